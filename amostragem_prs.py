@@ -0,0 +1,388 @@
+"""
+Coleta de PRs por amostragem estratificada
+Lab 03 - Sprint 1
+
+ColetorPRs lista os PRs de cada repositório em ordem de atualização (updated
+desc) até max_prs aprovados: além de pagar a listagem e o enriquecimento de
+todos os PRs até lá, o dataset fica concentrado na atividade recente. Aqui
+cada repositório é amostrado ao longo de todo o histórico:
+
+- Tamanho da amostra: fórmula de Cochran para estimar uma proporção com a
+  confiança e a margem de erro pedidas (p = 0,5, o pior caso), com a correção
+  para população finita. A população é total_closed_prs do repositório
+  (coletor_repositorios.py). Ela inclui os PRs que os filtros descartam, e o
+  tamanho cresce com a população: para a população dos PRs aprovados, o
+  tamanho obtido é conservador.
+- Estratos: os números 1..N (N = número do PR mais recente) são divididos em
+  `estratos` faixas de mesma largura, e a amostra é alocada proporcionalmente
+  à largura (a amostra continua autoponderada). Como os números crescem com a
+  data de criação, cada estrato cobre um período do histórico.
+- Sorteio: em cada estrato, os números são sorteados sem reposição e buscados
+  diretamente em /pulls/{n}, em paralelo (`simultaneas`). Números que não são
+  PRs (issues: 404), PRs abertos e PRs descartados pelos filtros dão lugar a
+  novos sorteios do mesmo estrato, até a cota ser atingida ou o estrato se
+  esgotar. Cada rodada sorteia o que falta dividido pela taxa de aprovação já
+  observada no estrato; aprovados além da cota (sobras da última rodada) ficam
+  fora do dataset, mas continuam no banco.
+
+O resumo de cada repositório (população, amostra alvo e obtida, margem de erro
+efetiva e a contagem dos números testados por resultado) é gravado em
+amostragem_prs.json no diretório base.
+
+Uso:
+    python amostragem_prs.py --confianca 0.95 --margem 0.05 --estratos 10
+"""
+
+import argparse
+import json
+import logging
+import math
+import random
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from statistics import NormalDist
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import configuracao
+import instrumentacao
+import metricas_pr
+import registro
+from armazenamento import ArmazenamentoColeta
+from cliente_http import ErroRequisicao, adicionar_argumentos_http
+from coleta_pipeline import ArmazenamentoEnfileirado, FilaMedida
+from coletor_prs import ColetorPRs, salvar_coleta
+
+logger = logging.getLogger(__name__)
+
+# Resumo da amostragem no diretório base
+ARQUIVO_RESUMO = "amostragem_prs.json"
+
+# Resultado da busca de cada número sorteado
+RESULTADOS = ('aprovado', 'descartado', 'aberto', 'inexistente', 'falha')
+
+
+def _z(confianca: float) -> float:
+    return NormalDist().inv_cdf((1 + confianca) / 2)
+
+
+def tamanho_amostra(populacao: int, confianca: float = 0.95, margem: float = 0.05, proporcao: float = 0.5) -> int:
+    """
+    Tamanho de amostra de Cochran com correção para população finita
+
+    n0 = z² p (1 - p) / e²  e  n = n0 / (1 + (n0 - 1) / N)
+
+    Args:
+        populacao: Tamanho da população (N)
+        confianca: Nível de confiança (ex.: 0.95)
+        margem: Margem de erro absoluta da proporção estimada (e)
+        proporcao: Proporção esperada (p); 0.5 é o pior caso
+
+    Returns:
+        Tamanho da amostra, no máximo a população
+    """
+    if populacao <= 0:
+        return 0
+    n0 = _z(confianca) ** 2 * proporcao * (1 - proporcao) / margem ** 2
+    return min(populacao, math.ceil(n0 / (1 + (n0 - 1) / populacao)))
+
+
+def margem_erro(amostra: int, populacao: int, confianca: float = 0.95, proporcao: float = 0.5) -> Optional[float]:
+    """
+    Margem de erro efetiva de uma amostra (inverso de tamanho_amostra)
+
+    Returns:
+        Margem de erro, ou None se a amostra é vazia
+    """
+    if amostra <= 0 or populacao <= 0:
+        return None
+    correcao = (populacao - amostra) / (populacao - 1) if populacao > 1 else 0.0
+    return _z(confianca) * math.sqrt(proporcao * (1 - proporcao) / amostra * max(correcao, 0.0))
+
+
+def estratos(maior_numero: int, quantidade: int) -> List[range]:
+    """
+    Divide os números 1..maior_numero em faixas contíguas de mesma largura (±1)
+    """
+    quantidade = max(1, min(quantidade, maior_numero))
+    limites = [1 + maior_numero * i // quantidade for i in range(quantidade + 1)]
+    return [range(inicio, fim) for inicio, fim in zip(limites[:-1], limites[1:])]
+
+
+def alocar(tamanho: int, faixas: Sequence[range]) -> List[int]:
+    """
+    Alocação proporcional à largura de cada estrato (método dos maiores restos)
+    """
+    total = sum(len(faixa) for faixa in faixas)
+    cotas = [tamanho * len(faixa) / total for faixa in faixas]
+    inteiras = [int(cota) for cota in cotas]
+    maiores_restos = sorted(range(len(faixas)), key=lambda h: inteiras[h] - cotas[h])
+    for h in maiores_restos[:tamanho - sum(inteiras)]:
+        inteiras[h] += 1
+    return inteiras
+
+
+class ColetorAmostral:
+    """
+    Amostra estratificada dos PRs fechados de cada repositório (ver o início do módulo)
+
+        with ArmazenamentoColeta(Path("coleta.sqlite")) as armazenamento:
+            amostral = ColetorAmostral(ColetorPRs(armazenamento=armazenamento), margem=0.05)
+            prs = amostral.coletar_todos_prs()
+    """
+
+    def __init__(self, coletor: ColetorPRs, confianca: float = 0.95, margem: float = 0.05, estratos: int = 10,
+                 simultaneas: int = 16, semente: Optional[int] = None):
+        """
+        Args:
+            coletor: Coletor usado nas requisições, nos filtros e no enriquecimento dos PRs
+            confianca: Nível de confiança da amostra de cada repositório
+            margem: Margem de erro da amostra de cada repositório
+            estratos: Faixas de números de PR em que cada repositório é dividido
+            simultaneas: Números buscados em paralelo
+            semente: Semente do sorteio (None: sorteio diferente a cada execução)
+        """
+        if not 0 < confianca < 1 or not 0 < margem < 1:
+            raise ValueError("confianca e margem devem estar entre 0 e 1")
+        if estratos < 1 or simultaneas < 1:
+            raise ValueError("estratos e simultaneas devem ser positivos")
+        self.coletor = coletor
+        self.confianca = confianca
+        self.margem = margem
+        self.estratos = estratos
+        self.simultaneas = simultaneas
+        self.sorteio = random.Random(semente)
+        self.resumos: Dict[str, Dict] = {}
+
+    def maior_numero(self, nome_repo: str) -> Optional[int]:
+        """
+        Número do PR mais recente do repositório (limite superior do sorteio)
+        """
+        response = self.coletor._get(f"{self.coletor.url_base}/repos/{nome_repo}/pulls", params={
+            'state': 'all',
+            'sort': 'created',
+            'direction': 'desc',
+            'per_page': 1
+        })
+        if response.status_code != 200:
+            logger.warning("%s: erro na requisição: %s", nome_repo, response.status_code)
+            return None
+        prs = self.coletor._json(response)
+        return prs[0]['number'] if prs else None
+
+    def buscar(self, nome_repo: str, numero: int) -> Tuple[str, Optional[Dict]]:
+        """
+        Busca o número sorteado em /pulls/{n} e, se for um PR fechado, aplica os filtros e coleta as métricas
+
+        Returns:
+            (resultado em RESULTADOS, PR com as métricas se foi aprovado)
+        """
+        try:
+            response = self.coletor._get(f"{self.coletor.url_base}/repos/{nome_repo}/pulls/{numero}")
+        except ErroRequisicao as e:
+            self.coletor.falhas.registrar(nome_repo, e.endpoint, str(e), url=e.url, pr=numero)
+            return 'falha', None
+
+        if response.status_code == 404:
+            # PRs e issues dividem a numeração: o número é de uma issue
+            return 'inexistente', None
+        if response.status_code != 200:
+            logger.warning("%s#%s: erro na requisição: %s", nome_repo, numero, response.status_code)
+            return 'falha', None
+
+        pr = self.coletor._json(response)
+        if pr.get('state') != 'closed':
+            return 'aberto', None
+        try:
+            resultado = self.coletor.processar_pr(pr, nome_repo)
+        except Exception as e:
+            logger.warning("%s#%s: erro ao processar PR: %s", nome_repo, numero, e)
+            return 'falha', None
+        return ('aprovado', resultado) if resultado else ('descartado', None)
+
+    @staticmethod
+    def _gravar(armazenamento: Optional[ArmazenamentoColeta], fila: FilaMedida, nome_repo: str,
+                aprovados: List[Dict]):
+        # Gravações enfileiradas pelas threads da rodada, feitas aqui, na thread principal
+        while not fila.empty():
+            tipo, *dados = fila.get_nowait()
+            getattr(armazenamento, tipo)(*dados)
+        if armazenamento:
+            for pr in aprovados:
+                armazenamento.salvar_pr(nome_repo, pr)
+
+    @instrumentacao.instrumentado('coleta.amostrar_repositorio')
+    def amostrar_repositorio(self, repo: Dict) -> List[Dict]:
+        """
+        Sorteia e coleta a amostra estratificada de um repositório
+
+        Args:
+            repo: Repositório de repositorios_selecionados.json (full_name e total_closed_prs)
+
+        Returns:
+            PRs da amostra, por estrato e na ordem do sorteio
+        """
+        nome_repo = repo.get('full_name', '')
+        populacao = repo.get('total_closed_prs', 0)
+        alvo = tamanho_amostra(populacao, self.confianca, self.margem)
+        maior = self.maior_numero(nome_repo) if alvo else None
+
+        resumo = {'populacao': populacao, 'amostra_alvo': alvo, 'maior_numero': maior,
+                  **dict.fromkeys(RESULTADOS, 0)}
+        self.resumos[nome_repo] = resumo
+        if not alvo or not maior:
+            resumo.update(amostra=0, margem_efetiva=None, estratos=[])
+            return []
+
+        faixas = estratos(maior, self.estratos)
+        cotas = alocar(alvo, faixas)
+        # Ordem do sorteio em cada estrato: uma permutação aleatória dos seus números
+        candidatos = [self.sorteio.sample(faixa, len(faixa)) for faixa in faixas]
+        testados = [0] * len(faixas)
+        aprovados: List[List[Dict]] = [[] for _ in faixas]
+        # Antes da primeira rodada, a taxa esperada é a fração dos números que são PRs fechados
+        taxa_inicial = min(1.0, populacao / maior)
+
+        armazenamento = self.coletor.armazenamento
+        fila = FilaMedida('escrita', 0)
+        self.coletor.armazenamento = ArmazenamentoEnfileirado(fila) if armazenamento else None
+        try:
+            with ThreadPoolExecutor(max_workers=self.simultaneas) as executor:
+                while True:
+                    rodada = []
+                    for h, cota in enumerate(cotas):
+                        faltam = cota - len(aprovados[h])
+                        restantes = len(candidatos[h]) - testados[h]
+                        if faltam <= 0 or not restantes:
+                            continue
+                        # Estimativa de Laplace: nunca zero, mesmo sem nenhum aprovado no estrato
+                        taxa = (len(aprovados[h]) + 1) / (testados[h] + 2) if testados[h] else taxa_inicial
+                        quantidade = min(restantes, math.ceil(faltam / taxa))
+                        rodada += [(h, numero) for numero in candidatos[h][testados[h]:testados[h] + quantidade]]
+                        testados[h] += quantidade
+                    if not rodada:
+                        break
+
+                    novos = []
+                    resultados = executor.map(lambda item: self.buscar(nome_repo, item[1]), rodada)
+                    for (h, _), (resultado, pr) in zip(rodada, resultados):
+                        resumo[resultado] += 1
+                        if pr is not None:
+                            aprovados[h].append(pr)
+                            novos.append(pr)
+                    self._gravar(armazenamento, fila, nome_repo, novos)
+        finally:
+            self.coletor.armazenamento = armazenamento
+
+        amostra = [pr for h, cota in enumerate(cotas) for pr in aprovados[h][:cota]]
+        resumo.update(
+            amostra=len(amostra),
+            margem_efetiva=margem_erro(len(amostra), populacao, self.confianca),
+            estratos=[{'numeros': [faixa.start, faixa.stop - 1], 'cota': cota, 'testados': testados[h],
+                       'amostra': min(cota, len(aprovados[h]))}
+                      for h, (faixa, cota) in enumerate(zip(faixas, cotas))],
+        )
+        if len(amostra) < alvo:
+            logger.warning("%s: amostra de %s PRs, abaixo da alvo (%s): "
+                           "estratos esgotados (margem de erro efetiva: %.3f)",
+                           nome_repo, len(amostra), alvo, resumo['margem_efetiva'] or 0)
+        logger.debug("%s: %d PRs na amostra, %d números testados", nome_repo, len(amostra), sum(testados))
+        return amostra
+
+    def salvar_resumo(self, nome_arquivo: str = ARQUIVO_RESUMO):
+        caminho = self.coletor.caminho_base / nome_arquivo
+        temporario = caminho.with_suffix('.tmp')
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump({'confianca': self.confianca, 'margem': self.margem, 'estratos': self.estratos,
+                       'repositorios': self.resumos}, f, indent=2, ensure_ascii=False)
+        temporario.replace(caminho)
+        logger.info("Resumo da amostragem salvo em: %s", caminho)
+
+    def coletar_todos_prs(self, arquivo_repositorios: str = "repositorios_selecionados.json") -> List[Dict]:
+        caminho_arquivo = self.coletor.caminho_base / arquivo_repositorios
+
+        if not caminho_arquivo.exists():
+            logger.error("Arquivo %s não encontrado!", caminho_arquivo)
+            return []
+
+        with open(caminho_arquivo, 'r', encoding='utf-8') as f:
+            repositorios = json.load(f)
+
+        logger.info("=== COLETA POR AMOSTRAGEM DE %s REPOSITÓRIOS "
+                    "(confiança %.0f%%, margem %.1f%%, %s estratos) ===\n",
+                    len(repositorios), self.confianca * 100, self.margem * 100, self.estratos)
+        progresso = registro.Progresso(len(repositorios), "Repositórios", logger)
+
+        todos_prs = []
+        for repo in repositorios:
+            try:
+                prs = self.amostrar_repositorio(repo)
+            except Exception as e:
+                logger.warning("Erro ao processar %s: %s", repo.get('full_name', ''), e)
+                progresso.avancar()
+                continue
+            todos_prs.extend(prs)
+            progresso.avancar(prs=len(prs))
+
+        progresso.concluir()
+        testados = sum(r[resultado] for r in self.resumos.values() for resultado in RESULTADOS)
+        logger.info("\n=== COLETA CONCLUÍDA ===")
+        logger.info("Total de PRs na amostra: %s (%s números testados)", len(todos_prs), testados)
+        self.salvar_resumo()
+
+        pendentes = len(self.coletor.falhas)
+        if pendentes:
+            logger.warning("%s itens falharam e estão em %s "
+                           "(reprocesse com: python coletor_prs.py --reprocessar-falhas)",
+                           pendentes, self.coletor.falhas.caminho.name)
+
+        return todos_prs
+
+
+def coletar(amostral: ColetorAmostral, arquivo_repos: str = "repositorios_selecionados.json") -> bool:
+    """
+    Versão por amostragem de coletor_prs.coletar
+
+    Returns:
+        True se algum PR foi coletado
+    """
+    logger.info("=== LAB 03 - SPRINT 1: COLETA DE PRs (AMOSTRAGEM) ===\n")
+
+    if not (amostral.coletor.caminho_base / arquivo_repos).exists():
+        logger.error("Arquivo %s não encontrado!", arquivo_repos)
+        logger.error("Execute primeiro o script coletor_repositorios.py para gerar a lista de repositórios.")
+        return False
+
+    todos_prs = amostral.coletar_todos_prs(arquivo_repos)
+    return salvar_coleta(amostral.coletor, todos_prs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Coleta de uma amostra estratificada dos PRs de cada repositório")
+    parser.add_argument('--banco', help="Banco SQLite normalizado da coleta (padrão: coleta.sqlite no diretório base)")
+    parser.add_argument('--confianca', type=float, default=0.95, help="Nível de confiança da amostra")
+    parser.add_argument('--margem', type=float, default=0.05, help="Margem de erro da amostra de cada repositório")
+    parser.add_argument('--estratos', type=int, default=10, help="Faixas de números de PR por repositório")
+    parser.add_argument('--simultaneas', type=int, default=16, help="Números de PR buscados em paralelo")
+    parser.add_argument('--semente', type=int, help="Semente do sorteio (para repetir a mesma amostra)")
+    parser.add_argument('--plugins', nargs='+', default=list(metricas_pr.PADRAO),
+                        help="Plugins de métricas ativos (python metricas_pr.py listar)")
+    adicionar_argumentos_http(parser)
+    args = parser.parse_args()
+
+    registro.configurar_logging()
+    banco = Path(args.banco) if args.banco else configuracao.caminho_base() / "coleta.sqlite"
+
+    with ArmazenamentoColeta(banco) as armazenamento:
+        try:
+            coletor = ColetorPRs(timeout=(args.timeout_conexao, args.timeout_leitura), hedge=args.hedge,
+                                 armazenamento=armazenamento, plugins=args.plugins)
+            amostral = ColetorAmostral(coletor, confianca=args.confianca, margem=args.margem,
+                                       estratos=args.estratos, simultaneas=args.simultaneas, semente=args.semente)
+        except ValueError as e:
+            parser.error(str(e))
+        coletar(amostral)
+
+
+if __name__ == "__main__":
+    main()
+    instrumentacao.finalizar(configuracao.caminho_base() / "trace_amostragem_prs.json")
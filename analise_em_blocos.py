@@ -0,0 +1,432 @@
+"""
+Análise de Pull Requests em blocos (fora da memória)
+Lab 03 - Caracterizando a atividade de code review no GitHub
+
+Executa as mesmas 8 RQs do AnalisadorPRs lendo o CSV em blocos, sem nunca
+carregar o dataset inteiro nem criar as colunas derivadas. Cada bloco atualiza
+sumários mescláveis (ver sumarios_streaming.py):
+- Esboços KLL para os percentis 1% e 99% usados no clipping de outliers
+- Contagens por categoria (mesmos limites do pd.cut em preparar_dados)
+- Momentos (média e desvio padrão) por status
+- Tabelas de contagem por valor distinto, das quais saem os postos exatos
+  para Mann-Whitney e Spearman (ou, nas RQs no modo aproximado, histogramas
+  de postos com faixas dadas pelos esboços KLL)
+
+A memória usada depende do tamanho do bloco e do número de valores distintos
+de cada métrica, não do número de PRs. Métricas quase contínuas (como o tempo
+de análise, com resolução de 1 segundo) podem ter quase tantos valores quanto
+PRs: quando a tabela de uma métrica passa de LIMITE_VALORES linhas, seus
+valores passam a ser agrupados em faixas geométricas de largura relativa
+PRECISAO_RELATIVA (ss.agrupar_relativo). Cada tabela fica então com no máximo
+ln(maior / menor valor) / ln(1 + PRECISAO_RELATIVA) linhas (~21 mil para uma
+razão de 10⁹ com 0.1%), e os testes dessa métrica tratam como empatados os
+valores a menos de 0.1% um do outro. Com os limites padrão, as tabelas somam
+algumas centenas de MB no pior caso, qualquer que seja o número de PRs.
+"""
+
+import argparse
+from datetime import datetime
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+import instrumentacao
+import sumarios_streaming as ss
+from executar_sprint2 import AnalisadorPRs
+
+
+class AnalisadorEmBlocos(AnalisadorPRs):
+    # Colunas lidas do CSV (as demais nunca são carregadas)
+    COLUNAS = ['repository', 'merged', 'total_additions', 'total_deletions', 'time_analysis_hours',
+               'description_chars', 'num_comments', 'num_participants']
+
+    METRICAS = ['total_changes', 'time_analysis_hours', 'description_chars', 'num_comments', 'num_participants']
+
+    # Resolução usada para discretizar métricas contínuas nas tabelas de contagem.
+    # O tempo de análise vem de timestamps com resolução de 1 segundo, então a
+    # discretização em segundos não altera nenhum empate.
+    RESOLUCAO = {'time_analysis_hours': 1 / 3600}
+
+    # Máximo de linhas da tabela de contagem de uma métrica (por status, e dos pares
+    # com o número de revisões) antes de agrupar seus valores em faixas relativas
+    LIMITE_VALORES = 1 << 20
+    PRECISAO_RELATIVA = 1e-3
+
+    # Nome do modo nas mensagens de início e fim da análise
+    MODO = "EM BLOCOS"
+
+    def __init__(self, arquivo_dataset: str = "dataset_prs.csv", tamanho_bloco: int = 500_000,
+                 limite_valores: Optional[int] = None, **opcoes):
+        """
+        Inicializa o analisador em blocos
+
+        Args:
+            arquivo_dataset: Nome do arquivo CSV com os dados dos PRs
+            tamanho_bloco: Número de linhas lidas por bloco
+            limite_valores: Linhas de uma tabela de contagem antes do agrupamento
+                (padrão: LIMITE_VALORES)
+            opcoes: Demais opções do AnalisadorPRs (caminho_base, categorias...)
+        """
+        super().__init__(arquivo_dataset, **opcoes)
+        self.tamanho_bloco = tamanho_bloco
+        self.limite_valores = limite_valores or self.LIMITE_VALORES
+        self.agrupadas = {}
+        # Nenhum gráfico é gerado neste modo: o relatório omite as imagens
+        self.formato_graficos = None
+
+    def carregar_dados(self) -> bool:
+        """
+        Verifica o dataset (os dados são lidos em blocos por preparar_dados)
+
+        Returns:
+            True se o arquivo existe, False caso contrário
+        """
+        print("=" * 80)
+        print(f"SPRINT 2 - ANÁLISE DE PULL REQUESTS ({self.MODO})")
+        print("=" * 80)
+        print()
+
+        if not self.caminho_dataset.exists():
+            print(f"❌ Erro: Arquivo {self.caminho_dataset} não encontrado!")
+            print("Execute primeiro a Sprint 1 para coletar os dados.")
+            return False
+
+        print(f"📂 Dataset: {self.caminho_dataset} (blocos de {self.tamanho_bloco} linhas)")
+        print()
+        return True
+
+    @classmethod
+    def _discretizar(cls, metrica: str, valores: pd.Series) -> pd.Series:
+        resolucao = cls.RESOLUCAO.get(metrica)
+        if resolucao is None:
+            return valores
+        return (valores / resolucao).round() * resolucao
+
+    @staticmethod
+    def _ler_blocos(leitor):
+        # Separa no trace o tempo de leitura do CSV do processamento de cada bloco
+        while True:
+            with instrumentacao.span('bloco.leitura', 'io'):
+                bloco = next(leitor, None)
+            if bloco is None:
+                return
+            instrumentacao.contar('blocos.linhas', len(bloco))
+            yield bloco
+
+    def _detectar_revisoes(self, colunas):
+        """
+        Inclui num_reviews nas colunas lidas e nas métricas quando o dataset a tem
+
+        Args:
+            colunas: Colunas do dataset
+        """
+        disponivel = self.COLUNA_REVISOES in colunas
+        self.COLUNAS = type(self).COLUNAS + ([self.COLUNA_REVISOES] if disponivel else [])
+        self.METRICAS = type(self).METRICAS + ([self.COLUNA_REVISOES] if disponivel else [])
+        self.definir_coluna_revisoes(disponivel)
+
+    def preparar_dados(self):
+        """
+        Lê o dataset em blocos e acumula todos os sumários usados pelas RQs
+        """
+        print("🔧 Processando dataset em blocos...")
+        self._detectar_revisoes(pd.read_csv(self.caminho_dataset, nrows=0).columns)
+
+        self.total_prs = 0
+        self.repositorios = set()
+        self.esbocos = {m: ss.EsbocoKLL() for m in self.METRICAS_SEM_OUTLIERS}
+        self.momentos = {(m, s): ss.Momentos() for m in self.METRICAS for s in (True, False)}
+        self.agrupadas = {}
+        contagens = {(m, s): ss.AcumuladorContagens() for m in self.METRICAS for s in (True, False)}
+        conjuntas = {}
+        self.categorias = {}
+        self.revisoes_por_categoria = {}
+
+        leitor = pd.read_csv(self.caminho_dataset, usecols=self.COLUNAS, chunksize=self.tamanho_bloco)
+
+        for i, bloco in enumerate(self._ler_blocos(leitor)):
+            bloco['merged'] = bloco['merged'].astype(bool)
+            bloco['total_changes'] = bloco['total_additions'] + bloco['total_deletions']
+
+            self.total_prs += len(bloco)
+            self.repositorios.update(bloco['repository'].dropna().unique())
+
+            for metrica in self.METRICAS:
+                bloco[metrica] = self._discretizar(metrica, bloco[metrica])
+
+            for metrica in self.METRICAS_SEM_OUTLIERS:
+                self.esbocos[metrica].atualizar(bloco[metrica].to_numpy())
+
+            # Valores das tabelas de contagem (agrupados nas métricas que passaram do limite)
+            tabelados = {m: self._agrupar(m, bloco[m]) for m in self.METRICAS}
+            for merged, grupo in bloco.groupby('merged'):
+                for metrica in self.METRICAS:
+                    self.momentos[(metrica, merged)].atualizar(grupo[metrica].to_numpy())
+                    contagens[(metrica, merged)].adicionar(ss.contar_valores(tabelados[metrica][grupo.index]))
+
+            # Pares (variável, revisões) para as correlações da Dimensão B
+            for _, variavel, comparacao in self._correlacoes():
+                conjuntas.setdefault(variavel, ss.AcumuladorContagens()).adicionar(
+                    ss.contar_pares(tabelados[variavel], tabelados[comparacao]))
+
+            self._limitar_tabelas(contagens, conjuntas)
+
+            for coluna, (origem, limites, rotulos) in self.CATEGORIAS.items():
+                categoria = pd.cut(bloco[origem], bins=limites, labels=rotulos)
+                self.categorias[coluna] = ss.mesclar_contagens(
+                    self.categorias.get(coluna), pd.crosstab(categoria, bloco['merged']).stack())
+                self.revisoes_por_categoria[coluna] = ss.mesclar_contagens(
+                    self.revisoes_por_categoria.get(coluna),
+                    ss.contar_pares(categoria.astype(object), bloco[self.coluna_revisoes]))
+
+            print(f"  Bloco {i + 1}: {self.total_prs} PRs processados")
+
+        self.contagens = {chave: acumulador.tabela for chave, acumulador in contagens.items()}
+        self.conjuntas = {variavel: acumulador.tabela for variavel, acumulador in conjuntas.items()}
+        self.limites_outliers = {
+            m: tuple(float(q) for q in esboco.quantis([0.01, 0.99])) for m, esboco in self.esbocos.items()
+        }
+        self._montar_resumo(len(self.repositorios))
+
+    def _correlacoes(self):
+        return (t for rq in ('RQ05', 'RQ06', 'RQ07', 'RQ08') for t in self.TESTES_RQ[rq])
+
+    def _agrupar(self, metrica: str, valores: pd.Series) -> pd.Series:
+        precisao = self.agrupadas.get(metrica)
+        if precisao is None:
+            return valores
+        return pd.Series(ss.agrupar_relativo(valores.to_numpy(dtype=float), precisao), index=valores.index)
+
+    def _limitar_tabelas(self, contagens: Dict, conjuntas: Dict):
+        """
+        Agrupa em faixas relativas as métricas cujas tabelas passaram de limite_valores
+
+        As tabelas já acumuladas são reagrupadas com a mesma função aplicada aos
+        blocos seguintes, então o resultado não depende do bloco em que o limite
+        foi atingido.
+        """
+        for metrica in self.METRICAS:
+            if metrica in self.agrupadas:
+                continue
+            tabelas = [(contagens[(metrica, s)], 0) for s in (True, False)]
+            tabelas += [(conjuntas[v], 0) for _, v, _ in self._correlacoes() if v == metrica and v in conjuntas]
+            # len() é um limite superior; a tabela mesclada dá o número exato
+            if not any(len(t) > self.limite_valores and len(t.tabela) > self.limite_valores for t, _ in tabelas):
+                continue
+            # Nos pares, a métrica também pode ser a comparação (o número de revisões)
+            tabelas += [(conjuntas[v], 1) for _, v, c in self._correlacoes() if c == metrica and v in conjuntas]
+
+            self.agrupadas[metrica] = self.PRECISAO_RELATIVA
+            for tabela, nivel in tabelas:
+                tabela.reagrupar(nivel, lambda v: ss.agrupar_relativo(v, self.PRECISAO_RELATIVA))
+            print(f"  • {metrica}: mais de {self.limite_valores} valores distintos; tabelas agrupadas em faixas "
+                  f"de {self.PRECISAO_RELATIVA:.1%} (valores mais próximos que isso contam como empates)")
+
+    def _montar_resumo(self, n_repositorios: int):
+        """
+        Totais e estatísticas descritivas do relatório, a partir dos sumários acumulados
+        """
+        merged_count = self.momentos[('total_changes', True)].n
+        closed_count = self.momentos[('total_changes', False)].n
+        if self.COLUNA_REVISOES in self.METRICAS:
+            self.avisar_revisoes_ausentes(self.total_prs - sum(self.momentos[(self.COLUNA_REVISOES, s)].n
+                                                               for s in (True, False)))
+
+        self.resumo = {
+            'data_analise': datetime.now().isoformat(timespec='minutes'),
+            'total_prs': self.total_prs,
+            'n_repositorios': n_repositorios,
+            'merged': merged_count,
+            'closed': closed_count,
+            'limites_outliers': self.limites_outliers,
+            'coluna_revisoes': self.coluna_revisoes,
+            'metricas': {
+                m: ss.descrever_contagens(ss.mesclar_contagens(self.contagens.get((m, True)),
+                                                               self.contagens.get((m, False), pd.Series(dtype=np.int64))))
+                for m in self.METRICAS
+            },
+        }
+
+        print("✓ Dados processados!")
+        print(f"  • Total de PRs: {self.total_prs}")
+        print(f"  • Repositórios únicos: {n_repositorios}")
+        print(f"  • PRs merged: {merged_count}")
+        print(f"  • PRs closed (não merged): {closed_count}")
+        print()
+
+    def _contagem(self, metrica: str, merged: bool) -> pd.Series:
+        return self.contagens.get((metrica, merged), pd.Series(dtype=np.int64))
+
+    def _quantis_faixas(self, metrica: str):
+        # Bordas dos testes aproximados: quantis do esboço KLL da métrica, quando há um
+        esboco = self.esbocos.get(metrica)
+        if esboco is None:
+            return None
+        return esboco.quantis(np.linspace(0, 1, self.faixas_histograma // 2 + 1))
+
+    def _mann_whitney(self, metrica: str) -> tuple:
+        # Teste exato (merged vs closed) a partir das tabelas de contagem
+        return ss.mann_whitney_de_contagens(self._contagem(metrica, True), self._contagem(metrica, False))
+
+    def _teste_status(self, rq: str, metrica: str) -> Dict:
+        if self.modo_testes.get(rq) == 'aproximado':
+            merged, closed = self._contagem(metrica, True), self._contagem(metrica, False)
+            r = ss.mann_whitney_aproximado(merged.index, closed.index, self.faixas_histograma,
+                                           self._quantis_faixas(metrica), merged.to_numpy(), closed.to_numpy())
+            self._registrar_aproximacao(rq, metrica, 'mann_whitney', r)
+            u_stat, p_value = (r['u_stat'], r['p_value']) if r else (None, None)
+        else:
+            u_stat, p_value = self._mann_whitney(metrica)
+        merged, closed = self.momentos[(metrica, True)], self.momentos[(metrica, False)]
+        mediana_merged = ss.descrever_contagens(self._contagem(metrica, True))['50%']
+        mediana_closed = ss.descrever_contagens(self._contagem(metrica, False))['50%']
+
+        print(f"{rq} - {metrica}:")
+        print(f"  • MERGED: média={merged.media:.2f}, mediana={mediana_merged:.2f}, "
+              f"desvio padrão={merged.desvio_padrao:.2f}")
+        print(f"  • CLOSED: média={closed.media:.2f}, mediana={mediana_closed:.2f}, "
+              f"desvio padrão={closed.desvio_padrao:.2f}")
+        if u_stat is not None:
+            print(f"  • Mann-Whitney U: U={u_stat:.2f}, p={p_value:.4f} ({self.interpretar_p_valor(p_value)})")
+
+        return {'u_stat': u_stat, 'p_value': p_value, 'merged_mean': merged.media, 'closed_mean': closed.media}
+
+    def _teste_correlacao(self, rq: str, variavel: str, comparacao: str) -> Dict:
+        conjunta = self.conjuntas[variavel]
+        if self.modo_testes.get(rq) == 'aproximado':
+            r = ss.spearman_aproximado(conjunta.index.get_level_values(0), conjunta.index.get_level_values(1),
+                                       self.faixas_histograma, self._quantis_faixas(variavel),
+                                       pesos=conjunta.to_numpy())
+            self._registrar_aproximacao(rq, variavel, 'spearman', r)
+            corr, p_value = (r['correlacao'], r['p_value']) if r else (None, None)
+        else:
+            corr, p_value = ss.spearman_de_contagens(conjunta)
+
+        print(f"{rq} - {variavel} vs {comparacao}:")
+        if corr is not None:
+            print(f"  • Spearman: ρ={corr:.4f}, p={p_value:.4f} ({self.interpretar_correlacao(corr)})")
+
+        return {
+            'correlacao': corr,
+            'p_value': p_value,
+            'interpretacao': self.interpretar_correlacao(corr) if corr is not None else None,
+            'significativo': p_value is not None and p_value < 0.05,
+        }
+
+    def executar_testes(self):
+        """
+        Responde às 8 RQs a partir dos sumários acumulados
+        """
+        print("=" * 80)
+        print("TESTES ESTATÍSTICOS")
+        print("=" * 80)
+        print()
+
+        titulos = {
+            'RQ01': 'Tamanho dos PRs vs Feedback Final',
+            'RQ02': 'Tempo de Análise vs Feedback Final',
+            'RQ03': 'Descrição dos PRs vs Feedback Final',
+            'RQ04': 'Interações nos PRs vs Feedback Final',
+            'RQ05': 'Tamanho dos PRs vs Número de Revisões',
+            'RQ06': 'Tempo de Análise vs Número de Revisões',
+            'RQ07': 'Descrição dos PRs vs Número de Revisões',
+            'RQ08': 'Interações vs Número de Revisões',
+        }
+
+        for rq in ('RQ01', 'RQ02', 'RQ03'):
+            _, metrica, _ = self.TESTES_RQ[rq][0]
+            resultado = self._teste_status(rq, metrica)
+            resultado['significativo'] = resultado['p_value'] is not None and resultado['p_value'] < 0.05
+            self.resultados[rq] = {'titulo': titulos[rq], **resultado}
+
+        comentarios = self._teste_status('RQ04', 'num_comments')
+        participantes = self._teste_status('RQ04', 'num_participants')
+        self.resultados['RQ04'] = {
+            'titulo': titulos['RQ04'],
+            'u_stat_comments': comentarios['u_stat'],
+            'p_value_comments': comentarios['p_value'],
+            'u_stat_participants': participantes['u_stat'],
+            'p_value_participants': participantes['p_value'],
+            'merged_mean_comments': comentarios['merged_mean'],
+            'closed_mean_comments': comentarios['closed_mean'],
+            'merged_mean_participants': participantes['merged_mean'],
+            'closed_mean_participants': participantes['closed_mean'],
+            'significativo_comments': comentarios['p_value'] is not None and comentarios['p_value'] < 0.05,
+            'significativo_participants': participantes['p_value'] is not None and participantes['p_value'] < 0.05,
+        }
+
+        for rq in ('RQ05', 'RQ06', 'RQ07', 'RQ08'):
+            _, variavel, comparacao = self.TESTES_RQ[rq][0]
+            self.resultados[rq] = {'titulo': titulos[rq], **self._teste_correlacao(rq, variavel, comparacao)}
+        self.anexar_aproximacoes()
+
+        print()
+        print(f"📈 {self.rotulo_revisoes} por categoria:")
+        for coluna, contagens in self.revisoes_por_categoria.items():
+            print(f"  {coluna}:")
+            for categoria in self.CATEGORIAS[coluna][2]:
+                if categoria not in contagens.index.get_level_values(0):
+                    continue
+                d = ss.descrever_contagens(contagens.xs(categoria, level=0))
+                print(f"    • {categoria}: média={d['mean']:.2f}, mediana={d['50%']:.2f}")
+        print()
+
+    def executar_analise_completa(self, bootstrap: bool = False, estratificado: bool = False,
+                                  formatos_relatorio: tuple = ('md',)):
+        """
+        Executa a análise em blocos de todas as RQs
+
+        Bootstrap e análise estratificada exigem os dados completos em memória e
+        não estão disponíveis neste modo.
+        """
+        if bootstrap or estratificado:
+            print(f"⚠ Bootstrap e análise estratificada não são suportados na análise {self.MODO.lower()}.")
+
+        self.tempos_etapas = {}
+
+        with self._etapa('carregar_dados'):
+            if not self.carregar_dados():
+                return False
+
+        with self._etapa('preparar_dados'):
+            self.preparar_dados()
+        with self._etapa('testes'):
+            self.executar_testes()
+        with self._etapa('relatorio'):
+            self.gerar_relatorio_final(formatos_relatorio)
+
+        self.registrar_execucao()
+
+        print("=" * 80)
+        print(f"✓ ANÁLISE {self.MODO} CONCLUÍDA!")
+        print("=" * 80)
+        print()
+
+        return True
+
+
+def main():
+    """
+    Função principal para executar a análise em blocos
+    """
+    parser = argparse.ArgumentParser(description="Análise de PRs em blocos (datasets maiores que a memória)")
+    parser.add_argument('--arquivo', default="dataset_prs.csv", help="CSV com os dados dos PRs")
+    parser.add_argument('--tamanho-bloco', type=int, default=500_000, help="Linhas lidas por bloco")
+    parser.add_argument('--limite-valores', type=int, default=AnalisadorEmBlocos.LIMITE_VALORES,
+                        help="Valores distintos de uma métrica antes de agrupá-los em faixas relativas")
+    parser.add_argument('--aproximado', nargs='*', metavar='RQ', choices=list(AnalisadorEmBlocos.TESTES_RQ),
+                        help="RQs com testes aproximados (sem RQs: todas)")
+    args = parser.parse_args()
+
+    modo_testes = None
+    if args.aproximado is not None:
+        modo_testes = {rq: 'aproximado' for rq in args.aproximado or AnalisadorEmBlocos.TESTES_RQ}
+    analisador = AnalisadorEmBlocos(args.arquivo, tamanho_bloco=args.tamanho_bloco,
+                                    limite_valores=args.limite_valores, modo_testes=modo_testes)
+    analisador.executar_analise_completa()
+    instrumentacao.finalizar(analisador.caminho_base / "trace_blocos.json")
+
+
+if __name__ == "__main__":
+    main()
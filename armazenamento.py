@@ -0,0 +1,376 @@
+"""
+Armazenamento normalizado da coleta (SQLite)
+Lab 03 - Caracterizando a atividade de code review no GitHub
+
+Os coletores gravam aqui, além dos JSON/CSV de sempre, os detalhes que antes
+eram descartados depois de contados: cada revisão, comentário e arquivo
+alterado de cada PR. Tabelas:
+
+- repositorios: um registro por repositório (chave: id do GitHub)
+- pull_requests: um registro por PR com as métricas da coleta (chave: id; único por repository + number)
+- revisoes, comentarios: um registro por revisão / comentário (chave: id do GitHub)
+- arquivos: um registro por arquivo alterado (chave: repository + pr_number + filename)
+
+As inserções são acumuladas em memória e gravadas em lotes, cada lote em uma
+única transação. Novas métricas saem de SQL sobre o banco, sem novas chamadas
+à API (veja METRICAS):
+
+    python armazenamento.py resumo
+    python armazenamento.py metrica horas_ate_primeira_revisao --saida primeira_revisao.csv
+    python armazenamento.py sql "SELECT state, COUNT(*) FROM revisoes GROUP BY state"
+    python armazenamento.py exportar --saida dataset_prs.csv
+
+A view dataset_prs tem as mesmas colunas de dataset_prs.csv.
+"""
+
+import argparse
+import csv
+import sqlite3
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import configuracao
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS repositorios (
+    id INTEGER PRIMARY KEY,
+    full_name TEXT NOT NULL UNIQUE,
+    name TEXT,
+    description TEXT,
+    html_url TEXT,
+    stars INTEGER,
+    forks INTEGER,
+    language TEXT,
+    created_at TEXT,
+    updated_at TEXT,
+    total_closed_prs INTEGER
+);
+CREATE TABLE IF NOT EXISTS pull_requests (
+    id INTEGER PRIMARY KEY,
+    repository TEXT NOT NULL,
+    number INTEGER NOT NULL,
+    title TEXT,
+    state TEXT,
+    merged INTEGER NOT NULL,
+    user_login TEXT,
+    created_at TEXT,
+    closed_at TEXT,
+    merged_at TEXT,
+    description_chars INTEGER,
+    num_files INTEGER,
+    total_additions INTEGER,
+    total_deletions INTEGER,
+    time_analysis_hours REAL,
+    num_comments INTEGER,
+    num_participants INTEGER,
+    coletado_em TEXT NOT NULL,
+    UNIQUE (repository, number)
+);
+CREATE TABLE IF NOT EXISTS revisoes (
+    id INTEGER PRIMARY KEY,
+    repository TEXT NOT NULL,
+    pr_number INTEGER NOT NULL,
+    user_login TEXT,
+    user_type TEXT,
+    state TEXT,
+    submitted_at TEXT,
+    author_association TEXT,
+    body_chars INTEGER
+);
+CREATE TABLE IF NOT EXISTS comentarios (
+    id INTEGER PRIMARY KEY,
+    repository TEXT NOT NULL,
+    pr_number INTEGER NOT NULL,
+    user_login TEXT,
+    user_type TEXT,
+    created_at TEXT,
+    author_association TEXT,
+    body_chars INTEGER
+);
+CREATE TABLE IF NOT EXISTS arquivos (
+    repository TEXT NOT NULL,
+    pr_number INTEGER NOT NULL,
+    filename TEXT NOT NULL,
+    status TEXT,
+    additions INTEGER,
+    deletions INTEGER,
+    changes INTEGER,
+    PRIMARY KEY (repository, pr_number, filename)
+);
+CREATE INDEX IF NOT EXISTS idx_prs_repository ON pull_requests (repository);
+CREATE INDEX IF NOT EXISTS idx_revisoes_pr ON revisoes (repository, pr_number);
+CREATE INDEX IF NOT EXISTS idx_revisoes_usuario ON revisoes (user_login);
+CREATE INDEX IF NOT EXISTS idx_comentarios_pr ON comentarios (repository, pr_number);
+"""
+
+# Versão da view dataset_prs (PRAGMA user_version). A view só é recriada quando
+# o banco tem uma versão anterior: abrir um banco em dia não altera o arquivo,
+# cujo hash o pipeline usa para saber se a etapa 'prs' está em dia. Incremente
+# ao alterar VIEW_DATASET
+VERSAO_VIEW = 2
+
+VIEW_DATASET = """
+DROP VIEW IF EXISTS dataset_prs;
+CREATE VIEW dataset_prs AS
+SELECT p.id AS pr_id, p.number AS pr_number, p.repository, p.title, p.state, p.merged, p.user_login AS user,
+       p.created_at, p.closed_at, p.merged_at, p.num_files, p.total_additions, p.total_deletions,
+       p.time_analysis_hours, p.description_chars, p.num_comments, p.num_participants,
+       COALESCE(r.num_reviews, 0) AS num_reviews, COALESCE(r.reviews_approved, 0) AS reviews_approved,
+       COALESCE(r.reviews_changes_requested, 0) AS reviews_changes_requested,
+       COALESCE(r.reviews_commented, 0) AS reviews_commented, COALESCE(r.reviews_dismissed, 0) AS reviews_dismissed,
+       (julianday(r.primeira_revisao) - julianday(p.created_at)) * 24 AS first_review_hours
+FROM pull_requests p
+LEFT JOIN (
+    SELECT repository, pr_number, COUNT(*) AS num_reviews,
+           SUM(state = 'APPROVED') AS reviews_approved,
+           SUM(state = 'CHANGES_REQUESTED') AS reviews_changes_requested,
+           SUM(state = 'COMMENTED') AS reviews_commented,
+           SUM(state = 'DISMISSED') AS reviews_dismissed,
+           MIN(submitted_at) AS primeira_revisao
+    FROM revisoes
+    WHERE state IS NOT 'PENDING'
+    GROUP BY repository, pr_number
+) r ON r.repository = p.repository AND r.pr_number = p.number;
+"""
+
+# Colunas de cada tabela, na ordem de inserção; os lotes são gravados nesta ordem
+COLUNAS = {
+    'repositorios': ('id', 'full_name', 'name', 'description', 'html_url', 'stars', 'forks', 'language',
+                     'created_at', 'updated_at', 'total_closed_prs'),
+    'pull_requests': ('id', 'repository', 'number', 'title', 'state', 'merged', 'user_login', 'created_at',
+                      'closed_at', 'merged_at', 'description_chars', 'num_files', 'total_additions',
+                      'total_deletions', 'time_analysis_hours', 'num_comments', 'num_participants',
+                      'coletado_em'),
+    'revisoes': ('id', 'repository', 'pr_number', 'user_login', 'user_type', 'state', 'submitted_at',
+                 'author_association', 'body_chars'),
+    'comentarios': ('id', 'repository', 'pr_number', 'user_login', 'user_type', 'created_at',
+                    'author_association', 'body_chars'),
+    'arquivos': ('repository', 'pr_number', 'filename', 'status', 'additions', 'deletions', 'changes'),
+}
+
+# Métricas calculadas só com SQL sobre os dados já coletados
+METRICAS = {
+    'horas_ate_primeira_revisao': """
+        SELECT p.repository, p.number, p.merged,
+               (julianday(MIN(r.submitted_at)) - julianday(p.created_at)) * 24 AS horas_ate_primeira_revisao
+        FROM pull_requests p
+        JOIN revisoes r ON r.repository = p.repository AND r.pr_number = p.number
+        WHERE r.submitted_at IS NOT NULL
+        GROUP BY p.id
+    """,
+    'revisores_distintos': """
+        SELECT p.repository, p.number, p.merged, COUNT(DISTINCT r.user_login) AS revisores_distintos,
+               COUNT(r.id) AS num_revisoes
+        FROM pull_requests p
+        LEFT JOIN revisoes r ON r.repository = p.repository AND r.pr_number = p.number
+        GROUP BY p.id
+    """,
+    'estados_revisoes': """
+        SELECT p.repository, p.number, p.merged,
+               SUM(r.state = 'APPROVED') AS aprovacoes,
+               SUM(r.state = 'CHANGES_REQUESTED') AS pedidos_de_mudanca,
+               SUM(r.state = 'COMMENTED') AS revisoes_comentario
+        FROM pull_requests p
+        JOIN revisoes r ON r.repository = p.repository AND r.pr_number = p.number
+        GROUP BY p.id
+    """,
+    'comentarios_de_bots': """
+        SELECT p.repository, p.number, COALESCE(SUM(c.user_type = 'Bot'), 0) AS comentarios_bots,
+               COUNT(c.id) AS comentarios
+        FROM pull_requests p
+        LEFT JOIN comentarios c ON c.repository = p.repository AND c.pr_number = p.number
+        GROUP BY p.id
+    """,
+    'extensoes_alteradas': """
+        SELECT CASE WHEN instr(filename, '.') > 0
+                    THEN lower(replace(filename, rtrim(filename, replace(filename, '.', '')), ''))
+                    ELSE '(sem extensão)' END AS extensao,
+               COUNT(*) AS arquivos, SUM(changes) AS linhas_alteradas
+        FROM arquivos
+        GROUP BY extensao
+        ORDER BY arquivos DESC
+    """,
+}
+
+
+def _usuario(item: Dict) -> Tuple[Optional[str], Optional[str]]:
+    usuario = item.get('user') or {}
+    return usuario.get('login'), usuario.get('type')
+
+
+def _tamanho(texto: Optional[str]) -> int:
+    return len(texto or '')
+
+
+def conectar(caminho_banco: Path) -> sqlite3.Connection:
+    # A conexão pode ser usada por outra thread, uma de cada vez (ex.: o escritor de coleta_pipeline)
+    conexao = sqlite3.connect(caminho_banco, check_same_thread=False)
+    conexao.execute('PRAGMA journal_mode=WAL')
+    conexao.execute('PRAGMA synchronous=NORMAL')
+    conexao.executescript(ESQUEMA)
+    if conexao.execute('PRAGMA user_version').fetchone()[0] < VERSAO_VIEW:
+        conexao.executescript(VIEW_DATASET + f"PRAGMA user_version = {VERSAO_VIEW};")
+    return conexao
+
+
+class ArmazenamentoColeta:
+    """
+    Escrita em lotes transacionais no banco da coleta
+
+    Exemplo:
+        with ArmazenamentoColeta(Path("coleta.sqlite")) as armazenamento:
+            coletor = ColetorPRs(armazenamento=armazenamento)
+            ...
+    """
+
+    def __init__(self, caminho_banco: Path, tamanho_lote: int = 500):
+        """
+        Args:
+            caminho_banco: Arquivo SQLite (criado se não existir)
+            tamanho_lote: Linhas acumuladas antes de cada gravação
+        """
+        self.caminho_banco = Path(caminho_banco)
+        self.tamanho_lote = tamanho_lote
+        self.conexao = conectar(self.caminho_banco)
+        self.pendentes: Dict[str, List[Tuple]] = {tabela: [] for tabela in COLUNAS}
+        self.total_pendentes = 0
+        self.linhas_gravadas = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        self.fechar()
+        return False
+
+    def _adicionar(self, tabela: str, linhas: Iterable[Tuple]):
+        linhas = list(linhas)
+        self.pendentes[tabela].extend(linhas)
+        self.total_pendentes += len(linhas)
+        if self.total_pendentes >= self.tamanho_lote:
+            self.descarregar()
+
+    def descarregar(self):
+        """
+        Grava todas as linhas pendentes em uma transação
+        """
+        if not self.total_pendentes:
+            return
+        with self.conexao:
+            for tabela, colunas in COLUNAS.items():
+                linhas = self.pendentes[tabela]
+                if linhas:
+                    self.conexao.executemany(
+                        f"INSERT OR REPLACE INTO {tabela} ({', '.join(colunas)}) "
+                        f"VALUES ({', '.join('?' * len(colunas))})", linhas)
+                    linhas.clear()
+        self.linhas_gravadas += self.total_pendentes
+        self.total_pendentes = 0
+
+    def fechar(self):
+        self.descarregar()
+        self.conexao.close()
+
+    def salvar_repositorios(self, repositorios: Sequence[Dict]):
+        """
+        Args:
+            repositorios: Repositórios no formato de repositorios_selecionados.json
+        """
+        self._adicionar('repositorios', (
+            tuple(repo.get(coluna) for coluna in COLUNAS['repositorios']) for repo in repositorios))
+
+    def salvar_pr(self, nome_repo: str, pr: Dict):
+        """
+        Args:
+            nome_repo: Repositório do PR (owner/nome)
+            pr: PR da API já com as métricas da coleta (num_files, num_comments...)
+        """
+        login, _ = _usuario(pr)
+        self._adicionar('pull_requests', [(
+            pr.get('id'), nome_repo, pr.get('number'), pr.get('title'), pr.get('state'),
+            int(pr.get('merged_at') is not None), login, pr.get('created_at'), pr.get('closed_at'),
+            pr.get('merged_at'), pr.get('description_chars'), pr.get('num_files'), pr.get('total_additions'),
+            pr.get('total_deletions'), pr.get('time_analysis_hours'), pr.get('num_comments'),
+            pr.get('num_participants'), datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        )])
+
+    def salvar_revisoes(self, nome_repo: str, numero_pr: int, revisoes: Sequence[Dict]):
+        self._adicionar('revisoes', (
+            (r.get('id'), nome_repo, numero_pr, *_usuario(r), r.get('state'), r.get('submitted_at'),
+             r.get('author_association'), _tamanho(r.get('body')))
+            for r in revisoes))
+
+    def salvar_comentarios(self, nome_repo: str, numero_pr: int, comentarios: Sequence[Dict]):
+        self._adicionar('comentarios', (
+            (c.get('id'), nome_repo, numero_pr, *_usuario(c), c.get('created_at'),
+             c.get('author_association'), _tamanho(c.get('body')))
+            for c in comentarios))
+
+    def salvar_arquivos(self, nome_repo: str, numero_pr: int, arquivos: Sequence[Dict]):
+        self._adicionar('arquivos', (
+            (nome_repo, numero_pr, a.get('filename'), a.get('status'), a.get('additions'),
+             a.get('deletions'), a.get('changes'))
+            for a in arquivos))
+
+
+def consultar(conexao: sqlite3.Connection, sql: str, parametros: Sequence = ()) -> Tuple[List[str], List[Tuple]]:
+    """
+    Executa uma consulta e devolve (colunas, linhas)
+    """
+    cursor = conexao.execute(sql, parametros)
+    return [d[0] for d in cursor.description or ()], cursor.fetchall()
+
+
+def _escrever(colunas: List[str], linhas: List[Tuple], saida: Optional[str]):
+    if saida:
+        with open(saida, 'w', newline='', encoding='utf-8') as f:
+            escritor = csv.writer(f)
+            escritor.writerow(colunas)
+            escritor.writerows(linhas)
+        print(f"✓ {len(linhas)} linhas salvas em {saida}")
+        return
+    escritor = csv.writer(sys.stdout, delimiter='\t')
+    escritor.writerow(colunas)
+    escritor.writerows(linhas)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Consultas ao banco normalizado da coleta")
+    parser.add_argument('--banco', default=str(configuracao.caminho_base() / "coleta.sqlite"),
+                        help="Arquivo SQLite da coleta")
+    sub = parser.add_subparsers(dest='comando', required=True)
+
+    sub.add_parser('resumo', help="Linhas em cada tabela")
+
+    p_metrica = sub.add_parser('metrica', help="Calcula uma métrica pré-definida")
+    p_metrica.add_argument('nome', choices=sorted(METRICAS))
+    p_metrica.add_argument('--saida', help="Arquivo CSV (padrão: terminal)")
+
+    p_sql = sub.add_parser('sql', help="Executa uma consulta SQL")
+    p_sql.add_argument('consulta')
+    p_sql.add_argument('--saida', help="Arquivo CSV (padrão: terminal)")
+
+    p_exportar = sub.add_parser('exportar', help="Exporta a view dataset_prs para CSV")
+    p_exportar.add_argument('--saida', default='dataset_prs.csv')
+
+    args = parser.parse_args()
+    conexao = conectar(Path(args.banco))
+
+    if args.comando == 'resumo':
+        for tabela in COLUNAS:
+            total = conexao.execute(f"SELECT COUNT(*) FROM {tabela}").fetchone()[0]
+            print(f"  • {tabela}: {total:,}")
+    elif args.comando == 'metrica':
+        _escrever(*consultar(conexao, METRICAS[args.nome]), args.saida)
+    elif args.comando == 'sql':
+        _escrever(*consultar(conexao, args.consulta), args.saida)
+    elif args.comando == 'exportar':
+        _escrever(*consultar(conexao, "SELECT * FROM dataset_prs"), args.saida)
+
+    conexao.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""
+API falsa do GitHub para testes locais
+Lab 03 - Caracterizando a atividade de code review no GitHub
+
+Servidor HTTP local que imita os endpoints usados pelos coletores (search,
+repos, pulls, reviews, files, comments) com dados sintéticos e latência
+controlada: cada resposta leva `latencia` segundos e uma fração `fracao_lenta`
+delas leva `latencia_lenta` segundos (a cauda que timeouts e hedge devem
+controlar).
+
+Como a API real, toda resposta 200 traz um ETag, e um GET com If-None-Match
+igual ao ETag atual recebe 304 sem corpo. `servidor.versoes` (full_name ->
+versão) simula repositórios alterados: cada versão soma estrelas e avança o
+updated_at do repositório.
+
+As listas de reviews, files e comments são paginadas como na API (per_page,
+padrão 30, e cabeçalho Link com rel="next" quando há mais páginas); a cada
+25 PRs, um tem 130 comentários, mais que uma página de 100.
+
+`servidor.requisicoes` conta as requisições recebidas por recurso (último
+segmento do caminho que não é um número: pulls, reviews, files...).
+
+Uso:
+    python benchmarks/api_falsa.py --porta 8765 --fracao-lenta 0.05
+    GITHUB_API_URL=http://127.0.0.1:8765 python coletor_prs.py --hedge
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+import zlib
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlencode, urlparse
+
+PRS_POR_REPOSITORIO = 150
+REPOSITORIOS = 50
+
+
+def _pr(nome_repo: str, numero: int) -> Dict:
+    criado = 1_600_000_000 + numero * 3600
+    merged = numero % 3 != 0
+    return {
+        'id': zlib.crc32(f"{nome_repo}#{numero}".encode()),
+        'number': numero,
+        'title': f"PR {numero}",
+        'state': 'closed',
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(criado)),
+        'closed_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(criado + 7200 + numero * 60)),
+        'merged_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(criado + 7200)) if merged else None,
+        'body': "x" * (numero * 7 % 500),
+        'user': {'login': f"autor{numero % 11}"},
+        'base': {'repo': {'id': zlib.crc32(nome_repo.encode()), 'full_name': nome_repo}},
+    }
+
+
+def _repositorio(i: int, versoes: Dict[str, int]) -> Dict:
+    nome_repo = f"org{i}/repo{i}"
+    versao = versoes.get(nome_repo, 0)
+    return {'id': zlib.crc32(nome_repo.encode()), 'full_name': nome_repo, 'name': f"repo{i}",
+            'stargazers_count': 100000 - i + versao, 'language': 'Python', 'description': '', 'html_url': '',
+            'created_at': '2015-01-01T00:00:00Z',
+            'updated_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(1_704_067_200 + versao * 86400)),
+            'forks_count': 10, 'open_issues_count': 1}
+
+
+def _paginar(itens: List, pagina: int, por_pagina: int) -> Tuple[int, List, Optional[int]]:
+    fim = pagina * por_pagina
+    return 200, itens[fim - por_pagina:fim], pagina + 1 if fim < len(itens) else None
+
+
+def _resposta(caminho: str, consulta: Dict[str, List[str]], repositorios: int = REPOSITORIOS,
+              versoes: Optional[Dict[str, int]] = None) -> Tuple[int, object, Optional[int]]:
+    """
+    Status, corpo e número da próxima página (None se não há, ou não é uma lista paginada)
+    """
+    versoes = versoes or {}
+    partes = [p for p in caminho.split('/') if p]
+    pagina = int(consulta.get('page', ['1'])[0])
+    por_pagina = int(consulta.get('per_page', ['30'])[0])
+
+    if partes[:2] == ['search', 'repositories']:
+        itens = [_repositorio(i, versoes)
+                 for i in range((pagina - 1) * por_pagina, min(pagina * por_pagina, repositorios))]
+        return 200, {'total_count': repositorios, 'items': itens}, None
+    if partes[:2] == ['search', 'issues']:
+        return 200, {'total_count': PRS_POR_REPOSITORIO, 'items': []}, None
+    if len(partes) < 3 or partes[0] != 'repos':
+        return 404, {'message': 'Not Found'}, None
+
+    nome_repo = f"{partes[1]}/{partes[2]}"
+    if len(partes) == 3:
+        i = int(partes[2][len('repo'):])
+        return (200, _repositorio(i, versoes), None) if i < repositorios else (404, {'message': 'Not Found'}, None)
+    if partes[3] == 'pulls' and len(partes) == 4:
+        inicio = (pagina - 1) * por_pagina + 1
+        numeros = range(inicio, min(inicio + por_pagina, PRS_POR_REPOSITORIO + 1))
+        if consulta.get('sort') == ['created'] and consulta.get('direction') == ['desc']:
+            # Mais recentes primeiro (a amostragem busca o maior número assim)
+            numeros = [PRS_POR_REPOSITORIO + 1 - n for n in numeros]
+        return 200, [_pr(nome_repo, n) for n in numeros], None
+
+    numero = int(partes[4])
+    if len(partes) == 5:
+        return 200, _pr(nome_repo, numero), None
+    recurso = partes[5]
+    if recurso == 'reviews':
+        return _paginar([{'id': i, 'user': {'login': f"revisor{(numero + i) % 7}"}, 'state': 'APPROVED'}
+                         for i in range(numero % 4)], pagina, por_pagina)
+    if recurso == 'files':
+        return _paginar([{'filename': f"arquivo{i}.py", 'additions': numero % 50, 'deletions': i}
+                         for i in range(1 + numero % 5)], pagina, por_pagina)
+    if recurso == 'comments':
+        quantidade = 130 if numero % 25 == 0 else numero % 6
+        return _paginar([{'id': i, 'user': {'login': f"comentador{i % 5}"}} for i in range(quantidade)],
+                        pagina, por_pagina)
+    return 404, {'message': 'Not Found'}, None
+
+
+def criar_servidor(porta: int = 0, latencia: float = 0.01, fracao_lenta: float = 0.05,
+                   latencia_lenta: float = 1.0, semente: int = 42,
+                   repositorios: int = REPOSITORIOS) -> ThreadingHTTPServer:
+    """
+    Cria o servidor (porta 0 = porta livre escolhida pelo sistema)
+
+    Args:
+        porta: Porta local
+        latencia: Latência normal de cada resposta, em segundos
+        fracao_lenta: Fração das respostas que caem na cauda lenta
+        latencia_lenta: Latência das respostas lentas, em segundos
+        semente: Semente do sorteio das respostas lentas
+        repositorios: Repositórios devolvidos pela busca
+
+    Returns:
+        Servidor ainda não iniciado (use iniciar_em_thread ou serve_forever)
+    """
+    sorteio = random.Random(semente)
+    trava = threading.Lock()
+    versoes: Dict[str, int] = {}
+    requisicoes: Counter = Counter()
+
+    class Manipulador(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            recurso = next((p for p in reversed(url.path.split('/')) if p and not p.isdigit()), '')
+            with trava:
+                lenta = sorteio.random() < fracao_lenta
+                requisicoes[recurso] += 1
+            time.sleep(latencia_lenta if lenta else latencia)
+
+            consulta = parse_qs(url.query)
+            status, corpo, proxima = _resposta(url.path, consulta, repositorios, versoes)
+            conteudo = json.dumps(corpo).encode('utf-8')
+            etag = f'W/"{zlib.crc32(conteudo):08x}"'
+            if status == 200 and self.headers.get('If-None-Match') == etag:
+                status, conteudo = 304, b''
+
+            try:
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(conteudo)))
+                if status in (200, 304):
+                    self.send_header('ETag', etag)
+                if proxima:
+                    consulta['page'] = [str(proxima)]
+                    link = f"http://{self.headers.get('Host')}{url.path}?{urlencode(consulta, doseq=True)}"
+                    self.send_header('Link', f'<{link}>; rel="next"')
+                self.send_header('X-RateLimit-Limit', '5000')
+                self.send_header('X-RateLimit-Remaining', '4999')
+                self.send_header('X-RateLimit-Reset', str(int(time.time()) + 3600))
+                self.end_headers()
+                self.wfile.write(conteudo)
+            except (BrokenPipeError, ConnectionResetError):
+                # O cliente desistiu (timeout) ou a cópia de hedge já foi respondida
+                self.close_connection = True
+
+        def log_message(self, *args):
+            pass
+
+    servidor = ThreadingHTTPServer(('127.0.0.1', porta), Manipulador)
+    servidor.daemon_threads = True
+    servidor.versoes = versoes
+    servidor.requisicoes = requisicoes
+    return servidor
+
+
+def iniciar_em_thread(servidor: ThreadingHTTPServer) -> str:
+    """
+    Inicia o servidor em uma thread daemon e devolve a URL base
+    """
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{servidor.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API falsa do GitHub com latência controlada")
+    parser.add_argument('--porta', type=int, default=8765)
+    parser.add_argument('--latencia', type=float, default=0.01)
+    parser.add_argument('--fracao-lenta', type=float, default=0.05)
+    parser.add_argument('--latencia-lenta', type=float, default=1.0)
+    args = parser.parse_args()
+
+    servidor = criar_servidor(args.porta, args.latencia, args.fracao_lenta, args.latencia_lenta)
+    print(f"API falsa em http://127.0.0.1:{servidor.server_address[1]} (Ctrl+C para encerrar)")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
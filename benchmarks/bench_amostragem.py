@@ -0,0 +1,120 @@
+"""
+Benchmark da coleta completa vs por amostragem
+Lab 03 - Caracterizando a atividade de code review no GitHub
+
+Contra a API falsa (benchmarks/api_falsa.py), coleta todos os PRs de cada
+repositório com ColetorPRs (a população dos PRs aprovados) e, para cada
+semente, uma amostra estratificada com ColetorAmostral (amostragem_prs.py).
+Mostra o tempo e as requisições de cada modo e, por repositório, o erro da
+proporção de PRs merged da amostra em relação à da população, comparado à
+margem de erro efetiva; a cobertura (repositórios com erro dentro da margem)
+deve ficar perto do nível de confiança.
+
+Confere também que cada PR da amostra é igual ao mesmo PR da coleta completa
+e que não há PRs repetidos; falha (código de saída 1) se não for o caso.
+
+Uso:
+    python benchmarks/bench_amostragem.py --repositorios 20 --margem 0.1 --sementes 5
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from api_falsa import criar_servidor, iniciar_em_thread  # noqa: E402
+import amostragem_prs  # noqa: E402
+import coletor_prs  # noqa: E402
+import coletor_repositorios  # noqa: E402
+from indice_prs import chave_pr  # noqa: E402
+
+
+def _proporcoes_merged(prs) -> dict:
+    contagens = defaultdict(lambda: [0, 0])
+    for pr in prs:
+        contagem = contagens[pr['base']['repo']['full_name']]
+        contagem[0] += pr.get('merged_at') is not None
+        contagem[1] += 1
+    return {repo: merged / total for repo, (merged, total) in contagens.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Coleta completa vs por amostragem contra a API falsa")
+    parser.add_argument('--repositorios', type=int, default=20)
+    parser.add_argument('--latencia', type=float, default=0.01)
+    parser.add_argument('--confianca', type=float, default=0.95)
+    parser.add_argument('--margem', type=float, default=0.1)
+    parser.add_argument('--estratos', type=int, default=10)
+    parser.add_argument('--simultaneas', type=int, default=16)
+    parser.add_argument('--sementes', type=int, default=5, help="Amostras sorteadas (sementes 0..n-1)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+    servidor = criar_servidor(0, args.latencia, 0.0)
+    os.environ['GITHUB_API_URL'] = iniciar_em_thread(servidor)
+
+    try:
+        with tempfile.TemporaryDirectory() as diretorio:
+            base = Path(diretorio)
+            coletor = coletor_repositorios.ColetorRepositorios(caminho_base=base)
+            coletor.PAUSA_ENTRE_REQUISICOES = 0
+            coletor_repositorios.coletar(coletor, limite=args.repositorios)
+
+            antes = sum(servidor.requisicoes.values())
+            inicio = time.perf_counter()
+            coletor = coletor_prs.ColetorPRs(caminho_base=base)
+            coletor.PAUSA_ENTRE_PAGINAS = coletor.PAUSA_ENTRE_REPOSITORIOS = 0
+            populacao = coletor.coletar_todos_prs(max_prs=10 ** 6)
+            tempo_completo = time.perf_counter() - inicio
+            requisicoes_completo = sum(servidor.requisicoes.values()) - antes
+            por_chave = {chave_pr(pr): pr for pr in populacao}
+            proporcoes = _proporcoes_merged(populacao)
+
+            print(f"{'Modo':22} {'Tempo (s)':>10} {'Requisições':>12} {'PRs':>7} {'Cobertura':>10} "
+                  f"{'Erro máx.':>10} {'Margem média':>13}")
+            print(f"{'completo':22} {tempo_completo:>10.2f} {requisicoes_completo:>12} {len(populacao):>7} "
+                  f"{'-':>10} {'-':>10} {'-':>13}")
+
+            problemas = []
+            for semente in range(args.sementes):
+                antes = sum(servidor.requisicoes.values())
+                inicio = time.perf_counter()
+                amostral = amostragem_prs.ColetorAmostral(
+                    coletor_prs.ColetorPRs(caminho_base=base), confianca=args.confianca, margem=args.margem,
+                    estratos=args.estratos, simultaneas=args.simultaneas, semente=semente)
+                amostra = amostral.coletar_todos_prs()
+                tempo = time.perf_counter() - inicio
+                requisicoes = sum(servidor.requisicoes.values()) - antes
+
+                chaves = [chave_pr(pr) for pr in amostra]
+                if len(set(chaves)) < len(chaves):
+                    problemas.append(f"semente {semente}: PRs repetidos na amostra")
+                problemas += [f"semente {semente}: PR {chave} difere da coleta completa"
+                              for chave, pr in zip(chaves, amostra) if por_chave.get(chave) != pr]
+
+                erros, margens = [], []
+                for repo, proporcao in _proporcoes_merged(amostra).items():
+                    erros.append(abs(proporcao - proporcoes[repo]))
+                    margens.append(amostral.resumos[repo]['margem_efetiva'])
+                cobertura = sum(e <= m for e, m in zip(erros, margens)) / len(erros) if erros else 0.0
+                print(f"{f'amostra (semente {semente})':22} {tempo:>10.2f} {requisicoes:>12} {len(amostra):>7} "
+                      f"{cobertura:>10.0%} {max(erros, default=0):>10.3f} "
+                      f"{sum(margens) / len(margens) if margens else 0:>13.3f}")
+
+            for problema in problemas[:20]:
+                print(f"  ✗ {problema}")
+            print(f"\nPRs da amostra iguais aos da coleta completa: {'sim' if not problemas else 'NÃO'}")
+            if problemas:
+                sys.exit(1)
+    finally:
+        servidor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
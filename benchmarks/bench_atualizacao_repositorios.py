@@ -0,0 +1,106 @@
+"""
+Benchmark da atualização dos repositórios com GETs condicionais
+Lab 03 - Caracterizando a atividade de code review no GitHub
+
+Contra a API falsa (benchmarks/api_falsa.py), compara refazer a coleta de
+repositórios com ColetorRepositorios.atualizar_repositorios: a primeira
+atualização (sem ETags salvos) e uma segunda depois de alterar uma fração
+dos repositórios. Mostra o tempo, as requisições, quantas responderam 304 e
+a cota gasta (requisições que não foram 304; as de busca têm limite próprio).
+No fim, confere que a lista atualizada é idêntica, byte a byte, à de uma
+coleta completa feita depois das alterações. As pausas fixas entre
+requisições são zeradas.
+
+Uso:
+    python benchmarks/bench_atualizacao_repositorios.py --repositorios 1000 --fracao-alterada 0.05
+"""
+
+import argparse
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from api_falsa import criar_servidor, iniciar_em_thread  # noqa: E402
+import coletor_repositorios  # noqa: E402
+
+ARQUIVO = "repositorios_selecionados.json"
+ENDPOINTS_BUSCA = ('repositories', 'issues')
+
+
+def _coletor(base: Path) -> coletor_repositorios.ColetorRepositorios:
+    coletor = coletor_repositorios.ColetorRepositorios(caminho_base=base)
+    coletor.PAUSA_ENTRE_REQUISICOES = 0
+    return coletor
+
+
+def _requisicoes(coletor) -> tuple:
+    latencias = coletor.cliente.latencias
+    total = sum(h.n for h in latencias.values())
+    busca = sum(latencias[e].n for e in ENDPOINTS_BUSCA if e in latencias)
+    return total, busca
+
+
+def coleta_completa(base: Path, repositorios: int) -> tuple:
+    coletor = _coletor(base)
+    inicio = time.perf_counter()
+    coletor_repositorios.coletar(coletor, limite=repositorios)
+    return (time.perf_counter() - inicio, *_requisicoes(coletor), 0)
+
+
+def atualizacao(base: Path, simultaneas: int) -> tuple:
+    coletor = _coletor(base)
+    inicio = time.perf_counter()
+    contagens = coletor.atualizar_repositorios(simultaneas=simultaneas)
+    return (time.perf_counter() - inicio, *_requisicoes(coletor), contagens['inalterados'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Coleta completa vs atualização condicional dos repositórios")
+    parser.add_argument('--repositorios', type=int, default=1000)
+    parser.add_argument('--fracao-alterada', type=float, default=0.05)
+    parser.add_argument('--latencia', type=float, default=0.02)
+    parser.add_argument('--simultaneas', type=int, default=8)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+    servidor = criar_servidor(0, args.latencia, 0.0, repositorios=args.repositorios)
+    os.environ['GITHUB_API_URL'] = iniciar_em_thread(servidor)
+
+    try:
+        with tempfile.TemporaryDirectory() as diretorio:
+            base = Path(diretorio) / "atualizada"
+            base.mkdir()
+            linhas = [("coleta completa", coleta_completa(base, args.repositorios)),
+                      ("atualização sem ETags", atualizacao(base, args.simultaneas))]
+
+            alterados = random.Random(0).sample(range(args.repositorios),
+                                                int(args.repositorios * args.fracao_alterada))
+            for i in alterados:
+                servidor.versoes[f"org{i}/repo{i}"] = 1
+            linhas.append((f"atualização ({len(alterados)} alterados)", atualizacao(base, args.simultaneas)))
+
+            referencia = Path(diretorio) / "referencia"
+            referencia.mkdir()
+            linhas.append(("coleta completa", coleta_completa(referencia, args.repositorios)))
+
+            print(f"{'Modo':32} {'Tempo (s)':>10} {'Requisições':>12} {'Busca':>7} {'304':>6} {'Cota':>6}")
+            for nome, (tempo, total, busca, nao_modificados) in linhas:
+                print(f"{nome:32} {tempo:>10.2f} {total:>12} {busca:>7} {nao_modificados:>6} "
+                      f"{total - nao_modificados:>6}")
+
+            identicos = (base / ARQUIVO).read_bytes() == (referencia / ARQUIVO).read_bytes()
+            print(f"\nLista atualizada idêntica à de uma coleta completa: {'sim' if identicos else 'NÃO'}")
+            if not identicos:
+                sys.exit(1)
+    finally:
+        servidor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark da coleta síncrona vs assíncrona
+Lab 03 - Caracterizando a atividade de code review no GitHub
+
+Coleta os mesmos repositórios e PRs da API falsa (benchmarks/api_falsa.py)
+com ColetorRepositorios/ColetorPRs e com as versões assíncronas
+(coletor_async.py), compara o tempo e confere que os arquivos gerados são
+idênticos byte a byte. As pausas fixas entre requisições da coleta síncrona
+são zeradas, para medir só o efeito da concorrência.
+
+Uso:
+    python benchmarks/bench_coleta_async.py --repositorios 10 --latencia 0.02
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from api_falsa import criar_servidor, iniciar_em_thread  # noqa: E402
+import coletor_async  # noqa: E402
+import coletor_prs  # noqa: E402
+import coletor_repositorios  # noqa: E402
+
+ARQUIVOS_REPOSITORIOS = ("todos_repositorios_populares.json", "repositorios_selecionados.json",
+                         "resumo_repositorios.csv")
+ARQUIVOS_PRS = ("dataset_prs.json", "dataset_prs.csv")
+
+
+def coletar_sincrono(base: Path, repositorios: int, max_prs: int) -> float:
+    inicio = time.perf_counter()
+    coletor = coletor_repositorios.ColetorRepositorios(caminho_base=base)
+    coletor.PAUSA_ENTRE_REQUISICOES = 0
+    coletor_repositorios.coletar(coletor, limite=repositorios)
+
+    coletor = coletor_prs.ColetorPRs(caminho_base=base)
+    coletor.PAUSA_ENTRE_PAGINAS = coletor.PAUSA_ENTRE_REPOSITORIOS = 0
+    coletor_prs.coletar(coletor, max_prs=max_prs)
+    return time.perf_counter() - inicio
+
+
+def coletar_assincrono(base: Path, repositorios: int, max_prs: int, limite_conexoes: int,
+                       repositorios_simultaneos: int) -> float:
+    inicio = time.perf_counter()
+    asyncio.run(coletor_async.coletar_repositorios(
+        coletor_async.ColetorRepositoriosAsync(caminho_base=base, limite_conexoes=limite_conexoes),
+        limite=repositorios))
+    asyncio.run(coletor_async.coletar_prs(
+        coletor_async.ColetorPRsAsync(caminho_base=base, limite_conexoes=limite_conexoes,
+                                      repositorios_simultaneos=repositorios_simultaneos),
+        max_prs=max_prs))
+    return time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Coleta síncrona vs assíncrona contra a API falsa")
+    parser.add_argument('--repositorios', type=int, default=10)
+    parser.add_argument('--max-prs', type=int, default=150, help="PRs por repositório (a API falsa tem 150)")
+    parser.add_argument('--latencia', type=float, default=0.02)
+    parser.add_argument('--fracao-lenta', type=float, default=0.0)
+    parser.add_argument('--limite-conexoes', type=int, nargs='+', default=[10, 50, 200])
+    parser.add_argument('--repositorios-simultaneos', type=int, default=8)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+    servidor = criar_servidor(0, args.latencia, args.fracao_lenta)
+    os.environ['GITHUB_API_URL'] = iniciar_em_thread(servidor)
+
+    try:
+        with tempfile.TemporaryDirectory() as diretorio:
+            base_sincrona = Path(diretorio) / "sincrono"
+            base_sincrona.mkdir()
+            tempo_sincrono = coletar_sincrono(base_sincrona, args.repositorios, args.max_prs)
+            print(f"{'Modo':22} {'Tempo (s)':>10} {'Aceleração':>11}  Arquivos idênticos")
+            print(f"{'síncrono':22} {tempo_sincrono:>10.2f} {1.0:>10.1f}×  -")
+
+            for limite in args.limite_conexoes:
+                base = Path(diretorio) / f"async_{limite}"
+                base.mkdir()
+                tempo = coletar_assincrono(base, args.repositorios, args.max_prs, limite,
+                                           args.repositorios_simultaneos)
+                diferentes = [nome for nome in ARQUIVOS_REPOSITORIOS + ARQUIVOS_PRS
+                              if (base / nome).read_bytes() != (base_sincrona / nome).read_bytes()]
+                print(f"{f'async ({limite} conexões)':22} {tempo:>10.2f} {tempo_sincrono / tempo:>10.1f}×  "
+                      f"{'sim' if not diferentes else 'NÃO: ' + ', '.join(diferentes)}")
+                if diferentes:
+                    sys.exit(1)
+    finally:
+        servidor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark da coleta sequencial vs em estágios
+Lab 03 - Caracterizando a atividade de code review no GitHub
+
+Coleta os PRs dos mesmos repositórios da API falsa (benchmarks/api_falsa.py)
+com ColetorPRs e com PipelineColeta (coleta_pipeline.py), para cada número
+de trabalhadores, e confere que os datasets gerados são idênticos byte a
+byte. As pausas fixas da coleta sequencial são zeradas. Com --max-prs acima
+do número de PRs de cada repositório mais uma página, as duas coletas pedem
+as mesmas páginas (ver a diferença de paginação em coleta_pipeline.py).
+
+Também mostra as métricas das filas: profundidade média e máxima e o tempo
+que os produtores ficaram bloqueados (contrapressão).
+
+Uso:
+    python benchmarks/bench_coleta_pipeline.py --repositorios 10 --latencia 0.02
+"""
+
+import argparse
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from api_falsa import criar_servidor, iniciar_em_thread  # noqa: E402
+import coleta_pipeline  # noqa: E402
+import coletor_prs  # noqa: E402
+import coletor_repositorios  # noqa: E402
+
+ARQUIVOS_PRS = ("dataset_prs.json", "dataset_prs.csv")
+
+
+def coletar_sequencial(base: Path, max_prs: int) -> float:
+    inicio = time.perf_counter()
+    coletor = coletor_prs.ColetorPRs(caminho_base=base)
+    coletor.PAUSA_ENTRE_PAGINAS = coletor.PAUSA_ENTRE_REPOSITORIOS = 0
+    coletor_prs.coletar(coletor, max_prs=max_prs)
+    return time.perf_counter() - inicio
+
+
+def coletar_em_estagios(base: Path, max_prs: int, trabalhadores: int, tamanho_fila: int) -> tuple:
+    inicio = time.perf_counter()
+    pipeline = coleta_pipeline.PipelineColeta(coletor_prs.ColetorPRs(caminho_base=base), max_prs=max_prs,
+                                              trabalhadores=trabalhadores, tamanho_fila=tamanho_fila)
+    coleta_pipeline.coletar(pipeline)
+    return time.perf_counter() - inicio, pipeline.metricas()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Coleta sequencial vs em estágios contra a API falsa")
+    parser.add_argument('--repositorios', type=int, default=10)
+    parser.add_argument('--max-prs', type=int, default=1000)
+    parser.add_argument('--latencia', type=float, default=0.02)
+    parser.add_argument('--fracao-lenta', type=float, default=0.0)
+    parser.add_argument('--trabalhadores', type=int, nargs='+', default=[8, 32, 64])
+    parser.add_argument('--tamanho-fila', type=int, default=200)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+    servidor = criar_servidor(0, args.latencia, args.fracao_lenta)
+    os.environ['GITHUB_API_URL'] = iniciar_em_thread(servidor)
+
+    try:
+        with tempfile.TemporaryDirectory() as diretorio:
+            base_sequencial = Path(diretorio) / "sequencial"
+            base_sequencial.mkdir()
+            coletor = coletor_repositorios.ColetorRepositorios(caminho_base=base_sequencial)
+            coletor.PAUSA_ENTRE_REQUISICOES = 0
+            coletor_repositorios.coletar(coletor, limite=args.repositorios)
+
+            tempo_sequencial = coletar_sequencial(base_sequencial, args.max_prs)
+            print(f"{'Modo':28} {'Tempo (s)':>10} {'Aceleração':>11}  {'Fila média/máx':>15} "
+                  f"{'Bloqueio (s)':>13}  Arquivos idênticos")
+            print(f"{'sequencial':28} {tempo_sequencial:>10.2f} {1.0:>10.1f}×  {'-':>15} {'-':>13}  -")
+
+            for trabalhadores in args.trabalhadores:
+                base = Path(diretorio) / f"pipeline_{trabalhadores}"
+                base.mkdir()
+                shutil.copy(base_sequencial / "repositorios_selecionados.json", base)
+                tempo, metricas = coletar_em_estagios(base, args.max_prs, trabalhadores, args.tamanho_fila)
+
+                fila = metricas['filas']['enriquecimento']
+                diferentes = [nome for nome in ARQUIVOS_PRS
+                              if (base / nome).read_bytes() != (base_sequencial / nome).read_bytes()]
+                profundidade = f"{fila['profundidade_media']:.0f}/{fila['profundidade_maxima']}"
+                print(f"{f'estágios ({trabalhadores} trabalhadores)':28} {tempo:>10.2f} "
+                      f"{tempo_sequencial / tempo:>10.1f}×  {profundidade:>15} {fila['espera_cheia_s']:>13.1f}  "
+                      f"{'sim' if not diferentes else 'NÃO: ' + ', '.join(diferentes)}")
+                if diferentes:
+                    sys.exit(1)
+    finally:
+        servidor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Benchmark das estatísticas incrementais
+Lab 03 - Caracterizando a atividade de code review no GitHub
+
+Sobre um dataset sintético, cria o estado (estatisticas_incrementais) com a
+primeira metade dos PRs e aplica o restante em lotes (--lote), cada lote
+trazendo também versões novas de PRs já aplicados (--alterados), que retiram
+as antigas. Mostra o tempo médio de carregar, aplicar e gravar o estado por
+lote e compara com uma análise em blocos completa do dataset final.
+
+No fim, confere que os resultados das 8 RQs (estatísticas, p-valores,
+médias) do AnalisadorIncremental são iguais aos do AnalisadorEmBlocos sobre o
+dataset final; falha (código de saída 1) se algum diferir.
+
+Uso:
+    python benchmarks/bench_estatisticas_incrementais.py --prs 300000 --lote 15000 --alterados 100
+"""
+
+import argparse
+import contextlib
+import io
+import math
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_importacao import criar_dataset  # noqa: E402
+from analise_em_blocos import AnalisadorEmBlocos  # noqa: E402
+import estatisticas_incrementais as ei  # noqa: E402
+
+# Diferença relativa aceita entre os dois modos (somas em ordens diferentes)
+TOLERANCIA = 1e-9
+
+
+def _resultados(analisador) -> dict:
+    with contextlib.redirect_stdout(io.StringIO()):
+        analisador.carregar_dados()
+        analisador.preparar_dados()
+        analisador.executar_testes()
+    return analisador.resultados
+
+
+def _diferencas(a, b, caminho=''):
+    if isinstance(a, dict) and isinstance(b, dict):
+        for chave in a.keys() | b.keys():
+            yield from _diferencas(a.get(chave), b.get(chave), f"{caminho}/{chave}")
+    elif isinstance(a, (int, float)) and isinstance(b, (int, float)) and not isinstance(a, bool):
+        if not (math.isclose(a, b, rel_tol=TOLERANCIA, abs_tol=1e-12) or (math.isnan(a) and math.isnan(b))):
+            yield caminho, a, b
+    elif a != b:
+        yield caminho, a, b
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Atualização incremental vs análise em blocos completa")
+    parser.add_argument('--prs', type=int, default=300_000)
+    parser.add_argument('--lote', type=int, default=15_000, help="PRs novos por lote")
+    parser.add_argument('--alterados', type=int, default=100, help="PRs já aplicados alterados por lote")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(1)
+    with tempfile.TemporaryDirectory() as diretorio:
+        base = Path(diretorio)
+        criar_dataset(base / "completo.csv", args.prs)
+        completo = pd.read_csv(base / "completo.csv")
+        # Tempos com resolução de segundos, como os da coleta (muitos valores distintos)
+        completo['time_analysis_hours'] = np.round(completo['time_analysis_hours'] * 3600) / 3600
+
+        metade = args.prs // 2
+        completo.iloc[:metade].to_csv(base / "metade.csv", index=False)
+        inicio = time.perf_counter()
+        ei.reconstruir_estado(base, base / "metade.csv")
+        tempo_reconstrucao = time.perf_counter() - inicio
+
+        atual = completo.iloc[:metade].copy()
+        caminho = base / ei.ARQUIVO_ESTADO
+        tempos = {'carregar': [], 'aplicar': [], 'salvar': []}
+        for posicao in range(metade, args.prs, args.lote):
+            novos = completo.iloc[posicao:posicao + args.lote]
+            indices = rng.choice(len(atual), min(args.alterados, len(atual)), replace=False)
+            antigos = atual.iloc[indices]
+            alterados = antigos.assign(num_comments=antigos['num_comments'] + 1,
+                                       merged=~antigos['merged'].astype(bool))
+
+            t0 = time.perf_counter()
+            estado = ei.EstadoEstatisticas.carregar(caminho)
+            t1 = time.perf_counter()
+            estado.aplicar(antigos, sinal=-1)
+            estado.aplicar(pd.concat([alterados, novos]))
+            t2 = time.perf_counter()
+            estado.salvar(caminho)
+            t3 = time.perf_counter()
+            for etapa, tempo in zip(tempos, (t1 - t0, t2 - t1, t3 - t2)):
+                tempos[etapa].append(tempo)
+
+            atual.iloc[indices] = alterados
+            atual = pd.concat([atual, novos], ignore_index=True)
+
+        atual.to_csv(base / "dataset_prs.csv", index=False)
+        blocos = AnalisadorEmBlocos(caminho_base=base)
+        inicio = time.perf_counter()
+        esperado = _resultados(blocos)
+        tempo_blocos = time.perf_counter() - inicio
+        obtido = _resultados(ei.AnalisadorIncremental(caminho_base=base))
+
+        print(f"Estado inicial ({metade:,} PRs): {tempo_reconstrucao:.2f} s; "
+              f"arquivo final de {caminho.stat().st_size / 1e6:.1f} MB")
+        print(f"{'Etapa por lote':28} {'Tempo médio (s)':>16}")
+        for etapa, valores in tempos.items():
+            print(f"{etapa:28} {np.mean(valores):>16.3f}")
+        print(f"{'total':28} {sum(np.mean(v) for v in tempos.values()):>16.3f}")
+        print(f"{f'análise em blocos ({len(atual):,} PRs)':28} {tempo_blocos:>16.3f}")
+
+        diferencas = list(_diferencas(esperado, obtido))
+        for campo, a, b in diferencas[:20]:
+            print(f"  ✗ {campo}: blocos={a!r} incremental={b!r}")
+        print(f"\nResultados iguais aos da análise em blocos: {'sim' if not diferencas else 'NÃO'}")
+        if diferencas:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
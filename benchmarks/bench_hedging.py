@@ -0,0 +1,58 @@
+"""
+Benchmark de hedge de requisições
+Lab 03 - Caracterizando a atividade de code review no GitHub
+
+Faz as mesmas requisições contra a API falsa (benchmarks/api_falsa.py) com e
+sem hedge e compara os percentis de latência de ponta a ponta por endpoint.
+Com 3% de respostas lentas, o p99 sem hedge fica na latência lenta; com hedge,
+a cópia enviada após o p95 costuma chegar antes.
+
+Uso:
+    python benchmarks/bench_hedging.py --requisicoes 400 --fracao-lenta 0.03
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from api_falsa import criar_servidor, iniciar_em_thread  # noqa: E402
+from cliente_http import ClienteGitHub  # noqa: E402
+
+
+def executar(url_base: str, requisicoes: int, hedge: bool, timeout):
+    cliente = ClienteGitHub({'Accept': 'application/json'}, timeout=timeout, hedge=hedge)
+    for i in range(requisicoes):
+        numero = i % 100 + 1
+        cliente.get(f"{url_base}/repos/org/repo/pulls/{numero}/reviews")
+        cliente.get(f"{url_base}/repos/org/repo/pulls/{numero}/files")
+    return cliente
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latência com e sem hedge contra a API falsa")
+    parser.add_argument('--requisicoes', type=int, default=400, help="Requisições por endpoint")
+    parser.add_argument('--latencia', type=float, default=0.01)
+    parser.add_argument('--fracao-lenta', type=float, default=0.03)
+    parser.add_argument('--latencia-lenta', type=float, default=1.0)
+    args = parser.parse_args()
+
+    print(f"{'Modo':10} {'Endpoint':>10} {'n':>6} {'p50 (ms)':>9} {'p95 (ms)':>9} "
+          f"{'p99 (ms)':>9} {'máx (ms)':>9} {'cópias':>7}")
+    for hedge in (False, True):
+        servidor = criar_servidor(0, args.latencia, args.fracao_lenta, args.latencia_lenta)
+        url_base = iniciar_em_thread(servidor)
+        try:
+            cliente = executar(url_base, args.requisicoes, hedge, timeout=(2.0, args.latencia_lenta * 5))
+        finally:
+            servidor.shutdown()
+
+        modo = 'hedge' if hedge else 'simples'
+        for endpoint, r in cliente.resumo_latencias().items():
+            print(f"{modo:10} {endpoint:>10} {r['n']:>6} {r['p50'] * 1000:>9.1f} {r['p95'] * 1000:>9.1f} "
+                  f"{r['p99'] * 1000:>9.1f} {r['max'] * 1000:>9.1f} {cliente.hedges:>7}")
+
+
+if __name__ == "__main__":
+    main()
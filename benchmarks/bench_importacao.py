@@ -0,0 +1,143 @@
+"""
+Benchmark do tempo de importação da linha de comando
+Lab 03 - Caracterizando a atividade de code review no GitHub
+
+Executa cada subcomando de lab3.py com `python -X importtime` sobre um dataset
+sintético (em um diretório temporário, via LAB3_CAMINHO_BASE) e soma o tempo
+de importação de todos os módulos carregados. Também serve de teste de
+regressão: falha (código de saída 1) se um subcomando terminar com erro (como
+o `plot` sem números de RQ, que deve gerar todas), se carregar um módulo
+pesado de que não precisa (ex.: matplotlib no `stats`) ou, com --referencia,
+se o tempo de algum subcomando crescer mais que a tolerância.
+
+Uso:
+    python benchmarks/bench_importacao.py --salvar importacao.json
+    python benchmarks/bench_importacao.py --referencia importacao.json --tolerancia 0.25
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+# Subcomandos medidos, na ordem (report lê o cache gerado por stats)
+COMANDOS = {
+    'report': ['report'],
+    'rq': ['rq', '1'],
+    'stats': ['stats'],
+    'plot': ['plot', '1', '--dpi', '50'],
+    # Sem números de RQ: todas (o argparse já rejeitou o padrão [] com choices=)
+    'plot (todas)': ['plot', '--dpi', '50'],
+}
+
+# Módulos que cada subcomando não deve importar
+PROIBIDOS = {
+    'report': {'numpy', 'pandas', 'scipy', 'matplotlib', 'seaborn'},
+    'rq': {'matplotlib', 'seaborn'},
+    'stats': {'matplotlib', 'seaborn'},
+    'plot': set(),
+    'plot (todas)': set(),
+}
+
+
+def criar_dataset(caminho: Path, n: int = 2000, semente: int = 0):
+    rng = np.random.default_rng(semente)
+    pd.DataFrame({
+        'pr_id': np.arange(n),
+        'repository': [f"r{i}" for i in rng.integers(0, 20, n)],
+        'merged': rng.random(n) < 0.6,
+        'total_additions': rng.poisson(80, n),
+        'total_deletions': rng.poisson(30, n),
+        'time_analysis_hours': rng.exponential(100, n),
+        'description_chars': rng.integers(0, 2000, n),
+        'num_comments': rng.poisson(5, n),
+        'num_participants': rng.poisson(2, n),
+    }).to_csv(caminho, index=False)
+
+
+def medir(argumentos, ambiente) -> tuple:
+    """
+    Executa `lab3.py <argumentos>` com -X importtime
+
+    Returns:
+        Tupla (tempo total de importação em ms, módulos de primeiro nível importados)
+    """
+    processo = subprocess.run([sys.executable, '-X', 'importtime', str(RAIZ / 'lab3.py'), *argumentos],
+                              env=ambiente, cwd=RAIZ, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                              text=True)
+    if processo.returncode != 0:
+        raise RuntimeError(f"lab3.py {' '.join(argumentos)} falhou:\n{processo.stderr[-2000:]}")
+
+    total_us, modulos = 0, set()
+    for linha in processo.stderr.splitlines():
+        if not linha.startswith('import time:') or 'self [us]' in linha:
+            continue
+        proprio, _, nome = linha[len('import time:'):].split('|')
+        total_us += int(proprio)
+        modulos.add(nome.strip().split('.')[0])
+    return total_us / 1000, modulos
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tempo de importação de cada subcomando de lab3.py")
+    parser.add_argument('--repeticoes', type=int, default=5)
+    parser.add_argument('--salvar', help="Salva as medianas (ms) em JSON, para usar como referência")
+    parser.add_argument('--referencia', help="JSON de uma medição anterior")
+    parser.add_argument('--tolerancia', type=float, default=0.25, help="Aumento relativo máximo sobre a referência")
+    args = parser.parse_args()
+
+    falhas = []
+    medianas = {}
+    with tempfile.TemporaryDirectory() as diretorio:
+        criar_dataset(Path(diretorio) / "dataset_prs.csv")
+        ambiente = {**os.environ, 'LAB3_CAMINHO_BASE': diretorio, 'LAB3_TRACE': ''}
+        # O cache de resultados que o report lê
+        medir(COMANDOS['stats'], ambiente)
+
+        print(f"{'Subcomando':12} {'mediana':>10} {'mínimo':>10}  módulos pesados")
+        for comando, argumentos in COMANDOS.items():
+            tempos = []
+            for _ in range(args.repeticoes):
+                tempo, modulos = medir(argumentos, ambiente)
+                tempos.append(tempo)
+            medianas[comando] = statistics.median(tempos)
+            pesados = sorted(modulos & {'numpy', 'pandas', 'scipy', 'matplotlib', 'seaborn'})
+            print(f"{comando:12} {medianas[comando]:>8.1f}ms {min(tempos):>8.1f}ms  {', '.join(pesados) or '-'}")
+
+            indevidos = modulos & PROIBIDOS[comando]
+            if indevidos:
+                falhas.append(f"{comando} importou {', '.join(sorted(indevidos))}")
+
+    if args.referencia:
+        with open(args.referencia, encoding='utf-8') as f:
+            referencia = json.load(f)
+        for comando, tempo in medianas.items():
+            anterior = referencia.get(comando)
+            if anterior and tempo > anterior * (1 + args.tolerancia):
+                falhas.append(f"{comando}: {tempo:.1f}ms (referência {anterior:.1f}ms, "
+                              f"+{tempo / anterior - 1:.0%})")
+
+    if args.salvar:
+        with open(args.salvar, 'w', encoding='utf-8') as f:
+            json.dump(medianas, f, indent=2)
+        print(f"\n✓ Medianas salvas em {args.salvar}")
+
+    if falhas:
+        print("\n❌ Regressões:")
+        for falha in falhas:
+            print(f"  • {falha}")
+        sys.exit(1)
+    print("\n✓ Nenhuma regressão")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Benchmark do núcleo de preparação dos dados
+Lab 03 - Caracterizando a atividade de code review no GitHub
+
+Compara, sobre um DataFrame sintético, a preparação anterior (um pd.cut por
+categoria, dois quantile por métrica com outliers e um describe por métrica
+do resumo) com preparacao.preparar (uma passada em blocos, discretização sem
+desvios condicionais e quantis por contagem ou por np.partition de uma
+posição), nas mesmas colunas de AnalisadorPRs.
+
+Confere que categorias, limites de outliers e estatísticas descritivas são
+iguais (momentos com tolerância relativa de 1e-9, pela ordem diferente das
+somas); falha (código de saída 1) se não forem.
+
+Uso:
+    python benchmarks/bench_preparacao.py --linhas 10000000 --repeticoes 2
+"""
+
+import argparse
+import math
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import preparacao  # noqa: E402
+from executar_sprint2 import AnalisadorPRs  # noqa: E402
+
+METRICAS = ['total_changes', 'time_analysis_hours', 'description_chars', 'num_comments', 'num_participants',
+            'num_reviews']
+
+
+def criar_dados(n: int, semente: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(semente)
+    revisoes = rng.poisson(2, n).astype('float64')
+    revisoes[rng.random(n) < 0.05] = np.nan  # PRs coletados antes do plugin revisoes
+    return pd.DataFrame({
+        'total_changes': np.floor(rng.pareto(0.8, n) * 20).astype('int64'),
+        'time_analysis_hours': rng.lognormal(3, 2, n),
+        'description_chars': rng.integers(0, 3000, n),
+        'num_comments': rng.negative_binomial(1, 0.2, n),
+        'num_participants': rng.poisson(3, n),
+        'num_reviews': revisoes,
+    })
+
+
+def referencia(df: pd.DataFrame):
+    """Preparação anterior: uma passada por operação"""
+    categorias = {c: pd.cut(df[origem], bins=limites, labels=rotulos)
+                  for c, (origem, limites, rotulos) in AnalisadorPRs.CATEGORIAS.items()}
+    limites = {c: (df[c].quantile(0.01), df[c].quantile(0.99)) for c in AnalisadorPRs.METRICAS_SEM_OUTLIERS}
+    resumo = {m: df[m].describe()[['count', 'mean', '50%', 'std']].to_dict() for m in METRICAS}
+    return categorias, limites, resumo
+
+
+def nucleo(df: pd.DataFrame, tamanho_bloco: int):
+    """Preparação com preparacao.preparar, como em AnalisadorPRs.preparar_dados"""
+    resumidas = list(dict.fromkeys(AnalisadorPRs.METRICAS_SEM_OUTLIERS + METRICAS))
+    codigos, quantis, momentos = preparacao.preparar(
+        {c: df[c].to_numpy() for c in resumidas}, resumidas,
+        {c: (origem, limites) for c, (origem, limites, _) in AnalisadorPRs.CATEGORIAS.items()},
+        AnalisadorPRs.PROBABILIDADES, tamanho_bloco)
+    categorias = {c: pd.Categorical.from_codes(codigos[c], categories=rotulos, ordered=True)
+                  for c, (_, _, rotulos) in AnalisadorPRs.CATEGORIAS.items()}
+    limites = {c: (quantis[c][0], quantis[c][2]) for c in AnalisadorPRs.METRICAS_SEM_OUTLIERS}
+    resumo = {m: {'count': momentos[m]['count'], 'mean': momentos[m]['mean'], '50%': float(quantis[m][1]),
+                  'std': momentos[m]['std']} for m in METRICAS}
+    return categorias, limites, resumo
+
+
+def diferencas(esperado, obtido) -> list:
+    categorias, limites, resumo = esperado
+    problemas = []
+    for c, serie in categorias.items():
+        if not serie.array.equals(obtido[0][c]):
+            problemas.append(f"categoria {c} difere do pd.cut")
+    for c, valores in limites.items():
+        if tuple(valores) != tuple(obtido[1][c]):
+            problemas.append(f"limites de outliers de {c}: {valores} != {obtido[1][c]}")
+    for m, estatisticas in resumo.items():
+        for chave, valor in estatisticas.items():
+            if not math.isclose(valor, obtido[2][m][chave], rel_tol=1e-9):
+                problemas.append(f"{chave} de {m}: {valor} != {obtido[2][m][chave]}")
+    return problemas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Preparação anterior vs núcleo em blocos")
+    parser.add_argument('--linhas', type=int, default=10_000_000)
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--bloco', type=int, default=preparacao.TAMANHO_BLOCO, help="Linhas por bloco")
+    args = parser.parse_args()
+
+    df = criar_dados(args.linhas)
+    tempos = {'referencia': [], 'nucleo': []}
+    for _ in range(args.repeticoes):
+        inicio = time.perf_counter()
+        esperado = referencia(df)
+        tempos['referencia'].append(time.perf_counter() - inicio)
+
+        inicio = time.perf_counter()
+        obtido = nucleo(df, args.bloco)
+        tempos['nucleo'].append(time.perf_counter() - inicio)
+
+    problemas = diferencas(esperado, obtido)
+    anterior, novo = min(tempos['referencia']), min(tempos['nucleo'])
+    print(f"{args.linhas} linhas, blocos de {args.bloco} (melhor de {args.repeticoes})")
+    print(f"  • pd.cut + quantile + describe: {anterior:.3f} s")
+    print(f"  • preparacao.preparar:          {novo:.3f} s ({anterior / novo:.1f}× mais rápido)")
+    for problema in problemas:
+        print(f"  ✗ {problema}")
+    print(f"\nResultados iguais: {'sim' if not problemas else 'NÃO'}")
+    if problemas:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Validação dos testes por repositório contra o scipy
+Lab 03 - Caracterizando a atividade de code review no GitHub
+
+Compara, em cada repositório de um dataset sintético, o Mann-Whitney de
+estratificacao.mann_whitney_por_grupo com stats.mannwhitneyu (aproximação
+normal com correção de continuidade) e o Spearman de spearman_por_grupo com
+stats.spearmanr. O dataset tem NaN na variável contínua e na binária (PRs
+sem status conhecido): essas linhas ficam fora dos dois grupos, como no teste
+sem estratificação. Falha (código de saída 1) se algum grupo divergir.
+
+Uso:
+    python benchmarks/validar_estratificacao.py --prs 20000 --repositorios 50
+"""
+
+import argparse
+import math
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import estratificacao  # noqa: E402
+
+TOLERANCIA = 1e-9
+
+
+def criar_dados(n: int, repositorios: int, semente: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(semente)
+    merged = pd.Series(rng.random(n) < 0.6, dtype=object)
+    merged[rng.random(n) < 0.05] = np.nan
+    mudancas = rng.poisson(40, n).astype('float64')
+    mudancas[rng.random(n) < 0.02] = np.nan
+    return pd.DataFrame({
+        'repository': [f"r{i}" for i in rng.integers(0, repositorios, n)],
+        'merged': merged,
+        'total_changes': mudancas,
+        'num_participants': rng.poisson(3, n),
+    })
+
+
+def _diferente(a: float, b: float) -> bool:
+    if math.isnan(a) or math.isnan(b):
+        return math.isnan(a) != math.isnan(b)
+    return not math.isclose(a, b, rel_tol=TOLERANCIA, abs_tol=TOLERANCIA)
+
+
+def diferencas(df: pd.DataFrame) -> list:
+    problemas = []
+    mann_whitney = estratificacao.mann_whitney_por_grupo(df, 'repository', 'total_changes', 'merged')
+    spearman = estratificacao.spearman_por_grupo(df, 'repository', 'total_changes', 'num_participants')
+
+    for repositorio, grupo in df.groupby('repository'):
+        validos = grupo.dropna(subset=['total_changes', 'merged'])
+        x = validos.loc[validos['merged'] == True, 'total_changes']  # noqa: E712
+        y = validos.loc[validos['merged'] == False, 'total_changes']  # noqa: E712
+        esperado = stats.mannwhitneyu(x, y, alternative='two-sided', method='asymptotic')
+        obtido = mann_whitney.loc[repositorio]
+        if (obtido['n1'], obtido['n2']) != (len(x), len(y)):
+            problemas.append(f"{repositorio}: n1, n2 = {obtido['n1']:.0f}, {obtido['n2']:.0f} "
+                             f"!= {len(x)}, {len(y)}")
+        for nome, valor, referencia in (('U', obtido['u_stat'], esperado.statistic),
+                                        ('p-valor do Mann-Whitney', obtido['p_value'], esperado.pvalue)):
+            if _diferente(float(valor), float(referencia)):
+                problemas.append(f"{repositorio}: {nome} {valor} != {referencia}")
+
+        pares = grupo[['total_changes', 'num_participants']].dropna()
+        esperado = stats.spearmanr(pares['total_changes'], pares['num_participants'])
+        obtido = spearman.loc[repositorio]
+        for nome, valor, referencia in (('ρ', obtido['correlacao'], esperado.statistic),
+                                        ('p-valor do Spearman', obtido['p_value'], esperado.pvalue)):
+            if _diferente(float(valor), float(referencia)):
+                problemas.append(f"{repositorio}: {nome} {valor} != {referencia}")
+    return problemas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Testes por repositório vs scipy")
+    parser.add_argument('--prs', type=int, default=20_000)
+    parser.add_argument('--repositorios', type=int, default=50)
+    args = parser.parse_args()
+
+    df = criar_dados(args.prs, args.repositorios)
+    problemas = diferencas(df)
+    print(f"{args.prs} PRs em {args.repositorios} repositórios "
+          f"({df['merged'].isna().sum()} sem status, {df['total_changes'].isna().sum()} sem total_changes)")
+    for problema in problemas[:20]:
+        print(f"  ✗ {problema}")
+    print(f"\nResultados iguais aos do scipy: {'sim' if not problemas else 'NÃO'}")
+    if problemas:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""
+Validação dos testes aproximados (histogramas de postos) contra o scipy
+Lab 03 - Caracterizando a atividade de code review no GitHub
+
+Para cada cenário sintético (métricas inteiras com muitos empates, tempos
+contínuos, átomos em 0, grupos pequenos, correlações positivas, negativas e
+nulas) e cada número de faixas, compara sumarios_streaming.mann_whitney_aproximado
+e spearman_aproximado com stats.mannwhitneyu(method='asymptotic') e
+stats.spearmanr. Confere que a estatística e o p-valor exatos caem sempre
+dentro dos intervalos garantidos, e mostra os erros observados e a largura
+dos intervalos. Falha (código de saída 1) se algum limite for violado.
+
+No fim, mede o tempo dos dois modos em uma coluna grande (--n).
+
+Uso:
+    python benchmarks/validar_testes_aproximados.py --repeticoes 20 --n 5000000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from scipy import stats
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import sumarios_streaming as ss  # noqa: E402
+
+# Folga para arredondamento em ponto flutuante ao comparar com os intervalos
+TOLERANCIA = 1e-9
+
+
+def _tempo_horas(rng, n):
+    # Tempo de análise: contínuo, cauda longa, resolução de 1 segundo
+    return np.round(rng.lognormal(3, 2, n) * 3600) / 3600
+
+
+def _linhas_alteradas(rng, n):
+    # Tamanho dos PRs: inteiro, cauda muito longa (muitos valores distintos)
+    return np.floor(rng.pareto(0.8, n) * 20).astype(np.int64)
+
+
+def _descricao(rng, n):
+    # Descrição: átomo em 0 (PRs sem descrição) e o restante espalhado
+    valores = np.floor(rng.lognormal(5, 1.5, n)).astype(np.int64)
+    valores[rng.random(n) < 0.3] = 0
+    return valores
+
+
+def _comentarios(rng, n):
+    # Poucos valores distintos: a discretização é exata
+    return rng.negative_binomial(1, 0.2, n)
+
+
+METRICAS = {
+    'tempo (contínuo)': _tempo_horas,
+    'tamanho (inteiro, cauda longa)': _linhas_alteradas,
+    'descrição (átomo em 0)': _descricao,
+    'comentários (poucos valores)': _comentarios,
+}
+
+
+def cenarios_mann_whitney(rng, n):
+    for nome, gerar in METRICAS.items():
+        for deslocamento in (0.0, 0.05, 0.3):
+            n1 = int(n * 0.7)
+            x1 = gerar(rng, n1)
+            x2 = gerar(rng, n - n1)
+            # Desloca o grupo 2 multiplicando uma fração dos valores
+            x2 = np.where(rng.random(len(x2)) < deslocamento, x2 * 2, x2)
+            yield f"{nome}, efeito {deslocamento}", x1, x2
+    yield "grupos pequenos", rng.integers(0, 10_000, 5), rng.integers(0, 10_000, 7)
+
+
+def cenarios_spearman(rng, n):
+    participantes = rng.poisson(3, n) + 1
+    for nome, gerar in METRICAS.items():
+        x = gerar(rng, n)
+        for forca in (-0.5, 0.0, 0.3, 0.9):
+            # y (participantes) depende de x com a força pedida, nas mesmas escalas inteiras
+            postos = stats.rankdata(x) / n
+            ruido = rng.random(n)
+            y = np.floor(np.quantile(participantes, np.clip(abs(forca) * (postos if forca >= 0 else 1 - postos)
+                                                             + (1 - abs(forca)) * ruido, 0, 1)))
+            yield f"{nome}, força {forca}", x, y
+    x = _tempo_horas(rng, n)
+    yield "duas contínuas", x, x * rng.lognormal(0, 1, n)
+
+
+def _dentro(valor, intervalo) -> bool:
+    return intervalo[0] - TOLERANCIA * max(1.0, abs(valor)) <= valor <= intervalo[1] + TOLERANCIA * max(1.0, abs(valor))
+
+
+def validar(repeticoes: int, n: int, faixas_testadas) -> int:
+    rng = np.random.default_rng(0)
+    violacoes = 0
+
+    print(f"{'Teste':14} {'Faixas':>7} {'Casos':>6} {'Erro máx. estat.':>17} {'Limite máx.':>12} "
+          f"{'Erro máx. p':>12} {'Largura máx. p':>15}")
+
+    for faixas in faixas_testadas:
+        for teste in ('mann_whitney', 'spearman'):
+            casos, erro_estat, limite_estat, erro_p, largura_p = 0, 0.0, 0.0, 0.0, 0.0
+            for _ in range(repeticoes):
+                if teste == 'mann_whitney':
+                    for nome, x1, x2 in cenarios_mann_whitney(rng, n):
+                        exato = stats.mannwhitneyu(x1, x2, alternative='two-sided', method='asymptotic')
+                        r = ss.mann_whitney_aproximado(x1, x2, faixas)
+                        escala = len(x1) * len(x2)
+                        estat, intervalo = exato.statistic, r['u_intervalo']
+                        erro_estat = max(erro_estat, abs(r['u_stat'] - estat) / escala)
+                        limite_estat = max(limite_estat, r['erro_u'] / escala)
+                        ok = _dentro(estat, intervalo) and _dentro(exato.pvalue, r['p_intervalo'])
+                        casos += 1
+                        erro_p = max(erro_p, abs(r['p_value'] - exato.pvalue))
+                        largura_p = max(largura_p, r['p_intervalo'][1] - r['p_intervalo'][0])
+                        if not ok:
+                            violacoes += 1
+                            print(f"  ✗ {nome}: U={estat} ∉ {intervalo} ou p={exato.pvalue} ∉ {r['p_intervalo']}")
+                else:
+                    for nome, x, y in cenarios_spearman(rng, n):
+                        exato = stats.spearmanr(x, y)
+                        r = ss.spearman_aproximado(x, y, faixas)
+                        estat, intervalo = exato.statistic, r['correlacao_intervalo']
+                        erro_estat = max(erro_estat, abs(r['correlacao'] - estat))
+                        limite_estat = max(limite_estat, r['erro'])
+                        ok = _dentro(estat, intervalo) and _dentro(exato.pvalue, r['p_intervalo'])
+                        casos += 1
+                        erro_p = max(erro_p, abs(r['p_value'] - exato.pvalue))
+                        largura_p = max(largura_p, r['p_intervalo'][1] - r['p_intervalo'][0])
+                        if not ok:
+                            violacoes += 1
+                            print(f"  ✗ {nome}: ρ={estat} ∉ {intervalo} ou p={exato.pvalue} ∉ {r['p_intervalo']}")
+
+            # Erros da estatística: em U / (n1 · n2) para Mann-Whitney e em ρ para Spearman
+            print(f"{teste:14} {faixas:>7} {casos:>6} {erro_estat:>17.2e} {limite_estat:>12.2e} "
+                  f"{erro_p:>12.2e} {largura_p:>15.2e}")
+
+    return violacoes
+
+
+def medir_tempos(n: int, faixas: int):
+    rng = np.random.default_rng(1)
+    x = _tempo_horas(rng, n)
+    merged = rng.random(n) < 0.6
+    y = rng.poisson(3, n) + 1.0
+
+    def medir(funcao):
+        inicio = time.perf_counter()
+        funcao()
+        return time.perf_counter() - inicio
+
+    linhas = [
+        ("Mann-Whitney", medir(lambda: stats.mannwhitneyu(x[merged], x[~merged], alternative='two-sided')),
+         medir(lambda: ss.mann_whitney_aproximado(x[merged], x[~merged], faixas))),
+        ("Spearman", medir(lambda: stats.spearmanr(x, y)),
+         medir(lambda: ss.spearman_aproximado(x, y, faixas))),
+    ]
+
+    print(f"\nTempo com n = {n:,} (tempo de análise contínuo, {faixas} faixas):")
+    print(f"{'Teste':14} {'scipy (s)':>10} {'Aproximado (s)':>15} {'Aceleração':>11}")
+    for nome, exato, aproximado in linhas:
+        print(f"{nome:14} {exato:>10.2f} {aproximado:>15.2f} {exato / aproximado:>10.1f}×")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Valida os testes aproximados contra o scipy")
+    parser.add_argument('--repeticoes', type=int, default=5, help="Repetições de cada cenário")
+    parser.add_argument('--tamanho', type=int, default=20_000, help="Observações em cada cenário")
+    parser.add_argument('--faixas', type=int, nargs='+', default=[256, 1024, 4096])
+    parser.add_argument('--n', type=int, default=5_000_000, help="Tamanho da coluna na medição de tempo (0 omite)")
+    args = parser.parse_args()
+
+    violacoes = validar(args.repeticoes, args.tamanho, args.faixas)
+    print(f"\nLimites violados: {violacoes}")
+
+    if args.n:
+        medir_tempos(args.n, max(args.faixas))
+
+    if violacoes:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,404 @@
+"""
+Cliente HTTP da API do GitHub com retentativas e fila de falhas
+Lab 03 - Caracterizando a atividade de code review no GitHub
+
+ClienteGitHub.get() repete requisições que falham de forma transitória
+(timeouts, erros de conexão, 5xx, 429 e rate limit) com espera exponencial e
+jitter completo: espera = uniforme(0, min(espera_maxima, espera_base · 2^tentativa)).
+Quando a API informa Retry-After ou X-RateLimit-Reset, a espera segue o cabeçalho.
+
+Cada endpoint ('pulls', 'files', 'reviews', 'comments', 'search'...) tem um
+orçamento de retentativas para a execução inteira: quando um endpoint esgota o
+orçamento, as próximas falhas dele não são mais repetidas, o que evita gastar a
+cota da API repetindo chamadas para um serviço que está fora do ar.
+
+Toda requisição tem timeout de conexão e de leitura. Opcionalmente (hedge=True),
+um GET que demora mais que o p95 de latência do seu endpoint recebe uma cópia, e
+vale a primeira resposta que chegar (Dean e Barroso, "The Tail at Scale"). A
+fração de cópias é limitada para não dobrar a carga na API. Histogramas de
+latência por endpoint (por tentativa e de ponta a ponta) mostram o efeito na cauda.
+
+Falhas definitivas levantam ErroRequisicao. Os coletores registram o item que
+falhou (repositório, PR, endpoint) na FilaFalhas, um arquivo JSONL persistente
+que pode ser reprocessado depois.
+"""
+
+import bisect
+import json
+import logging
+import random
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout, as_completed
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import requests
+
+import instrumentacao
+
+logger = logging.getLogger(__name__)
+
+STATUS_TRANSITORIOS = {429, 500, 502, 503, 504}
+
+
+class ErroRequisicao(Exception):
+    """
+    Requisição que falhou mesmo após as retentativas
+    """
+
+    def __init__(self, mensagem: str, url: str, endpoint: str, status: Optional[int] = None):
+        super().__init__(mensagem)
+        self.url = url
+        self.endpoint = endpoint
+        self.status = status
+
+
+def endpoint_da_url(url: str) -> str:
+    """
+    Último segmento não numérico do caminho (ex.: .../pulls/12/files -> 'files')
+    """
+    caminho = url.split('://', 1)[-1].split('?', 1)[0].rstrip('/')
+    segmentos = caminho.split('/')[1:]
+    # .../repos/{owner}/{repo}: o nome do repositório não é o endpoint
+    if len(segmentos) >= 3 and segmentos[-3] == 'repos':
+        return 'repos'
+    segmentos = [s for s in segmentos if not s.isdigit()]
+    return segmentos[-1] if segmentos else ''
+
+
+def proxima_pagina(response) -> Optional[str]:
+    """
+    URL da próxima página (cabeçalho Link, rel="next"), ou None na última
+    """
+    for link in requests.utils.parse_header_links(response.headers.get('Link', '')):
+        if link.get('rel') == 'next':
+            return link['url']
+    return None
+
+
+class HistogramaLatencia:
+    """
+    Histograma de latências com baldes geométricos (4 por oitava, de 1 ms a ~2 min)
+    """
+
+    LIMITES = tuple(0.001 * 2 ** (i / 4) for i in range(69))
+
+    def __init__(self):
+        self.contagens = [0] * (len(self.LIMITES) + 1)
+        self.n = 0
+        self.maximo = 0.0
+        self._trava = threading.Lock()
+
+    def registrar(self, segundos: float):
+        with self._trava:
+            self.contagens[bisect.bisect_left(self.LIMITES, segundos)] += 1
+            self.n += 1
+            self.maximo = max(self.maximo, segundos)
+
+    def quantil(self, q: float) -> Optional[float]:
+        """
+        Limite superior do balde que contém o quantil q (None se vazio)
+        """
+        if not self.n:
+            return None
+        alvo, acumulado = q * self.n, 0
+        for i, contagem in enumerate(self.contagens):
+            acumulado += contagem
+            if acumulado >= alvo:
+                return min(self.LIMITES[i], self.maximo) if i < len(self.LIMITES) else self.maximo
+        return self.maximo
+
+
+class ClienteGitHub:
+    def __init__(self, headers: Dict[str, str], tentativas: int = 5, espera_base: float = 1.0,
+                 espera_maxima: float = 60.0, orcamento_por_endpoint: int = 200,
+                 orcamentos: Optional[Dict[str, int]] = None, timeout: Tuple[float, float] = (5.0, 30.0),
+                 hedge: bool = False, fracao_maxima_hedge: float = 0.1, minimo_amostras_hedge: int = 20):
+        """
+        Args:
+            headers: Cabeçalhos enviados em todas as requisições (token, Accept...)
+            tentativas: Número máximo de tentativas de cada requisição
+            espera_base: Espera base do backoff exponencial, em segundos
+            espera_maxima: Limite da espera entre tentativas, em segundos
+            orcamento_por_endpoint: Retentativas permitidas por endpoint na execução
+            orcamentos: Orçamentos específicos por endpoint (ex.: {'search': 20})
+            timeout: Timeouts (conexão, leitura) de cada tentativa, em segundos
+            hedge: Envia uma cópia dos GETs que passam do p95 de latência do endpoint
+            fracao_maxima_hedge: Fração máxima de requisições que podem receber cópia
+            minimo_amostras_hedge: Latências observadas em um endpoint antes de usar o p95
+        """
+        self.headers = dict(headers)
+        self.tentativas = tentativas
+        self.espera_base = espera_base
+        self.espera_maxima = espera_maxima
+        self.orcamento_por_endpoint = orcamento_por_endpoint
+        self.orcamentos = dict(orcamentos or {})
+        self.timeout = timeout
+        self.hedge = hedge
+        self.fracao_maxima_hedge = fracao_maxima_hedge
+        self.minimo_amostras_hedge = minimo_amostras_hedge
+
+        # Latência de cada tentativa (base do p95) e a vista por quem chama get()
+        self.latencias_tentativa: Dict[str, HistogramaLatencia] = defaultdict(HistogramaLatencia)
+        self.latencias: Dict[str, HistogramaLatencia] = defaultdict(HistogramaLatencia)
+        self.requisicoes = 0
+        self.hedges = 0
+        self.hedges_vencedores = 0
+
+        self._trava = threading.Lock()
+        self._local = threading.local()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _sessao(self) -> requests.Session:
+        # Uma sessão (pool de conexões) por thread: cópias de hedge rodam em paralelo
+        sessao = getattr(self._local, 'sessao', None)
+        if sessao is None:
+            sessao = self._local.sessao = requests.Session()
+            sessao.headers.update(self.headers)
+        return sessao
+
+    def _tentar(self, url: str, endpoint: str, kwargs: Dict) -> requests.Response:
+        inicio = time.perf_counter()
+        try:
+            return self._sessao().get(url, **kwargs)
+        finally:
+            self.latencias_tentativa[endpoint].registrar(time.perf_counter() - inicio)
+
+    def _atraso_hedge(self, endpoint: str) -> Optional[float]:
+        if not self.hedge:
+            return None
+        historico = self.latencias_tentativa[endpoint]
+        if historico.n < self.minimo_amostras_hedge:
+            return None
+        return historico.quantil(0.95)
+
+    def _permitir_hedge(self) -> bool:
+        with self._trava:
+            if self.hedges + 1 > self.fracao_maxima_hedge * self.requisicoes:
+                return False
+            self.hedges += 1
+            return True
+
+    def _enviar(self, url: str, endpoint: str, kwargs: Dict) -> requests.Response:
+        with self._trava:
+            self.requisicoes += 1
+
+        atraso = self._atraso_hedge(endpoint)
+        if atraso is None:
+            return self._tentar(url, endpoint, kwargs)
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='hedge')
+
+        primaria = self._executor.submit(self._tentar, url, endpoint, kwargs)
+        try:
+            return primaria.result(timeout=atraso)
+        except FuturesTimeout:
+            pass
+
+        if not self._permitir_hedge():
+            return primaria.result()
+
+        instrumentacao.contar('http.hedges')
+        copia = self._executor.submit(self._tentar, url, endpoint, kwargs)
+
+        # Vale a primeira resposta bem-sucedida; se as duas falharem, o erro da primária
+        for futuro in as_completed([primaria, copia]):
+            if futuro.exception() is None:
+                if futuro is copia:
+                    with self._trava:
+                        self.hedges_vencedores += 1
+                    instrumentacao.contar('http.hedges_vencedores')
+                return futuro.result()
+        return primaria.result()
+
+    def _consumir_orcamento(self, endpoint: str) -> bool:
+        with self._trava:
+            restante = self.orcamentos.get(endpoint, self.orcamento_por_endpoint)
+            if restante <= 0:
+                return False
+            self.orcamentos[endpoint] = restante - 1
+            return True
+
+    def _espera(self, tentativa: int, response: Optional[requests.Response]) -> float:
+        if response is not None:
+            retry_after = response.headers.get('Retry-After')
+            if retry_after and retry_after.isdigit():
+                return float(retry_after)
+        return random.uniform(0, min(self.espera_maxima, self.espera_base * 2 ** tentativa))
+
+    @staticmethod
+    def _espera_rate_limit(response: requests.Response) -> Optional[float]:
+        """
+        Segundos até a renovação da cota, se a resposta for de rate limit primário
+        """
+        if response.status_code not in (403, 429) or response.headers.get('X-RateLimit-Remaining') != '0':
+            return None
+        reset = response.headers.get('X-RateLimit-Reset')
+        return max(1.0, float(reset) - time.time() + 1) if reset else 60.0
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """
+        GET com retentativas
+
+        Respostas definitivas (2xx, 3xx, 404 e demais 4xx) são devolvidas como vieram.
+
+        Raises:
+            ErroRequisicao: Se a falha persistir após as tentativas ou o orçamento do
+                endpoint tiver se esgotado
+        """
+        endpoint = endpoint_da_url(url)
+        kwargs.setdefault('timeout', self.timeout)
+        tentativa = 0
+        inicio = time.perf_counter()
+
+        while True:
+            response, erro = None, None
+            try:
+                response = self._enviar(url, endpoint, kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                erro = e
+
+            espera, tentativa = self._proxima_espera(url, endpoint, tentativa, response, erro)
+            if espera is None:
+                self.latencias[endpoint].registrar(time.perf_counter() - inicio)
+                return response
+            time.sleep(espera)
+
+    def _proxima_espera(self, url: str, endpoint: str, tentativa: int, response, erro) -> Tuple[Optional[float], int]:
+        """
+        Decide o que fazer com o resultado de uma tentativa (comum aos clientes síncrono e assíncrono)
+
+        Args:
+            tentativa: Tentativas com falha transitória até agora
+            response: Resposta recebida (None se a tentativa levantou erro de conexão/timeout)
+            erro: Erro da tentativa, quando não houve resposta
+
+        Returns:
+            Tupla (espera antes de repetir, tentativas com falha); espera None indica
+            resposta definitiva, que deve ser devolvida
+
+        Raises:
+            ErroRequisicao: Se a falha persistir após as tentativas ou o orçamento do
+                endpoint tiver se esgotado
+        """
+        if response is not None:
+            espera = self._espera_rate_limit(response)
+            if espera is not None:
+                # Rate limit primário: espera a renovação sem gastar tentativas
+                logger.warning("Rate limit atingido em %s. Aguardando %.0f segundos...", endpoint, espera)
+                instrumentacao.contar('http.espera_rate_limit_s', espera)
+                return espera, tentativa
+            # 403 com Retry-After é o rate limit secundário (abuso), também transitório
+            secundario = response.status_code == 403 and 'Retry-After' in response.headers
+            if response.status_code not in STATUS_TRANSITORIOS and not secundario:
+                return None, tentativa
+            erro = f"HTTP {response.status_code}"
+
+        tentativa += 1
+        if tentativa >= self.tentativas:
+            raise ErroRequisicao(f"{erro} após {tentativa} tentativas", url, endpoint,
+                                 response.status_code if response is not None else None)
+        if not self._consumir_orcamento(endpoint):
+            raise ErroRequisicao(f"{erro} (orçamento de retentativas de '{endpoint}' esgotado)", url,
+                                 endpoint, response.status_code if response is not None else None)
+
+        espera = self._espera(tentativa, response)
+        logger.debug("%s: %s, nova tentativa %d em %.1fs", url, erro, tentativa + 1, espera)
+        instrumentacao.contar('http.retentativas')
+        return espera, tentativa
+
+    def resumo_latencias(self) -> Dict[str, Dict[str, float]]:
+        """
+        Requisições, p50, p95, p99 e máximo (segundos) de ponta a ponta por endpoint
+        """
+        return {
+            endpoint: {'n': h.n, 'p50': h.quantil(0.5), 'p95': h.quantil(0.95), 'p99': h.quantil(0.99),
+                       'max': h.maximo}
+            for endpoint, h in sorted(self.latencias.items()) if h.n
+        }
+
+    def registrar_latencias(self):
+        """
+        Registra no log o histograma de latência de cada endpoint e o uso de hedge
+        """
+        for endpoint, r in self.resumo_latencias().items():
+            logger.info("  %12s: n=%s, p50=%.0f ms, p95=%.0f ms, p99=%.0f ms, máx=%.0f ms",
+                        endpoint, r['n'], r['p50'] * 1000, r['p95'] * 1000, r['p99'] * 1000, r['max'] * 1000,
+                        extra={'dados': {'evento': 'latencia', 'endpoint': endpoint, **r}})
+        if self.hedge:
+            logger.info("  Hedge: %s cópias em %s requisições, %s venceram a original",
+                        self.hedges, self.requisicoes, self.hedges_vencedores)
+
+
+def adicionar_argumentos_http(parser):
+    """
+    Opções de timeout e hedge comuns aos coletores
+    """
+    parser.add_argument('--timeout-conexao', type=float, default=5.0,
+                        help="Timeout para estabelecer a conexão, em segundos (padrão: 5)")
+    parser.add_argument('--timeout-leitura', type=float, default=30.0,
+                        help="Timeout de leitura da resposta, em segundos (padrão: 30)")
+    parser.add_argument('--hedge', action='store_true',
+                        help="Envia uma cópia dos GETs que passam do p95 de latência do endpoint")
+
+
+class FilaFalhas:
+    """
+    Fila persistente (JSONL) de itens que falharam, para reprocessamento posterior
+
+    Cada linha tem: data, repo, pr (None para páginas da listagem de PRs), pagina,
+    max_prs, endpoint, url e erro.
+    """
+
+    def __init__(self, caminho: Path):
+        self.caminho = Path(caminho)
+        self._trava = threading.Lock()
+
+    def registrar(self, repo: str, endpoint: str, erro: str, pr: Optional[int] = None, **extras):
+        item = {'data': datetime.now().isoformat(timespec='seconds'), 'repo': repo, 'pr': pr,
+                'endpoint': endpoint, 'erro': erro, **extras}
+        with self._trava, open(self.caminho, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(item, ensure_ascii=False) + '\n')
+        instrumentacao.contar('coleta.falhas')
+        logger.warning("%s%s: falha em %s (%s); registrada para reprocessamento",
+                       repo, f'#{pr}' if pr else '', endpoint, erro)
+
+    def __len__(self) -> int:
+        if not self.caminho.exists():
+            return 0
+        with open(self.caminho, encoding='utf-8') as f:
+            return sum(1 for linha in f if linha.strip())
+
+    def retirar(self) -> List[Dict]:
+        """
+        Retira todos os itens da fila
+
+        O arquivo é renomeado para *.reprocessando e só deve ser apagado (concluir_retirada)
+        depois que o reprocessamento terminar, para que nada se perca se ele for interrompido.
+        Itens que falharem de novo voltam para a fila normalmente.
+        """
+        em_andamento = self.caminho.with_suffix(self.caminho.suffix + '.reprocessando')
+        itens = []
+
+        with self._trava:
+            if em_andamento.exists():
+                itens.extend(self._ler(em_andamento))
+            if self.caminho.exists():
+                itens.extend(self._ler(self.caminho))
+                with open(em_andamento, 'w', encoding='utf-8') as f:
+                    f.writelines(json.dumps(item, ensure_ascii=False) + '\n' for item in itens)
+                self.caminho.unlink()
+
+        return itens
+
+    def concluir_retirada(self):
+        self.caminho.with_suffix(self.caminho.suffix + '.reprocessando').unlink(missing_ok=True)
+
+    @staticmethod
+    def _ler(caminho: Path) -> List[Dict]:
+        with open(caminho, encoding='utf-8') as f:
+            return [json.loads(linha) for linha in f if linha.strip()]
@@ -0,0 +1,534 @@
+"""
+Coleta de PRs em estágios (produtor/consumidor)
+Lab 03 - Sprint 1
+
+Em ColetorPRs a coleta é estritamente sequencial: lista uma página, espera
+filtrar_prs enriquecer todos os PRs dela, só então pede a próxima página, e
+os repositórios são processados um após o outro. Aqui cada etapa é um
+estágio com suas próprias threads, ligados por filas limitadas:
+
+    listagem (repositório -> páginas)  --fila de PRs-->  enriquecimento (N threads)
+        --fila de escrita-->  escritor (1 thread)
+
+- Listagem: `listadores` threads pegam repositórios e listam suas páginas de
+  PRs, sem esperar o enriquecimento. Um repositório para de ser listado
+  quando já tem `max_prs` PRs aprovados ou chega à última página.
+- Enriquecimento: `trabalhadores` threads aplicam os filtros e coletam as
+  métricas de cada PR (ColetorPRs.processar_pr).
+- Escritor: a única thread que grava no banco (SQLite não aceita a mesma
+  conexão em várias threads). As gravações de revisões, comentários e
+  arquivos feitas durante o enriquecimento são enfileiradas para ele, e os
+  PRs são gravados assim que aprovados, não só no fim da coleta.
+
+As filas são limitadas (`tamanho_fila`): quando o enriquecimento não
+acompanha a listagem, os listadores bloqueiam (contrapressão) e a memória
+fica limitada a algumas páginas em andamento. A profundidade de cada fila,
+o tempo que os produtores passaram bloqueados e a ocupação de cada estágio
+são amostrados continuamente, registrados no log a cada `intervalo`
+segundos e devolvidos por PipelineColeta.metricas().
+
+Diferença em relação a ColetorPRs: as páginas têm sempre 100 PRs. Lá o
+tamanho da página diminui conforme os PRs são aprovados, o que desloca a
+paginação (a página 3 com per_page=80 repete PRs da página 2); aqui não há
+sobreposição. O dataset tem, por repositório, os `max_prs` primeiros PRs
+aprovados na ordem da listagem. PRs que já estavam em enriquecimento quando
+o limite foi atingido são descartados do dataset, mas continuam no banco.
+
+Uso:
+    python coleta_pipeline.py --trabalhadores 32 --tamanho-fila 300
+"""
+
+import argparse
+import json
+import logging
+import queue
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import configuracao
+import instrumentacao
+import registro
+from armazenamento import ArmazenamentoColeta
+from cliente_http import ErroRequisicao, adicionar_argumentos_http
+from coletor_prs import ColetorPRs, salvar_coleta
+
+logger = logging.getLogger(__name__)
+
+# Marca o fim do trabalho em uma fila
+_FIM = object()
+
+
+class FilaMedida(queue.Queue):
+    """
+    Fila limitada que mede a própria profundidade e o tempo que os produtores
+    passaram bloqueados nela, esperando espaço (contrapressão)
+    """
+
+    def __init__(self, nome: str, capacidade: int):
+        super().__init__(capacidade)
+        self.nome = nome
+        self.itens = 0
+        self.espera_cheia = 0.0
+        self.profundidade_maxima = 0
+        self.amostras = 0
+        self.soma_profundidades = 0
+
+    def _put(self, item):
+        # Chamado pela Queue com self.mutex adquirido
+        super()._put(item)
+        self.profundidade_maxima = max(self.profundidade_maxima, len(self.queue))
+
+    def colocar(self, item):
+        inicio = time.perf_counter()
+        self.put(item)
+        espera = time.perf_counter() - inicio
+        with self.mutex:
+            self.itens += 1
+            self.espera_cheia += espera
+
+    def amostrar(self) -> int:
+        with self.mutex:
+            profundidade = len(self.queue)
+            self.amostras += 1
+            self.soma_profundidades += profundidade
+        return profundidade
+
+    def metricas(self) -> Dict:
+        with self.mutex:
+            return {
+                'capacidade': self.maxsize,
+                'profundidade': len(self.queue),
+                'profundidade_media': self.soma_profundidades / self.amostras if self.amostras else 0.0,
+                'profundidade_maxima': self.profundidade_maxima,
+                'itens': self.itens,
+                'espera_cheia_s': self.espera_cheia,
+            }
+
+
+class ArmazenamentoEnfileirado:
+    """
+    Substitui o armazenamento do coletor nas threads de enriquecimento: em vez
+    de gravar, enfileira a gravação para o escritor (também usado pela coleta
+    por amostragem, amostragem_prs.py)
+    """
+
+    def __init__(self, fila: FilaMedida):
+        self.fila = fila
+
+    def salvar_revisoes(self, nome_repo: str, numero_pr: int, revisoes: Sequence[Dict]):
+        self.fila.colocar(('salvar_revisoes', nome_repo, numero_pr, revisoes))
+
+    def salvar_comentarios(self, nome_repo: str, numero_pr: int, comentarios: Sequence[Dict]):
+        self.fila.colocar(('salvar_comentarios', nome_repo, numero_pr, comentarios))
+
+    def salvar_arquivos(self, nome_repo: str, numero_pr: int, arquivos: Sequence[Dict]):
+        self.fila.colocar(('salvar_arquivos', nome_repo, numero_pr, arquivos))
+
+
+class PipelineColeta:
+    """
+    Coleta de PRs em três estágios ligados por filas limitadas
+
+    Exemplo:
+        with ArmazenamentoColeta(Path("coleta.sqlite")) as armazenamento:
+            coletor = ColetorPRs(armazenamento=armazenamento)
+            prs = PipelineColeta(coletor, trabalhadores=32).coletar_todos_prs()
+    """
+
+    # PRs por página da listagem (máximo da API)
+    POR_PAGINA = 100
+
+    def __init__(self, coletor: ColetorPRs, max_prs: int = 200, listadores: int = 4, trabalhadores: int = 16,
+                 tamanho_fila: int = 200, intervalo: float = 5.0, intervalo_amostragem: float = 0.1):
+        """
+        Args:
+            coletor: Coletor usado nas requisições (cliente, fila de falhas e armazenamento)
+            max_prs: PRs aprovados por repositório
+            listadores: Threads que listam as páginas de PRs
+            trabalhadores: Threads que filtram e enriquecem os PRs
+            tamanho_fila: Capacidade da fila de PRs; a fila de escrita tem o dobro
+            intervalo: Segundos entre os registros de profundidade das filas no log
+            intervalo_amostragem: Segundos entre as amostras de profundidade das filas
+        """
+        if listadores < 1 or trabalhadores < 1 or tamanho_fila < 1:
+            raise ValueError("listadores, trabalhadores e tamanho_fila devem ser positivos")
+        self.coletor = coletor
+        self.max_prs = max_prs
+        self.listadores = listadores
+        self.trabalhadores = trabalhadores
+        self.tamanho_fila = tamanho_fila
+        self.intervalo = intervalo
+        self.intervalo_amostragem = intervalo_amostragem
+        self._reiniciar(())
+
+    def _reiniciar(self, repositorios: Sequence[str]):
+        self.repositorios = list(repositorios)
+        self.fila_repositorios: queue.Queue = queue.Queue()
+        for indice, nome_repo in enumerate(self.repositorios):
+            self.fila_repositorios.put((indice, nome_repo))
+        self.fila_prs = FilaMedida('enriquecimento', self.tamanho_fila)
+        self.fila_escrita = FilaMedida('escrita', 2 * self.tamanho_fila)
+
+        self._trava = threading.Lock()
+        # PRs aprovados por repositório, consultados pela listagem para saber quando parar
+        self._aprovados: Counter = Counter()
+        # PRs listados e ainda não enriquecidos, e repositórios com a listagem concluída
+        self._pendentes: Counter = Counter()
+        self._listados = set()
+        self._ocupados = Counter()
+        self._tempo_ocupado = Counter()
+        self.paginas = 0
+
+        # Estado do escritor (só ele acessa)
+        self._resultados: Dict[Tuple[int, int, int], Dict] = {}
+        self._erro_escrita: Optional[BaseException] = None
+        self._progresso = registro.Progresso(len(self.repositorios), "Repositórios", logger)
+        self._inicio = time.monotonic()
+        self._fim = None
+
+    def _ocupar(self, estagio: str, delta: int):
+        with self._trava:
+            self._ocupados[estagio] += delta
+
+    def _medir(self, estagio: str, inicio: float):
+        with self._trava:
+            self._tempo_ocupado[estagio] += time.perf_counter() - inicio
+
+    # Listagem
+
+    def _listar(self):
+        while True:
+            try:
+                indice, nome_repo = self.fila_repositorios.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                self._listar_repositorio(indice, nome_repo)
+            except Exception as e:
+                logger.warning("Erro ao processar %s: %s", nome_repo, e)
+            finally:
+                self._concluir_listagem(indice, nome_repo)
+
+    def _listar_repositorio(self, indice: int, nome_repo: str):
+        url = f"{self.coletor.url_base}/repos/{nome_repo}/pulls"
+        pagina = 1
+
+        while True:
+            with self._trava:
+                aprovados = self._aprovados[indice]
+            if aprovados >= self.max_prs:
+                return
+
+            params = {
+                'state': 'closed',
+                'sort': 'updated',
+                'direction': 'desc',
+                'page': pagina,
+                'per_page': self.POR_PAGINA
+            }
+            inicio = time.perf_counter()
+            self._ocupar('listagem', 1)
+            try:
+                response = self.coletor._get(url, params=params)
+            except ErroRequisicao as e:
+                # O restante da listagem é retomado a partir desta página no reprocessamento
+                self.coletor.falhas.registrar(nome_repo, e.endpoint, str(e), url=e.url, pagina=pagina,
+                                              max_prs=self.max_prs - aprovados)
+                return
+            finally:
+                self._ocupar('listagem', -1)
+                self._medir('listagem', inicio)
+
+            if response.status_code != 200:
+                logger.warning("%s: erro na requisição: %s", nome_repo, response.status_code)
+                return
+
+            prs = self.coletor._json(response)
+            with self._trava:
+                self.paginas += 1
+                self._pendentes[indice] += len(prs)
+            # Bloqueia enquanto a fila estiver cheia
+            for posicao, pr in enumerate(prs):
+                self.fila_prs.colocar(((indice, pagina, posicao), nome_repo, pr))
+
+            logger.debug("%s: página %d com %d PRs enfileirada", nome_repo, pagina, len(prs))
+            if len(prs) < self.POR_PAGINA:
+                return
+            pagina += 1
+
+    def _concluir_listagem(self, indice: int, nome_repo: str):
+        with self._trava:
+            self._listados.add(indice)
+            concluido = self._pendentes[indice] == 0
+        if concluido:
+            self.fila_escrita.colocar(('repositorio', indice, nome_repo))
+
+    # Enriquecimento
+
+    def _enriquecer(self):
+        while True:
+            item = self.fila_prs.get()
+            if item is _FIM:
+                return
+            chave, nome_repo, pr = item
+            indice = chave[0]
+
+            with self._trava:
+                completo = self._aprovados[indice] >= self.max_prs
+            # Os PRs já aprovados saíram da fila antes deste, então vêm antes na listagem:
+            # com o repositório completo, este não entraria no dataset
+            if completo:
+                resultado = None
+            else:
+                inicio = time.perf_counter()
+                self._ocupar('enriquecimento', 1)
+                try:
+                    resultado = self.coletor.processar_pr(pr, nome_repo)
+                except Exception as e:
+                    logger.warning("%s#%s: erro ao processar PR: %s", nome_repo, pr.get('number'), e)
+                    resultado = None
+                finally:
+                    self._ocupar('enriquecimento', -1)
+                    self._medir('enriquecimento', inicio)
+
+            if resultado:
+                with self._trava:
+                    self._aprovados[indice] += 1
+                self.fila_escrita.colocar(('pr', chave, nome_repo, resultado))
+
+            with self._trava:
+                self._pendentes[indice] -= 1
+                concluido = indice in self._listados and self._pendentes[indice] == 0
+            # Todas as mensagens 'pr' do repositório já estão na fila antes desta
+            if concluido:
+                self.fila_escrita.colocar(('repositorio', indice, nome_repo))
+
+    # Escrita
+
+    def _escrever(self, armazenamento: Optional[ArmazenamentoColeta]):
+        aprovados_por_repo: Counter = Counter()
+
+        while True:
+            mensagem = self.fila_escrita.get()
+            if mensagem is _FIM:
+                return
+            # Depois de um erro a fila continua sendo esvaziada, para não travar os produtores
+            if self._erro_escrita is not None:
+                continue
+
+            tipo, *dados = mensagem
+            inicio = time.perf_counter()
+            self._ocupar('escrita', 1)
+            try:
+                if tipo == 'pr':
+                    chave, nome_repo, pr = dados
+                    self._resultados[chave] = pr
+                    aprovados_por_repo[chave[0]] += 1
+                    if armazenamento:
+                        armazenamento.salvar_pr(nome_repo, pr)
+                elif tipo == 'repositorio':
+                    indice, nome_repo = dados
+                    prs = min(aprovados_por_repo[indice], self.max_prs)
+                    logger.debug("%s: %d PRs válidos coletados", nome_repo, prs)
+                    self._progresso.avancar(prs=prs)
+                elif armazenamento:
+                    getattr(armazenamento, tipo)(*dados)
+            except Exception as e:
+                logger.error("Erro na gravação (%s): %s", tipo, e)
+                self._erro_escrita = e
+            finally:
+                self._ocupar('escrita', -1)
+                self._medir('escrita', inicio)
+
+    # Monitoramento
+
+    def _monitorar(self, parar: threading.Event):
+        ultimo = time.monotonic()
+        while not parar.wait(self.intervalo_amostragem):
+            self.fila_prs.amostrar()
+            self.fila_escrita.amostrar()
+
+            agora = time.monotonic()
+            if agora - ultimo >= self.intervalo:
+                ultimo = agora
+                self._registrar_filas()
+
+    def _registrar_filas(self):
+        metricas = self.metricas()
+        filas, estagios = metricas['filas'], metricas['estagios']
+        logger.info(
+            "Filas: enriquecimento %d/%d (bloqueio %.1fs) | escrita %d/%d (bloqueio %.1fs) | "
+            "ocupados: listagem %d/%d, enriquecimento %d/%d",
+            filas['enriquecimento']['profundidade'], filas['enriquecimento']['capacidade'],
+            filas['enriquecimento']['espera_cheia_s'],
+            filas['escrita']['profundidade'], filas['escrita']['capacidade'], filas['escrita']['espera_cheia_s'],
+            estagios['listagem']['ocupados'], self.listadores,
+            estagios['enriquecimento']['ocupados'], self.trabalhadores,
+            extra={'dados': {'evento': 'filas_coleta', **metricas}})
+
+    def metricas(self) -> Dict:
+        """
+        Profundidade das filas e ocupação de cada estágio
+
+        Returns:
+            {'filas': {nome: métricas da FilaMedida},
+             'estagios': {nome: {threads, ocupados, tempo_ocupado_s, ocupacao}},
+             'paginas', 'duracao_s'}
+        """
+        duracao = (self._fim or time.monotonic()) - self._inicio
+        threads = {'listagem': self.listadores, 'enriquecimento': self.trabalhadores, 'escrita': 1}
+        with self._trava:
+            estagios = {
+                estagio: {
+                    'threads': n,
+                    'ocupados': self._ocupados[estagio],
+                    'tempo_ocupado_s': self._tempo_ocupado[estagio],
+                    # Fração do tempo em que as threads do estágio estavam trabalhando
+                    'ocupacao': self._tempo_ocupado[estagio] / (n * duracao) if duracao > 0 else 0.0,
+                }
+                for estagio, n in threads.items()
+            }
+            paginas = self.paginas
+        return {
+            'filas': {fila.nome: fila.metricas() for fila in (self.fila_prs, self.fila_escrita)},
+            'estagios': estagios,
+            'paginas': paginas,
+            'duracao_s': duracao,
+        }
+
+    @instrumentacao.instrumentado('coleta.pipeline')
+    def executar(self, repositorios: Sequence[str]) -> List[Dict]:
+        """
+        Coleta os PRs dos repositórios
+
+        Args:
+            repositorios: Nomes completos (owner/nome), na ordem do dataset
+
+        Returns:
+            PRs aprovados, na mesma ordem da coleta sequencial (repositório, página,
+            posição na página), até max_prs por repositório
+        """
+        self._reiniciar(repositorios)
+        armazenamento = self.coletor.armazenamento
+        self.coletor.armazenamento = ArmazenamentoEnfileirado(self.fila_escrita) if armazenamento else None
+        parar = threading.Event()
+
+        def iniciar(alvo, nome, *args):
+            thread = threading.Thread(target=alvo, args=args, name=nome, daemon=True)
+            thread.start()
+            return thread
+
+        monitor = iniciar(self._monitorar, 'coleta-monitor', parar)
+        escritor = iniciar(self._escrever, 'coleta-escrita', armazenamento)
+        trabalhadores = [iniciar(self._enriquecer, f'coleta-enriquecimento-{i}') for i in range(self.trabalhadores)]
+        listadores = [iniciar(self._listar, f'coleta-listagem-{i}') for i in range(self.listadores)]
+
+        try:
+            # Cada estágio termina quando o anterior terminou e a sua fila foi esvaziada
+            for thread in listadores:
+                thread.join()
+            for _ in trabalhadores:
+                self.fila_prs.put(_FIM)
+            for thread in trabalhadores:
+                thread.join()
+            self.fila_escrita.put(_FIM)
+            escritor.join()
+        finally:
+            self._fim = time.monotonic()
+            parar.set()
+            monitor.join()
+            self.coletor.armazenamento = armazenamento
+
+        if self._erro_escrita is not None:
+            raise self._erro_escrita
+
+        self._progresso.concluir()
+        self._registrar_filas()
+
+        prs, por_repo = [], Counter()
+        for chave in sorted(self._resultados):
+            if por_repo[chave[0]] < self.max_prs:
+                por_repo[chave[0]] += 1
+                prs.append(self._resultados[chave])
+        return prs
+
+    def coletar_todos_prs(self, arquivo_repositorios: str = "repositorios_selecionados.json") -> List[Dict]:
+        caminho_arquivo = self.coletor.caminho_base / arquivo_repositorios
+
+        if not caminho_arquivo.exists():
+            logger.error("Arquivo %s não encontrado!", caminho_arquivo)
+            return []
+
+        with open(caminho_arquivo, 'r', encoding='utf-8') as f:
+            repositorios = json.load(f)
+
+        logger.info("=== COLETA DE PRs DE %s REPOSITÓRIOS (%s listadores, %s trabalhadores) ===\n",
+                    len(repositorios), self.listadores, self.trabalhadores)
+        todos_prs = self.executar([repo.get('full_name', '') for repo in repositorios])
+
+        logger.info("\n=== COLETA CONCLUÍDA ===")
+        logger.info("Total de PRs coletados: %s", len(todos_prs))
+
+        pendentes = len(self.coletor.falhas)
+        if pendentes:
+            logger.warning("%s itens falharam e estão em %s "
+                           "(reprocesse com: python coletor_prs.py --reprocessar-falhas)",
+                           pendentes, self.coletor.falhas.caminho.name)
+
+        return todos_prs
+
+
+def coletar(pipeline: PipelineColeta, arquivo_repos: str = "repositorios_selecionados.json") -> bool:
+    """
+    Versão em estágios de coletor_prs.coletar
+
+    Returns:
+        True se algum PR foi coletado
+    """
+    logger.info("=== LAB 03 - SPRINT 1: COLETA DE PRs (PIPELINE) ===\n")
+
+    if not (pipeline.coletor.caminho_base / arquivo_repos).exists():
+        logger.error("Arquivo %s não encontrado!", arquivo_repos)
+        logger.error("Execute primeiro o script coletor_repositorios.py para gerar a lista de repositórios.")
+        return False
+
+    todos_prs = pipeline.coletar_todos_prs(arquivo_repos)
+    return salvar_coleta(pipeline.coletor, todos_prs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Coleta de PRs em estágios: listagem, enriquecimento e escrita")
+    parser.add_argument('--banco', help="Banco SQLite normalizado da coleta (padrão: coleta.sqlite no diretório base)")
+    parser.add_argument('--max-prs', type=int, default=200, help="PRs por repositório")
+    parser.add_argument('--listadores', type=int, default=4, help="Threads que listam as páginas de PRs")
+    parser.add_argument('--trabalhadores', type=int, default=16, help="Threads que enriquecem os PRs")
+    parser.add_argument('--tamanho-fila', type=int, default=200,
+                        help="PRs listados aguardando enriquecimento antes de a listagem bloquear")
+    parser.add_argument('--metricas', help="Salva as métricas das filas e estágios em JSON")
+    adicionar_argumentos_http(parser)
+    args = parser.parse_args()
+
+    registro.configurar_logging()
+    banco = Path(args.banco) if args.banco else configuracao.caminho_base() / "coleta.sqlite"
+
+    with ArmazenamentoColeta(banco) as armazenamento:
+        coletor = ColetorPRs(timeout=(args.timeout_conexao, args.timeout_leitura), hedge=args.hedge,
+                             armazenamento=armazenamento)
+        try:
+            pipeline = PipelineColeta(coletor, max_prs=args.max_prs, listadores=args.listadores,
+                                      trabalhadores=args.trabalhadores, tamanho_fila=args.tamanho_fila)
+        except ValueError as e:
+            parser.error(str(e))
+        coletar(pipeline)
+
+    if args.metricas:
+        with open(args.metricas, 'w', encoding='utf-8') as f:
+            json.dump(pipeline.metricas(), f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
+    instrumentacao.finalizar(configuracao.caminho_base() / "trace_coleta_pipeline.json")
@@ -0,0 +1,595 @@
+"""
+Coletores assíncronos (asyncio) de repositórios e Pull Requests
+Lab 03 - Sprint 1
+
+Mesma API de ColetorRepositorios e ColetorPRs, com os métodos que acessam a
+rede reescritos como corrotinas: um único event loop mantém milhares de
+requisições em andamento, sem uma thread (e sua pilha) por requisição.
+
+- Repositórios são processados em paralelo (até `repositorios_simultaneos`)
+  e, dentro de cada página de PRs, os PRs também; as páginas de um mesmo
+  repositório continuam sequenciais, porque o tamanho de cada página depende
+  de quantos PRs as anteriores aprovaram.
+- O número de conexões abertas é limitado pelo conector do aiohttp
+  (`limite_conexoes`); requisições além dele esperam na fila do conector. As
+  pausas fixas da coleta síncrona são substituídas por esse limite.
+- Tarefas são criadas em asyncio.TaskGroup: se uma falha de forma inesperada,
+  as irmãs são canceladas e o erro sobe, como no laço síncrono.
+- Os resultados são reunidos na ordem da entrada, então dataset_prs.json,
+  dataset_prs.csv e as listas de repositórios saem idênticos (byte a byte)
+  aos da coleta síncrona; a escrita usa os mesmos métodos.
+
+Retentativas, orçamento por endpoint, rate limit e histogramas de latência são
+os de ClienteGitHub. A fila de falhas é a mesma (falhas_coleta.jsonl) e pode
+ser reprocessada com `python coletor_prs.py --reprocessar-falhas`.
+
+Requer Python 3.11+ (TaskGroup) e o pacote aiohttp (`pip install aiohttp`).
+
+Uso:
+    python coletor_async.py repositorios
+    python coletor_async.py prs --limite-conexoes 50
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import configuracao
+import instrumentacao
+import metricas_pr
+import registro
+from armazenamento import ArmazenamentoColeta
+from cliente_http import ClienteGitHub, ErroRequisicao, endpoint_da_url, proxima_pagina
+from coletor_prs import ColetorPRs, salvar_coleta
+from coletor_repositorios import ColetorRepositorios, salvar_selecionados
+
+try:
+    import aiohttp
+except ImportError:  # backend opcional
+    aiohttp = None
+
+logger = logging.getLogger(__name__)
+
+
+class RespostaAsync:
+    """
+    Resposta já lida por completo, com a interface de requests.Response usada pelos coletores
+    """
+
+    def __init__(self, status_code: int, headers, content: bytes, url: str):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.url = url
+
+    @property
+    def text(self) -> str:
+        return self.content.decode('utf-8', errors='replace')
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class ClienteGitHubAsync(ClienteGitHub):
+    """
+    ClienteGitHub sobre aiohttp: mesmas retentativas e histogramas, get() é uma corrotina
+
+    Use como context manager assíncrono (abre e fecha a sessão e o pool de conexões):
+
+        async with ClienteGitHubAsync(headers) as cliente:
+            resposta = await cliente.get(url)
+    """
+
+    def __init__(self, headers: Dict[str, str], limite_conexoes: int = 100, **opcoes):
+        """
+        Args:
+            headers: Cabeçalhos enviados em todas as requisições
+            limite_conexoes: Máximo de conexões abertas ao mesmo tempo
+            opcoes: Demais opções do ClienteGitHub (tentativas, timeout, orçamentos...)
+        """
+        if aiohttp is None:
+            raise ImportError("A coleta assíncrona requer o pacote aiohttp (pip install aiohttp)")
+        super().__init__(headers, **opcoes)
+        self.limite_conexoes = limite_conexoes
+        self._sessao_async: Optional['aiohttp.ClientSession'] = None
+
+    async def __aenter__(self):
+        conexao, leitura = self.timeout
+        self._sessao_async = aiohttp.ClientSession(
+            headers=self.headers,
+            connector=aiohttp.TCPConnector(limit=self.limite_conexoes),
+            timeout=aiohttp.ClientTimeout(sock_connect=conexao, sock_read=leitura))
+        return self
+
+    async def __aexit__(self, *excecao):
+        await self._sessao_async.close()
+        self._sessao_async = None
+
+    async def _tentar_async(self, url: str, endpoint: str, params: Optional[Dict]) -> RespostaAsync:
+        inicio = time.perf_counter()
+        try:
+            async with self._sessao_async.get(url, params=params) as resposta:
+                conteudo = await resposta.read()
+                return RespostaAsync(resposta.status, resposta.headers, conteudo, str(resposta.url))
+        finally:
+            self.latencias_tentativa[endpoint].registrar(time.perf_counter() - inicio)
+
+    async def get(self, url: str, params: Optional[Dict] = None) -> RespostaAsync:
+        """
+        GET com retentativas (ver ClienteGitHub.get)
+
+        Raises:
+            ErroRequisicao: Se a falha persistir após as tentativas ou o orçamento do
+                endpoint tiver se esgotado
+        """
+        endpoint = endpoint_da_url(url)
+        tentativa = 0
+        inicio = time.perf_counter()
+
+        while True:
+            response, erro = None, None
+            with self._trava:
+                self.requisicoes += 1
+            try:
+                response = await self._tentar_async(url, endpoint, params)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                erro = str(e) or type(e).__name__
+
+            espera, tentativa = self._proxima_espera(url, endpoint, tentativa, response, erro)
+            if espera is None:
+                self.latencias[endpoint].registrar(time.perf_counter() - inicio)
+                return response
+            await asyncio.sleep(espera)
+
+
+async def _reunir(*corrotinas) -> list:
+    """
+    Executa as corrotinas em um TaskGroup e devolve os resultados na ordem recebida
+
+    Se uma delas falhar, as demais são canceladas e o primeiro erro sobe sozinho
+    (fora do ExceptionGroup), como aconteceria no laço síncrono.
+    """
+    try:
+        async with asyncio.TaskGroup() as grupo:
+            tarefas = [grupo.create_task(c) for c in corrotinas]
+    except ExceptionGroup as grupo:
+        raise grupo.exceptions[0] from None
+    return [t.result() for t in tarefas]
+
+
+class _ColetaAsync:
+    """
+    Partes comuns aos coletores assíncronos: sessão HTTP e GET instrumentado
+    """
+
+    async def __aenter__(self):
+        await self.cliente.__aenter__()
+        return self
+
+    async def __aexit__(self, *excecao):
+        await self.cliente.__aexit__(*excecao)
+
+    async def _get(self, url: str, **kwargs) -> RespostaAsync:
+        with instrumentacao.span('http.get', 'http', url=url):
+            response = await self.cliente.get(url, **kwargs)
+
+        registro.registrar_cota(response)
+        instrumentacao.contar('http.requisicoes')
+        instrumentacao.contar('http.bytes', len(response.content))
+        if response.status_code == 304:
+            instrumentacao.contar('http.cache_hits')
+        return response
+
+
+class ColetorRepositoriosAsync(_ColetaAsync, ColetorRepositorios):
+    def __init__(self, token: Optional[str] = None, timeout: Tuple[float, float] = (5.0, 30.0),
+                 armazenamento: Optional[ArmazenamentoColeta] = None, caminho_base: Optional[Path] = None,
+                 limite_conexoes: int = 100, buscas_simultaneas: int = 4):
+        """
+        Args:
+            buscas_simultaneas: Consultas à API de busca em andamento ao mesmo tempo
+                (a busca tem cota própria, bem menor que a dos demais endpoints)
+        """
+        super().__init__(token, timeout=timeout, armazenamento=armazenamento, caminho_base=caminho_base)
+        self.cliente = ClienteGitHubAsync(self.headers, limite_conexoes=limite_conexoes, timeout=timeout)
+        self.buscas_simultaneas = buscas_simultaneas
+
+    @instrumentacao.instrumentado('coleta.obter_repositorios_populares')
+    async def obter_repositorios_populares(self, limite: int = 200) -> List[Dict]:
+        repositorios = []
+        pagina = 1
+        por_pagina = 100
+
+        logger.info("Coletando os %s repositórios mais populares do GitHub...", limite)
+
+        # Páginas sequenciais: a busca para na primeira página vazia
+        while len(repositorios) < limite:
+            restantes = limite - len(repositorios)
+            params = {
+                'q': 'stars:>1000',
+                'sort': 'stars',
+                'order': 'desc',
+                'page': pagina,
+                'per_page': min(por_pagina, restantes)
+            }
+
+            try:
+                logger.debug("Fazendo requisição para página %d...", pagina)
+                response = await self._get(f"{self.url_base}/search/repositories", params=params)
+
+                if response.status_code == 200:
+                    repos = self._json(response).get('items', [])
+
+                    if not repos:
+                        logger.info("Nenhum repositório encontrado. Parando a coleta.")
+                        break
+
+                    repositorios.extend(repos)
+                    logger.debug("Coletados %d repositórios da página %d. Total: %d",
+                                 len(repos), pagina, len(repositorios))
+                    pagina += 1
+
+                else:
+                    logger.error("Erro na requisição: %s", response.status_code)
+                    logger.error("Resposta: %s", response.text)
+                    break
+
+            except Exception as e:
+                logger.error("Erro ao fazer requisição: %s", e)
+                break
+
+        return repositorios[:limite]
+
+    async def _total_prs_fechados(self, repo: Dict, semaforo: asyncio.Semaphore,
+                                  progresso: registro.Progresso) -> Optional[int]:
+        nome_repo = repo.get('full_name', '')
+        try:
+            async with semaforo:
+                response = await self._get(f"{self.url_base}/search/issues",
+                                           params={'q': f'repo:{nome_repo} is:pr is:closed', 'per_page': 1})
+            if response.status_code == 200:
+                return self._json(response).get('total_count', 0)
+            logger.warning("  ✗ Erro ao buscar PRs para %s: %s", nome_repo, response.status_code)
+        except Exception as e:
+            logger.warning("  ✗ Erro ao processar %s: %s", nome_repo, e)
+        finally:
+            progresso.avancar()
+        return None
+
+    @instrumentacao.instrumentado('coleta.filtrar_repositorios_por_prs')
+    async def filtrar_repositorios_por_prs(self, repositorios: List[Dict], min_prs: int = 100) -> List[Dict]:
+        logger.info("Filtrando repositórios com pelo menos %s PRs...", min_prs)
+        progresso = registro.Progresso(len(repositorios), "Repositórios verificados", logger)
+        semaforo = asyncio.Semaphore(self.buscas_simultaneas)
+
+        totais = await _reunir(*(self._total_prs_fechados(repo, semaforo, progresso) for repo in repositorios))
+
+        repositorios_filtrados = []
+        for repo, total_prs in zip(repositorios, totais):
+            if total_prs is None:
+                continue
+            if total_prs >= min_prs:
+                repo['total_closed_prs'] = total_prs
+                repositorios_filtrados.append(repo)
+                logger.debug("  ✓ %s: %d PRs fechados", repo.get('full_name', ''), total_prs)
+            else:
+                logger.debug("  ✗ %s: %d PRs fechados (abaixo do mínimo)", repo.get('full_name', ''), total_prs)
+
+        progresso.concluir()
+        logger.info("\nFiltragem concluída: %s repositórios atendem aos critérios", len(repositorios_filtrados))
+        return repositorios_filtrados
+
+
+class ColetorPRsAsync(_ColetaAsync, ColetorPRs):
+    def __init__(self, token: Optional[str] = None, timeout: Tuple[float, float] = (5.0, 30.0),
+                 armazenamento: Optional[ArmazenamentoColeta] = None, caminho_base: Optional[Path] = None,
+                 limite_conexoes: int = 100, repositorios_simultaneos: int = 8,
+                 plugins: Optional[Sequence[str]] = None, cache_respostas=None):
+        """
+        Args:
+            limite_conexoes: Máximo de conexões abertas com a API
+            repositorios_simultaneos: Repositórios coletados ao mesmo tempo
+            plugins, cache_respostas: Como em ColetorPRs
+        """
+        super().__init__(token, timeout=timeout, armazenamento=armazenamento, caminho_base=caminho_base,
+                         plugins=plugins, cache_respostas=cache_respostas)
+        self.cliente = ClienteGitHubAsync(self.headers, limite_conexoes=limite_conexoes, timeout=timeout)
+        self.repositorios_simultaneos = repositorios_simultaneos
+
+    @instrumentacao.instrumentado('coleta.obter_prs_do_repositorio')
+    async def obter_prs_do_repositorio(self, nome_repo: str, max_prs: int = 1000,
+                                       pagina_inicial: int = 1) -> List[Dict]:
+        prs = []
+        pagina = pagina_inicial
+        por_pagina = 100
+
+        logger.debug("Coletando PRs do repositório: %s", nome_repo)
+
+        while len(prs) < max_prs:
+            atual_por_pagina = min(por_pagina, max_prs - len(prs))
+            params = {
+                'state': 'closed',
+                'sort': 'updated',
+                'direction': 'desc',
+                'page': pagina,
+                'per_page': atual_por_pagina
+            }
+
+            try:
+                response = await self._get(f"{self.url_base}/repos/{nome_repo}/pulls", params=params)
+
+                if response.status_code == 200:
+                    batch_prs = self._json(response)
+
+                    if not batch_prs:
+                        logger.debug("  Nenhum PR encontrado na página %d", pagina)
+                        break
+
+                    prs_filtrados = await self.filtrar_prs(batch_prs, nome_repo)
+                    prs.extend(prs_filtrados)
+
+                    logger.debug("  Página %d: %d PRs encontrados, %d filtrados. Total: %d",
+                                 pagina, len(batch_prs), len(prs_filtrados), len(prs))
+
+                    if len(batch_prs) < atual_por_pagina:
+                        logger.debug("  Última página alcançada")
+                        break
+
+                    pagina += 1
+
+                else:
+                    logger.warning("%s: erro na requisição: %s", nome_repo, response.status_code)
+                    break
+
+            except ErroRequisicao as e:
+                # O restante da listagem é retomado a partir desta página no reprocessamento
+                self.falhas.registrar(nome_repo, e.endpoint, str(e), url=e.url, pagina=pagina,
+                                      max_prs=max_prs - len(prs))
+                break
+            except Exception as e:
+                logger.warning("%s: erro ao coletar PRs: %s", nome_repo, e)
+                break
+
+        logger.debug("  Coleta concluída: %d PRs válidos coletados", len(prs))
+        return prs
+
+    async def processar_pr(self, pr: Dict, nome_repo: str) -> Optional[Dict]:
+        try:
+            respostas = {}
+            if not await self.tem_revisoes(pr, nome_repo, respostas):
+                return None
+            if not self.atende_criterio_tempo(pr):
+                return None
+            return await self.adicionar_metricas_ao_pr(pr, nome_repo, respostas)
+        except ErroRequisicao as e:
+            # Falha transitória persistente: o PR vai para a fila de falhas em vez de sumir do dataset
+            self.falhas.registrar(nome_repo, e.endpoint, str(e), url=e.url, pr=pr.get('number'))
+            return None
+
+    @instrumentacao.instrumentado('coleta.filtrar_prs')
+    async def filtrar_prs(self, prs: List[Dict], nome_repo: str) -> List[Dict]:
+        # Todos os PRs da página em paralelo; a ordem da página é preservada
+        resultados = await _reunir(*(self.processar_pr(pr, nome_repo) for pr in prs))
+        prs_filtrados = [pr for pr in resultados if pr]
+
+        if self.armazenamento:
+            for pr in prs_filtrados:
+                self.armazenamento.salvar_pr(nome_repo, pr)
+        return prs_filtrados
+
+    @instrumentacao.instrumentado('coleta.tem_revisoes')
+    async def tem_revisoes(self, pr: Dict, nome_repo: str, respostas: Optional[Dict] = None) -> bool:
+        try:
+            if pr.get('review_count', 0) > 0:
+                return True
+
+            reviews = await self.buscar_resposta(pr, nome_repo, pr.get('number'), 'reviews')
+            if respostas is not None:
+                respostas['reviews'] = reviews
+            return bool(reviews)
+
+        except ErroRequisicao:
+            raise
+        except Exception as e:
+            logger.warning("%s#%s: erro ao verificar revisões: %s", nome_repo, pr.get('number'), e)
+            return False
+
+    async def adicionar_metricas_ao_pr(self, pr: Dict, nome_repo: str,
+                                       respostas: Optional[Dict] = None) -> Optional[Dict]:
+        try:
+            metricas = await self.coletar_metricas_pr(pr, nome_repo, pr.get('number'), respostas)
+            if metricas:
+                pr.update(metricas)
+                return pr
+            return None
+
+        except ErroRequisicao:
+            raise
+        except Exception as e:
+            logger.warning("%s#%s: erro ao adicionar métricas: %s", nome_repo, pr.get('number'), e)
+            return None
+
+    async def buscar_resposta(self, pr: Dict, nome_repo: str, numero_pr: int, endpoint: str) -> Optional[List]:
+        if self.cache_respostas is not None:
+            dados = self.cache_respostas.obter(pr, endpoint)
+            if dados is not None:
+                return dados
+
+        caminho, _ = metricas_pr.ENDPOINTS[endpoint]
+        url = self.url_base + caminho.format(repositorio=nome_repo, numero=numero_pr)
+        params = {'per_page': metricas_pr.POR_PAGINA}
+        dados = []
+        # As páginas seguintes dependem do Link da anterior e são buscadas em sequência
+        for _ in range(metricas_pr.MAX_PAGINAS):
+            response = await self._get(url, params=params)
+            if response.status_code != 200:
+                return None
+
+            pagina = self._json(response)
+            dados.extend(pagina)
+            url, params = proxima_pagina(response), None
+            if not url or len(pagina) < metricas_pr.POR_PAGINA:
+                break
+        else:
+            logger.warning("%s#%s: %s truncado em %d itens", nome_repo, numero_pr, endpoint, len(dados))
+
+        if self.cache_respostas is not None:
+            self.cache_respostas.salvar(pr, endpoint, dados)
+        return dados
+
+    async def _buscar_ou_nada(self, pr: Dict, nome_repo: str, numero_pr: int, endpoint: str) -> Optional[List]:
+        try:
+            return await self.buscar_resposta(pr, nome_repo, numero_pr, endpoint)
+        except ErroRequisicao:
+            raise
+        except Exception as e:
+            logger.warning("%s#%s: erro ao obter %s: %s", nome_repo, numero_pr, endpoint, e)
+            return None
+
+    async def obter_respostas(self, pr: Dict, nome_repo: str, numero_pr: int,
+                              respostas: Optional[Dict] = None) -> Dict[str, Optional[List]]:
+        # Os endpoints que faltam são buscados ao mesmo tempo
+        respostas = dict(respostas or {})
+        faltantes = [endpoint for endpoint in self.endpoints if endpoint not in respostas]
+        obtidas = await _reunir(*(self._buscar_ou_nada(pr, nome_repo, numero_pr, e) for e in faltantes))
+        respostas.update(zip(faltantes, obtidas))
+        respostas = {endpoint: respostas[endpoint] for endpoint in self.endpoints}
+        self._gravar_respostas(nome_repo, numero_pr, respostas)
+        return respostas
+
+    async def coletar_metricas_pr(self, pr: Dict, nome_repo: str, numero_pr: int,
+                                  respostas: Optional[Dict] = None) -> Optional[Dict]:
+        try:
+            respostas = await self.obter_respostas(pr, nome_repo, numero_pr, respostas)
+            return metricas_pr.calcular(self.plugins, pr, respostas)
+
+        except ErroRequisicao:
+            raise
+        except Exception as e:
+            logger.warning("%s#%s: erro ao coletar métricas: %s", nome_repo, numero_pr, e)
+            return None
+
+    async def _coletar_repositorio(self, nome_repo: str, max_prs: int, semaforo: asyncio.Semaphore,
+                                   progresso: registro.Progresso) -> List[Dict]:
+        async with semaforo:
+            try:
+                prs = await self.obter_prs_do_repositorio(nome_repo, max_prs=max_prs)
+            except Exception as e:
+                logger.warning("Erro ao processar %s: %s", nome_repo, e)
+                progresso.avancar()
+                return []
+        progresso.avancar(prs=len(prs))
+        return prs
+
+    async def coletar_todos_prs(self, arquivo_repositorios: str = "repositorios_selecionados.json",
+                                max_prs: int = 200) -> List[Dict]:
+        caminho_arquivo = self.caminho_base / arquivo_repositorios
+
+        if not caminho_arquivo.exists():
+            logger.error("Arquivo %s não encontrado!", caminho_arquivo)
+            return []
+
+        with open(caminho_arquivo, 'r', encoding='utf-8') as f:
+            repositorios = json.load(f)
+
+        logger.info("=== COLETA DE PRs DE %s REPOSITÓRIOS ===\n", len(repositorios))
+        progresso = registro.Progresso(len(repositorios), "Repositórios", logger)
+        semaforo = asyncio.Semaphore(self.repositorios_simultaneos)
+
+        por_repositorio = await _reunir(*(self._coletar_repositorio(repo.get('full_name', ''), max_prs,
+                                                                    semaforo, progresso)
+                                          for repo in repositorios))
+        todos_prs = [pr for prs in por_repositorio for pr in prs]
+
+        progresso.concluir()
+        logger.info("\n=== COLETA CONCLUÍDA ===")
+        logger.info("Total de PRs coletados: %s", len(todos_prs))
+
+        pendentes = len(self.falhas)
+        if pendentes:
+            logger.warning("%s itens falharam e estão em %s "
+                           "(reprocesse com: python coletor_prs.py --reprocessar-falhas)",
+                           pendentes, self.falhas.caminho.name)
+
+        return todos_prs
+
+
+async def coletar_repositorios(coletor: ColetorRepositoriosAsync, limite: int = 200, min_prs: int = 100) -> bool:
+    """
+    Versão assíncrona de coletor_repositorios.coletar
+
+    Returns:
+        True se algum repositório atendeu aos critérios
+    """
+    logger.info("=== LAB 03 - SPRINT 1: COLETA DE REPOSITÓRIOS (ASYNC) ===\n")
+
+    async with coletor:
+        repositorios = await coletor.obter_repositorios_populares(limite=limite)
+        if not repositorios:
+            logger.error("Erro: Nenhum repositório foi coletado.")
+            return False
+
+        logger.info("\nColetados %s repositórios populares.", len(repositorios))
+        coletor.salvar_repositorios(repositorios, "todos_repositorios_populares.json")
+
+        repositorios_filtrados = await coletor.filtrar_repositorios_por_prs(repositorios, min_prs=min_prs)
+    return salvar_selecionados(coletor, repositorios, repositorios_filtrados)
+
+
+async def coletar_prs(coletor: ColetorPRsAsync, arquivo_repos: str = "repositorios_selecionados.json",
+                      max_prs: int = 200) -> bool:
+    """
+    Versão assíncrona de coletor_prs.coletar
+
+    Returns:
+        True se algum PR foi coletado
+    """
+    logger.info("=== LAB 03 - SPRINT 1: COLETA DE PRs (ASYNC) ===\n")
+
+    if not (coletor.caminho_base / arquivo_repos).exists():
+        logger.error("Arquivo %s não encontrado!", arquivo_repos)
+        logger.error("Execute primeiro a coleta de repositórios para gerar a lista.")
+        return False
+
+    async with coletor:
+        todos_prs = await coletor.coletar_todos_prs(arquivo_repos, max_prs=max_prs)
+    return salvar_coleta(coletor, todos_prs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Coleta assíncrona (asyncio + aiohttp) de repositórios e PRs")
+    parser.add_argument('etapa', choices=('repositorios', 'prs'))
+    parser.add_argument('--banco', help="Banco SQLite normalizado da coleta (padrão: coleta.sqlite no diretório base)")
+    parser.add_argument('--limite-conexoes', type=int, default=100, help="Conexões simultâneas com a API")
+    parser.add_argument('--repositorios-simultaneos', type=int, default=8,
+                        help="Repositórios coletados ao mesmo tempo (etapa prs)")
+    parser.add_argument('--timeout-conexao', type=float, default=5.0)
+    parser.add_argument('--timeout-leitura', type=float, default=30.0)
+    args = parser.parse_args()
+
+    registro.configurar_logging()
+    banco = Path(args.banco) if args.banco else configuracao.caminho_base() / "coleta.sqlite"
+    timeout = (args.timeout_conexao, args.timeout_leitura)
+
+    try:
+        with ArmazenamentoColeta(banco) as armazenamento:
+            if args.etapa == 'repositorios':
+                coletor = ColetorRepositoriosAsync(timeout=timeout, armazenamento=armazenamento,
+                                                   limite_conexoes=args.limite_conexoes)
+                asyncio.run(coletar_repositorios(coletor))
+            else:
+                coletor = ColetorPRsAsync(timeout=timeout, armazenamento=armazenamento,
+                                          limite_conexoes=args.limite_conexoes,
+                                          repositorios_simultaneos=args.repositorios_simultaneos)
+                asyncio.run(coletar_prs(coletor))
+    except ImportError as e:
+        parser.error(str(e))
+
+
+if __name__ == "__main__":
+    main()
+    instrumentacao.finalizar(configuracao.caminho_base() / "trace_coleta_async.json")
@@ -8,14 +8,40 @@ import time
 import json
 import pandas as pd
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Optional, Sequence, Tuple
+import argparse
+import contextlib
+import logging
 import os
+from pathlib import Path
 from dotenv import load_dotenv
 
+import configuracao
+import instrumentacao
+import metricas_pr
+import registro
+from armazenamento import ArmazenamentoColeta
+from cliente_http import ClienteGitHub, ErroRequisicao, FilaFalhas, adicionar_argumentos_http, proxima_pagina
+from indice_prs import ARQUIVO_INDICE, IndicePRs, chave_pr, deduplicar, repositorio_pr
+
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 class ColetorPRs:
-    def __init__(self, token: Optional[str] = None):
+    # Pausas entre requisições sequenciais, para não sobrecarregar a API (segundos)
+    PAUSA_ENTRE_PAGINAS = 1.0
+    PAUSA_ENTRE_REPOSITORIOS = 2.0
+    
+    def __init__(self, token: Optional[str] = None, timeout: Tuple[float, float] = (5.0, 30.0),
+                 hedge: bool = False, armazenamento: Optional[ArmazenamentoColeta] = None,
+                 caminho_base: Optional[Path] = None, plugins: Optional[Sequence[str]] = None,
+                 cache_respostas: Optional[metricas_pr.CacheRespostas] = None):
+        """
+        Args:
+            plugins: Plugins de métricas ativos (metricas_pr.REGISTRO; padrão: metricas_pr.PADRAO)
+            cache_respostas: Cache das respostas brutas de cada endpoint por PR (opcional)
+        """
         self.token = token or os.getenv('GITHUB_TOKEN')
         self.headers = {
             'Accept': 'application/vnd.github.v3+json',
@@ -24,98 +50,150 @@ class ColetorPRs:
         
         if self.token:
             self.headers['Authorization'] = f'token {self.token}'
+        
+        # GITHUB_API_URL permite apontar a coleta para outro servidor (ex.: benchmarks/api_falsa.py)
+        self.url_base = os.getenv('GITHUB_API_URL', 'https://api.github.com').rstrip('/')
+        self.cliente = ClienteGitHub(self.headers, timeout=timeout, hedge=hedge)
+        self.caminho_base = Path(caminho_base) if caminho_base else configuracao.caminho_base()
+        self.falhas = FilaFalhas(self.caminho_base / "falhas_coleta.jsonl")
+        # Banco normalizado (revisões, comentários e arquivos de cada PR); opcional
+        self.armazenamento = armazenamento
+        self.plugins = metricas_pr.selecionar(plugins)
+        # Cada endpoint é buscado uma vez por PR e entregue a todos os plugins que o declaram
+        self.endpoints = metricas_pr.endpoints_necessarios(self.plugins)
+        self.cache_respostas = cache_respostas
     
-    def obter_prs_do_repositorio(self, nome_repo: str, max_prs: int = 1000) -> List[Dict]:
+    def _get(self, url: str, **kwargs) -> requests.Response:
+        with instrumentacao.span('http.get', 'http', url=url):
+            response = self.cliente.get(url, **kwargs)
+        
+        registro.registrar_cota(response)
+        instrumentacao.contar('http.requisicoes')
+        instrumentacao.contar('http.bytes', len(response.content))
+        if response.status_code == 304 or getattr(response, 'from_cache', False):
+            instrumentacao.contar('http.cache_hits')
+        return response
+    
+    def _json(self, response: requests.Response):
+        with instrumentacao.span('json.decode', 'http'):
+            return response.json()
+    
+    @instrumentacao.instrumentado('coleta.obter_prs_do_repositorio')
+    def obter_prs_do_repositorio(self, nome_repo: str, max_prs: int = 1000, pagina_inicial: int = 1) -> List[Dict]:
         prs = []
-        pagina = 1
+        pagina = pagina_inicial
         por_pagina = 100
         
-        print(f"Coletando PRs do repositório: {nome_repo}")
+        logger.debug("Coletando PRs do repositório: %s", nome_repo)
         
+        # per_page fixo: variá-lo entre as páginas desloca os limites delas (a
+        # página 3 com per_page=80 repete os PRs 161 a 200 no lugar de PRs novos);
+        # o excesso da última página é descartado
         while len(prs) < max_prs:
-            restantes = max_prs - len(prs)
-            atual_por_pagina = min(por_pagina, restantes)
-            
-            url = f"https://api.github.com/repos/{nome_repo}/pulls"
+            url = f"{self.url_base}/repos/{nome_repo}/pulls"
             params = {
                 'state': 'closed',
                 'sort': 'updated',
                 'direction': 'desc',
                 'page': pagina,
-                'per_page': atual_por_pagina
+                'per_page': por_pagina
             }
             
             try:
-                response = requests.get(url, headers=self.headers, params=params)
+                response = self._get(url, params=params)
                 
                 if response.status_code == 200:
-                    batch_prs = response.json()
+                    batch_prs = self._json(response)
                     
                     if not batch_prs:
-                        print(f"  Nenhum PR encontrado na página {pagina}")
+                        logger.debug("  Nenhum PR encontrado na página %d", pagina)
                         break
                     
                     prs_filtrados = self.filtrar_prs(batch_prs, nome_repo)
-                    prs.extend(prs_filtrados)
+                    prs.extend(prs_filtrados[:max_prs - len(prs)])
                     
-                    print(f"  Página {pagina}: {len(batch_prs)} PRs encontrados, {len(prs_filtrados)} filtrados. Total: {len(prs)}")
+                    logger.debug("  Página %d: %d PRs encontrados, %d filtrados. Total: %d",
+                                 pagina, len(batch_prs), len(prs_filtrados), len(prs))
                     
-                    if len(batch_prs) < atual_por_pagina:
-                        print(f"  Última página alcançada")
+                    if len(batch_prs) < por_pagina:
+                        logger.debug("  Última página alcançada")
                         break
                     
                     pagina += 1
-                    time.sleep(1)
+                    time.sleep(self.PAUSA_ENTRE_PAGINAS)
                     
-                elif response.status_code == 403:
-                    print(f"  Rate limit atingido. Aguardando 60 segundos...")
-                    time.sleep(60)
                 else:
-                    print(f"  Erro na requisição: {response.status_code}")
+                    logger.warning("%s: erro na requisição: %s", nome_repo, response.status_code)
                     break
                     
+            except ErroRequisicao as e:
+                # O restante da listagem é retomado a partir desta página no reprocessamento
+                self.falhas.registrar(nome_repo, e.endpoint, str(e), url=e.url, pagina=pagina, max_prs=max_prs - len(prs))
+                break
             except Exception as e:
-                print(f"  Erro ao coletar PRs: {e}")
+                logger.warning("%s: erro ao coletar PRs: %s", nome_repo, e)
                 break
         
-        print(f"  Coleta concluída: {len(prs)} PRs válidos coletados")
+        logger.debug("  Coleta concluída: %d PRs válidos coletados", len(prs))
         return prs
     
+    def processar_pr(self, pr: Dict, nome_repo: str) -> Optional[Dict]:
+        """
+        Aplica os filtros a um PR da listagem e, se ele passar, coleta suas métricas
+        
+        Returns:
+            O PR com as métricas, ou None se foi descartado (ou foi para a fila de falhas)
+        """
+        try:
+            # Respostas já obtidas para este PR (a de /reviews no filtro), reaproveitadas pelos plugins
+            respostas = {}
+            if not self.tem_revisoes(pr, nome_repo, respostas):
+                return None
+            
+            if not self.atende_criterio_tempo(pr):
+                return None
+            
+            return self.adicionar_metricas_ao_pr(pr, nome_repo, respostas)
+        except ErroRequisicao as e:
+            # Falha transitória persistente: o PR vai para a fila de falhas em vez de sumir do dataset
+            self.falhas.registrar(nome_repo, e.endpoint, str(e), url=e.url, pr=pr.get('number'))
+            return None
+    
+    @instrumentacao.instrumentado('coleta.filtrar_prs')
     def filtrar_prs(self, prs: List[Dict], nome_repo: str) -> List[Dict]:
         prs_filtrados = []
         
         for pr in prs:
-            if not self.tem_revisoes(pr, nome_repo):
-                continue
-            
-            if not self.atende_criterio_tempo(pr):
-                continue
+            pr_com_metricas = self.processar_pr(pr, nome_repo)
             
-            pr_com_metricas = self.adicionar_metricas_ao_pr(pr, nome_repo)
             if pr_com_metricas:
                 prs_filtrados.append(pr_com_metricas)
+                if self.armazenamento:
+                    self.armazenamento.salvar_pr(nome_repo, pr_com_metricas)
         
         return prs_filtrados
     
-    def tem_revisoes(self, pr: Dict, nome_repo: str) -> bool:
+    @instrumentacao.instrumentado('coleta.tem_revisoes')
+    def tem_revisoes(self, pr: Dict, nome_repo: str, respostas: Optional[Dict] = None) -> bool:
+        """
+        Args:
+            respostas: Se dado, recebe a resposta de /reviews (reaproveitada pelos plugins)
+        """
         try:
             review_count = pr.get('review_count', 0)
             
             if review_count > 0:
                 return True
             
-            numero_pr = pr.get('number')
-            url = f"https://api.github.com/repos/{nome_repo}/pulls/{numero_pr}/reviews"
-            
-            response = requests.get(url, headers=self.headers)
-            if response.status_code == 200:
-                reviews = response.json()
-                return len(reviews) > 0
-            
-            return False
+            reviews = self.buscar_resposta(pr, nome_repo, pr.get('number'), 'reviews')
+            if respostas is not None:
+                respostas['reviews'] = reviews
+            return bool(reviews)
             
+        except ErroRequisicao:
+            raise
         except Exception as e:
-            print(f"    Erro ao verificar revisões: {e}")
+            logger.warning("%s#%s: erro ao verificar revisões: %s", nome_repo, pr.get('number'), e)
             return False
     
     def atende_criterio_tempo(self, pr: Dict) -> bool:
@@ -134,14 +212,14 @@ class ColetorPRs:
             return time_diff > timedelta(hours=1)
             
         except Exception as e:
-            print(f"    Erro ao verificar critério de tempo: {e}")
+            logger.warning("PR %s: erro ao verificar critério de tempo: %s", pr.get('number'), e)
             return False
     
-    def adicionar_metricas_ao_pr(self, pr: Dict, nome_repo: str) -> Optional[Dict]:
+    def adicionar_metricas_ao_pr(self, pr: Dict, nome_repo: str, respostas: Optional[Dict] = None) -> Optional[Dict]:
         try:
             numero_pr = pr.get('number')
             
-            metricas = self.coletar_metricas_pr(pr, nome_repo, numero_pr)
+            metricas = self.coletar_metricas_pr(pr, nome_repo, numero_pr, respostas)
             
             if metricas:
                 pr.update(metricas)
@@ -149,139 +227,102 @@ class ColetorPRs:
             
             return None
             
+        except ErroRequisicao:
+            raise
         except Exception as e:
-            print(f"    Erro ao adicionar métricas: {e}")
-            return None
-    
-    def coletar_metricas_pr(self, pr: Dict, nome_repo: str, numero_pr: int) -> Optional[Dict]:
-        try:
-            metricas = {}
-            
-            metricas_arquivos = self.obter_metricas_arquivos(nome_repo, numero_pr)
-            if metricas_arquivos:
-                metricas.update(metricas_arquivos)
-            
-            metricas_tempo = self.obter_metricas_tempo(pr)
-            if metricas_tempo:
-                metricas.update(metricas_tempo)
-            
-            metricas_descricao = self.obter_metricas_descricao(pr)
-            if metricas_descricao:
-                metricas.update(metricas_descricao)
-            
-            metricas_interacao = self.obter_metricas_interacao(nome_repo, numero_pr)
-            if metricas_interacao:
-                metricas.update(metricas_interacao)
-            
-            return metricas if metricas else None
-            
-        except Exception as e:
-            print(f"      Erro ao coletar métricas: {e}")
-            return None
-    
-    def obter_metricas_arquivos(self, nome_repo: str, numero_pr: int) -> Optional[Dict]:
-        try:
-            url = f"https://api.github.com/repos/{nome_repo}/pulls/{numero_pr}/files"
-            response = requests.get(url, headers=self.headers)
-            
-            if response.status_code == 200:
-                files = response.json()
-                
-                num_files = len(files)
-                total_additions = sum(file.get('additions', 0) for file in files)
-                total_deletions = sum(file.get('deletions', 0) for file in files)
-                
-                return {
-                    'num_files': num_files,
-                    'total_additions': total_additions,
-                    'total_deletions': total_deletions
-                }
-            
-            return None
-            
-        except Exception as e:
-            print(f"        Erro ao coletar métricas de arquivos: {e}")
+            logger.warning("%s#%s: erro ao adicionar métricas: %s", nome_repo, pr.get('number'), e)
             return None
     
-    def obter_metricas_tempo(self, pr: Dict) -> Optional[Dict]:
-        try:
-            created_at = pr.get('created_at')
-            closed_at = pr.get('closed_at') or pr.get('merged_at')
-            
-            if not created_at or not closed_at:
+    def buscar_resposta(self, pr: Dict, nome_repo: str, numero_pr: int, endpoint: str) -> Optional[List]:
+        """
+        Resposta de um endpoint do PR (metricas_pr.ENDPOINTS), do cache de respostas ou da API
+        
+        Returns:
+            O JSON da resposta, ou None se a requisição não retornou 200
+        """
+        if self.cache_respostas is not None:
+            dados = self.cache_respostas.obter(pr, endpoint)
+            if dados is not None:
+                return dados
+        
+        caminho, _ = metricas_pr.ENDPOINTS[endpoint]
+        url = self.url_base + caminho.format(repositorio=nome_repo, numero=numero_pr)
+        params = {'per_page': metricas_pr.POR_PAGINA}
+        dados = []
+        for _ in range(metricas_pr.MAX_PAGINAS):
+            response = self._get(url, params=params)
+            if response.status_code != 200:
                 return None
             
-            created_dt = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
-            closed_dt = datetime.fromisoformat(closed_at.replace('Z', '+00:00'))
-            
-            time_diff = closed_dt - created_dt
-            time_hours = time_diff.total_seconds() / 3600
-            
-            return {
-                'time_analysis_hours': time_hours,
-                'created_at': created_at,
-                'closed_at': closed_at,
-                'merged_at': pr.get('merged_at')
-            }
-            
-        except Exception as e:
-            print(f"        Erro ao calcular métricas de tempo: {e}")
-            return None
+            pagina = self._json(response)
+            dados.extend(pagina)
+            # A URL do Link rel="next" já traz per_page e page
+            url, params = proxima_pagina(response), None
+            if not url or len(pagina) < metricas_pr.POR_PAGINA:
+                break
+        else:
+            logger.warning("%s#%s: %s truncado em %d itens", nome_repo, numero_pr, endpoint, len(dados))
+        
+        if self.cache_respostas is not None:
+            self.cache_respostas.salvar(pr, endpoint, dados)
+        return dados
     
-    def obter_metricas_descricao(self, pr: Dict) -> Optional[Dict]:
-        try:
-            body = pr.get('body', '') or ''
-            body_chars = len(body)
-            
-            return {
-                'description_chars': body_chars,
-                'description': body[:500] + '...' if len(body) > 500 else body
-            }
-            
-        except Exception as e:
-            print(f"        Erro ao calcular métricas da descrição: {e}")
-            return None
+    def _gravar_respostas(self, nome_repo: str, numero_pr: int, respostas: Dict):
+        if not self.armazenamento:
+            return
+        for endpoint, dados in respostas.items():
+            if dados is not None:
+                _, metodo = metricas_pr.ENDPOINTS[endpoint]
+                getattr(self.armazenamento, metodo)(nome_repo, numero_pr, dados)
     
-    def obter_metricas_interacao(self, nome_repo: str, numero_pr: int) -> Optional[Dict]:
+    def obter_respostas(self, pr: Dict, nome_repo: str, numero_pr: int,
+                        respostas: Optional[Dict] = None) -> Dict[str, Optional[List]]:
+        """
+        Busca uma vez cada endpoint de que os plugins ativos precisam
+        
+        Args:
+            respostas: Respostas já obtidas (não são buscadas de novo)
+        """
+        respostas = dict(respostas or {})
+        for endpoint in self.endpoints:
+            if endpoint in respostas:
+                continue
+            try:
+                respostas[endpoint] = self.buscar_resposta(pr, nome_repo, numero_pr, endpoint)
+            except ErroRequisicao:
+                raise
+            except Exception as e:
+                # Resposta inválida: só os plugins que dependem deste endpoint ficam sem métricas
+                logger.warning("%s#%s: erro ao obter %s: %s", nome_repo, numero_pr, endpoint, e)
+                respostas[endpoint] = None
+        respostas = {endpoint: respostas[endpoint] for endpoint in self.endpoints}
+        self._gravar_respostas(nome_repo, numero_pr, respostas)
+        return respostas
+    
+    def coletar_metricas_pr(self, pr: Dict, nome_repo: str, numero_pr: int,
+                            respostas: Optional[Dict] = None) -> Optional[Dict]:
+        """
+        Calcula as métricas de todos os plugins ativos (metricas_pr)
+        
+        Args:
+            respostas: Respostas de endpoints já obtidas para o PR
+        """
         try:
-            comments_url = f"https://api.github.com/repos/{nome_repo}/issues/{numero_pr}/comments"
-            comments_response = requests.get(comments_url, headers=self.headers)
-            
-            reviews_url = f"https://api.github.com/repos/{nome_repo}/pulls/{numero_pr}/reviews"
-            reviews_response = requests.get(reviews_url, headers=self.headers)
-            
-            num_comments = 0
-            participants = set()
-            
-            if comments_response.status_code == 200:
-                comments = comments_response.json()
-                num_comments = len(comments)
-                for comment in comments:
-                    user = comment.get('user', {})
-                    if user:
-                        participants.add(user.get('login', ''))
-            
-            if reviews_response.status_code == 200:
-                reviews = reviews_response.json()
-                for review in reviews:
-                    user = review.get('user', {})
-                    if user:
-                        participants.add(user.get('login', ''))
-            
-            return {
-                'num_comments': num_comments,
-                'num_participants': len(participants)
-            }
+            respostas = self.obter_respostas(pr, nome_repo, numero_pr, respostas)
+            return metricas_pr.calcular(self.plugins, pr, respostas)
             
+        except ErroRequisicao:
+            raise
         except Exception as e:
-            print(f"        Erro ao coletar métricas de interação: {e}")
+            logger.warning("%s#%s: erro ao coletar métricas: %s", nome_repo, numero_pr, e)
             return None
     
-    def coletar_todos_prs(self, arquivo_repositorios: str = "repositorios_selecionados.json") -> List[Dict]:
-        caminho_arquivo = f"/Users/pedroafonso/lab3/{arquivo_repositorios}"
+    def coletar_todos_prs(self, arquivo_repositorios: str = "repositorios_selecionados.json",
+                          max_prs: int = 200) -> List[Dict]:
+        caminho_arquivo = self.caminho_base / arquivo_repositorios
         
         if not os.path.exists(caminho_arquivo):
-            print(f"Arquivo {caminho_arquivo} não encontrado!")
+            logger.error("Arquivo %s não encontrado!", caminho_arquivo)
             return []
         
         with open(caminho_arquivo, 'r', encoding='utf-8') as f:
@@ -289,48 +330,139 @@ class ColetorPRs:
         
         todos_prs = []
         
-        print(f"=== COLETA DE PRs DE {len(repositorios)} REPOSITÓRIOS ===\n")
+        logger.info("=== COLETA DE PRs DE %s REPOSITÓRIOS ===\n", len(repositorios))
+        progresso = registro.Progresso(len(repositorios), "Repositórios", logger)
         
         for i, repo in enumerate(repositorios):
             nome_repo = repo.get('full_name', '')
-            print(f"[{i+1}/{len(repositorios)}] Processando repositório: {nome_repo}")
+            logger.debug("[%d/%d] Processando repositório: %s", i + 1, len(repositorios), nome_repo)
             
             try:
-                prs = self.obter_prs_do_repositorio(nome_repo, max_prs=200)
+                prs = self.obter_prs_do_repositorio(nome_repo, max_prs=max_prs)
                 todos_prs.extend(prs)
+                progresso.avancar(prs=len(prs))
                 
-                print(f"  Total de PRs coletados até agora: {len(todos_prs)}")
-                
-                time.sleep(2)
+                time.sleep(self.PAUSA_ENTRE_REPOSITORIOS)
                 
             except Exception as e:
-                print(f"  Erro ao processar {nome_repo}: {e}")
+                logger.warning("Erro ao processar %s: %s", nome_repo, e)
+                progresso.avancar()
                 continue
         
-        print(f"\n=== COLETA CONCLUÍDA ===")
-        print(f"Total de PRs coletados: {len(todos_prs)}")
+        progresso.concluir()
+        logger.info("\n=== COLETA CONCLUÍDA ===")
+        logger.info("Total de PRs coletados: %s", len(todos_prs))
+        
+        pendentes = len(self.falhas)
+        if pendentes:
+            logger.warning("%s itens falharam e estão em %s "
+                           "(reprocesse com: python coletor_prs.py --reprocessar-falhas)",
+                           pendentes, self.falhas.caminho.name)
         
         return todos_prs
     
+    def reprocessar_falhas(self) -> List[Dict]:
+        itens = self.falhas.retirar()
+        prs = []
+        
+        logger.info("=== REPROCESSAMENTO DE %s FALHAS ===\n", len(itens))
+        progresso = registro.Progresso(len(itens), "Falhas reprocessadas", logger)
+        vistos = set()
+        
+        for item in itens:
+            nome_repo, numero_pr = item['repo'], item.get('pr')
+            
+            if (nome_repo, numero_pr, item.get('pagina')) in vistos:
+                progresso.avancar()
+                continue
+            vistos.add((nome_repo, numero_pr, item.get('pagina')))
+            
+            if numero_pr is None:
+                # Página da listagem: retoma a coleta do repositório a partir dela
+                novos = self.obter_prs_do_repositorio(nome_repo, max_prs=item.get('max_prs', 200),
+                                                      pagina_inicial=item.get('pagina', 1))
+            else:
+                try:
+                    response = self._get(f"{self.url_base}/repos/{nome_repo}/pulls/{numero_pr}")
+                except ErroRequisicao as e:
+                    self.falhas.registrar(nome_repo, e.endpoint, str(e), url=e.url, pr=numero_pr)
+                    novos = []
+                else:
+                    novos = self.filtrar_prs([self._json(response)], nome_repo) if response.status_code == 200 else []
+            
+            prs.extend(novos)
+            progresso.avancar(prs=len(novos))
+        
+        self.falhas.concluir_retirada()
+        progresso.concluir()
+        logger.info("PRs recuperados: %s; falhas restantes: %s", len(prs), len(self.falhas))
+        
+        return prs
+    
+    def mesclar_com_dataset(self, prs: List[Dict], nome_arquivo: str = "dataset_prs.json") -> List[Dict]:
+        caminho_arquivo = self.caminho_base / nome_arquivo
+        
+        existentes = []
+        if os.path.exists(caminho_arquivo):
+            with open(caminho_arquivo, 'r', encoding='utf-8') as f:
+                existentes = json.load(f)
+        
+        # PRs já presentes (mesmo base.repo.id e number) são substituídos pela versão recuperada
+        return deduplicar(existentes + prs)
+    
+    def atualizar_indice(self, prs: List[Dict]):
+        """
+        Registra os PRs no índice de identidade do diretório base (indice_prs.py)
+        
+        Se existir o estado das estatísticas incrementais (estatisticas_incrementais.py),
+        aplica a ele só os PRs novos e, dos que mudaram, troca a versão anterior pela nova.
+        """
+        inseridos, retirados = [], []
+        with IndicePRs(self.caminho_base / ARQUIVO_INDICE) as indice:
+            for pr in prs:
+                anterior = indice.obter(chave_pr(pr))
+                indice.upsert(pr)
+                # Compara com o PR como ele fica gravado no índice (JSON)
+                if anterior is None or anterior != json.loads(json.dumps(pr, ensure_ascii=False, default=str)):
+                    inseridos.append(pr)
+                    if anterior is not None:
+                        retirados.append(anterior)
+            total = len(indice)
+        
+        novos = len(inseridos) - len(retirados)
+        logger.info("Índice de PRs: %s novos, %s atualizados, %s no total", novos, len(prs) - novos, total)
+        
+        if not inseridos:
+            return
+        
+        # Importado só aqui: traz a pilha da análise (scipy) para o processo da coleta
+        import estatisticas_incrementais
+        
+        if (self.caminho_base / estatisticas_incrementais.ARQUIVO_ESTADO).exists():
+            estatisticas_incrementais.atualizar_estado(self.caminho_base, self.criar_dataframe_prs(inseridos),
+                                                       self.criar_dataframe_prs(retirados))
+    
     def salvar_dataset_prs(self, prs: List[Dict], nome_arquivo: str = "dataset_prs.json"):
-        caminho_arquivo = f"/Users/pedroafonso/lab3/{nome_arquivo}"
+        caminho_arquivo = self.caminho_base / nome_arquivo
         
         with open(caminho_arquivo, 'w', encoding='utf-8') as f:
             json.dump(prs, f, indent=2, ensure_ascii=False, default=str)
         
-        print(f"Dataset salvo em: {caminho_arquivo}")
+        logger.info("Dataset salvo em: %s", caminho_arquivo)
     
     def criar_dataframe_prs(self, prs: List[Dict]) -> pd.DataFrame:
         if not prs:
             return pd.DataFrame()
         
         dados = []
+        colunas_extras = [coluna for plugin in self.plugins for coluna in plugin.colunas_csv]
         
         for pr in prs:
             linha = {
                 'pr_id': pr.get('id'),
                 'pr_number': pr.get('number'),
-                'repository': pr.get('head', {}).get('repo', {}).get('full_name', ''),
+                # Repositório de destino; head.repo é o fork de origem (None se foi apagado)
+                'repository': repositorio_pr(pr),
                 'title': pr.get('title', ''),
                 'state': pr.get('state', ''),
                 'merged': pr.get('merged', False),
@@ -346,6 +478,9 @@ class ColetorPRs:
                 'num_comments': pr.get('num_comments', 0),
                 'num_participants': pr.get('num_participants', 0)
             }
+            # Colunas dos plugins de métricas além dos padrão
+            for coluna in colunas_extras:
+                linha[coluna] = pr.get(coluna)
             dados.append(linha)
         
         df = pd.DataFrame(dados)
@@ -355,39 +490,101 @@ class ColetorPRs:
         df = self.criar_dataframe_prs(prs)
         
         if not df.empty:
-            caminho_arquivo = f"/Users/pedroafonso/lab3/{nome_arquivo}"
+            caminho_arquivo = self.caminho_base / nome_arquivo
             df.to_csv(caminho_arquivo, index=False, encoding='utf-8')
-            print(f"Dataset CSV salvo em: {caminho_arquivo}")
+            logger.info("Dataset CSV salvo em: %s", caminho_arquivo)
             
-            print(f"\n=== ESTATÍSTICAS DO DATASET ===")
-            print(f"Total de PRs: {len(df)}")
-            print(f"PRs Merged: {len(df[df['merged'] == True])}")
-            print(f"PRs Closed (não merged): {len(df[df['merged'] == False])}")
-            print(f"Repositórios únicos: {df['repository'].nunique()}")
+            logger.info("\n=== ESTATÍSTICAS DO DATASET ===")
+            logger.info("Total de PRs: %s", len(df))
+            logger.info("PRs Merged: %s", len(df[df['merged'] == True]))
+            logger.info("PRs Closed (não merged): %s", len(df[df['merged'] == False]))
+            logger.info("Repositórios únicos: %s", df['repository'].nunique())
 
-def main():
-    coletor = ColetorPRs()
+def coletar(coletor: ColetorPRs, arquivo_repos: str = "repositorios_selecionados.json",
+            max_prs: int = 200) -> bool:
+    """
+    Coleta os PRs dos repositórios selecionados e salva o dataset (JSON e CSV)
     
-    print("=== LAB 03 - SPRINT 1: COLETA DE PRs ===\n")
+    Returns:
+        True se algum PR foi coletado
+    """
+    logger.info("=== LAB 03 - SPRINT 1: COLETA DE PRs ===\n")
     
-    arquivo_repos = "repositorios_selecionados.json"
-    if not os.path.exists(f"/Users/pedroafonso/lab3/{arquivo_repos}"):
-        print(f"Arquivo {arquivo_repos} não encontrado!")
-        print("Execute primeiro o script coletor_repositorios.py para gerar a lista de repositórios.")
-        return
+    if not (coletor.caminho_base / arquivo_repos).exists():
+        logger.error("Arquivo %s não encontrado!", arquivo_repos)
+        logger.error("Execute primeiro o script coletor_repositorios.py para gerar a lista de repositórios.")
+        return False
     
-    todos_prs = coletor.coletar_todos_prs(arquivo_repos)
+    todos_prs = coletor.coletar_todos_prs(arquivo_repos, max_prs=max_prs)
+    return salvar_coleta(coletor, todos_prs)
+
+def salvar_coleta(coletor: ColetorPRs, todos_prs: List[Dict]) -> bool:
+    """
+    Salva o dataset coletado (JSON e CSV) e registra o resumo e as latências
     
+    Returns:
+        True se algum PR foi coletado
+    """
     if not todos_prs:
-        print("Nenhum PR foi coletado. Verifique a configuração e tente novamente.")
-        return
+        logger.error("Nenhum PR foi coletado. Verifique a configuração e tente novamente.")
+        return False
+    
+    unicos = deduplicar(todos_prs)
+    if len(unicos) < len(todos_prs):
+        logger.info("%s PRs repetidos removidos", len(todos_prs) - len(unicos))
+    todos_prs = unicos
     
     coletor.salvar_dataset_prs(todos_prs, "dataset_prs.json")
     coletor.salvar_prs_csv(todos_prs, "dataset_prs.csv")
+    coletor.atualizar_indice(todos_prs)
+    
+    logger.info("\n=== SPRINT 1 CONCLUÍDA ===")
+    logger.info("Dataset com %s PRs coletados e salvo com sucesso!", len(todos_prs))
+    if coletor.armazenamento:
+        logger.info("Revisões, comentários e arquivos salvos em: %s", coletor.armazenamento.caminho_banco)
+    logger.info("\nLatência por endpoint:")
+    coletor.cliente.registrar_latencias()
+    return True
+
+def main():
+    parser = argparse.ArgumentParser(description="Coleta de PRs dos repositórios selecionados")
+    parser.add_argument('--reprocessar-falhas', action='store_true',
+                        help="Reprocessa apenas os itens da fila de falhas e os acrescenta ao dataset")
+    parser.add_argument('--banco', help="Banco SQLite normalizado que recebe PRs, revisões, comentários e arquivos "
+                                        "(padrão: coleta.sqlite no diretório base)")
+    parser.add_argument('--plugins', nargs='+', default=list(metricas_pr.PADRAO),
+                        help="Plugins de métricas ativos (python metricas_pr.py listar)")
+    parser.add_argument('--cache-respostas', action='store_true',
+                        help="Guarda as respostas de cada PR em respostas_prs para recalcular métricas sem a API")
+    adicionar_argumentos_http(parser)
+    args = parser.parse_args()
     
-    print(f"\n=== SPRINT 1 CONCLUÍDA ===")
-    print(f"Dataset com {len(todos_prs)} PRs coletados e salvo com sucesso!")
+    registro.configurar_logging()
+    banco = Path(args.banco) if args.banco else configuracao.caminho_base() / "coleta.sqlite"
+    
+    with contextlib.ExitStack() as pilha:
+        armazenamento = pilha.enter_context(ArmazenamentoColeta(banco))
+        cache = None
+        if args.cache_respostas:
+            cache = pilha.enter_context(
+                metricas_pr.CacheRespostas(configuracao.caminho_base() / metricas_pr.ARQUIVO_CACHE))
+        try:
+            coletor = ColetorPRs(timeout=(args.timeout_conexao, args.timeout_leitura), hedge=args.hedge,
+                                 armazenamento=armazenamento, plugins=args.plugins, cache_respostas=cache)
+        except ValueError as e:
+            parser.error(str(e))
+        
+        if args.reprocessar_falhas:
+            recuperados = coletor.reprocessar_falhas()
+            if recuperados:
+                todos_prs = coletor.mesclar_com_dataset(recuperados)
+                coletor.salvar_dataset_prs(todos_prs, "dataset_prs.json")
+                coletor.salvar_prs_csv(todos_prs, "dataset_prs.csv")
+                coletor.atualizar_indice(recuperados)
+            return
+        
+        coletar(coletor)
 
 if __name__ == "__main__":
     main()
-
+    instrumentacao.finalizar(configuracao.caminho_base() / "trace_coleta_prs.json")
@@ -7,14 +7,36 @@ import requests
 import time
 import json
 import pandas as pd
-from typing import List, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Tuple
+import argparse
+import logging
 import os
+from pathlib import Path
 from dotenv import load_dotenv
 
+import configuracao
+import instrumentacao
+import registro
+from armazenamento import ArmazenamentoColeta
+from cliente_http import ClienteGitHub, adicionar_argumentos_http
+
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 class ColetorRepositorios:
-    def __init__(self, token: Optional[str] = None):
+    # Pausa entre requisições sequenciais, para não sobrecarregar a API (segundos)
+    PAUSA_ENTRE_REQUISICOES = 1.0
+    # ETags de /repos/{full_name} da última atualização (full_name -> ETag), no diretório base
+    ARQUIVO_ETAGS = "etags_repositorios.json"
+    # Campos de repositorios_selecionados.json que vêm de /repos/{full_name}
+    CAMPOS_METADADOS = ('id', 'name', 'full_name', 'description', 'html_url', 'stars', 'forks', 'language',
+                        'created_at', 'updated_at')
+    
+    def __init__(self, token: Optional[str] = None, timeout: Tuple[float, float] = (5.0, 30.0),
+                 hedge: bool = False, armazenamento: Optional[ArmazenamentoColeta] = None,
+                 caminho_base: Optional[Path] = None):
         self.token = token or os.getenv('GITHUB_TOKEN')
         self.headers = {
             'Accept': 'application/vnd.github.v3+json',
@@ -23,19 +45,41 @@ class ColetorRepositorios:
         
         if self.token:
             self.headers['Authorization'] = f'token {self.token}'
+        
+        # GITHUB_API_URL permite apontar a coleta para outro servidor (ex.: benchmarks/api_falsa.py)
+        self.url_base = os.getenv('GITHUB_API_URL', 'https://api.github.com').rstrip('/')
+        self.cliente = ClienteGitHub(self.headers, timeout=timeout, hedge=hedge)
+        self.armazenamento = armazenamento
+        self.caminho_base = Path(caminho_base) if caminho_base else configuracao.caminho_base()
     
+    def _get(self, url: str, **kwargs) -> requests.Response:
+        with instrumentacao.span('http.get', 'http', url=url):
+            response = self.cliente.get(url, **kwargs)
+        
+        registro.registrar_cota(response)
+        instrumentacao.contar('http.requisicoes')
+        instrumentacao.contar('http.bytes', len(response.content))
+        if response.status_code == 304 or getattr(response, 'from_cache', False):
+            instrumentacao.contar('http.cache_hits')
+        return response
+    
+    def _json(self, response: requests.Response):
+        with instrumentacao.span('json.decode', 'http'):
+            return response.json()
+    
+    @instrumentacao.instrumentado('coleta.obter_repositorios_populares')
     def obter_repositorios_populares(self, limite: int = 200) -> List[Dict]:
         repositorios = []
         pagina = 1
         por_pagina = 100
         
-        print(f"Coletando os {limite} repositórios mais populares do GitHub...")
+        logger.info("Coletando os %s repositórios mais populares do GitHub...", limite)
         
         while len(repositorios) < limite:
             restantes = limite - len(repositorios)
             atual_por_pagina = min(por_pagina, restantes)
             
-            url = f"https://api.github.com/search/repositories"
+            url = f"{self.url_base}/search/repositories"
             params = {
                 'q': 'stars:>1000',
                 'sort': 'stars',
@@ -45,101 +89,250 @@ class ColetorRepositorios:
             }
             
             try:
-                print(f"Fazendo requisição para página {pagina}...")
-                response = requests.get(url, headers=self.headers, params=params)
+                logger.debug("Fazendo requisição para página %d...", pagina)
+                response = self._get(url, params=params)
                 
                 if response.status_code == 200:
-                    data = response.json()
+                    data = self._json(response)
                     repos = data.get('items', [])
                     
                     if not repos:
-                        print("Nenhum repositório encontrado. Parando a coleta.")
+                        logger.info("Nenhum repositório encontrado. Parando a coleta.")
                         break
                     
                     repositorios.extend(repos)
-                    print(f"Coletados {len(repos)} repositórios da página {pagina}. Total: {len(repositorios)}")
+                    logger.debug("Coletados %d repositórios da página %d. Total: %d",
+                                 len(repos), pagina, len(repositorios))
                     
-                    time.sleep(1)
+                    time.sleep(self.PAUSA_ENTRE_REQUISICOES)
                     pagina += 1
                     
-                elif response.status_code == 403:
-                    print("Rate limit atingido. Aguardando 60 segundos...")
-                    time.sleep(60)
                 else:
-                    print(f"Erro na requisição: {response.status_code}")
-                    print(f"Resposta: {response.text}")
+                    logger.error("Erro na requisição: %s", response.status_code)
+                    logger.error("Resposta: %s", response.text)
                     break
                     
             except Exception as e:
-                print(f"Erro ao fazer requisição: {e}")
+                logger.error("Erro ao fazer requisição: %s", e)
                 break
         
         return repositorios[:limite]
     
+    @instrumentacao.instrumentado('coleta.filtrar_repositorios_por_prs')
     def filtrar_repositorios_por_prs(self, repositorios: List[Dict], min_prs: int = 100) -> List[Dict]:
         repositorios_filtrados = []
         
-        print(f"Filtrando repositórios com pelo menos {min_prs} PRs...")
+        logger.info("Filtrando repositórios com pelo menos %s PRs...", min_prs)
+        progresso = registro.Progresso(len(repositorios), "Repositórios verificados", logger)
         
         for i, repo in enumerate(repositorios):
             nome_repo = repo.get('full_name', '')
-            print(f"[{i+1}/{len(repositorios)}] Verificando {nome_repo}...")
+            logger.debug("[%d/%d] Verificando %s...", i + 1, len(repositorios), nome_repo)
+            progresso.avancar()
             
             try:
-                search_url = f"https://api.github.com/search/issues"
-                search_params = {
-                    'q': f'repo:{nome_repo} is:pr is:closed',
-                    'per_page': 1
-                }
-                
-                search_response = requests.get(search_url, headers=self.headers, params=search_params)
+                total_prs = self.contar_prs_fechados(nome_repo)
                 
-                if search_response.status_code == 200:
-                    search_data = search_response.json()
-                    total_prs = search_data.get('total_count', 0)
-                    
+                if total_prs is not None:
                     if total_prs >= min_prs:
                         repo['total_closed_prs'] = total_prs
                         repositorios_filtrados.append(repo)
-                        print(f"  ✓ {nome_repo}: {total_prs} PRs fechados")
+                        logger.debug("  ✓ %s: %d PRs fechados", nome_repo, total_prs)
                     else:
-                        print(f"  ✗ {nome_repo}: {total_prs} PRs fechados (abaixo do mínimo)")
-                else:
-                    print(f"  ✗ Erro ao buscar PRs para {nome_repo}: {search_response.status_code}")
+                        logger.debug("  ✗ %s: %d PRs fechados (abaixo do mínimo)", nome_repo, total_prs)
                 
-                time.sleep(1)
+                time.sleep(self.PAUSA_ENTRE_REQUISICOES)
                 
             except Exception as e:
-                print(f"  ✗ Erro ao processar {nome_repo}: {e}")
+                logger.warning("  ✗ Erro ao processar %s: %s", nome_repo, e)
                 continue
         
-        print(f"\nFiltragem concluída: {len(repositorios_filtrados)} repositórios atendem aos critérios")
+        progresso.concluir()
+        logger.info("\nFiltragem concluída: %s repositórios atendem aos critérios", len(repositorios_filtrados))
         return repositorios_filtrados
     
+    def contar_prs_fechados(self, nome_repo: str) -> Optional[int]:
+        """
+        Total de PRs fechados do repositório, pela API de busca
+        
+        Returns:
+            O total, ou None se a busca falhou
+        """
+        search_url = f"{self.url_base}/search/issues"
+        search_params = {
+            'q': f'repo:{nome_repo} is:pr is:closed',
+            'per_page': 1
+        }
+        
+        search_response = self._get(search_url, params=search_params)
+        
+        if search_response.status_code == 200:
+            return self._json(search_response).get('total_count', 0)
+        
+        logger.warning("  ✗ Erro ao buscar PRs para %s: %s", nome_repo, search_response.status_code)
+        return None
+    
+    def consultar_repositorio(self, nome_repo: str,
+                              etag: Optional[str] = None) -> Tuple[int, Optional[Dict], Optional[str]]:
+        """
+        GET condicional de /repos/{full_name}
+        
+        Args:
+            nome_repo: Nome completo (owner/nome)
+            etag: ETag da consulta anterior; se o repositório não mudou, a API responde
+                304 sem corpo, e respostas 304 não consomem a cota
+        
+        Returns:
+            Tupla (status, repositório da API ou None, ETag atual)
+        """
+        headers = {'If-None-Match': etag} if etag else None
+        response = self._get(f"{self.url_base}/repos/{nome_repo}", headers=headers)
+        
+        if response.status_code == 200:
+            return 200, self._json(response), response.headers.get('ETag')
+        return response.status_code, None, response.headers.get('ETag', etag)
+    
+    @instrumentacao.instrumentado('coleta.atualizar_repositorios')
+    def atualizar_repositorios(self, nome_arquivo: str = "repositorios_selecionados.json",
+                               simultaneas: int = 8) -> Optional[Dict[str, int]]:
+        """
+        Atualiza os metadados de uma lista de repositórios já salva, sem refazer a coleta
+        
+        Cada repositório é consultado com o ETag da atualização anterior (ARQUIVO_ETAGS):
+        os que não mudaram respondem 304. Só as linhas cujos metadados mudaram são
+        regravadas, no JSON e no banco, e total_closed_prs só é recontado (API de busca)
+        quando o updated_at do repositório avançou.
+        
+        Args:
+            nome_arquivo: Lista de repositórios no diretório base
+            simultaneas: GETs condicionais em paralelo
+        
+        Returns:
+            Contagens (inalterados, sem_mudanca, atualizados, prs_recontados, falhas),
+            ou None se a lista não existe
+        """
+        caminho_arquivo = self.caminho_base / nome_arquivo
+        
+        if not caminho_arquivo.exists():
+            logger.error("Arquivo %s não encontrado!", caminho_arquivo)
+            return None
+        
+        with open(caminho_arquivo, 'r', encoding='utf-8') as f:
+            repositorios = json.load(f)
+        
+        caminho_etags = self.caminho_base / self.ARQUIVO_ETAGS
+        etags = {}
+        if caminho_etags.exists():
+            with open(caminho_etags, 'r', encoding='utf-8') as f:
+                etags = json.load(f)
+        
+        logger.info("Atualizando %s repositórios de %s (%s ETags salvos)...",
+                    len(repositorios), nome_arquivo, len(etags))
+        progresso = registro.Progresso(len(repositorios), "Repositórios consultados", logger)
+        contagens = dict.fromkeys(('inalterados', 'sem_mudanca', 'atualizados', 'prs_recontados', 'falhas'), 0)
+        
+        def consultar(repo: Dict) -> Tuple[Optional[int], Optional[Dict], Optional[str]]:
+            nome_repo = repo.get('full_name', '')
+            try:
+                return self.consultar_repositorio(nome_repo, etags.get(nome_repo))
+            except Exception as e:
+                logger.warning("  ✗ Erro ao consultar %s: %s", nome_repo, e)
+                return None, None, None
+        
+        # GETs condicionais em paralelo; as respostas são tratadas aqui, na ordem da lista
+        alterados = []
+        with ThreadPoolExecutor(max_workers=simultaneas) as executor:
+            for i, (status, dados, etag) in enumerate(executor.map(consultar, repositorios)):
+                progresso.avancar()
+                antigo = repositorios[i]
+                
+                if status == 304:
+                    contagens['inalterados'] += 1
+                    continue
+                
+                if status != 200:
+                    if status is not None:
+                        logger.warning("  ✗ Erro ao consultar %s: %s", antigo.get('full_name'), status)
+                    contagens['falhas'] += 1
+                    continue
+                
+                novo = self.limpar_repositorio({**dados, 'total_closed_prs': antigo.get('total_closed_prs', 0)})
+                # Repositório renomeado: o ETag passa a ser guardado com o novo nome
+                etags.pop(antigo.get('full_name'), None)
+                if etag:
+                    etags[novo['full_name']] = etag
+                
+                if all(novo[campo] == antigo.get(campo) for campo in self.CAMPOS_METADADOS):
+                    contagens['sem_mudanca'] += 1
+                else:
+                    alterados.append((i, novo))
+        progresso.concluir()
+        
+        # Recontagens em sequência, com pausa: a API de busca tem limite por minuto
+        for i, novo in alterados:
+            if novo['updated_at'] != repositorios[i].get('updated_at'):
+                try:
+                    total_prs = self.contar_prs_fechados(novo['full_name'])
+                except Exception as e:
+                    logger.warning("  ✗ Erro ao processar %s: %s", novo['full_name'], e)
+                    total_prs = None
+                
+                if total_prs is not None:
+                    novo['total_closed_prs'] = total_prs
+                    contagens['prs_recontados'] += 1
+                time.sleep(self.PAUSA_ENTRE_REQUISICOES)
+            
+            logger.debug("  ↻ %s: metadados atualizados", novo['full_name'])
+            repositorios[i] = novo
+        contagens['atualizados'] = len(alterados)
+        
+        if alterados:
+            with open(caminho_arquivo, 'w', encoding='utf-8') as f:
+                json.dump(repositorios, f, indent=2, ensure_ascii=False)
+            
+            if self.armazenamento:
+                self.armazenamento.salvar_repositorios([novo for _, novo in alterados])
+        
+        with open(caminho_etags, 'w', encoding='utf-8') as f:
+            json.dump(etags, f, indent=2, ensure_ascii=False)
+        
+        logger.info("\nAtualização concluída: %s inalterados (304), %s sem mudança nos metadados, "
+                    "%s atualizados (%s com PRs recontados), %s falhas",
+                    contagens['inalterados'], contagens['sem_mudanca'], contagens['atualizados'],
+                    contagens['prs_recontados'], contagens['falhas'])
+        return contagens
+    
+    @staticmethod
+    def limpar_repositorio(repo: Dict) -> Dict:
+        """
+        Converte um repositório da API para o formato de repositorios_selecionados.json
+        """
+        return {
+            'id': repo.get('id'),
+            'name': repo.get('name'),
+            'full_name': repo.get('full_name'),
+            'description': repo.get('description'),
+            'html_url': repo.get('html_url'),
+            'stars': repo.get('stargazers_count'),
+            'forks': repo.get('forks_count'),
+            'language': repo.get('language'),
+            'created_at': repo.get('created_at'),
+            'updated_at': repo.get('updated_at'),
+            'total_closed_prs': repo.get('total_closed_prs', 0)
+        }
+    
     def salvar_repositorios(self, repositorios: List[Dict], nome_arquivo: str = "repositorios_selecionados.json"):
-        caminho_arquivo = f"/Users/pedroafonso/lab3/{nome_arquivo}"
+        caminho_arquivo = self.caminho_base / nome_arquivo
         
-        repos_limpos = []
-        for repo in repositorios:
-            repo_limpo = {
-                'id': repo.get('id'),
-                'name': repo.get('name'),
-                'full_name': repo.get('full_name'),
-                'description': repo.get('description'),
-                'html_url': repo.get('html_url'),
-                'stars': repo.get('stargazers_count'),
-                'forks': repo.get('forks_count'),
-                'language': repo.get('language'),
-                'created_at': repo.get('created_at'),
-                'updated_at': repo.get('updated_at'),
-                'total_closed_prs': repo.get('total_closed_prs', 0)
-            }
-            repos_limpos.append(repo_limpo)
+        repos_limpos = [self.limpar_repositorio(repo) for repo in repositorios]
         
         with open(caminho_arquivo, 'w', encoding='utf-8') as f:
             json.dump(repos_limpos, f, indent=2, ensure_ascii=False)
         
-        print(f"Lista de repositórios salva em: {caminho_arquivo}")
+        if self.armazenamento:
+            self.armazenamento.salvar_repositorios(repos_limpos)
+        
+        logger.info("Lista de repositórios salva em: %s", caminho_arquivo)
     
     def criar_relatorio_resumo(self, repositorios: List[Dict]) -> pd.DataFrame:
         dados = []
@@ -159,45 +352,87 @@ class ColetorRepositorios:
         df = pd.DataFrame(dados)
         return df
 
-def main():
-    coletor = ColetorRepositorios()
+def coletar(coletor: ColetorRepositorios, limite: int = 200, min_prs: int = 100) -> bool:
+    """
+    Coleta os repositórios populares, filtra pelo número de PRs e salva as listas e o resumo
     
-    print("=== LAB 03 - SPRINT 1: COLETA DE REPOSITÓRIOS ===\n")
+    Returns:
+        True se algum repositório atendeu aos critérios
+    """
+    logger.info("=== LAB 03 - SPRINT 1: COLETA DE REPOSITÓRIOS ===\n")
     
-    repositorios = coletor.obter_repositorios_populares(limite=200)
+    repositorios = coletor.obter_repositorios_populares(limite=limite)
     
     if not repositorios:
-        print("Erro: Nenhum repositório foi coletado.")
-        return
+        logger.error("Erro: Nenhum repositório foi coletado.")
+        return False
     
-    print(f"\nColetados {len(repositorios)} repositórios populares.")
+    logger.info("\nColetados %s repositórios populares.", len(repositorios))
     
     coletor.salvar_repositorios(repositorios, "todos_repositorios_populares.json")
     
-    repositorios_filtrados = coletor.filtrar_repositorios_por_prs(repositorios, min_prs=100)
+    repositorios_filtrados = coletor.filtrar_repositorios_por_prs(repositorios, min_prs=min_prs)
+    return salvar_selecionados(coletor, repositorios, repositorios_filtrados)
+
+def salvar_selecionados(coletor: ColetorRepositorios, repositorios: List[Dict],
+                        repositorios_filtrados: List[Dict]) -> bool:
+    """
+    Salva os repositórios selecionados e o resumo e registra as estatísticas da coleta
     
+    Returns:
+        True se algum repositório atendeu aos critérios
+    """
     if not repositorios_filtrados:
-        print("Erro: Nenhum repositório atende aos critérios de filtragem.")
-        return
+        logger.error("Erro: Nenhum repositório atende aos critérios de filtragem.")
+        return False
     
     coletor.salvar_repositorios(repositorios_filtrados, "repositorios_selecionados.json")
     
     resumo_df = coletor.criar_relatorio_resumo(repositorios_filtrados)
     
-    resumo_df.to_csv("/Users/pedroafonso/lab3/resumo_repositorios.csv", index=False, encoding='utf-8')
+    resumo_df.to_csv(coletor.caminho_base / "resumo_repositorios.csv", index=False, encoding='utf-8')
     
-    print(f"\n=== RESUMO DA COLETA ===")
-    print(f"Total de repositórios coletados: {len(repositorios)}")
-    print(f"Repositórios que atendem aos critérios: {len(repositorios_filtrados)}")
-    print(f"Taxa de filtragem: {len(repositorios_filtrados)/len(repositorios)*100:.1f}%")
+    logger.info("\n=== RESUMO DA COLETA ===")
+    logger.info("Total de repositórios coletados: %s", len(repositorios))
+    logger.info("Repositórios que atendem aos critérios: %s", len(repositorios_filtrados))
+    logger.info("Taxa de filtragem: %.1f%%", len(repositorios_filtrados)/len(repositorios)*100)
     
-    print(f"\nTop 10 repositórios selecionados:")
-    print(resumo_df[['Nome', 'Linguagem', 'Estrelas', 'PRs Fechados']].head(10).to_string(index=False))
+    logger.info("\nTop 10 repositórios selecionados:")
+    logger.info(resumo_df[['Nome', 'Linguagem', 'Estrelas', 'PRs Fechados']].head(10).to_string(index=False))
     
-    print(f"\nLinguagens mais comuns:")
+    logger.info("\nLinguagens mais comuns:")
     lang_counts = resumo_df['Linguagem'].value_counts().head(5)
-    print(lang_counts.to_string())
+    logger.info(lang_counts.to_string())
+    
+    logger.info("\nLatência por endpoint:")
+    coletor.cliente.registrar_latencias()
+    return True
+
+def main():
+    parser = argparse.ArgumentParser(description="Coleta e filtragem dos repositórios populares")
+    parser.add_argument('--banco', help="Banco SQLite normalizado que recebe os repositórios "
+                                        "(padrão: coleta.sqlite no diretório base)")
+    parser.add_argument('--atualizar', action='store_true',
+                        help="Atualiza os metadados de repositorios_selecionados.json com GETs condicionais "
+                             "(ETag), em vez de refazer a coleta")
+    parser.add_argument('--simultaneas', type=int, default=8, help="GETs condicionais em paralelo (--atualizar)")
+    adicionar_argumentos_http(parser)
+    args = parser.parse_args()
+    
+    registro.configurar_logging()
+    banco = Path(args.banco) if args.banco else configuracao.caminho_base() / "coleta.sqlite"
+    
+    with ArmazenamentoColeta(banco) as armazenamento:
+        coletor = ColetorRepositorios(timeout=(args.timeout_conexao, args.timeout_leitura), hedge=args.hedge,
+                                      armazenamento=armazenamento)
+        
+        if args.atualizar:
+            coletor.atualizar_repositorios(simultaneas=args.simultaneas)
+            coletor.cliente.registrar_latencias()
+            return
+        
+        coletar(coletor)
 
 if __name__ == "__main__":
     main()
-
+    instrumentacao.finalizar(configuracao.caminho_base() / "trace_coleta_repositorios.json")
@@ -0,0 +1,130 @@
+"""
+Configuração do projeto
+Lab 03 - Caracterizando a atividade de code review no GitHub
+
+Todos os arquivos gerados (dados, bancos, gráficos e relatórios) ficam em um
+diretório base: a variável de ambiente LAB3_CAMINHO_BASE, se definida, ou o
+diretório destes scripts.
+
+pipeline.json reúne os parâmetros de cada etapa (limites da coleta, opções
+da análise, formatos do relatório) e as categorias usadas nas RQs. Chaves
+ausentes no arquivo ficam com os valores de PADRAO; nos limites das
+categorias, null representa infinito.
+"""
+
+import copy
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+DIRETORIO_SCRIPTS = Path(__file__).resolve().parent
+
+PADRAO = {
+    'caminho_base': None,
+    'coleta_repositorios': {
+        'limite': 200,
+        'min_prs': 100,
+        'timeout_conexao': 5.0,
+        'timeout_leitura': 30.0,
+        'hedge': False,
+        # Com a lista já coletada, atualiza os metadados com GETs condicionais em vez de refazer a coleta
+        'atualizar': False,
+    },
+    'coleta_prs': {
+        'max_prs_por_repositorio': 200,
+        'timeout_conexao': 5.0,
+        'timeout_leitura': 30.0,
+        'hedge': False,
+        # Plugins de métricas (metricas_pr.py), na ordem das colunas do dataset
+        'metricas': ['arquivos', 'tempo', 'descricao', 'interacao', 'revisoes'],
+        # Guarda as respostas brutas de cada PR (respostas_prs) para recalcular métricas sem a API
+        'cache_respostas': False,
+        # Coleta uma amostra estratificada de cada repositório (amostragem_prs.py) em vez dos max_prs
+        # PRs atualizados mais recentemente; semente fixa para repetir a mesma amostra
+        'amostragem': {
+            'ativa': False,
+            'confianca': 0.95,
+            'margem': 0.05,
+            'estratos': 10,
+            'simultaneas': 16,
+            'semente': 0,
+        },
+    },
+    'analise': {
+        'dpi': 300,
+        'formato_graficos': 'png',
+        'limite_pontos': 50_000,
+        'modo_dispersao': 'hexbin',
+        'bootstrap': False,
+        'estratificado': False,
+        # Modo dos testes por RQ ('exato' ou 'aproximado'), ex.: {'RQ02': 'aproximado'}
+        'modo_testes': {},
+        'faixas_histograma': 4096,
+    },
+    'categorias': {
+        'tamanho_categoria': {'origem': 'total_changes', 'limites': [0, 50, 200, 500, None],
+                              'rotulos': ['Pequeno', 'Médio', 'Grande', 'Muito Grande']},
+        'tempo_categoria': {'origem': 'time_analysis_hours', 'limites': [0, 24, 168, 720, None],
+                            'rotulos': ['< 1 dia', '1-7 dias', '1-30 dias', '> 30 dias']},
+        'descricao_categoria': {'origem': 'description_chars', 'limites': [0, 100, 500, 1000, None],
+                                'rotulos': ['Muito Curta', 'Curta', 'Média', 'Longa']},
+        'interacoes_categoria': {'origem': 'num_comments', 'limites': [0, 5, 15, 30, None],
+                                 'rotulos': ['Baixa', 'Média', 'Alta', 'Muito Alta']},
+    },
+    'metricas_banco': {
+        'metricas': ['horas_ate_primeira_revisao', 'revisores_distintos', 'estados_revisoes'],
+    },
+    'relatorio': {
+        'formatos': ['md'],
+    },
+}
+
+
+def caminho_base() -> Path:
+    """
+    Diretório dos dados e resultados (LAB3_CAMINHO_BASE ou o diretório dos scripts)
+    """
+    return Path(os.getenv('LAB3_CAMINHO_BASE') or DIRETORIO_SCRIPTS)
+
+
+def _mesclar(padrao: Dict, valores: Dict) -> Dict:
+    resultado = copy.deepcopy(padrao)
+    for chave, valor in valores.items():
+        if isinstance(valor, dict) and isinstance(resultado.get(chave), dict) and chave != 'categorias':
+            resultado[chave] = _mesclar(resultado[chave], valor)
+        else:
+            resultado[chave] = valor
+    return resultado
+
+
+def carregar(caminho: Optional[Path] = None) -> Dict:
+    """
+    Lê a configuração e completa as chaves ausentes com PADRAO
+
+    Args:
+        caminho: Arquivo JSON (padrão: pipeline.json no diretório dos scripts, se existir)
+
+    Returns:
+        Configuração completa, com caminho_base já resolvido
+    """
+    caminho = Path(caminho) if caminho else DIRETORIO_SCRIPTS / "pipeline.json"
+    valores = {}
+    if caminho.exists():
+        with open(caminho, 'r', encoding='utf-8') as f:
+            valores = json.load(f)
+
+    config = _mesclar(PADRAO, valores)
+    base = config['caminho_base']
+    config['caminho_base'] = str((caminho.parent / base).resolve() if base else caminho_base())
+    return config
+
+
+def categorias(config: Dict) -> Dict[str, Tuple[str, List[float], List[str]]]:
+    """
+    Categorias no formato de AnalisadorPRs.CATEGORIAS: coluna -> (origem, limites, rótulos)
+    """
+    return {
+        coluna: (c['origem'], [float('inf') if limite is None else limite for limite in c['limites']], c['rotulos'])
+        for coluna, c in config['categorias'].items()
+    }
@@ -0,0 +1,428 @@
+"""
+Estatísticas incrementais das RQs
+Lab 03 - Caracterizando a atividade de code review no GitHub
+
+Mantém em estado_estatisticas.npz (no diretório base) os sumários de cada
+métrica e grupo (merged/closed) usados pelas 8 RQs, e os atualiza só com os
+PRs que mudaram, sem reler o dataset:
+- Momentos: contagem, média (soma) e variância de Welford/Chan, com retirada
+- Esboços KLL das métricas com clipping (percentis 1% e 99%)
+- Contagens das categorias do pd.cut por status e por número de revisões
+- SomaPostos: tabelas ordenadas por valor de cada grupo e o U1 do Mann-Whitney,
+  atualizados por busca binária
+- Contagens dos pares (variável, revisões) do Spearman
+
+As tabelas da Dimensão B são mantidas tanto para num_reviews quanto para o
+proxy num_participants: a análise usa num_reviews se algum PR a tem.
+
+Uma atualização com d PRs custa O(d log D) mais cópias vetorizadas O(D), em
+que D é o número de valores distintos de cada métrica; nada depende do número
+total de PRs. Ler e gravar o estado também é O(D).
+
+O estado acompanha o índice de PRs (indice_prs.py): a cada coleta,
+ColetorPRs.atualizar_indice aplica os PRs novos e, dos PRs que mudaram,
+retira a versão anterior e aplica a nova. Os esboços KLL não admitem
+retirada: as versões substituídas continuam neles (o erro de posto dos
+percentis cresce no máximo retiradas / n) até o estado ser reconstruído.
+
+Uso:
+    python estatisticas_incrementais.py reconstruir                    # a partir do índice de PRs
+    python estatisticas_incrementais.py reconstruir --dataset dataset_prs.csv
+    python estatisticas_incrementais.py aplicar novos.csv --retirar versoes_antigas.csv
+    python estatisticas_incrementais.py analisar                       # RQs a partir do estado
+"""
+
+import argparse
+import json
+import logging
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+import configuracao
+import instrumentacao
+import registro
+import sumarios_streaming as ss
+from analise_em_blocos import AnalisadorEmBlocos
+
+logger = logging.getLogger(__name__)
+
+# Arquivo do estado no diretório base
+ARQUIVO_ESTADO = "estado_estatisticas.npz"
+VERSAO_ESTADO = 2
+
+# PRs convertidos por vez ao reconstruir o estado a partir do índice
+LOTE_RECONSTRUCAO = 100_000
+
+
+def _tabela_vazia() -> pd.Series:
+    # Tabela de contagem de pares vazia, no formato de contar_pares
+    return pd.Series([], index=pd.MultiIndex.from_arrays([[], []], names=['x', 'y']), dtype=np.int64)
+
+
+def _somar(acumulado: pd.Series, novas: pd.Series, sinal: int) -> pd.Series:
+    """
+    Soma (sinal=1) ou subtrai (sinal=-1) uma tabela de contagem, sem deixar células vazias
+    """
+    if not len(novas):
+        return acumulado
+
+    posicoes = acumulado.index.get_indexer(novas.index)
+    if (posicoes >= 0).all():
+        # Só chaves já presentes: soma no lugar, mantendo o índice (e a tabela hash dele)
+        contagens = acumulado.to_numpy().copy()
+        np.add.at(contagens, posicoes, sinal * novas.to_numpy(dtype=np.int64))
+        if (contagens > 0).all():
+            return pd.Series(contagens, index=acumulado.index)
+
+    resultado = acumulado.add(sinal * novas.astype(np.int64), fill_value=0).astype(np.int64)
+    if (resultado < 0).any():
+        raise ValueError("retirada de mais PRs do que o estado contém")
+    return resultado[resultado != 0]
+
+
+class EstadoEstatisticas:
+    """
+    Sumários mescláveis de todas as RQs, atualizados por inserção e retirada de PRs
+
+    Exemplo:
+        estado = EstadoEstatisticas.carregar(caminho)
+        estado.aplicar(versoes_antigas, sinal=-1)
+        estado.aplicar(prs_novos_e_alterados)
+        estado.salvar(caminho)
+    """
+
+    COLUNAS = AnalisadorEmBlocos.COLUNAS + [AnalisadorEmBlocos.COLUNA_REVISOES]
+    METRICAS = AnalisadorEmBlocos.METRICAS + [AnalisadorEmBlocos.COLUNA_REVISOES]
+    METRICAS_SEM_OUTLIERS = AnalisadorEmBlocos.METRICAS_SEM_OUTLIERS
+
+    # Medidas do número de revisões: a real e o proxy dos datasets antigos
+    REVISOES = (AnalisadorEmBlocos.COLUNA_REVISOES, AnalisadorEmBlocos.PROXY_REVISOES)
+
+    # Pares (variável, comparação) das correlações da Dimensão B
+    CORRELACOES = [(v, c) for c in REVISOES for rq in ('RQ05', 'RQ06', 'RQ07', 'RQ08')
+                   for _, v, _ in AnalisadorEmBlocos.TESTES_RQ[rq]]
+
+    def __init__(self, categorias: Optional[Dict] = None):
+        """
+        Args:
+            categorias: Categorias no formato de AnalisadorPRs.CATEGORIAS (padrão: as da classe)
+        """
+        self.categorias = categorias if categorias is not None else AnalisadorEmBlocos.CATEGORIAS
+        self.total_prs = 0
+        self.repositorios = pd.Series(dtype=np.int64)
+        self.momentos = {(m, s): ss.Momentos() for m in self.METRICAS for s in (True, False)}
+        self.esbocos = {m: ss.EsbocoKLL() for m in self.METRICAS_SEM_OUTLIERS}
+        self.retiradas_esbocos = 0
+        self.somas = {m: ss.SomaPostos() for m in self.METRICAS}
+        self.conjuntas = {par: _tabela_vazia() for par in self.CORRELACOES}
+        self.categorias_status = {coluna: _tabela_vazia() for coluna in self.categorias}
+        self.revisoes_por_categoria = {(coluna, c): _tabela_vazia() for coluna in self.categorias for c in self.REVISOES}
+
+    def aplicar(self, df: pd.DataFrame, sinal: int = 1) -> int:
+        """
+        Insere (sinal=1) ou retira (sinal=-1) PRs do estado
+
+        Args:
+            df: PRs no formato de dataset_prs.csv (ColetorPRs.criar_dataframe_prs)
+            sinal: 1 para inserir, -1 para retirar versões já aplicadas
+
+        Returns:
+            Número de PRs aplicados
+        """
+        if df is None or df.empty:
+            return 0
+
+        # PRs coletados sem o plugin revisoes não têm num_reviews (fica NaN)
+        bloco = df.reindex(columns=self.COLUNAS)
+        bloco['merged'] = bloco['merged'].astype(bool)
+        bloco['total_changes'] = bloco['total_additions'] + bloco['total_deletions']
+        for metrica in self.METRICAS:
+            bloco[metrica] = AnalisadorEmBlocos._discretizar(metrica, bloco[metrica])
+
+        self.total_prs += sinal * len(bloco)
+        self.repositorios = _somar(self.repositorios, bloco['repository'].dropna().value_counts(), sinal)
+
+        for metrica, esboco in self.esbocos.items():
+            if sinal > 0:
+                esboco.atualizar(bloco[metrica].to_numpy())
+            else:
+                self.retiradas_esbocos += int(bloco[metrica].notna().sum())
+
+        merged = bloco['merged'].to_numpy()
+        for metrica in self.METRICAS:
+            valores = bloco[metrica].to_numpy(dtype=float)
+            for status in (True, False):
+                momentos = self.momentos[(metrica, status)]
+                (momentos.atualizar if sinal > 0 else momentos.retirar)(valores[merged == status])
+            self.somas[metrica].atualizar(valores[merged], valores[~merged], sinal)
+
+        for variavel, comparacao in self.CORRELACOES:
+            self.conjuntas[(variavel, comparacao)] = _somar(self.conjuntas[(variavel, comparacao)],
+                                                            ss.contar_pares(bloco[variavel], bloco[comparacao]), sinal)
+
+        for coluna, (origem, limites, rotulos) in self.categorias.items():
+            categoria = pd.cut(bloco[origem], bins=limites, labels=rotulos).astype(object)
+            self.categorias_status[coluna] = _somar(self.categorias_status[coluna],
+                                                    ss.contar_pares(categoria, bloco['merged']), sinal)
+            for c in self.REVISOES:
+                self.revisoes_por_categoria[(coluna, c)] = _somar(
+                    self.revisoes_por_categoria[(coluna, c)], ss.contar_pares(categoria, bloco[c]), sinal)
+
+        return len(bloco)
+
+    # ------------------------------------------------------------------------
+    # Persistência
+    # ------------------------------------------------------------------------
+
+    def _categorias_serializaveis(self) -> Dict:
+        return {coluna: [origem, [None if np.isinf(l) else l for l in limites], list(rotulos)]
+                for coluna, (origem, limites, rotulos) in self.categorias.items()}
+
+    TABELAS = ('conjuntas', 'categorias_status', 'revisoes_por_categoria')
+
+    @staticmethod
+    def _nome_tabela(atributo: str, chave) -> str:
+        return '/'.join([atributo, *(chave if isinstance(chave, tuple) else (chave,))])
+
+    def salvar(self, caminho: Path):
+        """
+        Grava o estado em um .npz: os arrays em binário e os escalares em um JSON embutido
+        """
+        metadados = {
+            'versao': VERSAO_ESTADO,
+            'categorias': self._categorias_serializaveis(),
+            'total_prs': self.total_prs,
+            'repositorios': {str(r): int(n) for r, n in self.repositorios.items()},
+            'momentos': [[m, s, x.n, x.media, x.m2, x.minimo, x.maximo] for (m, s), x in self.momentos.items()],
+            'esbocos': {m: {'k': e.k, 'n': e.n, 'niveis': len(e.niveis)} for m, e in self.esbocos.items()},
+            'retiradas_esbocos': self.retiradas_esbocos,
+            # Inteiros grandes (Σ t³ - t passa de 64 bits) ficam no JSON
+            'somas': {m: {'dobro_u': s.dobro_u, 'empates': s.empates} for m, s in self.somas.items()},
+        }
+        arrays = {'metadados': np.array(json.dumps(metadados))}
+
+        for m, e in self.esbocos.items():
+            for h, nivel in enumerate(e.niveis):
+                arrays[f'esbocos/{m}/{h}'] = nivel
+        for m, soma in self.somas.items():
+            for i, grupo in enumerate(soma.grupos):
+                arrays[f'somas/{m}/{i}/valores'] = grupo.valores
+                arrays[f'somas/{m}/{i}/contagens'] = grupo.contagens
+        for atributo in self.TABELAS:
+            for chave, tabela in getattr(self, atributo).items():
+                nome = self._nome_tabela(atributo, chave)
+                for nivel in (0, 1):
+                    valores = tabela.index.get_level_values(nivel).to_numpy()
+                    # Rótulos das categorias: texto em array nativo (o .npz é lido sem pickle)
+                    arrays[f'{nome}/{nivel}'] = valores.astype(str) if valores.dtype == object else valores
+                arrays[f'{nome}/contagens'] = tabela.to_numpy()
+
+        temporario = Path(caminho).with_suffix('.tmp')
+        with open(temporario, 'wb') as f:
+            np.savez(f, **arrays)
+        temporario.replace(caminho)
+
+    @classmethod
+    def carregar(cls, caminho: Path, categorias: Optional[Dict] = None) -> 'EstadoEstatisticas':
+        """
+        Args:
+            caminho: Arquivo gravado por salvar
+            categorias: Categorias esperadas; se diferirem das do estado, é preciso reconstruí-lo
+        """
+        with np.load(caminho, allow_pickle=False) as arquivo:
+            arrays = dict(arquivo.items())
+        metadados = json.loads(str(arrays['metadados']))
+
+        if metadados.get('versao') != VERSAO_ESTADO:
+            raise ValueError(f"versão do estado incompatível ({metadados.get('versao')}): reconstrua o estado")
+
+        estado = cls({coluna: (origem, [float('inf') if l is None else l for l in limites], rotulos)
+                      for coluna, (origem, limites, rotulos) in metadados['categorias'].items()})
+        if categorias is not None and estado._categorias_serializaveis() != cls(categorias)._categorias_serializaveis():
+            raise ValueError("as categorias mudaram desde a criação do estado: reconstrua o estado")
+
+        estado.total_prs = metadados['total_prs']
+        estado.repositorios = pd.Series(metadados['repositorios'], dtype=np.int64)
+        for m, s, n, media, m2, minimo, maximo in metadados['momentos']:
+            estado.momentos[(m, s)] = ss.Momentos.de_agregados(n, media, m2, minimo, maximo)
+        for m, e in metadados['esbocos'].items():
+            esboco = ss.EsbocoKLL(e['k'])
+            esboco.n = e['n']
+            esboco.niveis = [arrays[f'esbocos/{m}/{h}'] for h in range(e['niveis'])]
+            estado.esbocos[m] = esboco
+        estado.retiradas_esbocos = metadados['retiradas_esbocos']
+
+        for m, s in metadados['somas'].items():
+            soma = ss.SomaPostos()
+            soma.grupos = tuple(ss.TabelaOrdenada(arrays[f'somas/{m}/{i}/valores'], arrays[f'somas/{m}/{i}/contagens'])
+                                for i in (0, 1))
+            valores = np.union1d(soma.grupos[0].valores, soma.grupos[1].valores)
+            soma.conjunta = ss.TabelaOrdenada(valores, soma.grupos[0].contagem(valores) +
+                                              soma.grupos[1].contagem(valores))
+            soma.dobro_u, soma.empates = s['dobro_u'], s['empates']
+            estado.somas[m] = soma
+
+        for atributo in cls.TABELAS:
+            for chave in getattr(estado, atributo):
+                nome = cls._nome_tabela(atributo, chave)
+                indice = pd.MultiIndex.from_arrays([arrays[f'{nome}/{nivel}'] for nivel in (0, 1)], names=['x', 'y'])
+                getattr(estado, atributo)[chave] = pd.Series(arrays[f'{nome}/contagens'], index=indice)
+        return estado
+
+
+def atualizar_estado(caminho_base: Path, inseridos: pd.DataFrame, retirados: pd.DataFrame) -> bool:
+    """
+    Aplica ao estado do diretório base os PRs novos ou alterados de uma coleta
+
+    Não faz nada se o estado ainda não existe (crie-o com `reconstruir`).
+
+    Args:
+        caminho_base: Diretório base
+        inseridos: Versões atuais dos PRs novos e dos alterados
+        retirados: Versões anteriores dos PRs alterados
+
+    Returns:
+        True se o estado foi atualizado
+    """
+    caminho = Path(caminho_base) / ARQUIVO_ESTADO
+    if not caminho.exists():
+        return False
+
+    estado = EstadoEstatisticas.carregar(caminho)
+    retirados_n = estado.aplicar(retirados, sinal=-1)
+    inseridos_n = estado.aplicar(inseridos)
+    estado.salvar(caminho)
+
+    logger.info("Estatísticas incrementais: %s PRs novos, %s substituídos, %s no total",
+                inseridos_n - retirados_n, retirados_n, estado.total_prs)
+    return True
+
+
+def reconstruir_estado(caminho_base: Path, dataset: Optional[Path] = None, categorias: Optional[Dict] = None,
+                       tamanho_bloco: int = LOTE_RECONSTRUCAO) -> EstadoEstatisticas:
+    """
+    Cria o estado do zero: a partir do índice de PRs ou, com `dataset`, de um CSV lido em blocos
+    """
+    estado = EstadoEstatisticas(categorias)
+
+    if dataset is not None:
+        for bloco in pd.read_csv(dataset, usecols=lambda c: c in EstadoEstatisticas.COLUNAS, chunksize=tamanho_bloco):
+            estado.aplicar(bloco)
+    else:
+        from coletor_prs import ColetorPRs
+        from indice_prs import ARQUIVO_INDICE, IndicePRs
+
+        coletor = ColetorPRs(caminho_base=Path(caminho_base))
+        with IndicePRs(Path(caminho_base) / ARQUIVO_INDICE, 'r') as indice:
+            lote = []
+            for pr in indice.prs():
+                lote.append(pr)
+                if len(lote) == tamanho_bloco:
+                    estado.aplicar(coletor.criar_dataframe_prs(lote))
+                    lote = []
+            estado.aplicar(coletor.criar_dataframe_prs(lote))
+
+    estado.salvar(Path(caminho_base) / ARQUIVO_ESTADO)
+    return estado
+
+
+class AnalisadorIncremental(AnalisadorEmBlocos):
+    """
+    Responde às 8 RQs a partir do estado incremental, sem ler o dataset
+
+    Os testes de Mann-Whitney vêm direto do U1 mantido em SomaPostos; os demais
+    resultados usam as mesmas rotinas da análise em blocos.
+    """
+
+    MODO = "INCREMENTAL"
+
+    def __init__(self, **opcoes):
+        super().__init__(ARQUIVO_ESTADO, **opcoes)
+        self.estado = None
+
+    def carregar_dados(self) -> bool:
+        print("=" * 80)
+        print(f"SPRINT 2 - ANÁLISE DE PULL REQUESTS ({self.MODO})")
+        print("=" * 80)
+        print()
+
+        if not self.caminho_dataset.exists():
+            print(f"❌ Erro: Estado {self.caminho_dataset} não encontrado!")
+            print("Crie-o com: python estatisticas_incrementais.py reconstruir")
+            return False
+
+        print(f"📂 Estado: {self.caminho_dataset}")
+        print()
+        return True
+
+    def preparar_dados(self):
+        """
+        Carrega o estado e expõe os sumários no formato da análise em blocos
+        """
+        print("🔧 Carregando estado incremental...")
+        self.estado = estado = EstadoEstatisticas.carregar(self.caminho_dataset, self.CATEGORIAS)
+
+        revisoes = sum(estado.momentos[(self.COLUNA_REVISOES, s)].n for s in (True, False))
+        self._detectar_revisoes([self.COLUNA_REVISOES] if revisoes else [])
+
+        self.total_prs = estado.total_prs
+        self.esbocos = estado.esbocos
+        self.momentos = estado.momentos
+        self.contagens = {(m, merged): soma.grupos[0 if merged else 1].serie()
+                          for m, soma in estado.somas.items() for merged in (True, False)}
+        self.conjuntas = {v: t for (v, c), t in estado.conjuntas.items() if c == self.coluna_revisoes}
+        self.categorias = estado.categorias_status
+        self.revisoes_por_categoria = {coluna: t for (coluna, c), t in estado.revisoes_por_categoria.items()
+                                       if c == self.coluna_revisoes}
+
+        self.limites_outliers = {
+            m: tuple(float(q) for q in esboco.quantis([0.01, 0.99])) for m, esboco in self.esbocos.items()
+        }
+        if estado.retiradas_esbocos:
+            print(f"  • {estado.retiradas_esbocos} valores substituídos ainda nos esboços dos percentis "
+                  f"(reconstrua o estado para removê-los)")
+        self._montar_resumo(len(estado.repositorios))
+
+    def _mann_whitney(self, metrica: str) -> tuple:
+        return self.estado.somas[metrica].resultado()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Estatísticas das RQs mantidas incrementalmente")
+    sub = parser.add_subparsers(dest='comando', required=True)
+
+    p_reconstruir = sub.add_parser('reconstruir', help="Cria o estado do zero (índice de PRs ou CSV)")
+    p_reconstruir.add_argument('--dataset', help="CSV no formato de dataset_prs.csv (padrão: o índice de PRs)")
+
+    p_aplicar = sub.add_parser('aplicar', help="Aplica ao estado um CSV de PRs novos ou alterados")
+    p_aplicar.add_argument('inseridos', help="CSV com os PRs a inserir")
+    p_aplicar.add_argument('--retirar', help="CSV com as versões anteriores dos PRs alterados")
+
+    sub.add_parser('analisar', help="Responde às RQs a partir do estado")
+    args = parser.parse_args()
+    registro.configurar_logging()
+
+    config = configuracao.carregar()
+    base = Path(config['caminho_base'])
+    categorias = configuracao.categorias(config)
+
+    if args.comando == 'reconstruir':
+        estado = reconstruir_estado(base, Path(args.dataset) if args.dataset else None, categorias)
+        print(f"✓ Estado criado: {estado.total_prs} PRs ({base / ARQUIVO_ESTADO})")
+    elif args.comando == 'aplicar':
+        if not (base / ARQUIVO_ESTADO).exists():
+            parser.error(f"{ARQUIVO_ESTADO} não encontrado (crie-o com: reconstruir)")
+        retirados = pd.read_csv(args.retirar) if args.retirar else None
+        atualizar_estado(base, pd.read_csv(args.inseridos), retirados)
+        print(f"✓ Estado atualizado ({base / ARQUIVO_ESTADO})")
+    else:
+        analisador = AnalisadorIncremental(caminho_base=base, categorias=categorias)
+        analisador.executar_analise_completa()
+        instrumentacao.finalizar(analisador.caminho_base / "trace_incremental.json")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+"""
+Análise estratificada por repositório
+Lab 03 - Caracterizando a atividade de code review no GitHub
+
+Calcula os testes de Mann-Whitney e Spearman separadamente em cada grupo
+(repositório) com um único groupby vetorizado, e depois agrega os resultados:
+- Mann-Whitney: teste de van Elteren (soma de postos estratificada)
+- Spearman: meta-análise com transformação z de Fisher ponderada por (n - 3)
+
+Os p-valores por grupo usam a aproximação normal (Mann-Whitney, com correção
+de continuidade e de empates) e a distribuição t (Spearman), as mesmas usadas
+pelo scipy para amostras grandes.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+# Tamanho mínimo de cada grupo, igual às guardas de teste_mann_whitney e calcular_correlacao
+MINIMO_AMOSTRAS = 3
+
+
+def mann_whitney_por_grupo(df: pd.DataFrame, coluna_grupo: str, var_continua: str,
+                           var_binaria: str, valor_grupo1=True) -> pd.DataFrame:
+    """
+    Mann-Whitney U (bilateral) em cada grupo
+
+    Args:
+        df: DataFrame com os dados
+        coluna_grupo: Coluna que define os estratos (ex.: 'repository')
+        var_continua: Variável comparada entre os grupos
+        var_binaria: Variável que separa as duas amostras
+        valor_grupo1: Valor de var_binaria que define a primeira amostra
+
+    Returns:
+        DataFrame indexado pelo grupo com n1, n2, u_stat, efeito_u, z e p_value
+        (NaN nos grupos com menos de 3 observações em alguma amostra)
+    """
+    dados = df[[coluna_grupo, var_continua, var_binaria]].dropna()
+    em_grupo1 = (dados[var_binaria] == valor_grupo1).astype(float)
+
+    postos = dados.groupby(coluna_grupo, observed=True)[var_continua].rank(method='average')
+
+    somas = pd.DataFrame({
+        coluna_grupo: dados[coluna_grupo],
+        'n': 1.0,
+        'n1': em_grupo1,
+        'r1': postos * em_grupo1,
+    }).groupby(coluna_grupo, observed=True).sum()
+
+    # Correção de empates: soma de (t³ - t) sobre os valores empatados de cada grupo
+    t = dados.groupby([coluna_grupo, var_continua], observed=True).size().astype(float)
+    empates = (t ** 3 - t).groupby(level=0, observed=True).sum()
+
+    n, n1 = somas['n'], somas['n1']
+    n2 = n - n1
+    u1 = somas['r1'] - n1 * (n1 + 1) / 2
+    media = n1 * n2 / 2
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        variancia = n1 * n2 / 12 * ((n + 1) - empates.reindex(n.index, fill_value=0) / (n * (n - 1)))
+        validos = (n1 >= MINIMO_AMOSTRAS) & (n2 >= MINIMO_AMOSTRAS) & (variancia > 0)
+
+        z = (np.abs(u1 - media) - 0.5).clip(lower=0) / np.sqrt(variancia)
+        resultado = pd.DataFrame({
+            'n1': n1,
+            'n2': n2,
+            'u_stat': u1,
+            'efeito_u': u1 / (n1 * n2),
+            'z': np.sign(u1 - media) * z,
+            'p_value': np.minimum(1.0, 2 * stats.norm.sf(z)),
+            'variancia_u': variancia,
+        })
+
+    resultado.loc[~validos, ['u_stat', 'efeito_u', 'z', 'p_value']] = np.nan
+    return resultado
+
+
+def spearman_por_grupo(df: pd.DataFrame, coluna_grupo: str, var1: str, var2: str) -> pd.DataFrame:
+    """
+    Correlação de Spearman em cada grupo
+
+    Args:
+        df: DataFrame com os dados
+        coluna_grupo: Coluna que define os estratos (ex.: 'repository')
+        var1: Nome da primeira variável
+        var2: Nome da segunda variável
+
+    Returns:
+        DataFrame indexado pelo grupo com n, correlacao e p_value
+        (NaN nos grupos com menos de 3 pares ou com variável constante)
+    """
+    dados = df[[coluna_grupo, var1, var2]].dropna()
+    agrupado = dados.groupby(coluna_grupo, observed=True)
+    rx = agrupado[var1].rank(method='average')
+    ry = agrupado[var2].rank(method='average')
+
+    somas = pd.DataFrame({
+        coluna_grupo: dados[coluna_grupo],
+        'n': 1.0,
+        'sx': rx,
+        'sy': ry,
+        'sxx': rx * rx,
+        'syy': ry * ry,
+        'sxy': rx * ry,
+    }).groupby(coluna_grupo, observed=True).sum()
+
+    n = somas['n']
+    cov = somas['sxy'] - somas['sx'] * somas['sy'] / n
+    vx = somas['sxx'] - somas['sx'] ** 2 / n
+    vy = somas['syy'] - somas['sy'] ** 2 / n
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rho = (cov / np.sqrt(vx * vy)).clip(-1, 1)
+        t = rho * np.sqrt((n - 2) / (1 - rho ** 2))
+        p_value = 2 * stats.t.sf(np.abs(t), n - 2)
+
+    resultado = pd.DataFrame({'n': n, 'correlacao': rho, 'p_value': p_value})
+
+    invalidos = (n < MINIMO_AMOSTRAS) | (vx <= 0) | (vy <= 0)
+    resultado.loc[invalidos, ['correlacao', 'p_value']] = np.nan
+    return resultado
+
+
+def agregar_mann_whitney(por_grupo: pd.DataFrame) -> Dict:
+    """
+    Combina os testes por grupo com o teste de van Elteren
+
+    Cada estrato contribui com (U1 - E[U1]) / (n + 1), e o efeito médio é a média
+    dos efeitos por grupo ponderada pelo tamanho do grupo.
+    """
+    validos = por_grupo.dropna(subset=['u_stat'])
+
+    if validos.empty:
+        return {'n_grupos': len(por_grupo), 'n_grupos_validos': 0}
+
+    n = validos['n1'] + validos['n2']
+    desvio = (validos['u_stat'] - validos['n1'] * validos['n2'] / 2) / (n + 1)
+    variancia = validos['variancia_u'] / (n + 1) ** 2
+    z = desvio.sum() / np.sqrt(variancia.sum())
+
+    return {
+        'n_grupos': len(por_grupo),
+        'n_grupos_validos': len(validos),
+        'n_grupos_significativos': int((validos['p_value'] < 0.05).sum()),
+        'efeito_u_medio': float(np.average(validos['efeito_u'], weights=n)),
+        'z': float(z),
+        'p_value': float(2 * stats.norm.sf(abs(z))),
+        'significativo': bool(2 * stats.norm.sf(abs(z)) < 0.05),
+    }
+
+
+def agregar_spearman(por_grupo: pd.DataFrame, nivel_confianca: float = 0.95) -> Dict:
+    """
+    Combina as correlações por grupo com a transformação z de Fisher
+
+    Grupos com n = 3 têm peso zero (n - 3) e não entram na média.
+    """
+    validos = por_grupo.dropna(subset=['correlacao'])
+    validos = validos[validos['n'] > 3]
+
+    if validos.empty:
+        return {'n_grupos': len(por_grupo), 'n_grupos_validos': 0}
+
+    pesos = validos['n'] - 3
+    z_grupos = np.arctanh(validos['correlacao'].clip(-0.999999, 0.999999))
+    z = float(np.average(z_grupos, weights=pesos))
+    erro = 1 / np.sqrt(pesos.sum())
+    critico = stats.norm.ppf(0.5 + nivel_confianca / 2)
+    p_value = float(2 * stats.norm.sf(abs(z / erro)))
+
+    return {
+        'n_grupos': len(por_grupo),
+        'n_grupos_validos': len(validos),
+        'n_grupos_significativos': int((validos['p_value'] < 0.05).sum()),
+        'correlacao': float(np.tanh(z)),
+        'correlacao_ic': (float(np.tanh(z - critico * erro)), float(np.tanh(z + critico * erro))),
+        'p_value': p_value,
+        'significativo': p_value < 0.05,
+    }
+
+
+def _testes_do_fragmento(argumentos: Tuple[pd.DataFrame, str, List[Tuple[str, str, str]]]) -> List[pd.DataFrame]:
+    df, coluna_grupo, testes = argumentos
+    resultados = []
+    for teste, variavel, comparacao in testes:
+        if teste == 'mann_whitney':
+            resultados.append(mann_whitney_por_grupo(df, coluna_grupo, variavel, comparacao))
+        else:
+            resultados.append(spearman_por_grupo(df, coluna_grupo, variavel, comparacao))
+    return resultados
+
+
+def calcular_por_grupo(df: pd.DataFrame, coluna_grupo: str, testes: List[Tuple[str, str, str]],
+                       n_processos: Optional[int] = None,
+                       minimo_grupos_pool: int = 2000) -> List[pd.DataFrame]:
+    """
+    Calcula todos os testes por grupo
+
+    Com poucos grupos (ou n_processos=1) tudo roda em um único groupby vetorizado.
+    A partir de `minimo_grupos_pool` grupos, os grupos são divididos em fragmentos
+    disjuntos processados em paralelo.
+
+    Args:
+        df: DataFrame com os dados
+        coluna_grupo: Coluna que define os estratos
+        testes: Lista de (teste, variável, variável de comparação), como em TESTES_RQ
+        n_processos: Número de processos (None usa todos os núcleos)
+        minimo_grupos_pool: Número mínimo de grupos para usar o pool de processos
+
+    Returns:
+        Um DataFrame de resultados por grupo para cada teste, na ordem de `testes`
+    """
+    colunas = sorted({coluna_grupo} | {v for _, var, comp in testes for v in (var, comp)})
+    df = df[colunas]
+
+    codigos, grupos = pd.factorize(df[coluna_grupo])
+    n_processos = n_processos or os.cpu_count() or 1
+
+    if n_processos <= 1 or len(grupos) < minimo_grupos_pool:
+        return _testes_do_fragmento((df, coluna_grupo, testes))
+
+    # Fragmentos disjuntos por grupo: cada repositório fica inteiro em um fragmento
+    fragmento = codigos % n_processos
+    argumentos = [(df[fragmento == i], coluna_grupo, testes) for i in range(n_processos)]
+
+    with ProcessPoolExecutor(max_workers=n_processos) as pool:
+        parciais = list(pool.map(_testes_do_fragmento, argumentos))
+
+    return [pd.concat([p[i] for p in parciais]) for i in range(len(testes))]
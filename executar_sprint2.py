@@ -10,34 +10,136 @@ sobre a relação entre características dos PRs e:
 
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from scipy import stats
 from datetime import datetime
+import functools
 import json
 import os
+import time
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Dict, List, Optional
 
-# Configuração de estilo dos gráficos
-sns.set_style("whitegrid")
-plt.rcParams['figure.figsize'] = (12, 6)
-plt.rcParams['font.size'] = 10
+import configuracao
+import historico_resultados
+import instrumentacao
+import preparacao
+import reamostragem
+import relatorio
+
+@functools.lru_cache(maxsize=None)
+def _graficos():
+    """
+    Importa matplotlib e seaborn só quando o primeiro gráfico é desenhado
+    (são a maior parte do tempo de importação) e aplica o estilo dos gráficos
+    
+    Returns:
+        Tupla (pyplot, seaborn)
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    
+    # Configuração de estilo dos gráficos
+    sns.set_style("whitegrid")
+    plt.rcParams['figure.figsize'] = (12, 6)
+    plt.rcParams['font.size'] = 10
+    return plt, sns
 
 class AnalisadorPRs:
-    def __init__(self, arquivo_dataset: str = "dataset_prs.csv"):
+    # Testes estatísticos de cada RQ: (teste, variável analisada, variável de comparação)
+    TESTES_RQ = {
+        'RQ01': [('mann_whitney', 'total_changes', 'merged')],
+        'RQ02': [('mann_whitney', 'time_analysis_hours', 'merged')],
+        'RQ03': [('mann_whitney', 'description_chars', 'merged')],
+        'RQ04': [('mann_whitney', 'num_comments', 'merged'),
+                 ('mann_whitney', 'num_participants', 'merged')],
+        'RQ05': [('spearman', 'total_changes', 'num_reviews')],
+        'RQ06': [('spearman', 'time_analysis_hours', 'num_reviews')],
+        'RQ07': [('spearman', 'description_chars', 'num_reviews')],
+        'RQ08': [('spearman', 'num_comments', 'num_reviews')],
+    }
+    
+    # Número de revisões da Dimensão B (plugin revisoes da coleta). Datasets coletados
+    # antes do plugin não têm a coluna: neles, o número de participantes é o proxy
+    COLUNA_REVISOES = 'num_reviews'
+    PROXY_REVISOES = 'num_participants'
+    
+    # Colunas da coleta de revisões incluídas nas estatísticas descritivas, quando presentes
+    METRICAS_REVISOES = ['num_reviews', 'reviews_approved', 'reviews_changes_requested', 'first_review_hours']
+    
+    # Categorias criadas em preparar_dados: coluna -> (variável de origem, limites, rótulos)
+    CATEGORIAS = {
+        'tamanho_categoria': ('total_changes', [0, 50, 200, 500, float('inf')],
+                              ['Pequeno', 'Médio', 'Grande', 'Muito Grande']),
+        'tempo_categoria': ('time_analysis_hours', [0, 24, 168, 720, float('inf')],
+                            ['< 1 dia', '1-7 dias', '1-30 dias', '> 30 dias']),
+        'descricao_categoria': ('description_chars', [0, 100, 500, 1000, float('inf')],
+                                ['Muito Curta', 'Curta', 'Média', 'Longa']),
+        'interacoes_categoria': ('num_comments', [0, 5, 15, 30, float('inf')],
+                                 ['Baixa', 'Média', 'Alta', 'Muito Alta']),
+    }
+    
+    # Métricas com versão *_sem_outliers (clipping nos percentis 1% e 99%)
+    METRICAS_SEM_OUTLIERS = ['total_changes', 'time_analysis_hours', 'description_chars', 'num_comments']
+    
+    # Quantis calculados em preparar_dados: limites de outliers (1% e 99%) e mediana
+    PROBABILIDADES = [0.01, 0.5, 0.99]
+    
+    # Modos dos testes de cada RQ: postos exatos (scipy) ou histogramas de postos
+    # com limites de erro garantidos (ver sumarios_streaming.py)
+    MODOS_TESTE = ('exato', 'aproximado')
+    
+    def __init__(self, arquivo_dataset: str = "dataset_prs.csv", dpi: int = 300,
+                 formato_graficos: str = "png", limite_pontos: int = 50_000,
+                 modo_dispersao: str = "hexbin", caminho_base: Optional[Path] = None,
+                 categorias: Optional[Dict] = None, gerar_graficos: bool = True,
+                 modo_testes: Optional[Dict[str, str]] = None, faixas_histograma: int = 4096):
         """
         Inicializa o analisador de PRs
         
         Args:
             arquivo_dataset: Nome do arquivo CSV com os dados dos PRs
+            dpi: Resolução dos gráficos salvos
+            formato_graficos: Formato dos gráficos (png, svg, pdf, jpg, webp...)
+            limite_pontos: Máximo de pontos desenhados individualmente em um gráfico
+            modo_dispersao: Como desenhar dispersões acima do limite ('hexbin' ou 'amostra')
+            caminho_base: Diretório dos dados e resultados (padrão: configuracao.caminho_base())
+            categorias: Categorias no formato de CATEGORIAS (padrão: as da classe)
+            gerar_graficos: Se False, as RQs só calculam os testes (matplotlib e seaborn
+                nem chegam a ser importados)
+            modo_testes: Modo dos testes por RQ, ex.: {'RQ02': 'aproximado'} (padrão: todos exatos)
+            faixas_histograma: Número de faixas dos testes aproximados
         """
-        self.caminho_base = Path("/Users/pedroafonso/lab3")
+        self.caminho_base = Path(caminho_base) if caminho_base else configuracao.caminho_base()
         self.caminho_dataset = self.caminho_base / arquivo_dataset
         self.caminho_graficos = self.caminho_base / "graficos"
-        self.caminho_graficos.mkdir(exist_ok=True)
+        self.caminho_graficos.mkdir(parents=True, exist_ok=True)
+        
+        if categorias is not None:
+            self.CATEGORIAS = categorias
+        
+        self.dpi = dpi
+        self.formato_graficos = formato_graficos
+        self.limite_pontos = limite_pontos
+        self.modo_dispersao = modo_dispersao
+        self.gerar_graficos = gerar_graficos
+        
+        self.modo_testes = dict(modo_testes or {})
+        invalidos = {m for m in self.modo_testes.values() if m not in self.MODOS_TESTE}
+        if invalidos:
+            raise ValueError(f"modo de teste inválido: {', '.join(sorted(invalidos))} "
+                             f"(use {' ou '.join(self.MODOS_TESTE)})")
+        self.faixas_histograma = faixas_histograma
+        self.aproximacoes = {}
+        self._discretizacoes = {}
         
         self.df = None
         self.resultados = {}
+        self.resumo = {}
+        self.limites_outliers = {}
+        self.tempos_etapas = {}
+        self.coluna_revisoes = self.COLUNA_REVISOES
         
     def carregar_dados(self) -> bool:
         """
@@ -73,57 +175,254 @@ class AnalisadorPRs:
         Prepara e limpa os dados para análise
         """
         print("🔧 Preparando dados para análise...")
+        self._discretizacoes = {}
         
         # Converter colunas booleanas
         self.df['merged'] = self.df['merged'].astype(bool)
         
         # Adicionar variável categórica para o status
-        self.df['status_categoria'] = self.df['merged'].map({True: 'MERGED', False: 'CLOSED'})
-        
-        # Calcular tamanho total das mudanças
-        self.df['total_changes'] = self.df['total_additions'] + self.df['total_deletions']
-        
-        # Criar categorias de tamanho
-        self.df['tamanho_categoria'] = pd.cut(
-            self.df['total_changes'],
-            bins=[0, 50, 200, 500, float('inf')],
-            labels=['Pequeno', 'Médio', 'Grande', 'Muito Grande']
-        )
-        
-        # Criar categorias de tempo
-        self.df['tempo_categoria'] = pd.cut(
-            self.df['time_analysis_hours'],
-            bins=[0, 24, 168, 720, float('inf')],
-            labels=['< 1 dia', '1-7 dias', '1-30 dias', '> 30 dias']
-        )
-        
-        # Criar categorias de descrição
-        self.df['descricao_categoria'] = pd.cut(
-            self.df['description_chars'],
-            bins=[0, 100, 500, 1000, float('inf')],
-            labels=['Muito Curta', 'Curta', 'Média', 'Longa']
-        )
-        
-        # Criar categorias de interações
-        self.df['interacoes_categoria'] = pd.cut(
-            self.df['num_comments'],
-            bins=[0, 5, 15, 30, float('inf')],
-            labels=['Baixa', 'Média', 'Alta', 'Muito Alta']
-        )
-        
-        # Remover outliers extremos (opcional)
-        for col in ['total_changes', 'time_analysis_hours', 'description_chars', 'num_comments']:
-            q1 = self.df[col].quantile(0.01)
-            q99 = self.df[col].quantile(0.99)
-            self.df[f'{col}_sem_outliers'] = self.df[col].clip(q1, q99)
+        self.df['status_categoria'] = self.df['merged'].map({True: 'MERGED', False: 'CLOSED'}).astype('category')
+        
+        # Calcular tamanho total das mudanças (em int64, antes da redução de tipos)
+        self.df['total_changes'] = self.df['total_additions'].astype('int64') + self.df['total_deletions'].astype('int64')
+        
+        # Categorias, limites de outliers e estatísticas descritivas em uma única
+        # passada pelos dados, em blocos (ver preparacao.py)
+        metricas = ['total_changes', 'time_analysis_hours', 'description_chars', 'num_comments', 'num_participants']
+        metricas += [m for m in self.METRICAS_REVISOES if m in self.df]
+        resumidas = list(dict.fromkeys(self.METRICAS_SEM_OUTLIERS + metricas))
+        origens = {origem for origem, _, _ in self.CATEGORIAS.values()}
+        codigos, quantis, momentos = preparacao.preparar(
+            {c: self.df[c].to_numpy() for c in dict.fromkeys(resumidas + sorted(origens))}, resumidas,
+            {coluna: (origem, limites) for coluna, (origem, limites, _) in self.CATEGORIAS.items()},
+            self.PROBABILIDADES)
+        
+        # Criar categorias de tamanho, tempo, descrição e interações (como pd.cut)
+        for coluna, (origem, limites, rotulos) in self.CATEGORIAS.items():
+            self.df[coluna] = pd.Categorical.from_codes(codigos[coluna], categories=rotulos, ordered=True)
+        
+        # Limites para remoção de outliers extremos: as colunas *_sem_outliers
+        # só são materializadas quando um gráfico precisa delas (ver dados_grafico)
+        for col in self.METRICAS_SEM_OUTLIERS:
+            self.limites_outliers[col] = (quantis[col][0], quantis[col][2])
+        
+        coluna = self.df.get(self.COLUNA_REVISOES)
+        self.definir_coluna_revisoes(coluna is not None and momentos[self.COLUNA_REVISOES]['count'] > 0)
+        if coluna is not None:
+            self.avisar_revisoes_ausentes(len(self.df) - int(momentos[self.COLUNA_REVISOES]['count']))
+        
+        # Totais e estatísticas descritivas usados no relatório (calculados uma única vez)
+        metricas = [m for m in metricas if m not in self.METRICAS_REVISOES or momentos[m]['count'] > 0]
+        self.resumo = {
+            'data_analise': datetime.now().isoformat(timespec='minutes'),
+            'total_prs': len(self.df),
+            'n_repositorios': int(self.df['repository'].nunique()),
+            'merged': int(self.df['merged'].sum()),
+            'closed': int((~self.df['merged']).sum()),
+            'limites_outliers': self.limites_outliers,
+            'coluna_revisoes': self.coluna_revisoes,
+            'metricas': {m: {'count': momentos[m]['count'], 'mean': momentos[m]['mean'],
+                             '50%': float(quantis[m][1]), 'std': momentos[m]['std']} for m in metricas},
+        }
+        
+        # Reduzir tipos das colunas
+        memoria_antes = self.df.memory_usage(deep=True).sum()
+        self.otimizar_tipos()
+        memoria_depois = self.df.memory_usage(deep=True).sum()
+        self.memoria_dados = {'antes': int(memoria_antes), 'depois': int(memoria_depois)}
         
         print("✓ Dados preparados!")
+        print(f"  • Memória: {memoria_antes / 1024**2:.1f} MB → {memoria_depois / 1024**2:.1f} MB "
+              f"({memoria_antes / max(memoria_depois, 1):.1f}× menor)")
         print()
     
+    @property
+    def rotulo_revisoes(self) -> str:
+        return 'Revisões' if self.coluna_revisoes == self.COLUNA_REVISOES else 'Participantes'
+    
+    def definir_coluna_revisoes(self, disponivel: bool):
+        """
+        Escolhe a variável de número de revisões das RQs 05 a 08 e ajusta TESTES_RQ
+        
+        Args:
+            disponivel: Se o dataset tem num_reviews (em ao menos um PR)
+        """
+        self.coluna_revisoes = self.COLUNA_REVISOES if disponivel else self.PROXY_REVISOES
+        self.TESTES_RQ = {
+            rq: [(teste, v, self.coluna_revisoes if c == self.COLUNA_REVISOES else c) for teste, v, c in testes]
+            for rq, testes in type(self).TESTES_RQ.items()
+        }
+        
+        if not disponivel:
+            print(f"  • Dataset sem {self.COLUNA_REVISOES} (coletado sem o plugin revisoes): "
+                  f"{self.PROXY_REVISOES} usado como proxy do número de revisões")
+    
+    def avisar_revisoes_ausentes(self, ausentes: int):
+        # PRs coletados antes do plugin revisoes: sem num_reviews, ficam fora das correlações
+        if ausentes and self.coluna_revisoes == self.COLUNA_REVISOES:
+            print(f"  • {ausentes} PRs sem {self.COLUNA_REVISOES} ficam fora das RQs 05 a 08 "
+                  f"(recalcule com: python metricas_pr.py recalcular)")
+    
+    def otimizar_tipos(self, limite_categoria: float = 0.5):
+        """
+        Reduz o uso de memória do DataFrame
+        
+        - Inteiros são reduzidos ao menor tipo inteiro que comporta os valores
+        - Floats viram float32 apenas quando a conversão não perde precisão
+        - Datas (colunas *_at) viram datetime64
+        - Textos com muitos valores repetidos viram category
+        
+        Args:
+            limite_categoria: Fração máxima de valores distintos para converter texto em category
+        """
+        for coluna in self.df.columns:
+            serie = self.df[coluna]
+            
+            if pd.api.types.is_bool_dtype(serie) or isinstance(serie.dtype, pd.CategoricalDtype):
+                continue
+            
+            if pd.api.types.is_integer_dtype(serie):
+                self.df[coluna] = pd.to_numeric(serie, downcast='integer')
+            elif pd.api.types.is_float_dtype(serie):
+                reduzida = serie.astype('float32')
+                if np.array_equal(reduzida.to_numpy(dtype='float64'), serie.to_numpy(), equal_nan=True):
+                    self.df[coluna] = reduzida
+            elif serie.dtype == object:
+                if coluna.endswith('_at'):
+                    self.df[coluna] = pd.to_datetime(serie, utc=True, errors='coerce', format='ISO8601')
+                elif serie.nunique() <= limite_categoria * len(serie):
+                    self.df[coluna] = serie.astype('category')
+    
+    def sem_outliers(self, coluna: str) -> pd.Series:
+        """
+        Retorna a coluna com clipping nos percentis 1% e 99%
+        
+        Args:
+            coluna: Nome da métrica (uma de METRICAS_SEM_OUTLIERS)
+            
+        Returns:
+            Série com os valores limitados, calculada sob demanda
+        """
+        q1, q99 = self.limites_outliers[coluna]
+        return self.df[coluna].clip(q1, q99).rename(f'{coluna}_sem_outliers')
+    
+    def dados_grafico(self, *colunas: str) -> pd.DataFrame:
+        """
+        Monta um DataFrame apenas com as colunas usadas em um gráfico
+        
+        Colunas terminadas em _sem_outliers são calculadas sob demanda.
+        
+        Args:
+            colunas: Nomes das colunas
+            
+        Returns:
+            DataFrame com as colunas pedidas
+        """
+        dados = {}
+        for coluna in colunas:
+            if coluna.endswith('_sem_outliers'):
+                dados[coluna] = self.sem_outliers(coluna[:-len('_sem_outliers')])
+            else:
+                dados[coluna] = self.df[coluna]
+        return pd.DataFrame(dados)
+    
+    def _amostra(self, dados: pd.DataFrame) -> pd.DataFrame:
+        """
+        Amostra aleatória (reprodutível) de até limite_pontos linhas, para gráficos
+        cujo custo cresce com o número de pontos (ex.: KDE do violin plot)
+        """
+        if len(dados) <= self.limite_pontos:
+            return dados
+        return dados.sample(self.limite_pontos, random_state=0)
+    
+    def _dispersao(self, ax, x: pd.Series, y: pd.Series, **kwargs):
+        """
+        Desenha um gráfico de dispersão
+        
+        Até limite_pontos, cada PR é um ponto. Acima disso, os dados são agregados
+        em um hexbin (contagem em escala log) ou, para séries com legenda, reduzidos
+        a uma amostra aleatória desenhada como imagem rasterizada.
+        """
+        if len(x) <= self.limite_pontos:
+            ax.scatter(x, y, **kwargs)
+        elif self.modo_dispersao == 'hexbin' and 'label' not in kwargs:
+            ax.hexbin(x, y, gridsize=80, bins='log', mincnt=1, cmap='Blues')
+        else:
+            indices = np.random.default_rng(0).choice(len(x), self.limite_pontos, replace=False)
+            ax.scatter(np.asarray(x)[indices], np.asarray(y)[indices], rasterized=True, **kwargs)
+    
+    def _salvar_grafico(self, nome: str):
+        """
+        Salva e fecha a figura atual no formato e DPI configurados
+        
+        Args:
+            nome: Nome do arquivo, sem extensão
+        """
+        plt, _ = _graficos()
+        arquivo = f"{nome}.{self.formato_graficos}"
+        with instrumentacao.span('savefig', 'graficos', arquivo=arquivo):
+            plt.savefig(self.caminho_graficos / arquivo, dpi=self.dpi, bbox_inches='tight')
+        plt.close()
+        
+        print(f"\n✓ Gráfico salvo: graficos/{arquivo}")
+    
+    def _modo_teste(self, variavel: str, comparacao: str) -> tuple:
+        """
+        RQ do teste (variavel, comparacao) em TESTES_RQ e o modo configurado para ela
+        
+        Returns:
+            Tupla (RQ ou None, 'exato' ou 'aproximado')
+        """
+        for rq, testes in self.TESTES_RQ.items():
+            if any(v == variavel and c == comparacao for _, v, c in testes):
+                return rq, self.modo_testes.get(rq, 'exato')
+        return None, 'exato'
+    
+    def _discretizacao(self, coluna: str) -> tuple:
+        """
+        Faixa de cada linha da coluna (-1 nos valores ausentes) e máscara das faixas puras
+        
+        Calculada uma vez por coluna e reaproveitada por todos os testes aproximados que
+        a usam (ex.: num_participants nas RQs 04 a 08): cada teste custa só um bincount.
+        """
+        if coluna not in self._discretizacoes:
+            import sumarios_streaming as ss
+            
+            valores = self.df[coluna].to_numpy(dtype=float)
+            validos = ~np.isnan(valores)
+            codigos = np.full(len(valores), -1, dtype=np.intp)
+            codigos[validos], puras = ss.discretizar(valores[validos], self.faixas_histograma)
+            self._discretizacoes[coluna] = (codigos, puras)
+        return self._discretizacoes[coluna]
+    
+    def _registrar_aproximacao(self, rq: str, variavel: str, teste: str, resultado: Optional[Dict]):
+        """
+        Guarda os intervalos de um teste aproximado (anexados aos resultados da RQ
+        por anexar_aproximacoes) e avisa quando o intervalo do p-valor cruza 0.05
+        """
+        if resultado is None:
+            return
+        
+        self.aproximacoes.setdefault(rq, {})[variavel] = {'teste': teste, **resultado}
+        p_min, p_max = resultado['p_intervalo']
+        print(f"≈ {rq} - {variavel}: teste aproximado (histograma de postos), p ∈ [{p_min:.4g}; {p_max:.4g}]")
+        if p_min < 0.05 <= p_max:
+            print(f"  ⚠ O intervalo do p-valor cruza 0.05: use o modo exato nesta RQ para concluir")
+    
+    def anexar_aproximacoes(self):
+        """
+        Adiciona em self.resultados[RQ]['aproximado'] os intervalos dos testes aproximados
+        """
+        for rq, testes in self.aproximacoes.items():
+            if rq in self.resultados:
+                self.resultados[rq]['aproximado'] = testes
+    
     def calcular_correlacao(self, var1: str, var2: str) -> tuple:
         """
         Calcula correlação de Spearman entre duas variáveis
         
+        Se a RQ do teste estiver no modo aproximado, usa o histograma conjunto de postos.
+        
         Args:
             var1: Nome da primeira variável
             var2: Nome da segunda variável
@@ -131,12 +430,26 @@ class AnalisadorPRs:
         Returns:
             Tupla (correlação, p-valor)
         """
+        rq, modo = self._modo_teste(var1, var2)
+        if modo == 'aproximado':
+            import sumarios_streaming as ss
+            
+            cx, puras_x = self._discretizacao(var1)
+            cy, puras_y = self._discretizacao(var2)
+            validos = (cx >= 0) & (cy >= 0)
+            r = ss.spearman_de_histograma(*ss.histograma_conjunto(cx[validos], cy[validos], len(puras_y)),
+                                          puras_x, puras_y)
+            self._registrar_aproximacao(rq, var1, 'spearman', r)
+            return (r['correlacao'], r['p_value']) if r else (None, None)
+        
         # Remover valores nulos
         dados = self.df[[var1, var2]].dropna()
         
         if len(dados) < 3:
             return None, None
         
+        from scipy import stats
+        
         # Correlação de Spearman (não assume distribuição normal)
         corr, p_value = stats.spearmanr(dados[var1], dados[var2])
         
@@ -146,6 +459,8 @@ class AnalisadorPRs:
         """
         Realiza teste de Mann-Whitney U para comparar duas grupos
         
+        Se a RQ do teste estiver no modo aproximado, usa os histogramas de postos dos grupos.
+        
         Args:
             var_continua: Nome da variável contínua
             var_binaria: Nome da variável binária (deve ter 2 categorias)
@@ -158,12 +473,26 @@ class AnalisadorPRs:
         if len(grupos) != 2:
             return None, None
         
+        rq, modo = self._modo_teste(var_continua, var_binaria)
+        if modo == 'aproximado':
+            import sumarios_streaming as ss
+            
+            codigos, puras = self._discretizacao(var_continua)
+            rotulos = self.df[var_binaria].to_numpy()
+            h1, h2 = (np.bincount(codigos[(rotulos == grupo) & (codigos >= 0)], minlength=len(puras))
+                      for grupo in grupos)
+            r = ss.mann_whitney_de_histogramas(h1, h2, puras)
+            self._registrar_aproximacao(rq, var_continua, 'mann_whitney', r)
+            return (r['u_stat'], r['p_value']) if r else (None, None)
+        
         grupo1 = self.df[self.df[var_binaria] == grupos[0]][var_continua].dropna()
         grupo2 = self.df[self.df[var_binaria] == grupos[1]][var_continua].dropna()
         
         if len(grupo1) < 3 or len(grupo2) < 3:
             return None, None
         
+        from scipy import stats
+        
         u_stat, p_value = stats.mannwhitneyu(grupo1, grupo2, alternative='two-sided')
         
         return u_stat, p_value
@@ -227,51 +556,53 @@ class AnalisadorPRs:
         print("=" * 80)
         print()
         
-        # Análise estatística
-        u_stat, p_value = self.teste_mann_whitney('total_changes', 'merged')
-        
-        # Estatísticas descritivas
-        merged_stats = self.df[self.df['merged'] == True]['total_changes'].describe()
-        closed_stats = self.df[self.df['merged'] == False]['total_changes'].describe()
-        
-        print("📊 Estatísticas Descritivas:")
-        print(f"\nPRs MERGED:")
-        print(f"  • Média: {merged_stats['mean']:.2f} linhas")
-        print(f"  • Mediana: {merged_stats['50%']:.2f} linhas")
-        print(f"  • Desvio padrão: {merged_stats['std']:.2f}")
-        
-        print(f"\nPRs CLOSED:")
-        print(f"  • Média: {closed_stats['mean']:.2f} linhas")
-        print(f"  • Mediana: {closed_stats['50%']:.2f} linhas")
-        print(f"  • Desvio padrão: {closed_stats['std']:.2f}")
-        
-        print(f"\n📈 Teste Estatístico (Mann-Whitney U):")
-        print(f"  • Estatística U: {u_stat:.2f}")
-        print(f"  • P-valor: {p_value:.4f}")
-        print(f"  • Interpretação: {self.interpretar_p_valor(p_value)}")
-        
-        # Visualização
-        fig, axes = plt.subplots(1, 2, figsize=(15, 6))
-        
-        # Boxplot
-        self.df.boxplot(column='total_changes_sem_outliers', by='status_categoria', ax=axes[0])
-        axes[0].set_title('Distribuição do Tamanho por Status')
-        axes[0].set_xlabel('Status do PR')
-        axes[0].set_ylabel('Total de Mudanças (linhas)')
-        plt.sca(axes[0])
-        plt.xticks(rotation=0)
-        
-        # Violin plot
-        sns.violinplot(data=self.df, x='status_categoria', y='total_changes_sem_outliers', ax=axes[1])
-        axes[1].set_title('Densidade do Tamanho por Status')
-        axes[1].set_xlabel('Status do PR')
-        axes[1].set_ylabel('Total de Mudanças (linhas)')
-        
-        plt.tight_layout()
-        plt.savefig(self.caminho_graficos / 'rq01_tamanho_vs_status.png', dpi=300, bbox_inches='tight')
-        plt.close()
-        
-        print(f"\n✓ Gráfico salvo: graficos/rq01_tamanho_vs_status.png")
+        with instrumentacao.span('RQ01.estatisticas', 'analise'):
+            # Análise estatística
+            u_stat, p_value = self.teste_mann_whitney('total_changes', 'merged')
+        
+            # Estatísticas descritivas
+            merged_stats = self.df[self.df['merged'] == True]['total_changes'].describe()
+            closed_stats = self.df[self.df['merged'] == False]['total_changes'].describe()
+        
+            print("📊 Estatísticas Descritivas:")
+            print(f"\nPRs MERGED:")
+            print(f"  • Média: {merged_stats['mean']:.2f} linhas")
+            print(f"  • Mediana: {merged_stats['50%']:.2f} linhas")
+            print(f"  • Desvio padrão: {merged_stats['std']:.2f}")
+        
+            print(f"\nPRs CLOSED:")
+            print(f"  • Média: {closed_stats['mean']:.2f} linhas")
+            print(f"  • Mediana: {closed_stats['50%']:.2f} linhas")
+            print(f"  • Desvio padrão: {closed_stats['std']:.2f}")
+        
+            print(f"\n📈 Teste Estatístico (Mann-Whitney U):")
+            print(f"  • Estatística U: {u_stat:.2f}")
+            print(f"  • P-valor: {p_value:.4f}")
+            print(f"  • Interpretação: {self.interpretar_p_valor(p_value)}")
+        
+        if self.gerar_graficos:
+            with instrumentacao.span('RQ01.grafico', 'graficos'):
+                # Visualização
+                plt, sns = _graficos()
+                dados = self.dados_grafico('total_changes_sem_outliers', 'status_categoria')
+                fig, axes = plt.subplots(1, 2, figsize=(15, 6))
+        
+                # Boxplot
+                dados.boxplot(column='total_changes_sem_outliers', by='status_categoria', ax=axes[0])
+                axes[0].set_title('Distribuição do Tamanho por Status')
+                axes[0].set_xlabel('Status do PR')
+                axes[0].set_ylabel('Total de Mudanças (linhas)')
+                plt.sca(axes[0])
+                plt.xticks(rotation=0)
+        
+                # Violin plot
+                sns.violinplot(data=self._amostra(dados), x='status_categoria', y='total_changes_sem_outliers', ax=axes[1])
+                axes[1].set_title('Densidade do Tamanho por Status')
+                axes[1].set_xlabel('Status do PR')
+                axes[1].set_ylabel('Total de Mudanças (linhas)')
+        
+                plt.tight_layout()
+                self._salvar_grafico('rq01_tamanho_vs_status')
         print()
         
         # Armazenar resultados
@@ -293,55 +624,57 @@ class AnalisadorPRs:
         print("=" * 80)
         print()
         
-        # Análise estatística
-        u_stat, p_value = self.teste_mann_whitney('time_analysis_hours', 'merged')
-        
-        # Estatísticas descritivas
-        merged_stats = self.df[self.df['merged'] == True]['time_analysis_hours'].describe()
-        closed_stats = self.df[self.df['merged'] == False]['time_analysis_hours'].describe()
-        
-        print("📊 Estatísticas Descritivas:")
-        print(f"\nPRs MERGED:")
-        print(f"  • Média: {merged_stats['mean']:.2f} horas ({merged_stats['mean']/24:.2f} dias)")
-        print(f"  • Mediana: {merged_stats['50%']:.2f} horas ({merged_stats['50%']/24:.2f} dias)")
-        print(f"  • Desvio padrão: {merged_stats['std']:.2f} horas")
-        
-        print(f"\nPRs CLOSED:")
-        print(f"  • Média: {closed_stats['mean']:.2f} horas ({closed_stats['mean']/24:.2f} dias)")
-        print(f"  • Mediana: {closed_stats['50%']:.2f} horas ({closed_stats['50%']/24:.2f} dias)")
-        print(f"  • Desvio padrão: {closed_stats['std']:.2f} horas")
-        
-        print(f"\n📈 Teste Estatístico (Mann-Whitney U):")
-        print(f"  • Estatística U: {u_stat:.2f}")
-        print(f"  • P-valor: {p_value:.4f}")
-        print(f"  • Interpretação: {self.interpretar_p_valor(p_value)}")
-        
-        # Visualização
-        fig, axes = plt.subplots(1, 2, figsize=(15, 6))
-        
-        # Boxplot
-        self.df.boxplot(column='time_analysis_hours_sem_outliers', by='status_categoria', ax=axes[0])
-        axes[0].set_title('Distribuição do Tempo de Análise por Status')
-        axes[0].set_xlabel('Status do PR')
-        axes[0].set_ylabel('Tempo de Análise (horas)')
-        plt.sca(axes[0])
-        plt.xticks(rotation=0)
-        
-        # Histogram comparativo
-        merged_data = self.df[self.df['merged'] == True]['time_analysis_hours_sem_outliers']
-        closed_data = self.df[self.df['merged'] == False]['time_analysis_hours_sem_outliers']
-        
-        axes[1].hist([merged_data, closed_data], bins=30, label=['MERGED', 'CLOSED'], alpha=0.7)
-        axes[1].set_title('Histograma do Tempo de Análise por Status')
-        axes[1].set_xlabel('Tempo de Análise (horas)')
-        axes[1].set_ylabel('Frequência')
-        axes[1].legend()
-        
-        plt.tight_layout()
-        plt.savefig(self.caminho_graficos / 'rq02_tempo_vs_status.png', dpi=300, bbox_inches='tight')
-        plt.close()
-        
-        print(f"\n✓ Gráfico salvo: graficos/rq02_tempo_vs_status.png")
+        with instrumentacao.span('RQ02.estatisticas', 'analise'):
+            # Análise estatística
+            u_stat, p_value = self.teste_mann_whitney('time_analysis_hours', 'merged')
+        
+            # Estatísticas descritivas
+            merged_stats = self.df[self.df['merged'] == True]['time_analysis_hours'].describe()
+            closed_stats = self.df[self.df['merged'] == False]['time_analysis_hours'].describe()
+        
+            print("📊 Estatísticas Descritivas:")
+            print(f"\nPRs MERGED:")
+            print(f"  • Média: {merged_stats['mean']:.2f} horas ({merged_stats['mean']/24:.2f} dias)")
+            print(f"  • Mediana: {merged_stats['50%']:.2f} horas ({merged_stats['50%']/24:.2f} dias)")
+            print(f"  • Desvio padrão: {merged_stats['std']:.2f} horas")
+        
+            print(f"\nPRs CLOSED:")
+            print(f"  • Média: {closed_stats['mean']:.2f} horas ({closed_stats['mean']/24:.2f} dias)")
+            print(f"  • Mediana: {closed_stats['50%']:.2f} horas ({closed_stats['50%']/24:.2f} dias)")
+            print(f"  • Desvio padrão: {closed_stats['std']:.2f} horas")
+        
+            print(f"\n📈 Teste Estatístico (Mann-Whitney U):")
+            print(f"  • Estatística U: {u_stat:.2f}")
+            print(f"  • P-valor: {p_value:.4f}")
+            print(f"  • Interpretação: {self.interpretar_p_valor(p_value)}")
+        
+        if self.gerar_graficos:
+            with instrumentacao.span('RQ02.grafico', 'graficos'):
+                # Visualização
+                plt, _ = _graficos()
+                dados = self.dados_grafico('time_analysis_hours_sem_outliers', 'status_categoria', 'merged')
+                fig, axes = plt.subplots(1, 2, figsize=(15, 6))
+        
+                # Boxplot
+                dados.boxplot(column='time_analysis_hours_sem_outliers', by='status_categoria', ax=axes[0])
+                axes[0].set_title('Distribuição do Tempo de Análise por Status')
+                axes[0].set_xlabel('Status do PR')
+                axes[0].set_ylabel('Tempo de Análise (horas)')
+                plt.sca(axes[0])
+                plt.xticks(rotation=0)
+        
+                # Histogram comparativo
+                merged_data = dados[dados['merged'] == True]['time_analysis_hours_sem_outliers']
+                closed_data = dados[dados['merged'] == False]['time_analysis_hours_sem_outliers']
+        
+                axes[1].hist([merged_data, closed_data], bins=30, label=['MERGED', 'CLOSED'], alpha=0.7)
+                axes[1].set_title('Histograma do Tempo de Análise por Status')
+                axes[1].set_xlabel('Tempo de Análise (horas)')
+                axes[1].set_ylabel('Frequência')
+                axes[1].legend()
+        
+                plt.tight_layout()
+                self._salvar_grafico('rq02_tempo_vs_status')
         print()
         
         # Armazenar resultados
@@ -363,54 +696,56 @@ class AnalisadorPRs:
         print("=" * 80)
         print()
         
-        # Análise estatística
-        u_stat, p_value = self.teste_mann_whitney('description_chars', 'merged')
-        
-        # Estatísticas descritivas
-        merged_stats = self.df[self.df['merged'] == True]['description_chars'].describe()
-        closed_stats = self.df[self.df['merged'] == False]['description_chars'].describe()
-        
-        print("📊 Estatísticas Descritivas:")
-        print(f"\nPRs MERGED:")
-        print(f"  • Média: {merged_stats['mean']:.2f} caracteres")
-        print(f"  • Mediana: {merged_stats['50%']:.2f} caracteres")
-        print(f"  • Desvio padrão: {merged_stats['std']:.2f}")
-        
-        print(f"\nPRs CLOSED:")
-        print(f"  • Média: {closed_stats['mean']:.2f} caracteres")
-        print(f"  • Mediana: {closed_stats['50%']:.2f} caracteres")
-        print(f"  • Desvio padrão: {closed_stats['std']:.2f}")
-        
-        print(f"\n📈 Teste Estatístico (Mann-Whitney U):")
-        print(f"  • Estatística U: {u_stat:.2f}")
-        print(f"  • P-valor: {p_value:.4f}")
-        print(f"  • Interpretação: {self.interpretar_p_valor(p_value)}")
-        
-        # Visualização
-        fig, axes = plt.subplots(1, 2, figsize=(15, 6))
-        
-        # Boxplot
-        self.df.boxplot(column='description_chars_sem_outliers', by='status_categoria', ax=axes[0])
-        axes[0].set_title('Distribuição do Tamanho da Descrição por Status')
-        axes[0].set_xlabel('Status do PR')
-        axes[0].set_ylabel('Tamanho da Descrição (caracteres)')
-        plt.sca(axes[0])
-        plt.xticks(rotation=0)
-        
-        # Gráfico de barras por categoria
-        df_descricao = self.df.groupby(['descricao_categoria', 'status_categoria']).size().unstack(fill_value=0)
-        df_descricao_pct = df_descricao.div(df_descricao.sum(axis=1), axis=0) * 100
-        df_descricao_pct.plot(kind='bar', ax=axes[1], rot=45)
-        axes[1].set_title('Proporção de Status por Tamanho de Descrição')
-        axes[1].set_xlabel('Tamanho da Descrição')
-        axes[1].set_ylabel('Porcentagem (%)')
-        axes[1].legend(title='Status')
-        
-        plt.tight_layout()
-        plt.savefig(self.caminho_graficos / 'rq03_descricao_vs_status.png', dpi=300, bbox_inches='tight')
-        plt.close()
-        
-        print(f"\n✓ Gráfico salvo: graficos/rq03_descricao_vs_status.png")
+        with instrumentacao.span('RQ03.estatisticas', 'analise'):
+            # Análise estatística
+            u_stat, p_value = self.teste_mann_whitney('description_chars', 'merged')
+        
+            # Estatísticas descritivas
+            merged_stats = self.df[self.df['merged'] == True]['description_chars'].describe()
+            closed_stats = self.df[self.df['merged'] == False]['description_chars'].describe()
+        
+            print("📊 Estatísticas Descritivas:")
+            print(f"\nPRs MERGED:")
+            print(f"  • Média: {merged_stats['mean']:.2f} caracteres")
+            print(f"  • Mediana: {merged_stats['50%']:.2f} caracteres")
+            print(f"  • Desvio padrão: {merged_stats['std']:.2f}")
+        
+            print(f"\nPRs CLOSED:")
+            print(f"  • Média: {closed_stats['mean']:.2f} caracteres")
+            print(f"  • Mediana: {closed_stats['50%']:.2f} caracteres")
+            print(f"  • Desvio padrão: {closed_stats['std']:.2f}")
+        
+            print(f"\n📈 Teste Estatístico (Mann-Whitney U):")
+            print(f"  • Estatística U: {u_stat:.2f}")
+            print(f"  • P-valor: {p_value:.4f}")
+            print(f"  • Interpretação: {self.interpretar_p_valor(p_value)}")
+        
+        if self.gerar_graficos:
+            with instrumentacao.span('RQ03.grafico', 'graficos'):
+                # Visualização
+                plt, _ = _graficos()
+                dados = self.dados_grafico('description_chars_sem_outliers', 'status_categoria')
+                fig, axes = plt.subplots(1, 2, figsize=(15, 6))
+        
+                # Boxplot
+                dados.boxplot(column='description_chars_sem_outliers', by='status_categoria', ax=axes[0])
+                axes[0].set_title('Distribuição do Tamanho da Descrição por Status')
+                axes[0].set_xlabel('Status do PR')
+                axes[0].set_ylabel('Tamanho da Descrição (caracteres)')
+                plt.sca(axes[0])
+                plt.xticks(rotation=0)
+        
+                # Gráfico de barras por categoria
+                df_descricao = self.df.groupby(['descricao_categoria', 'status_categoria']).size().unstack(fill_value=0)
+                df_descricao_pct = df_descricao.div(df_descricao.sum(axis=1), axis=0) * 100
+                df_descricao_pct.plot(kind='bar', ax=axes[1], rot=45)
+                axes[1].set_title('Proporção de Status por Tamanho de Descrição')
+                axes[1].set_xlabel('Tamanho da Descrição')
+                axes[1].set_ylabel('Porcentagem (%)')
+                axes[1].legend(title='Status')
+        
+                plt.tight_layout()
+                self._salvar_grafico('rq03_descricao_vs_status')
         print()
         
         # Armazenar resultados
@@ -432,96 +767,93 @@ class AnalisadorPRs:
         print("=" * 80)
         print()
         
-        # Análise estatística para comentários
-        u_stat_comments, p_value_comments = self.teste_mann_whitney('num_comments', 'merged')
-        
-        # Análise estatística para participantes
-        u_stat_participants, p_value_participants = self.teste_mann_whitney('num_participants', 'merged')
-        
-        # Estatísticas descritivas - Comentários
-        merged_comments = self.df[self.df['merged'] == True]['num_comments'].describe()
-        closed_comments = self.df[self.df['merged'] == False]['num_comments'].describe()
-        
-        # Estatísticas descritivas - Participantes
-        merged_participants = self.df[self.df['merged'] == True]['num_participants'].describe()
-        closed_participants = self.df[self.df['merged'] == False]['num_participants'].describe()
-        
-        print("📊 Estatísticas Descritivas - COMENTÁRIOS:")
-        print(f"\nPRs MERGED:")
-        print(f"  • Média: {merged_comments['mean']:.2f} comentários")
-        print(f"  • Mediana: {merged_comments['50%']:.2f} comentários")
-        
-        print(f"\nPRs CLOSED:")
-        print(f"  • Média: {closed_comments['mean']:.2f} comentários")
-        print(f"  • Mediana: {closed_comments['50%']:.2f} comentários")
-        
-        print(f"\n📈 Teste Estatístico - Comentários (Mann-Whitney U):")
-        print(f"  • Estatística U: {u_stat_comments:.2f}")
-        print(f"  • P-valor: {p_value_comments:.4f}")
-        print(f"  • Interpretação: {self.interpretar_p_valor(p_value_comments)}")
-        
-        print(f"\n📊 Estatísticas Descritivas - PARTICIPANTES:")
-        print(f"\nPRs MERGED:")
-        print(f"  • Média: {merged_participants['mean']:.2f} participantes")
-        print(f"  • Mediana: {merged_participants['50%']:.2f} participantes")
-        
-        print(f"\nPRs CLOSED:")
-        print(f"  • Média: {closed_participants['mean']:.2f} participantes")
-        print(f"  • Mediana: {closed_participants['50%']:.2f} participantes")
-        
-        print(f"\n📈 Teste Estatístico - Participantes (Mann-Whitney U):")
-        print(f"  • Estatística U: {u_stat_participants:.2f}")
-        print(f"  • P-valor: {p_value_participants:.4f}")
-        print(f"  • Interpretação: {self.interpretar_p_valor(p_value_participants)}")
-        
-        # Visualização
-        fig, axes = plt.subplots(2, 2, figsize=(15, 12))
-        
-        # Boxplot - Comentários
-        self.df.boxplot(column='num_comments_sem_outliers', by='status_categoria', ax=axes[0, 0])
-        axes[0, 0].set_title('Distribuição de Comentários por Status')
-        axes[0, 0].set_xlabel('Status do PR')
-        axes[0, 0].set_ylabel('Número de Comentários')
-        plt.sca(axes[0, 0])
-        plt.xticks(rotation=0)
-        
-        # Boxplot - Participantes
-        self.df.boxplot(column='num_participants', by='status_categoria', ax=axes[0, 1])
-        axes[0, 1].set_title('Distribuição de Participantes por Status')
-        axes[0, 1].set_xlabel('Status do PR')
-        axes[0, 1].set_ylabel('Número de Participantes')
-        plt.sca(axes[0, 1])
-        plt.xticks(rotation=0)
-        
-        # Scatter plot - Comentários vs Participantes
-        for status in ['MERGED', 'CLOSED']:
-            data = self.df[self.df['status_categoria'] == status]
-            axes[1, 0].scatter(
-                data['num_comments_sem_outliers'],
-                data['num_participants'],
-                alpha=0.5,
-                label=status,
-                s=30
-            )
-        axes[1, 0].set_title('Comentários vs Participantes por Status')
-        axes[1, 0].set_xlabel('Número de Comentários')
-        axes[1, 0].set_ylabel('Número de Participantes')
-        axes[1, 0].legend()
-        
-        # Gráfico de barras por categoria de interações
-        df_interacoes = self.df.groupby(['interacoes_categoria', 'status_categoria']).size().unstack(fill_value=0)
-        df_interacoes_pct = df_interacoes.div(df_interacoes.sum(axis=1), axis=0) * 100
-        df_interacoes_pct.plot(kind='bar', ax=axes[1, 1], rot=45)
-        axes[1, 1].set_title('Proporção de Status por Nível de Interação')
-        axes[1, 1].set_xlabel('Nível de Interação')
-        axes[1, 1].set_ylabel('Porcentagem (%)')
-        axes[1, 1].legend(title='Status')
-        
-        plt.tight_layout()
-        plt.savefig(self.caminho_graficos / 'rq04_interacoes_vs_status.png', dpi=300, bbox_inches='tight')
-        plt.close()
-        
-        print(f"\n✓ Gráfico salvo: graficos/rq04_interacoes_vs_status.png")
+        with instrumentacao.span('RQ04.estatisticas', 'analise'):
+            # Análise estatística para comentários
+            u_stat_comments, p_value_comments = self.teste_mann_whitney('num_comments', 'merged')
+        
+            # Análise estatística para participantes
+            u_stat_participants, p_value_participants = self.teste_mann_whitney('num_participants', 'merged')
+        
+            # Estatísticas descritivas - Comentários
+            merged_comments = self.df[self.df['merged'] == True]['num_comments'].describe()
+            closed_comments = self.df[self.df['merged'] == False]['num_comments'].describe()
+        
+            # Estatísticas descritivas - Participantes
+            merged_participants = self.df[self.df['merged'] == True]['num_participants'].describe()
+            closed_participants = self.df[self.df['merged'] == False]['num_participants'].describe()
+        
+            print("📊 Estatísticas Descritivas - COMENTÁRIOS:")
+            print(f"\nPRs MERGED:")
+            print(f"  • Média: {merged_comments['mean']:.2f} comentários")
+            print(f"  • Mediana: {merged_comments['50%']:.2f} comentários")
+        
+            print(f"\nPRs CLOSED:")
+            print(f"  • Média: {closed_comments['mean']:.2f} comentários")
+            print(f"  • Mediana: {closed_comments['50%']:.2f} comentários")
+        
+            print(f"\n📈 Teste Estatístico - Comentários (Mann-Whitney U):")
+            print(f"  • Estatística U: {u_stat_comments:.2f}")
+            print(f"  • P-valor: {p_value_comments:.4f}")
+            print(f"  • Interpretação: {self.interpretar_p_valor(p_value_comments)}")
+        
+            print(f"\n📊 Estatísticas Descritivas - PARTICIPANTES:")
+            print(f"\nPRs MERGED:")
+            print(f"  • Média: {merged_participants['mean']:.2f} participantes")
+            print(f"  • Mediana: {merged_participants['50%']:.2f} participantes")
+        
+            print(f"\nPRs CLOSED:")
+            print(f"  • Média: {closed_participants['mean']:.2f} participantes")
+            print(f"  • Mediana: {closed_participants['50%']:.2f} participantes")
+        
+            print(f"\n📈 Teste Estatístico - Participantes (Mann-Whitney U):")
+            print(f"  • Estatística U: {u_stat_participants:.2f}")
+            print(f"  • P-valor: {p_value_participants:.4f}")
+            print(f"  • Interpretação: {self.interpretar_p_valor(p_value_participants)}")
+        
+        if self.gerar_graficos:
+            with instrumentacao.span('RQ04.grafico', 'graficos'):
+                # Visualização
+                plt, _ = _graficos()
+                dados = self.dados_grafico('num_comments_sem_outliers', 'num_participants', 'status_categoria')
+                fig, axes = plt.subplots(2, 2, figsize=(15, 12))
+        
+                # Boxplot - Comentários
+                dados.boxplot(column='num_comments_sem_outliers', by='status_categoria', ax=axes[0, 0])
+                axes[0, 0].set_title('Distribuição de Comentários por Status')
+                axes[0, 0].set_xlabel('Status do PR')
+                axes[0, 0].set_ylabel('Número de Comentários')
+                plt.sca(axes[0, 0])
+                plt.xticks(rotation=0)
+        
+                # Boxplot - Participantes
+                self.df.boxplot(column='num_participants', by='status_categoria', ax=axes[0, 1])
+                axes[0, 1].set_title('Distribuição de Participantes por Status')
+                axes[0, 1].set_xlabel('Status do PR')
+                axes[0, 1].set_ylabel('Número de Participantes')
+                plt.sca(axes[0, 1])
+                plt.xticks(rotation=0)
+        
+                # Scatter plot - Comentários vs Participantes
+                for status in ['MERGED', 'CLOSED']:
+                    data = dados[dados['status_categoria'] == status]
+                    self._dispersao(axes[1, 0], data['num_comments_sem_outliers'], data['num_participants'],
+                                    alpha=0.5, label=status, s=30)
+                axes[1, 0].set_title('Comentários vs Participantes por Status')
+                axes[1, 0].set_xlabel('Número de Comentários')
+                axes[1, 0].set_ylabel('Número de Participantes')
+                axes[1, 0].legend()
+        
+                # Gráfico de barras por categoria de interações
+                df_interacoes = self.df.groupby(['interacoes_categoria', 'status_categoria']).size().unstack(fill_value=0)
+                df_interacoes_pct = df_interacoes.div(df_interacoes.sum(axis=1), axis=0) * 100
+                df_interacoes_pct.plot(kind='bar', ax=axes[1, 1], rot=45)
+                axes[1, 1].set_title('Proporção de Status por Nível de Interação')
+                axes[1, 1].set_xlabel('Nível de Interação')
+                axes[1, 1].set_ylabel('Porcentagem (%)')
+                axes[1, 1].legend(title='Status')
+        
+                plt.tight_layout()
+                self._salvar_grafico('rq04_interacoes_vs_status')
         print()
         
         # Armazenar resultados
@@ -547,69 +879,66 @@ class AnalisadorPRs:
         """
         RQ 05: Qual a relação entre o tamanho dos PRs e o número de revisões realizadas?
         
-        Nota: Como não temos a contagem exata de revisões no dataset, vamos usar
-        o número de participantes como proxy para o número de revisões.
+        Nota: O número de revisões vem de num_reviews (plugin revisoes da coleta); em
+        datasets coletados antes dele, o número de participantes é usado como proxy.
         """
         print("=" * 80)
         print("RQ 05: TAMANHO DOS PRS vs NÚMERO DE REVISÕES")
         print("=" * 80)
         print()
         
-        # Usar num_participants como proxy para número de revisões
-        corr, p_value = self.calcular_correlacao('total_changes', 'num_participants')
-        
-        print("📊 Análise de Correlação:")
-        print(f"  • Correlação de Spearman: {corr:.4f}")
-        print(f"  • P-valor: {p_value:.4f}")
-        print(f"  • Interpretação da correlação: {self.interpretar_correlacao(corr)}")
-        print(f"  • Significância: {self.interpretar_p_valor(p_value)}")
-        
-        # Estatísticas por categoria de tamanho
-        print(f"\n📈 Média de Participantes por Categoria de Tamanho:")
-        stats_tamanho = self.df.groupby('tamanho_categoria')['num_participants'].agg(['mean', 'median', 'std'])
-        for idx, row in stats_tamanho.iterrows():
-            print(f"  • {idx}: média={row['mean']:.2f}, mediana={row['median']:.2f}")
-        
-        # Visualização
-        fig, axes = plt.subplots(1, 2, figsize=(15, 6))
-        
-        # Scatter plot
-        axes[0].scatter(
-            self.df['total_changes_sem_outliers'],
-            self.df['num_participants'],
-            alpha=0.5,
-            s=30
-        )
-        axes[0].set_title('Tamanho do PR vs Número de Participantes')
-        axes[0].set_xlabel('Total de Mudanças (linhas)')
-        axes[0].set_ylabel('Número de Participantes')
-        
-        # Adicionar linha de tendência
-        z = np.polyfit(self.df['total_changes_sem_outliers'].dropna(), 
-                       self.df['num_participants'].dropna(), 1)
-        p = np.poly1d(z)
-        axes[0].plot(
-            sorted(self.df['total_changes_sem_outliers'].dropna()),
-            p(sorted(self.df['total_changes_sem_outliers'].dropna())),
-            "r--",
-            alpha=0.8,
-            label=f'Tendência (ρ={corr:.3f})'
-        )
-        axes[0].legend()
-        
-        # Boxplot por categoria
-        self.df.boxplot(column='num_participants', by='tamanho_categoria', ax=axes[1])
-        axes[1].set_title('Número de Participantes por Categoria de Tamanho')
-        axes[1].set_xlabel('Categoria de Tamanho do PR')
-        axes[1].set_ylabel('Número de Participantes')
-        plt.sca(axes[1])
-        plt.xticks(rotation=45)
-        
-        plt.tight_layout()
-        plt.savefig(self.caminho_graficos / 'rq05_tamanho_vs_revisoes.png', dpi=300, bbox_inches='tight')
-        plt.close()
-        
-        print(f"\n✓ Gráfico salvo: graficos/rq05_tamanho_vs_revisoes.png")
+        with instrumentacao.span('RQ05.estatisticas', 'analise'):
+            # Número de revisões (num_participants como proxy em datasets sem num_reviews)
+            corr, p_value = self.calcular_correlacao('total_changes', self.coluna_revisoes)
+        
+            print("📊 Análise de Correlação:")
+            print(f"  • Correlação de Spearman: {corr:.4f}")
+            print(f"  • P-valor: {p_value:.4f}")
+            print(f"  • Interpretação da correlação: {self.interpretar_correlacao(corr)}")
+            print(f"  • Significância: {self.interpretar_p_valor(p_value)}")
+        
+            # Estatísticas por categoria de tamanho
+            print(f"\n📈 Média de {self.rotulo_revisoes} por Categoria de Tamanho:")
+            stats_tamanho = self.df.groupby('tamanho_categoria')[self.coluna_revisoes].agg(['mean', 'median', 'std'])
+            for idx, row in stats_tamanho.iterrows():
+                print(f"  • {idx}: média={row['mean']:.2f}, mediana={row['median']:.2f}")
+        
+        if self.gerar_graficos:
+            with instrumentacao.span('RQ05.grafico', 'graficos'):
+                # Visualização
+                plt, _ = _graficos()
+                dados = self.dados_grafico('total_changes_sem_outliers', self.coluna_revisoes).dropna()
+                fig, axes = plt.subplots(1, 2, figsize=(15, 6))
+        
+                # Scatter plot
+                self._dispersao(axes[0], dados['total_changes_sem_outliers'], dados[self.coluna_revisoes], alpha=0.5, s=30)
+                axes[0].set_title(f'Tamanho do PR vs Número de {self.rotulo_revisoes}')
+                axes[0].set_xlabel('Total de Mudanças (linhas)')
+                axes[0].set_ylabel(f'Número de {self.rotulo_revisoes}')
+        
+                # Adicionar linha de tendência
+                z = np.polyfit(dados['total_changes_sem_outliers'], dados[self.coluna_revisoes], 1)
+                p = np.poly1d(z)
+                extremos = np.array([dados['total_changes_sem_outliers'].min(), dados['total_changes_sem_outliers'].max()])
+                axes[0].plot(
+                    extremos,
+                    p(extremos),
+                    "r--",
+                    alpha=0.8,
+                    label=f'Tendência (ρ={corr:.3f})'
+                )
+                axes[0].legend()
+        
+                # Boxplot por categoria
+                self.df.boxplot(column=self.coluna_revisoes, by='tamanho_categoria', ax=axes[1])
+                axes[1].set_title(f'Número de {self.rotulo_revisoes} por Categoria de Tamanho')
+                axes[1].set_xlabel('Categoria de Tamanho do PR')
+                axes[1].set_ylabel(f'Número de {self.rotulo_revisoes}')
+                plt.sca(axes[1])
+                plt.xticks(rotation=45)
+        
+                plt.tight_layout()
+                self._salvar_grafico('rq05_tamanho_vs_revisoes')
         print()
         
         # Armazenar resultados
@@ -630,61 +959,58 @@ class AnalisadorPRs:
         print("=" * 80)
         print()
         
-        # Usar num_participants como proxy para número de revisões
-        corr, p_value = self.calcular_correlacao('time_analysis_hours', 'num_participants')
-        
-        print("📊 Análise de Correlação:")
-        print(f"  • Correlação de Spearman: {corr:.4f}")
-        print(f"  • P-valor: {p_value:.4f}")
-        print(f"  • Interpretação da correlação: {self.interpretar_correlacao(corr)}")
-        print(f"  • Significância: {self.interpretar_p_valor(p_value)}")
-        
-        # Estatísticas por categoria de tempo
-        print(f"\n📈 Média de Participantes por Categoria de Tempo:")
-        stats_tempo = self.df.groupby('tempo_categoria')['num_participants'].agg(['mean', 'median', 'std'])
-        for idx, row in stats_tempo.iterrows():
-            print(f"  • {idx}: média={row['mean']:.2f}, mediana={row['median']:.2f}")
-        
-        # Visualização
-        fig, axes = plt.subplots(1, 2, figsize=(15, 6))
-        
-        # Scatter plot
-        axes[0].scatter(
-            self.df['time_analysis_hours_sem_outliers'],
-            self.df['num_participants'],
-            alpha=0.5,
-            s=30
-        )
-        axes[0].set_title('Tempo de Análise vs Número de Participantes')
-        axes[0].set_xlabel('Tempo de Análise (horas)')
-        axes[0].set_ylabel('Número de Participantes')
-        
-        # Adicionar linha de tendência
-        z = np.polyfit(self.df['time_analysis_hours_sem_outliers'].dropna(), 
-                       self.df['num_participants'].dropna(), 1)
-        p = np.poly1d(z)
-        axes[0].plot(
-            sorted(self.df['time_analysis_hours_sem_outliers'].dropna()),
-            p(sorted(self.df['time_analysis_hours_sem_outliers'].dropna())),
-            "r--",
-            alpha=0.8,
-            label=f'Tendência (ρ={corr:.3f})'
-        )
-        axes[0].legend()
-        
-        # Boxplot por categoria
-        self.df.boxplot(column='num_participants', by='tempo_categoria', ax=axes[1])
-        axes[1].set_title('Número de Participantes por Categoria de Tempo')
-        axes[1].set_xlabel('Categoria de Tempo de Análise')
-        axes[1].set_ylabel('Número de Participantes')
-        plt.sca(axes[1])
-        plt.xticks(rotation=45)
-        
-        plt.tight_layout()
-        plt.savefig(self.caminho_graficos / 'rq06_tempo_vs_revisoes.png', dpi=300, bbox_inches='tight')
-        plt.close()
-        
-        print(f"\n✓ Gráfico salvo: graficos/rq06_tempo_vs_revisoes.png")
+        with instrumentacao.span('RQ06.estatisticas', 'analise'):
+            # Número de revisões (num_participants como proxy em datasets sem num_reviews)
+            corr, p_value = self.calcular_correlacao('time_analysis_hours', self.coluna_revisoes)
+        
+            print("📊 Análise de Correlação:")
+            print(f"  • Correlação de Spearman: {corr:.4f}")
+            print(f"  • P-valor: {p_value:.4f}")
+            print(f"  • Interpretação da correlação: {self.interpretar_correlacao(corr)}")
+            print(f"  • Significância: {self.interpretar_p_valor(p_value)}")
+        
+            # Estatísticas por categoria de tempo
+            print(f"\n📈 Média de {self.rotulo_revisoes} por Categoria de Tempo:")
+            stats_tempo = self.df.groupby('tempo_categoria')[self.coluna_revisoes].agg(['mean', 'median', 'std'])
+            for idx, row in stats_tempo.iterrows():
+                print(f"  • {idx}: média={row['mean']:.2f}, mediana={row['median']:.2f}")
+        
+        if self.gerar_graficos:
+            with instrumentacao.span('RQ06.grafico', 'graficos'):
+                # Visualização
+                plt, _ = _graficos()
+                dados = self.dados_grafico('time_analysis_hours_sem_outliers', self.coluna_revisoes).dropna()
+                fig, axes = plt.subplots(1, 2, figsize=(15, 6))
+        
+                # Scatter plot
+                self._dispersao(axes[0], dados['time_analysis_hours_sem_outliers'], dados[self.coluna_revisoes], alpha=0.5, s=30)
+                axes[0].set_title(f'Tempo de Análise vs Número de {self.rotulo_revisoes}')
+                axes[0].set_xlabel('Tempo de Análise (horas)')
+                axes[0].set_ylabel(f'Número de {self.rotulo_revisoes}')
+        
+                # Adicionar linha de tendência
+                z = np.polyfit(dados['time_analysis_hours_sem_outliers'], dados[self.coluna_revisoes], 1)
+                p = np.poly1d(z)
+                extremos = np.array([dados['time_analysis_hours_sem_outliers'].min(), dados['time_analysis_hours_sem_outliers'].max()])
+                axes[0].plot(
+                    extremos,
+                    p(extremos),
+                    "r--",
+                    alpha=0.8,
+                    label=f'Tendência (ρ={corr:.3f})'
+                )
+                axes[0].legend()
+        
+                # Boxplot por categoria
+                self.df.boxplot(column=self.coluna_revisoes, by='tempo_categoria', ax=axes[1])
+                axes[1].set_title(f'Número de {self.rotulo_revisoes} por Categoria de Tempo')
+                axes[1].set_xlabel('Categoria de Tempo de Análise')
+                axes[1].set_ylabel(f'Número de {self.rotulo_revisoes}')
+                plt.sca(axes[1])
+                plt.xticks(rotation=45)
+        
+                plt.tight_layout()
+                self._salvar_grafico('rq06_tempo_vs_revisoes')
         print()
         
         # Armazenar resultados
@@ -705,61 +1031,58 @@ class AnalisadorPRs:
         print("=" * 80)
         print()
         
-        # Usar num_participants como proxy para número de revisões
-        corr, p_value = self.calcular_correlacao('description_chars', 'num_participants')
-        
-        print("📊 Análise de Correlação:")
-        print(f"  • Correlação de Spearman: {corr:.4f}")
-        print(f"  • P-valor: {p_value:.4f}")
-        print(f"  • Interpretação da correlação: {self.interpretar_correlacao(corr)}")
-        print(f"  • Significância: {self.interpretar_p_valor(p_value)}")
-        
-        # Estatísticas por categoria de descrição
-        print(f"\n📈 Média de Participantes por Categoria de Descrição:")
-        stats_desc = self.df.groupby('descricao_categoria')['num_participants'].agg(['mean', 'median', 'std'])
-        for idx, row in stats_desc.iterrows():
-            print(f"  • {idx}: média={row['mean']:.2f}, mediana={row['median']:.2f}")
-        
-        # Visualização
-        fig, axes = plt.subplots(1, 2, figsize=(15, 6))
-        
-        # Scatter plot
-        axes[0].scatter(
-            self.df['description_chars_sem_outliers'],
-            self.df['num_participants'],
-            alpha=0.5,
-            s=30
-        )
-        axes[0].set_title('Tamanho da Descrição vs Número de Participantes')
-        axes[0].set_xlabel('Tamanho da Descrição (caracteres)')
-        axes[0].set_ylabel('Número de Participantes')
-        
-        # Adicionar linha de tendência
-        z = np.polyfit(self.df['description_chars_sem_outliers'].dropna(), 
-                       self.df['num_participants'].dropna(), 1)
-        p = np.poly1d(z)
-        axes[0].plot(
-            sorted(self.df['description_chars_sem_outliers'].dropna()),
-            p(sorted(self.df['description_chars_sem_outliers'].dropna())),
-            "r--",
-            alpha=0.8,
-            label=f'Tendência (ρ={corr:.3f})'
-        )
-        axes[0].legend()
-        
-        # Boxplot por categoria
-        self.df.boxplot(column='num_participants', by='descricao_categoria', ax=axes[1])
-        axes[1].set_title('Número de Participantes por Categoria de Descrição')
-        axes[1].set_xlabel('Categoria de Descrição')
-        axes[1].set_ylabel('Número de Participantes')
-        plt.sca(axes[1])
-        plt.xticks(rotation=45)
-        
-        plt.tight_layout()
-        plt.savefig(self.caminho_graficos / 'rq07_descricao_vs_revisoes.png', dpi=300, bbox_inches='tight')
-        plt.close()
-        
-        print(f"\n✓ Gráfico salvo: graficos/rq07_descricao_vs_revisoes.png")
+        with instrumentacao.span('RQ07.estatisticas', 'analise'):
+            # Número de revisões (num_participants como proxy em datasets sem num_reviews)
+            corr, p_value = self.calcular_correlacao('description_chars', self.coluna_revisoes)
+        
+            print("📊 Análise de Correlação:")
+            print(f"  • Correlação de Spearman: {corr:.4f}")
+            print(f"  • P-valor: {p_value:.4f}")
+            print(f"  • Interpretação da correlação: {self.interpretar_correlacao(corr)}")
+            print(f"  • Significância: {self.interpretar_p_valor(p_value)}")
+        
+            # Estatísticas por categoria de descrição
+            print(f"\n📈 Média de {self.rotulo_revisoes} por Categoria de Descrição:")
+            stats_desc = self.df.groupby('descricao_categoria')[self.coluna_revisoes].agg(['mean', 'median', 'std'])
+            for idx, row in stats_desc.iterrows():
+                print(f"  • {idx}: média={row['mean']:.2f}, mediana={row['median']:.2f}")
+        
+        if self.gerar_graficos:
+            with instrumentacao.span('RQ07.grafico', 'graficos'):
+                # Visualização
+                plt, _ = _graficos()
+                dados = self.dados_grafico('description_chars_sem_outliers', self.coluna_revisoes).dropna()
+                fig, axes = plt.subplots(1, 2, figsize=(15, 6))
+        
+                # Scatter plot
+                self._dispersao(axes[0], dados['description_chars_sem_outliers'], dados[self.coluna_revisoes], alpha=0.5, s=30)
+                axes[0].set_title(f'Tamanho da Descrição vs Número de {self.rotulo_revisoes}')
+                axes[0].set_xlabel('Tamanho da Descrição (caracteres)')
+                axes[0].set_ylabel(f'Número de {self.rotulo_revisoes}')
+        
+                # Adicionar linha de tendência
+                z = np.polyfit(dados['description_chars_sem_outliers'], dados[self.coluna_revisoes], 1)
+                p = np.poly1d(z)
+                extremos = np.array([dados['description_chars_sem_outliers'].min(), dados['description_chars_sem_outliers'].max()])
+                axes[0].plot(
+                    extremos,
+                    p(extremos),
+                    "r--",
+                    alpha=0.8,
+                    label=f'Tendência (ρ={corr:.3f})'
+                )
+                axes[0].legend()
+        
+                # Boxplot por categoria
+                self.df.boxplot(column=self.coluna_revisoes, by='descricao_categoria', ax=axes[1])
+                axes[1].set_title(f'Número de {self.rotulo_revisoes} por Categoria de Descrição')
+                axes[1].set_xlabel('Categoria de Descrição')
+                axes[1].set_ylabel(f'Número de {self.rotulo_revisoes}')
+                plt.sca(axes[1])
+                plt.xticks(rotation=45)
+        
+                plt.tight_layout()
+                self._salvar_grafico('rq07_descricao_vs_revisoes')
         print()
         
         # Armazenar resultados
@@ -780,61 +1103,58 @@ class AnalisadorPRs:
         print("=" * 80)
         print()
         
-        # Correlação entre comentários e participantes
-        corr, p_value = self.calcular_correlacao('num_comments', 'num_participants')
-        
-        print("📊 Análise de Correlação:")
-        print(f"  • Correlação de Spearman: {corr:.4f}")
-        print(f"  • P-valor: {p_value:.4f}")
-        print(f"  • Interpretação da correlação: {self.interpretar_correlacao(corr)}")
-        print(f"  • Significância: {self.interpretar_p_valor(p_value)}")
-        
-        # Estatísticas por categoria de interações
-        print(f"\n📈 Média de Participantes por Categoria de Interações:")
-        stats_inter = self.df.groupby('interacoes_categoria')['num_participants'].agg(['mean', 'median', 'std'])
-        for idx, row in stats_inter.iterrows():
-            print(f"  • {idx}: média={row['mean']:.2f}, mediana={row['median']:.2f}")
-        
-        # Visualização
-        fig, axes = plt.subplots(1, 2, figsize=(15, 6))
-        
-        # Scatter plot
-        axes[0].scatter(
-            self.df['num_comments_sem_outliers'],
-            self.df['num_participants'],
-            alpha=0.5,
-            s=30
-        )
-        axes[0].set_title('Número de Comentários vs Número de Participantes')
-        axes[0].set_xlabel('Número de Comentários')
-        axes[0].set_ylabel('Número de Participantes')
-        
-        # Adicionar linha de tendência
-        z = np.polyfit(self.df['num_comments_sem_outliers'].dropna(), 
-                       self.df['num_participants'].dropna(), 1)
-        p = np.poly1d(z)
-        axes[0].plot(
-            sorted(self.df['num_comments_sem_outliers'].dropna()),
-            p(sorted(self.df['num_comments_sem_outliers'].dropna())),
-            "r--",
-            alpha=0.8,
-            label=f'Tendência (ρ={corr:.3f})'
-        )
-        axes[0].legend()
-        
-        # Boxplot por categoria
-        self.df.boxplot(column='num_participants', by='interacoes_categoria', ax=axes[1])
-        axes[1].set_title('Número de Participantes por Categoria de Interações')
-        axes[1].set_xlabel('Categoria de Interações')
-        axes[1].set_ylabel('Número de Participantes')
-        plt.sca(axes[1])
-        plt.xticks(rotation=45)
-        
-        plt.tight_layout()
-        plt.savefig(self.caminho_graficos / 'rq08_interacoes_vs_revisoes.png', dpi=300, bbox_inches='tight')
-        plt.close()
-        
-        print(f"\n✓ Gráfico salvo: graficos/rq08_interacoes_vs_revisoes.png")
+        with instrumentacao.span('RQ08.estatisticas', 'analise'):
+            # Correlação entre comentários e número de revisões
+            corr, p_value = self.calcular_correlacao('num_comments', self.coluna_revisoes)
+        
+            print("📊 Análise de Correlação:")
+            print(f"  • Correlação de Spearman: {corr:.4f}")
+            print(f"  • P-valor: {p_value:.4f}")
+            print(f"  • Interpretação da correlação: {self.interpretar_correlacao(corr)}")
+            print(f"  • Significância: {self.interpretar_p_valor(p_value)}")
+        
+            # Estatísticas por categoria de interações
+            print(f"\n📈 Média de {self.rotulo_revisoes} por Categoria de Interações:")
+            stats_inter = self.df.groupby('interacoes_categoria')[self.coluna_revisoes].agg(['mean', 'median', 'std'])
+            for idx, row in stats_inter.iterrows():
+                print(f"  • {idx}: média={row['mean']:.2f}, mediana={row['median']:.2f}")
+        
+        if self.gerar_graficos:
+            with instrumentacao.span('RQ08.grafico', 'graficos'):
+                # Visualização
+                plt, _ = _graficos()
+                dados = self.dados_grafico('num_comments_sem_outliers', self.coluna_revisoes).dropna()
+                fig, axes = plt.subplots(1, 2, figsize=(15, 6))
+        
+                # Scatter plot
+                self._dispersao(axes[0], dados['num_comments_sem_outliers'], dados[self.coluna_revisoes], alpha=0.5, s=30)
+                axes[0].set_title(f'Número de Comentários vs Número de {self.rotulo_revisoes}')
+                axes[0].set_xlabel('Número de Comentários')
+                axes[0].set_ylabel(f'Número de {self.rotulo_revisoes}')
+        
+                # Adicionar linha de tendência
+                z = np.polyfit(dados['num_comments_sem_outliers'], dados[self.coluna_revisoes], 1)
+                p = np.poly1d(z)
+                extremos = np.array([dados['num_comments_sem_outliers'].min(), dados['num_comments_sem_outliers'].max()])
+                axes[0].plot(
+                    extremos,
+                    p(extremos),
+                    "r--",
+                    alpha=0.8,
+                    label=f'Tendência (ρ={corr:.3f})'
+                )
+                axes[0].legend()
+        
+                # Boxplot por categoria
+                self.df.boxplot(column=self.coluna_revisoes, by='interacoes_categoria', ax=axes[1])
+                axes[1].set_title(f'Número de {self.rotulo_revisoes} por Categoria de Interações')
+                axes[1].set_xlabel('Categoria de Interações')
+                axes[1].set_ylabel(f'Número de {self.rotulo_revisoes}')
+                plt.sca(axes[1])
+                plt.xticks(rotation=45)
+        
+                plt.tight_layout()
+                self._salvar_grafico('rq08_interacoes_vs_revisoes')
         print()
         
         # Armazenar resultados
@@ -845,323 +1165,297 @@ class AnalisadorPRs:
             'interpretacao': self.interpretar_correlacao(corr),
             'significativo': p_value < 0.05
         }
-    
-    def gerar_relatorio_final(self):
+
+    # ========================================================================
+    # INTERVALOS DE CONFIANÇA (BOOTSTRAP) E TESTES DE PERMUTAÇÃO
+    # ========================================================================
+
+    def calcular_intervalos_bootstrap(self, n_reamostragens: int = 10000, n_permutacoes: int = 10000,
+                                      nivel_confianca: float = 0.95, n_processos: Optional[int] = None,
+                                      semente: Optional[int] = 42):
         """
-        Gera um relatório final em formato Markdown com todos os resultados
+        Calcula intervalos de confiança bootstrap e p-valores de permutação para todas as RQs
+
+        Para as RQs de Mann-Whitney (merged vs closed) calcula intervalos para as medianas
+        de cada grupo e para o tamanho de efeito U1 / (n1 * n2). Para as RQs de Spearman
+        calcula o intervalo de ρ. Os resultados são adicionados em self.resultados[RQ]['bootstrap'].
+
+        Args:
+            n_reamostragens: Número de reamostragens bootstrap
+            n_permutacoes: Número de permutações aleatórias
+            nivel_confianca: Nível de confiança dos intervalos
+            n_processos: Número de processos (None usa todos os núcleos)
+            semente: Semente do gerador aleatório (para reprodutibilidade)
         """
         print("=" * 80)
-        print("GERANDO RELATÓRIO FINAL")
+        print("INTERVALOS DE CONFIANÇA (BOOTSTRAP) E TESTES DE PERMUTAÇÃO")
         print("=" * 80)
         print()
-        
-        # Criar diretório de relatórios
-        caminho_relatorio = self.caminho_base / "relatorio_sprint2.md"
-        
-        with open(caminho_relatorio, 'w', encoding='utf-8') as f:
-            # Cabeçalho
-            f.write("# Sprint 2 - Análise de Pull Requests do GitHub\n\n")
-            f.write(f"**Data da análise:** {datetime.now().strftime('%d/%m/%Y %H:%M')}\n\n")
-            f.write(f"**Dataset:** {len(self.df)} Pull Requests\n\n")
-            f.write(f"**Repositórios analisados:** {self.df['repository'].nunique()}\n\n")
-            f.write("---\n\n")
-            
-            # Sumário executivo
-            f.write("## Sumário Executivo\n\n")
-            f.write("Este relatório apresenta os resultados da análise de code review em repositórios populares do GitHub, ")
-            f.write("investigando as relações entre características dos PRs e dois outcomes principais:\n\n")
-            f.write("1. **Dimensão A:** Feedback final das revisões (PR merged ou closed)\n")
-            f.write("2. **Dimensão B:** Número de revisões realizadas (proxy: número de participantes)\n\n")
-            f.write("---\n\n")
-            
-            # Estatísticas descritivas gerais
-            f.write("## Estatísticas Descritivas Gerais\n\n")
-            
-            f.write("### Status dos PRs\n\n")
-            merged_count = len(self.df[self.df['merged'] == True])
-            closed_count = len(self.df[self.df['merged'] == False])
-            f.write(f"- **PRs Merged:** {merged_count} ({merged_count/len(self.df)*100:.1f}%)\n")
-            f.write(f"- **PRs Closed (não merged):** {closed_count} ({closed_count/len(self.df)*100:.1f}%)\n\n")
-            
-            f.write("### Métricas Gerais\n\n")
-            f.write("| Métrica | Média | Mediana | Desvio Padrão |\n")
-            f.write("|---------|-------|---------|---------------|\n")
-            
-            metricas = ['total_changes', 'time_analysis_hours', 'description_chars', 'num_comments', 'num_participants']
-            nomes = ['Mudanças (linhas)', 'Tempo (horas)', 'Descrição (chars)', 'Comentários', 'Participantes']
-            
-            for metrica, nome in zip(metricas, nomes):
-                stats = self.df[metrica].describe()
-                f.write(f"| {nome} | {stats['mean']:.2f} | {stats['50%']:.2f} | {stats['std']:.2f} |\n")
-            
-            f.write("\n---\n\n")
-            
-            # Dimensão A: Feedback Final
-            f.write("## Dimensão A: Feedback Final das Revisões\n\n")
-            
-            # RQ01
-            f.write("### RQ 01: Tamanho dos PRs vs Feedback Final\n\n")
-            rq01 = self.resultados['RQ01']
-            f.write(f"**Questão:** Qual a relação entre o tamanho dos PRs e o feedback final das revisões?\n\n")
-            f.write("**Resultados:**\n\n")
-            f.write(f"- PRs **merged** têm em média **{rq01['merged_mean']:.2f} linhas** de mudanças\n")
-            f.write(f"- PRs **closed** têm em média **{rq01['closed_mean']:.2f} linhas** de mudanças\n")
-            f.write(f"- Teste Mann-Whitney U: U={rq01['u_stat']:.2f}, p={rq01['p_value']:.4f}\n")
-            f.write(f"- **Significância:** {'✓ Significativo' if rq01['significativo'] else '✗ Não significativo'}\n\n")
-            f.write("**Interpretação:** ")
-            if rq01['significativo']:
-                if rq01['merged_mean'] < rq01['closed_mean']:
-                    f.write("PRs menores têm maior probabilidade de serem merged.\n\n")
-                else:
-                    f.write("PRs maiores têm maior probabilidade de serem merged.\n\n")
-            else:
-                f.write("Não há evidência estatística de que o tamanho influencie o status final do PR.\n\n")
-            
-            f.write(f"![RQ01](graficos/rq01_tamanho_vs_status.png)\n\n")
-            f.write("---\n\n")
-            
-            # RQ02
-            f.write("### RQ 02: Tempo de Análise vs Feedback Final\n\n")
-            rq02 = self.resultados['RQ02']
-            f.write(f"**Questão:** Qual a relação entre o tempo de análise dos PRs e o feedback final das revisões?\n\n")
-            f.write("**Resultados:**\n\n")
-            f.write(f"- PRs **merged** levam em média **{rq02['merged_mean']:.2f} horas** ({rq02['merged_mean']/24:.2f} dias)\n")
-            f.write(f"- PRs **closed** levam em média **{rq02['closed_mean']:.2f} horas** ({rq02['closed_mean']/24:.2f} dias)\n")
-            f.write(f"- Teste Mann-Whitney U: U={rq02['u_stat']:.2f}, p={rq02['p_value']:.4f}\n")
-            f.write(f"- **Significância:** {'✓ Significativo' if rq02['significativo'] else '✗ Não significativo'}\n\n")
-            f.write("**Interpretação:** ")
-            if rq02['significativo']:
-                if rq02['merged_mean'] < rq02['closed_mean']:
-                    f.write("PRs que são merged tendem a ser analisados mais rapidamente.\n\n")
-                else:
-                    f.write("PRs que são merged tendem a levar mais tempo para serem analisados.\n\n")
-            else:
-                f.write("Não há evidência estatística de que o tempo de análise influencie o status final do PR.\n\n")
-            
-            f.write(f"![RQ02](graficos/rq02_tempo_vs_status.png)\n\n")
-            f.write("---\n\n")
-            
-            # RQ03
-            f.write("### RQ 03: Descrição dos PRs vs Feedback Final\n\n")
-            rq03 = self.resultados['RQ03']
-            f.write(f"**Questão:** Qual a relação entre a descrição dos PRs e o feedback final das revisões?\n\n")
-            f.write("**Resultados:**\n\n")
-            f.write(f"- PRs **merged** têm em média **{rq03['merged_mean']:.2f} caracteres** na descrição\n")
-            f.write(f"- PRs **closed** têm em média **{rq03['closed_mean']:.2f} caracteres** na descrição\n")
-            f.write(f"- Teste Mann-Whitney U: U={rq03['u_stat']:.2f}, p={rq03['p_value']:.4f}\n")
-            f.write(f"- **Significância:** {'✓ Significativo' if rq03['significativo'] else '✗ Não significativo'}\n\n")
-            f.write("**Interpretação:** ")
-            if rq03['significativo']:
-                if rq03['merged_mean'] > rq03['closed_mean']:
-                    f.write("Descrições mais detalhadas estão associadas a maior probabilidade de merge.\n\n")
-                else:
-                    f.write("Descrições mais curtas estão associadas a maior probabilidade de merge.\n\n")
-            else:
-                f.write("Não há evidência estatística de que o tamanho da descrição influencie o status final do PR.\n\n")
-            
-            f.write(f"![RQ03](graficos/rq03_descricao_vs_status.png)\n\n")
-            f.write("---\n\n")
-            
-            # RQ04
-            f.write("### RQ 04: Interações nos PRs vs Feedback Final\n\n")
-            rq04 = self.resultados['RQ04']
-            f.write(f"**Questão:** Qual a relação entre as interações nos PRs e o feedback final das revisões?\n\n")
-            f.write("**Resultados - Comentários:**\n\n")
-            f.write(f"- PRs **merged** têm em média **{rq04['merged_mean_comments']:.2f} comentários**\n")
-            f.write(f"- PRs **closed** têm em média **{rq04['closed_mean_comments']:.2f} comentários**\n")
-            f.write(f"- Teste Mann-Whitney U: U={rq04['u_stat_comments']:.2f}, p={rq04['p_value_comments']:.4f}\n")
-            f.write(f"- **Significância:** {'✓ Significativo' if rq04['significativo_comments'] else '✗ Não significativo'}\n\n")
-            
-            f.write("**Resultados - Participantes:**\n\n")
-            f.write(f"- PRs **merged** têm em média **{rq04['merged_mean_participants']:.2f} participantes**\n")
-            f.write(f"- PRs **closed** têm em média **{rq04['closed_mean_participants']:.2f} participantes**\n")
-            f.write(f"- Teste Mann-Whitney U: U={rq04['u_stat_participants']:.2f}, p={rq04['p_value_participants']:.4f}\n")
-            f.write(f"- **Significância:** {'✓ Significativo' if rq04['significativo_participants'] else '✗ Não significativo'}\n\n")
-            
-            f.write("**Interpretação:** ")
-            if rq04['significativo_comments'] or rq04['significativo_participants']:
-                f.write("O nível de interação (comentários e/ou participantes) influencia o status final do PR.\n\n")
-            else:
-                f.write("Não há evidência estatística de que o nível de interação influencie o status final do PR.\n\n")
-            
-            f.write(f"![RQ04](graficos/rq04_interacoes_vs_status.png)\n\n")
-            f.write("---\n\n")
-            
-            # Dimensão B: Número de Revisões
-            f.write("## Dimensão B: Número de Revisões Realizadas\n\n")
-            f.write("*Nota: O número de participantes é usado como proxy para o número de revisões.*\n\n")
-            
-            # RQ05
-            f.write("### RQ 05: Tamanho dos PRs vs Número de Revisões\n\n")
-            rq05 = self.resultados['RQ05']
-            f.write(f"**Questão:** Qual a relação entre o tamanho dos PRs e o número de revisões realizadas?\n\n")
-            f.write("**Resultados:**\n\n")
-            f.write(f"- Correlação de Spearman: ρ={rq05['correlacao']:.4f}\n")
-            f.write(f"- P-valor: p={rq05['p_value']:.4f}\n")
-            f.write(f"- Interpretação: Correlação {rq05['interpretacao']}\n")
-            f.write(f"- **Significância:** {'✓ Significativo' if rq05['significativo'] else '✗ Não significativo'}\n\n")
-            f.write("**Interpretação:** ")
-            if rq05['significativo']:
-                if rq05['correlacao'] > 0:
-                    f.write("PRs maiores tendem a ter mais revisores participando.\n\n")
-                else:
-                    f.write("PRs menores tendem a ter mais revisores participando.\n\n")
-            else:
-                f.write("Não há evidência estatística de correlação entre o tamanho do PR e o número de revisões.\n\n")
-            
-            f.write(f"![RQ05](graficos/rq05_tamanho_vs_revisoes.png)\n\n")
-            f.write("---\n\n")
-            
-            # RQ06
-            f.write("### RQ 06: Tempo de Análise vs Número de Revisões\n\n")
-            rq06 = self.resultados['RQ06']
-            f.write(f"**Questão:** Qual a relação entre o tempo de análise dos PRs e o número de revisões realizadas?\n\n")
-            f.write("**Resultados:**\n\n")
-            f.write(f"- Correlação de Spearman: ρ={rq06['correlacao']:.4f}\n")
-            f.write(f"- P-valor: p={rq06['p_value']:.4f}\n")
-            f.write(f"- Interpretação: Correlação {rq06['interpretacao']}\n")
-            f.write(f"- **Significância:** {'✓ Significativo' if rq06['significativo'] else '✗ Não significativo'}\n\n")
-            f.write("**Interpretação:** ")
-            if rq06['significativo']:
-                if rq06['correlacao'] > 0:
-                    f.write("PRs que levam mais tempo tendem a ter mais revisores participando.\n\n")
-                else:
-                    f.write("PRs mais rápidos tendem a ter mais revisores participando.\n\n")
-            else:
-                f.write("Não há evidência estatística de correlação entre o tempo de análise e o número de revisões.\n\n")
-            
-            f.write(f"![RQ06](graficos/rq06_tempo_vs_revisoes.png)\n\n")
-            f.write("---\n\n")
-            
-            # RQ07
-            f.write("### RQ 07: Descrição dos PRs vs Número de Revisões\n\n")
-            rq07 = self.resultados['RQ07']
-            f.write(f"**Questão:** Qual a relação entre a descrição dos PRs e o número de revisões realizadas?\n\n")
-            f.write("**Resultados:**\n\n")
-            f.write(f"- Correlação de Spearman: ρ={rq07['correlacao']:.4f}\n")
-            f.write(f"- P-valor: p={rq07['p_value']:.4f}\n")
-            f.write(f"- Interpretação: Correlação {rq07['interpretacao']}\n")
-            f.write(f"- **Significância:** {'✓ Significativo' if rq07['significativo'] else '✗ Não significativo'}\n\n")
-            f.write("**Interpretação:** ")
-            if rq07['significativo']:
-                if rq07['correlacao'] > 0:
-                    f.write("PRs com descrições mais detalhadas tendem a ter mais revisores participando.\n\n")
+
+        opcoes = {'n_processos': n_processos, 'semente': semente}
+
+        for rq, testes in self.TESTES_RQ.items():
+            if rq not in self.resultados:
+                continue
+
+            self.resultados[rq]['bootstrap'] = {}
+
+            for teste, variavel, comparacao in testes:
+                if teste == 'mann_whitney':
+                    merged = self.df[self.df[comparacao] == True][variavel].dropna()
+                    closed = self.df[self.df[comparacao] == False][variavel].dropna()
+
+                    if len(merged) < 3 or len(closed) < 3:
+                        continue
+
+                    ic = reamostragem.bootstrap_mann_whitney(
+                        merged, closed, n_reamostragens, nivel_confianca, **opcoes)
+                    perm = reamostragem.permutacao_mann_whitney(
+                        merged, closed, n_permutacoes, **opcoes)
+
+                    resultado = {
+                        'teste': teste,
+                        'mediana_merged': ic['mediana_grupo1'],
+                        'mediana_merged_ic': ic['mediana_grupo1_ic'],
+                        'mediana_closed': ic['mediana_grupo2'],
+                        'mediana_closed_ic': ic['mediana_grupo2_ic'],
+                        'efeito_u': ic['efeito_u'],
+                        'efeito_u_ic': ic['efeito_u_ic'],
+                    }
+
+                    print(f"{rq} - {variavel}:")
+                    print(f"  • Mediana MERGED: {ic['mediana_grupo1']:.2f} "
+                          f"[{ic['mediana_grupo1_ic'][0]:.2f}; {ic['mediana_grupo1_ic'][1]:.2f}]")
+                    print(f"  • Mediana CLOSED: {ic['mediana_grupo2']:.2f} "
+                          f"[{ic['mediana_grupo2_ic'][0]:.2f}; {ic['mediana_grupo2_ic'][1]:.2f}]")
+                    print(f"  • Efeito U (P[merged > closed]): {ic['efeito_u']:.4f} "
+                          f"[{ic['efeito_u_ic'][0]:.4f}; {ic['efeito_u_ic'][1]:.4f}]")
                 else:
-                    f.write("PRs com descrições mais curtas tendem a ter mais revisores participando.\n\n")
+                    dados = self.df[[variavel, comparacao]].dropna()
+
+                    if len(dados) < 3:
+                        continue
+
+                    ic = reamostragem.bootstrap_spearman(
+                        dados[variavel], dados[comparacao], n_reamostragens, nivel_confianca, **opcoes)
+                    perm = reamostragem.permutacao_spearman(
+                        dados[variavel], dados[comparacao], n_permutacoes, **opcoes)
+
+                    resultado = {
+                        'teste': teste,
+                        'comparacao': comparacao,
+                        'rho_ic': ic['rho_ic'],
+                    }
+
+                    print(f"{rq} - {variavel} vs {comparacao}:")
+                    print(f"  • IC de ρ: [{ic['rho_ic'][0]:.4f}; {ic['rho_ic'][1]:.4f}]")
+
+                resultado.update({
+                    'p_value_permutacao': perm['p_valor'],
+                    'permutacao_exata': perm['exato'],
+                    'n_permutacoes': perm['n_permutacoes'],
+                    'n_reamostragens': n_reamostragens,
+                    'nivel_confianca': nivel_confianca,
+                })
+                self.resultados[rq]['bootstrap'][variavel] = resultado
+
+                tipo = "exato" if perm['exato'] else f"{perm['n_permutacoes']} permutações"
+                print(f"  • P-valor de permutação: {perm['p_valor']:.4f} ({tipo})")
+
+        print()
+
+    # ========================================================================
+    # ANÁLISE ESTRATIFICADA POR REPOSITÓRIO
+    # ========================================================================
+
+    def executar_analise_estratificada(self, coluna_grupo: str = 'repository',
+                                       n_processos: Optional[int] = None):
+        """
+        Calcula os testes de cada RQ separadamente por repositório e agrega os resultados
+
+        Evita que poucos repositórios muito grandes dominem o resultado agregado.
+        Os resultados são adicionados em self.resultados[RQ]['estratificado'].
+
+        Args:
+            coluna_grupo: Coluna que define os estratos
+            n_processos: Número de processos (None usa todos os núcleos)
+        """
+        print("=" * 80)
+        print("ANÁLISE ESTRATIFICADA POR REPOSITÓRIO")
+        print("=" * 80)
+        print()
+
+        testes = [(rq, teste) for rq, lista in self.TESTES_RQ.items() for teste in lista]
+        import estratificacao
+
+        por_grupo = estratificacao.calcular_por_grupo(
+            self.df, coluna_grupo, [teste for _, teste in testes], n_processos=n_processos)
+
+        for (rq, (teste, variavel, comparacao)), resultado in zip(testes, por_grupo):
+            if teste == 'mann_whitney':
+                agregado = estratificacao.agregar_mann_whitney(resultado)
             else:
-                f.write("Não há evidência estatística de correlação entre o tamanho da descrição e o número de revisões.\n\n")
-            
-            f.write(f"![RQ07](graficos/rq07_descricao_vs_revisoes.png)\n\n")
-            f.write("---\n\n")
-            
-            # RQ08
-            f.write("### RQ 08: Interações vs Número de Revisões\n\n")
-            rq08 = self.resultados['RQ08']
-            f.write(f"**Questão:** Qual a relação entre as interações nos PRs e o número de revisões realizadas?\n\n")
-            f.write("**Resultados:**\n\n")
-            f.write(f"- Correlação de Spearman: ρ={rq08['correlacao']:.4f}\n")
-            f.write(f"- P-valor: p={rq08['p_value']:.4f}\n")
-            f.write(f"- Interpretação: Correlação {rq08['interpretacao']}\n")
-            f.write(f"- **Significância:** {'✓ Significativo' if rq08['significativo'] else '✗ Não significativo'}\n\n")
-            f.write("**Interpretação:** ")
-            if rq08['significativo']:
-                if rq08['correlacao'] > 0:
-                    f.write("PRs com mais comentários tendem a ter mais revisores participando (esperado).\n\n")
-                else:
-                    f.write("PRs com menos comentários tendem a ter mais revisores participando (contra-intuitivo).\n\n")
+                agregado = estratificacao.agregar_spearman(resultado)
+
+            agregado['teste'] = teste
+            self.resultados.setdefault(rq, {}).setdefault('estratificado', {})[variavel] = agregado
+
+            print(f"{rq} - {variavel}: {agregado['n_grupos_validos']}/{agregado['n_grupos']} repositórios válidos")
+
+            if not agregado['n_grupos_validos']:
+                continue
+
+            if teste == 'mann_whitney':
+                print(f"  • Efeito U médio: {agregado['efeito_u_medio']:.4f}")
+                print(f"  • van Elteren: z={agregado['z']:.2f}, p={agregado['p_value']:.4f}")
             else:
-                f.write("Não há evidência estatística de correlação entre comentários e participantes.\n\n")
-            
-            f.write(f"![RQ08](graficos/rq08_interacoes_vs_revisoes.png)\n\n")
-            f.write("---\n\n")
-            
-            # Conclusões
-            f.write("## Conclusões Gerais\n\n")
-            
-            # Contar quantas RQs foram significativas
-            sig_count = sum([
-                self.resultados[f'RQ0{i}']['significativo'] for i in range(1, 5)
-            ] + [
-                self.resultados[f'RQ0{i}']['significativo'] for i in range(5, 9)
-            ])
-            
-            f.write(f"Das 8 questões de pesquisa analisadas, **{sig_count} apresentaram resultados estatisticamente significativos** (p < 0.05).\n\n")
-            
-            f.write("### Principais Achados:\n\n")
-            f.write("**Dimensão A - Feedback Final:**\n\n")
-            
-            for i in range(1, 5):
-                rq = self.resultados[f'RQ0{i}']
-                if rq['significativo']:
-                    f.write(f"- ✓ **RQ0{i}:** {rq['titulo']} - Relação significativa encontrada\n")
-                else:
-                    f.write(f"- ✗ **RQ0{i}:** {rq['titulo']} - Sem relação significativa\n")
-            
-            f.write("\n**Dimensão B - Número de Revisões:**\n\n")
-            
-            for i in range(5, 9):
-                rq = self.resultados[f'RQ0{i}']
-                if rq['significativo']:
-                    f.write(f"- ✓ **RQ0{i}:** {rq['titulo']} - Relação significativa encontrada\n")
-                else:
-                    f.write(f"- ✗ **RQ0{i}:** {rq['titulo']} - Sem relação significativa\n")
-            
-            f.write("\n---\n\n")
-            
-            # Metodologia
-            f.write("## Metodologia\n\n")
-            f.write("### Testes Estatísticos Utilizados:\n\n")
-            f.write("1. **Teste de Mann-Whitney U:** Para comparar duas grupos independentes (PRs merged vs closed)\n")
-            f.write("   - Não paramétrico, não assume distribuição normal\n")
-            f.write("   - Apropriado para dados com outliers\n\n")
-            f.write("2. **Correlação de Spearman:** Para medir a associação entre duas variáveis contínuas\n")
-            f.write("   - Não paramétrica, baseada em ranks\n")
-            f.write("   - Detecta relações monotônicas (não apenas lineares)\n\n")
-            f.write("### Nível de Significância:\n\n")
-            f.write("- α = 0.05 (5%)\n")
-            f.write("- Resultados com p < 0.05 são considerados estatisticamente significativos\n\n")
-            f.write("### Tratamento de Outliers:\n\n")
-            f.write("- Outliers extremos foram tratados usando clipping nos percentis 1% e 99%\n")
-            f.write("- Dados originais preservados para análises robustas\n\n")
-            
-            f.write("---\n\n")
-            f.write(f"*Relatório gerado automaticamente pela Sprint 2 em {datetime.now().strftime('%d/%m/%Y às %H:%M')}*\n")
+                ic = agregado['correlacao_ic']
+                print(f"  • ρ combinado: {agregado['correlacao']:.4f} [{ic[0]:.4f}; {ic[1]:.4f}]")
+                print(f"  • P-valor: {agregado['p_value']:.4f}")
+            print(f"  • Repositórios com p < 0.05: {agregado['n_grupos_significativos']}")
+
+        print()
+
+    def gerar_relatorio_final(self, formatos: tuple = ('md',)) -> List[Path]:
+        """
+        Gera o relatório final a partir de self.resultados e self.resumo
+        
+        O relatório não acessa o DataFrame. Os resultados também são salvos em
+        resultados_sprint2.json, de onde `python relatorio.py` regenera o relatório
+        sem recarregar o dataset.
+        
+        Args:
+            formatos: Formatos do relatório ('md', 'html' e/ou 'json')
+        
+        Returns:
+            Caminhos dos relatórios gerados (vazio sem formatos)
+        """
+        print("=" * 80)
+        print("GERANDO RELATÓRIO FINAL")
+        print("=" * 80)
+        print()
+        
+        relatorio.salvar_cache(self.caminho_base / "resultados_sprint2.json", self.resultados, self.resumo,
+                               self.formato_graficos)
+        print("✓ Resultados salvos: resultados_sprint2.json")
+        
+        caminhos = []
+        for formato in formatos:
+            caminho = relatorio.gerar_relatorio(self.resultados, self.resumo,
+                                                self.caminho_base / f"relatorio_sprint2.{formato}",
+                                                formato, self.formato_graficos)
+            print(f"✓ Relatório salvo: {caminho.name}")
+            caminhos.append(caminho)
+        print()
+        return caminhos
+    
+    @contextmanager
+    def _etapa(self, nome: str):
+        """
+        Mede o tempo de uma etapa da análise (acumulado em self.tempos_etapas)
+        """
+        inicio = time.perf_counter()
+        try:
+            with instrumentacao.span(nome, 'etapa'):
+                yield
+        finally:
+            self.tempos_etapas[nome] = self.tempos_etapas.get(nome, 0.0) + time.perf_counter() - inicio
+    
+    def registrar_execucao(self) -> int:
+        """
+        Registra os resultados, os tempos das etapas e os metadados desta execução
+        em historico_resultados.sqlite, para comparação entre execuções
+        
+        Returns:
+            Identificador da execução no histórico
+        """
+        metadados = {
+            'modo': type(self).__name__,
+            'dataset': str(self.caminho_dataset),
+            'hash_dataset': historico_resultados.hash_arquivo(self.caminho_dataset),
+            'total_prs': self.resumo.get('total_prs'),
+            'merged': self.resumo.get('merged'),
+            'closed': self.resumo.get('closed'),
+            'n_repositorios': self.resumo.get('n_repositorios'),
+            'memoria_pico_mb': historico_resultados.memoria_pico_mb(),
+        }
+        execucao = historico_resultados.registrar_execucao(
+            self.caminho_base / "historico_resultados.sqlite", metadados, self.tempos_etapas, self.resultados)
         
-        print(f"✓ Relatório salvo: relatorio_sprint2.md")
+        print(f"✓ Execução {execucao} registrada em historico_resultados.sqlite")
         print()
+        return execucao
     
-    def executar_analise_completa(self):
+    def executar_analise_completa(self, bootstrap: bool = False, estratificado: bool = False,
+                                  formatos_relatorio: tuple = ('md',)):
         """
         Executa a análise completa de todas as RQs
+        
+        Args:
+            bootstrap: Se True, calcula intervalos bootstrap e testes de permutação
+                (opcional: com 10 mil reamostragens, leva minutos por teste em datasets grandes)
+            estratificado: Se True, também calcula os testes por repositório
+            formatos_relatorio: Formatos do relatório (vazio: só salva resultados_sprint2.json)
         """
+        self.tempos_etapas = {}
+        
         # Carregar dados
-        if not self.carregar_dados():
-            return False
+        with self._etapa('carregar_dados'):
+            if not self.carregar_dados():
+                return False
         
         # Preparar dados
-        self.preparar_dados()
+        with self._etapa('preparar_dados'):
+            self.preparar_dados()
         
         # Dimensão A: Feedback Final
-        self.rq01_tamanho_vs_status()
-        self.rq02_tempo_vs_status()
-        self.rq03_descricao_vs_status()
-        self.rq04_interacoes_vs_status()
+        with self._etapa('RQ01'):
+            self.rq01_tamanho_vs_status()
+        with self._etapa('RQ02'):
+            self.rq02_tempo_vs_status()
+        with self._etapa('RQ03'):
+            self.rq03_descricao_vs_status()
+        with self._etapa('RQ04'):
+            self.rq04_interacoes_vs_status()
         
         # Dimensão B: Número de Revisões
-        self.rq05_tamanho_vs_revisoes()
-        self.rq06_tempo_vs_revisoes()
-        self.rq07_descricao_vs_revisoes()
-        self.rq08_interacoes_vs_revisoes()
+        with self._etapa('RQ05'):
+            self.rq05_tamanho_vs_revisoes()
+        with self._etapa('RQ06'):
+            self.rq06_tempo_vs_revisoes()
+        with self._etapa('RQ07'):
+            self.rq07_descricao_vs_revisoes()
+        with self._etapa('RQ08'):
+            self.rq08_interacoes_vs_revisoes()
+        self.anexar_aproximacoes()
+        
+        # Intervalos de confiança e testes de permutação
+        if bootstrap:
+            with self._etapa('bootstrap'):
+                self.calcular_intervalos_bootstrap()
+        
+        # Análise estratificada por repositório
+        if estratificado:
+            with self._etapa('estratificado'):
+                self.executar_analise_estratificada()
         
         # Gerar relatório final
-        self.gerar_relatorio_final()
+        with self._etapa('relatorio'):
+            relatorios = self.gerar_relatorio_final(formatos_relatorio)
+        
+        # Registrar a execução no histórico
+        self.registrar_execucao()
         
         print("=" * 80)
         print("✓ SPRINT 2 CONCLUÍDA COM SUCESSO!")
         print("=" * 80)
         print()
-        print(f"📊 Gráficos salvos em: {self.caminho_graficos}")
-        print(f"📄 Relatório completo: relatorio_sprint2.md")
+        if self.gerar_graficos:
+            print(f"📊 Gráficos salvos em: {self.caminho_graficos}")
+        for caminho in relatorios:
+            print(f"📄 Relatório completo: {caminho.name}")
+        print(f"📄 Resultados em cache: resultados_sprint2.json (regenere com: python relatorio.py)")
+        print(f"🗄 Histórico de execuções: historico_resultados.sqlite (compare com: python historico_resultados.py comparar)")
         print()
         
         return True
@@ -1172,6 +1466,7 @@ def main():
     """
     analisador = AnalisadorPRs()
     analisador.executar_analise_completa()
+    instrumentacao.finalizar(analisador.caminho_base / "trace_sprint2.json")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,323 @@
+"""
+Histórico de execuções da análise (SQLite)
+Lab 03 - Caracterizando a atividade de code review no GitHub
+
+Cada execução registra uma linha em `execucoes` (hash e contagens do dataset,
+memória de pico, tempo total), os tempos de cada etapa em `tempos_etapas` e
+todos os valores numéricos de self.resultados em `resultados`, no formato
+(rq, chave, valor). Chaves aninhadas usam pontos, ex.:
+'bootstrap.total_changes.efeito_u_ic.0'.
+
+Uso:
+    python historico_resultados.py listar
+    python historico_resultados.py comparar [A B]
+    python historico_resultados.py tendencia --rq RQ05 --chave correlacao
+    python historico_resultados.py tendencia --etapa preparar_dados
+
+`comparar` termina com código 1 quando encontra mudança estatística ou regressão
+de desempenho, para uso na análise noturna.
+"""
+
+import argparse
+import hashlib
+import sqlite3
+import sys
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import configuracao
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS execucoes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    data TEXT NOT NULL,
+    modo TEXT,
+    dataset TEXT,
+    hash_dataset TEXT,
+    total_prs INTEGER,
+    merged INTEGER,
+    closed INTEGER,
+    n_repositorios INTEGER,
+    memoria_pico_mb REAL,
+    tempo_total_s REAL
+);
+CREATE TABLE IF NOT EXISTS tempos_etapas (
+    execucao_id INTEGER NOT NULL REFERENCES execucoes(id),
+    etapa TEXT NOT NULL,
+    segundos REAL NOT NULL,
+    PRIMARY KEY (execucao_id, etapa)
+);
+CREATE TABLE IF NOT EXISTS resultados (
+    execucao_id INTEGER NOT NULL REFERENCES execucoes(id),
+    rq TEXT NOT NULL,
+    chave TEXT NOT NULL,
+    valor REAL NOT NULL,
+    PRIMARY KEY (execucao_id, rq, chave)
+);
+"""
+
+# Chaves de tamanho de efeito comparadas por diferença absoluta
+CHAVES_EFEITO = ('correlacao', 'efeito_u', 'efeito_u_medio')
+
+# Prefixos das chaves de p-valor (testes e permutações do bootstrap)
+CHAVES_P_VALOR = ('p_value', 'p_valor')
+
+
+def hash_arquivo(caminho: Path, tamanho_bloco: int = 1 << 20) -> str:
+    """
+    SHA-256 do arquivo, lido em blocos
+    """
+    h = hashlib.sha256()
+    with open(caminho, 'rb') as f:
+        for bloco in iter(lambda: f.read(tamanho_bloco), b''):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+def memoria_pico_mb() -> Optional[float]:
+    """
+    Pico de memória residente do processo (None onde `resource` não existe)
+    """
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss é em bytes no macOS e em KB no Linux
+    return pico / 1024 ** 2 if sys.platform == 'darwin' else pico / 1024
+
+
+def achatar(valor, prefixo: str = '') -> Iterator[Tuple[str, float]]:
+    """
+    Percorre um resultado aninhado e produz (chave, valor) para cada número
+    """
+    if isinstance(valor, dict):
+        for k, v in valor.items():
+            yield from achatar(v, f"{prefixo}.{k}" if prefixo else str(k))
+    elif isinstance(valor, (list, tuple)):
+        for i, v in enumerate(valor):
+            yield from achatar(v, f"{prefixo}.{i}")
+    elif hasattr(valor, 'item'):  # escalares do numpy
+        yield from achatar(valor.item(), prefixo)
+    elif isinstance(valor, (bool, int, float)) and valor == valor:
+        yield prefixo, float(valor)
+
+
+def conectar(caminho_banco: Path) -> sqlite3.Connection:
+    conexao = sqlite3.connect(caminho_banco)
+    conexao.executescript(ESQUEMA)
+    return conexao
+
+
+def registrar_execucao(caminho_banco: Path, metadados: Dict, tempos: Dict[str, float],
+                       resultados: Dict) -> int:
+    """
+    Registra uma execução no histórico
+
+    Args:
+        caminho_banco: Arquivo SQLite (criado se não existir)
+        metadados: Colunas da tabela execucoes (dataset, hash_dataset, total_prs...)
+        tempos: Segundos gastos em cada etapa
+        resultados: Resultados das RQs (AnalisadorPRs.resultados)
+
+    Returns:
+        Identificador da execução
+    """
+    linha = {'data': datetime.now().isoformat(timespec='seconds'),
+             'tempo_total_s': sum(tempos.values()), **metadados}
+
+    with closing(conectar(caminho_banco)) as conexao, conexao:
+        colunas = ', '.join(linha)
+        cursor = conexao.execute(f"INSERT INTO execucoes ({colunas}) VALUES ({', '.join('?' * len(linha))})",
+                                 list(linha.values()))
+        execucao = cursor.lastrowid
+        conexao.executemany("INSERT INTO tempos_etapas VALUES (?, ?, ?)",
+                            [(execucao, etapa, segundos) for etapa, segundos in tempos.items()])
+        conexao.executemany("INSERT INTO resultados VALUES (?, ?, ?, ?)",
+                            [(execucao, rq, chave, valor)
+                             for rq, resultado in resultados.items() for chave, valor in achatar(resultado)])
+    return execucao
+
+
+def _execucao(conexao: sqlite3.Connection, execucao: int) -> Dict:
+    cursor = conexao.cursor()
+    cursor.row_factory = sqlite3.Row
+    linha = cursor.execute("SELECT * FROM execucoes WHERE id = ?", (execucao,)).fetchone()
+    if linha is None:
+        raise ValueError(f"Execução {execucao} não encontrada")
+    return dict(linha)
+
+
+def comparar_execucoes(conexao: sqlite3.Connection, a: int, b: int, limite_efeito: float = 0.05,
+                       limite_media: float = 0.10, limite_tempo: float = 0.20,
+                       minimo_segundos: float = 1.0, limite_p: float = 0.01) -> Tuple[List[str], List[str]]:
+    """
+    Compara duas execuções
+
+    Resultados que só existem em uma das execuções (uma RQ ou métrica nova, o
+    bootstrap ligado ou desligado) também são alertas estatísticos.
+
+    Args:
+        limite_efeito: Diferença absoluta máxima em ρ e no efeito U
+        limite_media: Variação relativa máxima nas médias
+        limite_p: Diferença absoluta máxima nos p-valores
+        limite_tempo: Aumento relativo máximo no tempo das etapas e na memória de pico
+        minimo_segundos: Aumentos de tempo menores que isso são ignorados (ruído)
+
+    Returns:
+        (alertas estatísticos, alertas de desempenho)
+    """
+    estatisticos, desempenho = [], []
+
+    valores = {}
+    for execucao in (a, b):
+        valores[execucao] = {(rq, chave): valor for rq, chave, valor in conexao.execute(
+            "SELECT rq, chave, valor FROM resultados WHERE execucao_id = ?", (execucao,))}
+
+    for rq, chave in sorted(valores[a].keys() | valores[b].keys()):
+        antes, depois = valores[a].get((rq, chave)), valores[b].get((rq, chave))
+        if antes is None:
+            estatisticos.append(f"{rq} {chave}: novo ({depois:.4g})")
+            continue
+        if depois is None:
+            estatisticos.append(f"{rq} {chave}: removido (era {antes:.4g})")
+            continue
+        if depois == antes:
+            continue
+        nome = chave.rsplit('.', 1)[-1]
+        if nome.startswith('significativo'):
+            estado = 'significativo' if depois else 'não significativo'
+            estatisticos.append(f"{rq} {chave}: passou a ser {estado}")
+        elif nome in CHAVES_EFEITO and abs(depois - antes) > limite_efeito:
+            estatisticos.append(f"{rq} {chave}: {antes:.4f} → {depois:.4f}")
+        elif nome.startswith(CHAVES_P_VALOR) and abs(depois - antes) > limite_p:
+            estatisticos.append(f"{rq} {chave}: {antes:.4g} → {depois:.4g}")
+        elif 'mean' in nome and antes and abs(depois - antes) / abs(antes) > limite_media:
+            estatisticos.append(f"{rq} {chave}: {antes:.2f} → {depois:.2f} ({(depois / antes - 1) * 100:+.1f}%)")
+
+    tempos = {}
+    for execucao in (a, b):
+        tempos[execucao] = dict(conexao.execute(
+            "SELECT etapa, segundos FROM tempos_etapas WHERE execucao_id = ?", (execucao,)))
+
+    for etapa, antes in tempos[a].items():
+        depois = tempos[b].get(etapa)
+        if depois is not None and depois - antes > minimo_segundos and depois > antes * (1 + limite_tempo):
+            desempenho.append(f"{etapa}: {antes:.1f}s → {depois:.1f}s ({(depois / antes - 1) * 100:+.0f}%)")
+
+    memoria_a, memoria_b = _execucao(conexao, a)['memoria_pico_mb'], _execucao(conexao, b)['memoria_pico_mb']
+    if memoria_a and memoria_b and memoria_b > memoria_a * (1 + limite_tempo):
+        desempenho.append(f"memória de pico: {memoria_a:.0f} MB → {memoria_b:.0f} MB")
+
+    return estatisticos, desempenho
+
+
+# ============================================================================
+# Linha de comando
+# ============================================================================
+
+def _listar(conexao: sqlite3.Connection, args):
+    print(f"{'ID':>4}  {'Data':19}  {'Modo':20}  {'PRs':>9}  {'Hash':12}  {'Tempo (s)':>9}  {'Memória (MB)':>12}")
+    for linha in conexao.execute("SELECT id, data, modo, total_prs, hash_dataset, tempo_total_s, memoria_pico_mb "
+                                 "FROM execucoes ORDER BY id DESC LIMIT ?", (args.limite,)):
+        id_, data, modo, total, hash_, tempo, memoria = linha
+        print(f"{id_:>4}  {data:19}  {modo or '-':20}  {total or 0:>9}  {(hash_ or '-')[:12]:12}  "
+              f"{tempo or 0:>9.1f}  {memoria or 0:>12.0f}")
+
+
+def _comparar(conexao: sqlite3.Connection, args) -> int:
+    if args.execucoes:
+        a, b = args.execucoes
+    else:
+        ultimas = [linha[0] for linha in conexao.execute("SELECT id FROM execucoes ORDER BY id DESC LIMIT 2")]
+        if len(ultimas) < 2:
+            print("❌ São necessárias ao menos duas execuções no histórico")
+            return 2
+        b, a = ultimas
+
+    execucao_a, execucao_b = _execucao(conexao, a), _execucao(conexao, b)
+    print(f"Comparando execução {a} ({execucao_a['data']}) com {b} ({execucao_b['data']})")
+    if execucao_a['hash_dataset'] != execucao_b['hash_dataset']:
+        print(f"  • Dataset diferente: {execucao_a['total_prs']} → {execucao_b['total_prs']} PRs")
+    print()
+
+    estatisticos, desempenho = comparar_execucoes(conexao, a, b, args.limite_efeito, args.limite_media,
+                                                  args.limite_tempo, limite_p=args.limite_p)
+
+    print("📊 Mudanças estatísticas:")
+    for alerta in estatisticos or ["nenhuma"]:
+        print(f"  • {alerta}")
+    print("⏱ Regressões de desempenho:")
+    for alerta in desempenho or ["nenhuma"]:
+        print(f"  • {alerta}")
+
+    return 1 if estatisticos or desempenho else 0
+
+
+def _tendencia(conexao: sqlite3.Connection, args):
+    if args.etapa:
+        consulta = ("SELECT e.id, e.data, t.segundos FROM execucoes e JOIN tempos_etapas t ON t.execucao_id = e.id "
+                    "WHERE t.etapa = ? ORDER BY e.id DESC LIMIT ?")
+        parametros = (args.etapa, args.limite)
+        titulo = f"{args.etapa} (s)"
+    else:
+        consulta = ("SELECT e.id, e.data, r.valor FROM execucoes e JOIN resultados r ON r.execucao_id = e.id "
+                    "WHERE r.rq = ? AND r.chave = ? ORDER BY e.id DESC LIMIT ?")
+        parametros = (args.rq, args.chave, args.limite)
+        titulo = f"{args.rq} {args.chave}"
+
+    linhas = list(reversed(conexao.execute(consulta, parametros).fetchall()))
+    print(f"{'ID':>4}  {'Data':19}  {titulo}")
+    for id_, data, valor in linhas:
+        print(f"{id_:>4}  {data:19}  {valor:.4f}")
+
+
+def main():
+    """
+    Lista, compara e mostra a tendência das execuções registradas
+    """
+    parser = argparse.ArgumentParser(description="Histórico de execuções da análise")
+    parser.add_argument('--banco', default=str(configuracao.caminho_base() / "historico_resultados.sqlite"),
+                        help="Arquivo SQLite do histórico")
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+
+    listar = subparsers.add_parser('listar', help="Lista as execuções mais recentes")
+    listar.add_argument('--limite', type=int, default=20)
+
+    comparar = subparsers.add_parser('comparar', help="Compara duas execuções (padrão: as duas últimas)")
+    comparar.add_argument('execucoes', type=int, nargs='*', help="IDs das execuções A e B")
+    comparar.add_argument('--limite-efeito', type=float, default=0.05, help="Diferença máxima em ρ e no efeito U")
+    comparar.add_argument('--limite-media', type=float, default=0.10, help="Variação relativa máxima nas médias")
+    comparar.add_argument('--limite-p', type=float, default=0.01, help="Diferença máxima nos p-valores")
+    comparar.add_argument('--limite-tempo', type=float, default=0.20, help="Aumento relativo máximo de tempo e memória")
+
+    tendencia = subparsers.add_parser('tendencia', help="Evolução de um resultado ou etapa")
+    tendencia.add_argument('--rq', default='RQ01')
+    tendencia.add_argument('--chave', default='p_value')
+    tendencia.add_argument('--etapa', help="Mostra o tempo desta etapa em vez de um resultado")
+    tendencia.add_argument('--limite', type=int, default=20)
+
+    args = parser.parse_args()
+    if args.comando == 'comparar' and len(args.execucoes) not in (0, 2):
+        parser.error("informe os IDs de duas execuções, ou nenhum para comparar as duas últimas")
+
+    if not Path(args.banco).exists():
+        print(f"❌ Histórico {args.banco} não encontrado")
+        sys.exit(2)
+
+    with closing(conectar(args.banco)) as conexao:
+        if args.comando == 'listar':
+            _listar(conexao, args)
+        elif args.comando == 'comparar':
+            sys.exit(_comparar(conexao, args))
+        else:
+            _tendencia(conexao, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""
+Índice de identidade dos PRs (deduplicação entre repositórios, forks e execuções)
+Lab 03 - Caracterizando a atividade de code review no GitHub
+
+Um PR é identificado por (base.repo.id, number): o repositório de destino,
+que não muda quando o repositório é renomeado, e o número do PR nele. O
+repositório de um PR é base.repo.full_name; head.repo é o fork de onde o PR
+saiu (ou None, se o fork foi apagado).
+
+IndicePRs guarda os PRs nessa chave em uma tabela hash em disco (módulo dbm:
+dbm.gnu ou dbm.ndbm quando disponíveis, senão dbm.dumb), com upsert e
+consulta em O(1) sem carregar o índice em memória. A coleta registra nele
+todo PR salvo (arquivo indice_prs no diretório base), então o índice acumula
+as execuções; índices de coletas divididas (shards) são combinados em tempo
+linear, e o dataset completo é exportado do índice:
+
+    python indice_prs.py importar dataset_prs_antigo.json
+    python indice_prs.py mesclar shard1/indice_prs shard2/indice_prs
+    python indice_prs.py exportar --saida combinado/
+
+Em chaves repetidas vale o último registro: o da coleta mais recente no
+upsert, e o do índice mesclado por último em `mesclar`.
+"""
+
+import argparse
+import dbm
+import json
+import logging
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import configuracao
+import registro
+
+logger = logging.getLogger(__name__)
+
+# Arquivo do índice no diretório base (o dbm pode acrescentar extensões)
+ARQUIVO_INDICE = "indice_prs"
+
+
+def repositorio_pr(pr: Dict) -> str:
+    """
+    Repositório de destino do PR (owner/nome)
+    """
+    return ((pr.get('base') or {}).get('repo') or {}).get('full_name') or ''
+
+
+def chave_pr(pr: Dict) -> str:
+    """
+    Chave de identidade do PR: "<base.repo.id>:<number>"
+
+    PRs sem base.repo.id (registros incompletos) usam o id global do PR, também único.
+    """
+    id_repo = ((pr.get('base') or {}).get('repo') or {}).get('id')
+    if id_repo is not None and pr.get('number') is not None:
+        return f"{id_repo}:{pr['number']}"
+    return f"id:{pr.get('id')}"
+
+
+def _ordem(chave: str) -> Tuple:
+    prefixo, _, numero = chave.partition(':')
+    if prefixo == 'id':
+        return (1, numero, 0)
+    return (0, int(prefixo), int(numero))
+
+
+def deduplicar(prs: Iterable[Dict]) -> List[Dict]:
+    """
+    Remove PRs repetidos em tempo linear
+
+    Cada PR fica na posição da primeira ocorrência, com o conteúdo da última (upsert).
+    """
+    posicoes: Dict[str, int] = {}
+    resultado: List[Dict] = []
+
+    for pr in prs:
+        chave = chave_pr(pr)
+        if chave in posicoes:
+            resultado[posicoes[chave]] = pr
+        else:
+            posicoes[chave] = len(resultado)
+            resultado.append(pr)
+    return resultado
+
+
+class IndicePRs:
+    """
+    Índice em disco dos PRs por (base.repo.id, number)
+
+    Cada valor é o PR completo, como em dataset_prs.json.
+
+    Exemplo:
+        with IndicePRs(Path("indice_prs")) as indice:
+            for pr in prs:
+                indice.upsert(pr)
+            with IndicePRs(Path("shard2/indice_prs"), 'r') as outro:
+                indice.mesclar(outro)
+    """
+
+    def __init__(self, caminho: Path, modo: str = 'c'):
+        """
+        Args:
+            caminho: Arquivo do índice (sem extensão)
+            modo: Modo do dbm.open: 'r' (leitura), 'w' (existente) ou 'c' (cria se preciso)
+        """
+        self.caminho = Path(caminho)
+        self._db = dbm.open(str(self.caminho), modo)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        self.fechar()
+        return False
+
+    def fechar(self):
+        self._db.close()
+
+    def __len__(self) -> int:
+        return len(self._db)
+
+    def __contains__(self, pr: Dict) -> bool:
+        return chave_pr(pr).encode() in self._db
+
+    def obter(self, chave: str) -> Optional[Dict]:
+        valor = self._db.get(chave.encode())
+        return json.loads(valor) if valor is not None else None
+
+    def upsert(self, pr: Dict) -> bool:
+        """
+        Insere ou substitui o PR
+
+        Returns:
+            True se a chave não estava no índice
+        """
+        chave = chave_pr(pr).encode()
+        novo = chave not in self._db
+        self._db[chave] = json.dumps(pr, ensure_ascii=False, default=str).encode('utf-8')
+        return novo
+
+    def mesclar(self, outro: 'IndicePRs') -> Tuple[int, int]:
+        """
+        Copia todas as entradas de outro índice, em tempo linear no tamanho dele
+
+        Returns:
+            Tupla (chaves novas, chaves substituídas)
+        """
+        novos = 0
+        for chave in outro._db.keys():
+            novos += chave not in self._db
+            self._db[chave] = outro._db[chave]
+        return novos, len(outro) - novos
+
+    def chaves(self) -> List[str]:
+        """
+        Chaves em ordem de repositório (base.repo.id) e número do PR
+        """
+        return sorted((chave.decode() for chave in self._db.keys()), key=_ordem)
+
+    def prs(self) -> Iterator[Dict]:
+        for chave in self.chaves():
+            yield self.obter(chave)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Índice de identidade dos PRs: importação, mesclagem e exportação")
+    parser.add_argument('--indice', default=str(configuracao.caminho_base() / ARQUIVO_INDICE),
+                        help="Índice de destino (padrão: indice_prs no diretório base)")
+    sub = parser.add_subparsers(dest='comando', required=True)
+
+    p_importar = sub.add_parser('importar', help="Registra no índice os PRs de datasets JSON")
+    p_importar.add_argument('datasets', nargs='+')
+
+    p_mesclar = sub.add_parser('mesclar', help="Mescla outros índices (shards) no índice")
+    p_mesclar.add_argument('indices', nargs='+', help="Na ordem de precedência: em chaves repetidas vale o último")
+
+    p_exportar = sub.add_parser('exportar', help="Gera dataset_prs.json e dataset_prs.csv a partir do índice")
+    p_exportar.add_argument('--saida', default=str(configuracao.caminho_base()), help="Diretório de saída")
+
+    args = parser.parse_args()
+    registro.configurar_logging()
+
+    try:
+        with IndicePRs(Path(args.indice), 'r' if args.comando == 'exportar' else 'c') as indice:
+            if args.comando == 'importar':
+                for caminho in args.datasets:
+                    with open(caminho, 'r', encoding='utf-8') as f:
+                        prs = json.load(f)
+                    novos = sum(indice.upsert(pr) for pr in prs)
+                    print(f"✓ {caminho}: {novos} PRs novos, {len(prs) - novos} atualizados")
+            elif args.comando == 'mesclar':
+                for caminho in args.indices:
+                    with IndicePRs(Path(caminho), 'r') as outro:
+                        novos, substituidos = indice.mesclar(outro)
+                    print(f"✓ {caminho}: {novos} PRs novos, {substituidos} substituídos")
+            else:
+                from coletor_prs import ColetorPRs
+
+                coletor = ColetorPRs(caminho_base=Path(args.saida))
+                prs = list(indice.prs())
+                coletor.salvar_dataset_prs(prs, "dataset_prs.json")
+                coletor.salvar_prs_csv(prs, "dataset_prs.csv")
+            print(f"  Índice {args.indice}: {len(indice)} PRs")
+    except dbm.error as e:
+        parser.error(f"não foi possível abrir o índice: {e}")
+
+
+if __name__ == "__main__":
+    main()
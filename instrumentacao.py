@@ -0,0 +1,195 @@
+"""
+Instrumentação de etapas (spans) e contadores
+Lab 03 - Caracterizando a atividade de code review no GitHub
+
+Spans medem o tempo de um trecho de código:
+
+    with instrumentacao.span('RQ01.grafico', 'graficos'):
+        ...
+
+Funções inteiras podem ser decoradas com @instrumentado('nome'). Contadores
+acumulam totais (requisições, bytes, acertos de cache):
+
+    instrumentacao.contar('http.bytes', len(response.content))
+
+Desativada (padrão), span() devolve sempre o mesmo objeto vazio e contar() só
+testa uma flag, então o custo é de uma chamada de função. Para ativar, defina
+LAB3_TRACE=1 (ou chame ativar()). Ao final, finalizar() grava os spans no
+formato Chrome trace (abra em chrome://tracing ou https://ui.perfetto.dev) e
+imprime um resumo por etapa.
+"""
+
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+ATIVO = os.getenv('LAB3_TRACE', '') not in ('', '0')
+
+_eventos: List[Dict] = []
+_contadores: Dict[str, float] = defaultdict(float)
+_trava = threading.Lock()
+_pid = os.getpid()
+
+
+class _SpanVazio:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        return False
+
+
+_SPAN_VAZIO = _SpanVazio()
+
+
+class _Span:
+    __slots__ = ('nome', 'categoria', 'args', 'inicio')
+
+    def __init__(self, nome: str, categoria: str, args: Dict):
+        self.nome = nome
+        self.categoria = categoria
+        self.args = args
+
+    def __enter__(self):
+        self.inicio = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, tipo, *excecao):
+        fim = time.perf_counter_ns()
+        evento = {
+            'name': self.nome,
+            'cat': self.categoria,
+            'ph': 'X',
+            'ts': self.inicio / 1000,
+            'dur': (fim - self.inicio) / 1000,
+            'pid': _pid,
+            'tid': threading.get_ident(),
+        }
+        if self.args or tipo is not None:
+            evento['args'] = {**self.args, **({'erro': tipo.__name__} if tipo is not None else {})}
+        _eventos.append(evento)
+        return False
+
+
+def span(nome: str, categoria: str = 'geral', **args):
+    """
+    Context manager que mede o tempo de um trecho (sem efeito se desativado)
+
+    Args:
+        nome: Nome da etapa (ex.: 'RQ01.estatisticas', 'http.get')
+        categoria: Agrupamento no trace (ex.: 'http', 'analise', 'graficos')
+        args: Atributos extras gravados no evento (ex.: url)
+    """
+    if not ATIVO:
+        return _SPAN_VAZIO
+    return _Span(nome, categoria, args)
+
+
+def instrumentado(nome: str, categoria: str = 'geral'):
+    """
+    Decorador que envolve a função inteira em um span
+    """
+    def decorador(funcao):
+        if inspect.iscoroutinefunction(funcao):
+            # Corrotinas: o span cobre a execução inteira, incluindo as esperas (await)
+            @functools.wraps(funcao)
+            async def envolvida_async(*args, **kwargs):
+                if not ATIVO:
+                    return await funcao(*args, **kwargs)
+                with _Span(nome, categoria, {}):
+                    return await funcao(*args, **kwargs)
+            return envolvida_async
+
+        @functools.wraps(funcao)
+        def envolvida(*args, **kwargs):
+            if not ATIVO:
+                return funcao(*args, **kwargs)
+            with _Span(nome, categoria, {}):
+                return funcao(*args, **kwargs)
+        return envolvida
+    return decorador
+
+
+def contar(nome: str, valor: float = 1):
+    if ATIVO:
+        with _trava:
+            _contadores[nome] += valor
+
+
+def ativar(ativo: bool = True):
+    global ATIVO
+    ATIVO = ativo
+
+
+def limpar():
+    _eventos.clear()
+    _contadores.clear()
+
+
+def resumo_spans() -> Dict[str, Dict[str, float]]:
+    """
+    Chamadas, tempo total, médio e máximo (em segundos) de cada span
+    """
+    resumo = {}
+    for evento in list(_eventos):
+        r = resumo.setdefault(evento['name'], {'chamadas': 0, 'total': 0.0, 'maximo': 0.0})
+        duracao = evento['dur'] / 1e6
+        r['chamadas'] += 1
+        r['total'] += duracao
+        r['maximo'] = max(r['maximo'], duracao)
+    for r in resumo.values():
+        r['media'] = r['total'] / r['chamadas']
+    return resumo
+
+
+def exportar(caminho: Path):
+    """
+    Grava os spans no formato Chrome trace (JSON), com os contadores em otherData
+    """
+    with open(caminho, 'w', encoding='utf-8') as f:
+        json.dump({'traceEvents': list(_eventos), 'displayTimeUnit': 'ms',
+                   'otherData': dict(_contadores)}, f)
+
+
+def imprimir_resumo(limite: int = 30):
+    resumo = sorted(resumo_spans().items(), key=lambda item: item[1]['total'], reverse=True)
+
+    print("=" * 80)
+    print("INSTRUMENTAÇÃO")
+    print("=" * 80)
+    print()
+    print(f"{'Etapa':40} {'Chamadas':>9} {'Total (s)':>10} {'Média (ms)':>11} {'Máx (ms)':>10}")
+    for nome, r in resumo[:limite]:
+        print(f"{nome[:40]:40} {r['chamadas']:>9} {r['total']:>10.3f} "
+              f"{r['media'] * 1000:>11.1f} {r['maximo'] * 1000:>10.1f}")
+
+    if _contadores:
+        print()
+        print("Contadores:")
+        for nome, valor in sorted(_contadores.items()):
+            print(f"  • {nome}: {valor:,.0f}")
+    print()
+
+
+def finalizar(caminho: Optional[Path] = None):
+    """
+    Exporta o trace e imprime o resumo (sem efeito se desativado)
+
+    Args:
+        caminho: Arquivo do trace (padrão: LAB3_TRACE_ARQUIVO ou trace.json)
+    """
+    if not ATIVO:
+        return
+    caminho = Path(caminho or os.getenv('LAB3_TRACE_ARQUIVO', 'trace.json'))
+    exportar(caminho)
+    imprimir_resumo()
+    print(f"✓ Trace salvo: {caminho}")
+    print()
@@ -0,0 +1,146 @@
+"""
+Linha de comando da análise
+Lab 03 - Caracterizando a atividade de code review no GitHub
+
+Cada subcomando importa só o que usa: este módulo carrega apenas a biblioteca
+padrão (com configuracao e relatorio), e pandas, scipy, matplotlib e seaborn
+são importados dentro dos comandos que precisam deles.
+
+    stats    testes de todas as RQs, sem gráficos (pandas + scipy)
+    plot     gráficos das RQs (pandas + scipy + matplotlib + seaborn)
+    report   relatório a partir de resultados_sprint2.json (só biblioteca padrão)
+    rq N     uma única RQ; gráfico só com --grafico
+
+Uso:
+    python lab3.py stats --bootstrap
+    python lab3.py stats --aproximado RQ02 RQ06   # testes aproximados nessas RQs
+    python lab3.py plot 1 5 --formato svg
+    python lab3.py report --formato html
+    python lab3.py rq 3
+
+O tempo de importação de cada subcomando é medido por benchmarks/bench_importacao.py.
+"""
+
+import argparse
+from pathlib import Path
+
+import configuracao
+import relatorio
+
+RQS = range(1, 9)
+
+
+def numero_rq(texto: str) -> int:
+    """
+    Número de RQ da linha de comando (1 a 8)
+
+    Usado como type= em vez de choices=RQS: com nargs='*' e nenhum número, o
+    argparse de algumas versões do Python confere o padrão [] contra choices.
+    """
+    try:
+        numero = int(texto)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"não é um número: {texto!r}")
+    if numero not in RQS:
+        raise argparse.ArgumentTypeError(f"RQ {numero} não existe (1 a 8)")
+    return numero
+
+
+def _analisador(args, gerar_graficos: bool):
+    from executar_sprint2 import AnalisadorPRs
+
+    config = configuracao.carregar(args.config)
+    opcoes = config['analise']
+    modo_testes = dict(opcoes['modo_testes'])
+    if getattr(args, 'aproximado', None) is not None:
+        modo_testes.update({rq: 'aproximado' for rq in args.aproximado or AnalisadorPRs.TESTES_RQ})
+    return AnalisadorPRs(args.arquivo, dpi=getattr(args, 'dpi', None) or opcoes['dpi'],
+                         formato_graficos=getattr(args, 'formato', None) or opcoes['formato_graficos'],
+                         limite_pontos=opcoes['limite_pontos'], modo_dispersao=opcoes['modo_dispersao'],
+                         caminho_base=config['caminho_base'], categorias=configuracao.categorias(config),
+                         gerar_graficos=gerar_graficos, modo_testes=modo_testes,
+                         faixas_histograma=opcoes['faixas_histograma'])
+
+
+def _executar_rqs(analisador, rqs) -> bool:
+    if not analisador.carregar_dados():
+        return False
+    analisador.preparar_dados()
+    for n in rqs:
+        # Métodos rqNN_<tema> do AnalisadorPRs
+        metodo = next(nome for nome in dir(analisador) if nome.startswith(f"rq{n:02d}_"))
+        getattr(analisador, metodo)()
+    return True
+
+
+def comando_stats(args) -> bool:
+    analisador = _analisador(args, gerar_graficos=False)
+    return analisador.executar_analise_completa(bootstrap=args.bootstrap, estratificado=args.estratificado,
+                                                formatos_relatorio=())
+
+
+def comando_plot(args) -> bool:
+    return _executar_rqs(_analisador(args, gerar_graficos=True), args.rqs or RQS)
+
+
+def comando_rq(args) -> bool:
+    return _executar_rqs(_analisador(args, gerar_graficos=args.grafico), [args.numero])
+
+
+def comando_report(args) -> bool:
+    base = Path(configuracao.carregar(args.config)['caminho_base'])
+    caminho_cache = Path(args.cache) if args.cache else base / "resultados_sprint2.json"
+    if not caminho_cache.exists():
+        print(f"❌ {caminho_cache} não encontrado (gere com: python lab3.py stats)")
+        return False
+
+    cache = relatorio.carregar_cache(caminho_cache)
+    for formato in args.formato:
+        saida = caminho_cache.with_name(f"relatorio_sprint2.{formato}")
+        relatorio.gerar_relatorio(cache['resultados'], cache['resumo'], saida, formato, cache.get('formato_graficos'))
+        print(f"✓ Relatório salvo: {saida}")
+    return True
+
+
+def criar_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Análise de PRs: estatísticas, gráficos e relatório")
+    parser.add_argument('--config', help="Arquivo de configuração (padrão: pipeline.json)")
+    sub = parser.add_subparsers(dest='comando', required=True)
+
+    def com_dataset(p):
+        p.add_argument('--arquivo', default="dataset_prs.csv", help="CSV dos PRs, no diretório base")
+        return p
+
+    p_stats = com_dataset(sub.add_parser('stats', help="Testes de todas as RQs, sem gráficos"))
+    p_stats.add_argument('--bootstrap', action='store_true', help="Intervalos bootstrap e testes de permutação")
+    p_stats.add_argument('--estratificado', action='store_true', help="Testes por repositório")
+    p_stats.add_argument('--aproximado', nargs='*', metavar='RQ', choices=[f"RQ{n:02d}" for n in RQS],
+                         help="RQs com testes aproximados por histogramas de postos (sem RQs: todas)")
+    p_stats.set_defaults(funcao=comando_stats)
+
+    p_plot = com_dataset(sub.add_parser('plot', help="Gráficos das RQs"))
+    p_plot.add_argument('rqs', type=numero_rq, nargs='*', metavar='N', help="RQs de 1 a 8 (padrão: todas)")
+    p_plot.add_argument('--formato', help="Formato dos gráficos (padrão: o de pipeline.json)")
+    p_plot.add_argument('--dpi', type=int, help="Resolução dos gráficos (padrão: a de pipeline.json)")
+    p_plot.set_defaults(funcao=comando_plot)
+
+    p_report = sub.add_parser('report', help="Relatório a partir dos resultados em cache")
+    p_report.add_argument('--cache', help="Cache de resultados (padrão: resultados_sprint2.json no diretório base)")
+    p_report.add_argument('--formato', nargs='+', choices=relatorio.FORMATOS, default=['md'])
+    p_report.set_defaults(funcao=comando_report)
+
+    p_rq = com_dataset(sub.add_parser('rq', help="Uma única RQ"))
+    p_rq.add_argument('numero', type=numero_rq, metavar='N', help="Número da RQ (1 a 8)")
+    p_rq.add_argument('--grafico', action='store_true', help="Também salva o gráfico da RQ")
+    p_rq.set_defaults(funcao=comando_rq)
+    return parser
+
+
+def main():
+    args = criar_parser().parse_args()
+    if not args.funcao(args):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,351 @@
+"""
+Registro de plugins de métricas dos PRs
+Lab 03 - Caracterizando a atividade de code review no GitHub
+
+Cada métrica coletada para um PR é um plugin: uma função que recebe o PR da
+listagem e as respostas dos endpoints que ela declarou, e devolve um dict com
+as suas colunas. A coleta (ColetorPRs) calcula a união dos endpoints dos
+plugins ativos, busca cada um uma única vez por PR e entrega as respostas a
+todos os plugins. A resposta de /reviews obtida no filtro de PRs revisados é
+reaproveitada.
+
+Para acrescentar uma métrica, basta registrar a função:
+
+    @registrar('latencia_revisao', endpoints=('reviews',), colunas_csv=('horas_ate_revisao',))
+    def latencia_revisao(pr, respostas):
+        ...
+
+em metricas_pr.py e ativá-la em pipeline.json (coleta_prs.metricas) ou com
+--plugins (latencia_revisao é só um exemplo, não está registrada). Com o
+cache de respostas ativo (coleta_prs.cache_respostas), as respostas brutas de
+cada endpoint ficam em respostas_prs (dbm, no diretório base), e as métricas
+dos PRs já coletados podem ser recalculadas sem novas requisições; só os
+endpoints que ainda não estão no cache são buscados:
+
+    python metricas_pr.py listar
+    python metricas_pr.py recalcular --plugins arquivos tempo descricao interacao revisoes
+"""
+
+import argparse
+import dbm
+import json
+import logging
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+import configuracao
+import instrumentacao
+import registro
+from indice_prs import chave_pr, repositorio_pr
+
+logger = logging.getLogger(__name__)
+
+# Endpoints por PR: caminho na API e método de ArmazenamentoColeta que grava a resposta
+ENDPOINTS = {
+    'files': ("/repos/{repositorio}/pulls/{numero}/files", 'salvar_arquivos'),
+    'comments': ("/repos/{repositorio}/issues/{numero}/comments", 'salvar_comentarios'),
+    'reviews': ("/repos/{repositorio}/pulls/{numero}/reviews", 'salvar_revisoes'),
+}
+
+# Itens por página dos endpoints (o padrão da API, 30, truncava as contagens) e
+# páginas buscadas no máximo por endpoint e PR (a API devolve até 3000 arquivos)
+POR_PAGINA = 100
+MAX_PAGINAS = 30
+
+# Cache das respostas brutas no diretório base (o dbm pode acrescentar extensões)
+ARQUIVO_CACHE = "respostas_prs"
+
+
+class PluginMetrica:
+    """
+    Métrica de PR: função, endpoints de que depende e colunas que acrescenta ao CSV
+    """
+
+    def __init__(self, nome: str, funcao: Callable[[Dict, Dict[str, Optional[List]]], Optional[Dict]],
+                 endpoints: Sequence[str] = (), colunas_csv: Sequence[str] = ()):
+        desconhecidos = set(endpoints) - set(ENDPOINTS)
+        if desconhecidos:
+            raise ValueError(f"plugin {nome}: endpoints desconhecidos: {', '.join(sorted(desconhecidos))}")
+        self.nome = nome
+        self.funcao = funcao
+        self.endpoints = tuple(endpoints)
+        self.colunas_csv = tuple(colunas_csv)
+
+
+REGISTRO: Dict[str, PluginMetrica] = {}
+
+# Plugins da coleta padrão, na ordem em que as colunas aparecem em dataset_prs.json
+PADRAO = ('arquivos', 'tempo', 'descricao', 'interacao', 'revisoes')
+
+# Estados de revisão contados pelo plugin revisoes (PENDING, o rascunho do revisor, fica de fora)
+ESTADOS_REVISAO = {
+    'APPROVED': 'reviews_approved',
+    'CHANGES_REQUESTED': 'reviews_changes_requested',
+    'COMMENTED': 'reviews_commented',
+    'DISMISSED': 'reviews_dismissed',
+}
+
+
+def registrar(nome: str, endpoints: Sequence[str] = (), colunas_csv: Sequence[str] = ()):
+    """
+    Decorador que registra uma função como plugin de métrica
+
+    Args:
+        nome: Nome do plugin (em pipeline.json e --plugins)
+        endpoints: Chaves de ENDPOINTS cujas respostas a função recebe
+        colunas_csv: Colunas que o plugin acrescenta a dataset_prs.csv (as dos plugins
+            padrão já fazem parte do formato do CSV)
+    """
+    def decorador(funcao):
+        REGISTRO[nome] = PluginMetrica(nome, funcao, endpoints, colunas_csv)
+        return funcao
+    return decorador
+
+
+def selecionar(nomes: Optional[Sequence[str]] = None) -> List[PluginMetrica]:
+    """
+    Plugins com os nomes dados, na ordem dada (padrão: PADRAO)
+    """
+    nomes = PADRAO if nomes is None else nomes
+    desconhecidos = [nome for nome in nomes if nome not in REGISTRO]
+    if desconhecidos:
+        raise ValueError(f"plugins de métricas desconhecidos: {', '.join(desconhecidos)} "
+                         f"(disponíveis: {', '.join(REGISTRO)})")
+    return [REGISTRO[nome] for nome in nomes]
+
+
+def endpoints_necessarios(plugins: Sequence[PluginMetrica]) -> List[str]:
+    """
+    União dos endpoints dos plugins, na ordem da primeira ocorrência
+    """
+    return list(dict.fromkeys(endpoint for plugin in plugins for endpoint in plugin.endpoints))
+
+
+def calcular(plugins: Sequence[PluginMetrica], pr: Dict, respostas: Dict[str, Optional[List]]) -> Optional[Dict]:
+    """
+    Entrega as respostas a cada plugin e junta as métricas, na ordem dos plugins
+
+    Args:
+        plugins: Plugins ativos
+        pr: PR da listagem
+        respostas: Resposta de cada endpoint (None se a requisição não retornou 200)
+
+    Returns:
+        Métricas do PR, ou None se nenhum plugin produziu métricas
+    """
+    metricas = {}
+    for plugin in plugins:
+        with instrumentacao.span(f'metricas.{plugin.nome}'):
+            try:
+                parcial = plugin.funcao(pr, respostas)
+            except Exception as e:
+                logger.warning("%s#%s: erro na métrica %s: %s", repositorio_pr(pr), pr.get('number'), plugin.nome, e)
+                parcial = None
+        if parcial:
+            metricas.update(parcial)
+    return metricas if metricas else None
+
+
+# ----------------------------------------------------------------------------
+# Plugins padrão
+# ----------------------------------------------------------------------------
+
+def _horas(inicio: str, fim: str) -> float:
+    inicio_dt = datetime.fromisoformat(inicio.replace('Z', '+00:00'))
+    fim_dt = datetime.fromisoformat(fim.replace('Z', '+00:00'))
+    return (fim_dt - inicio_dt).total_seconds() / 3600
+
+
+@registrar('arquivos', endpoints=('files',))
+def metricas_arquivos(pr: Dict, respostas: Dict) -> Optional[Dict]:
+    files = respostas['files']
+    if files is None:
+        return None
+
+    return {
+        'num_files': len(files),
+        'total_additions': sum(file.get('additions', 0) for file in files),
+        'total_deletions': sum(file.get('deletions', 0) for file in files)
+    }
+
+
+@registrar('tempo')
+def metricas_tempo(pr: Dict, respostas: Dict) -> Optional[Dict]:
+    created_at = pr.get('created_at')
+    closed_at = pr.get('closed_at') or pr.get('merged_at')
+
+    if not created_at or not closed_at:
+        return None
+
+    return {
+        'time_analysis_hours': _horas(created_at, closed_at),
+        'created_at': created_at,
+        'closed_at': closed_at,
+        'merged_at': pr.get('merged_at')
+    }
+
+
+@registrar('descricao')
+def metricas_descricao(pr: Dict, respostas: Dict) -> Optional[Dict]:
+    body = pr.get('body', '') or ''
+
+    return {
+        'description_chars': len(body),
+        'description': body[:500] + '...' if len(body) > 500 else body
+    }
+
+
+@registrar('interacao', endpoints=('comments', 'reviews'))
+def metricas_interacao(pr: Dict, respostas: Dict) -> Optional[Dict]:
+    comments = respostas['comments'] or []
+    participants = set()
+
+    for item in (*comments, *(respostas['reviews'] or [])):
+        user = item.get('user', {})
+        if user:
+            participants.add(user.get('login', ''))
+
+    return {
+        'num_comments': len(comments),
+        'num_participants': len(participants)
+    }
+
+
+@registrar('revisoes', endpoints=('reviews',),
+           colunas_csv=('num_reviews', *ESTADOS_REVISAO.values(), 'first_review_hours'))
+def metricas_revisoes(pr: Dict, respostas: Dict) -> Optional[Dict]:
+    reviews = respostas['reviews']
+    if reviews is None:
+        return None
+
+    enviadas = [review for review in reviews if review.get('state') != 'PENDING']
+    metricas = {'num_reviews': len(enviadas)}
+    for estado, coluna in ESTADOS_REVISAO.items():
+        metricas[coluna] = sum(review.get('state') == estado for review in enviadas)
+
+    # Latência até a primeira revisão enviada (timestamps ISO 8601 em UTC: a ordem do texto é a do tempo)
+    envios = [review['submitted_at'] for review in enviadas if review.get('submitted_at')]
+    primeira = min(envios) if envios and pr.get('created_at') else None
+    metricas['first_review_hours'] = _horas(pr['created_at'], primeira) if primeira else None
+    return metricas
+
+
+# ----------------------------------------------------------------------------
+# Cache das respostas
+# ----------------------------------------------------------------------------
+
+class CacheRespostas:
+    """
+    Respostas brutas (200) de cada endpoint por PR, em uma tabela hash em disco
+
+    A chave é a identidade do PR (indice_prs.chave_pr) e o endpoint, com o
+    sufixo /paginas: as entradas sem ele guardam só a primeira página (30
+    itens) e são buscadas de novo. O acesso é
+    protegido por uma trava: a coleta em estágios usa o cache em várias threads.
+    """
+
+    def __init__(self, caminho: Path, modo: str = 'c'):
+        """
+        Args:
+            caminho: Arquivo do cache (sem extensão)
+            modo: Modo do dbm.open: 'r' (leitura), 'w' (existente) ou 'c' (cria se preciso)
+        """
+        self.caminho = Path(caminho)
+        self._db = dbm.open(str(self.caminho), modo)
+        self._trava = threading.Lock()
+        self.acertos = 0
+        self.faltas = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        self.fechar()
+        return False
+
+    def fechar(self):
+        self._db.close()
+
+    @staticmethod
+    def _chave(pr: Dict, endpoint: str) -> bytes:
+        return f"{chave_pr(pr)}/{endpoint}/paginas".encode()
+
+    def obter(self, pr: Dict, endpoint: str) -> Optional[List]:
+        with self._trava:
+            valor = self._db.get(self._chave(pr, endpoint))
+            if valor is None:
+                self.faltas += 1
+                return None
+            self.acertos += 1
+        return json.loads(valor)
+
+    def salvar(self, pr: Dict, endpoint: str, dados: List):
+        valor = json.dumps(dados, ensure_ascii=False, default=str).encode('utf-8')
+        with self._trava:
+            self._db[self._chave(pr, endpoint)] = valor
+
+
+def recalcular(coletor, indice) -> List[Dict]:
+    """
+    Recalcula com os plugins do coletor as métricas de todos os PRs do índice
+
+    Respostas que estão no cache do coletor não geram requisições.
+
+    Returns:
+        Os PRs com as métricas recalculadas (os que falharam ficam de fora)
+    """
+    prs = []
+    progresso = registro.Progresso(len(indice), "PRs recalculados", logger)
+    for pr in indice.prs():
+        metricas = coletor.coletar_metricas_pr(pr, repositorio_pr(pr), pr.get('number'))
+        if metricas:
+            pr.update(metricas)
+            prs.append(pr)
+        progresso.avancar()
+    progresso.concluir()
+    return prs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Plugins de métricas dos PRs: listagem e recálculo")
+    sub = parser.add_subparsers(dest='comando', required=True)
+    sub.add_parser('listar', help="Mostra os plugins registrados e os endpoints de cada um")
+    p_recalcular = sub.add_parser('recalcular', help="Recalcula as métricas dos PRs do índice a partir do cache")
+    p_recalcular.add_argument('--plugins', nargs='+', help="Plugins ativos (padrão: coleta_prs.metricas)")
+    args = parser.parse_args()
+
+    if args.comando == 'listar':
+        for plugin in REGISTRO.values():
+            endpoints = ', '.join(plugin.endpoints) or '(só a listagem)'
+            print(f"{plugin.nome:20} {endpoints}")
+        return
+
+    from coletor_prs import ColetorPRs
+    from indice_prs import ARQUIVO_INDICE, IndicePRs
+
+    registro.configurar_logging()
+    config = configuracao.carregar()
+    base = Path(config['caminho_base'])
+
+    try:
+        plugins = args.plugins or config['coleta_prs']['metricas']
+        with CacheRespostas(base / ARQUIVO_CACHE) as cache:
+            coletor = ColetorPRs(caminho_base=base, plugins=plugins, cache_respostas=cache)
+            with IndicePRs(base / ARQUIVO_INDICE, 'r') as indice:
+                prs = recalcular(coletor, indice)
+            coletor.atualizar_indice(prs)
+            with IndicePRs(base / ARQUIVO_INDICE, 'r') as indice:
+                todos_prs = list(indice.prs())
+            coletor.salvar_dataset_prs(todos_prs, "dataset_prs.json")
+            coletor.salvar_prs_csv(todos_prs, "dataset_prs.csv")
+            print(f"✓ {len(prs)} PRs recalculados; respostas do cache: {cache.acertos}, buscadas na API: {cache.faltas}")
+    except ValueError as e:
+        parser.error(str(e))
+    except dbm.error as e:
+        parser.error(f"não foi possível abrir o índice ou o cache: {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+"""
+Análise de Pull Requests com agregações em SQL
+Lab 03 - Caracterizando a atividade de code review no GitHub
+
+Executa as mesmas 8 RQs do AnalisadorPRs sem carregar o dataset no pandas:
+todas as agregações (contagens, médias, variâncias, percentis de outliers, as
+categorias do pd.cut e as tabelas cruzadas por status) rodam dentro de um
+motor SQL embutido, e só as tabelas de contagem voltam para o Python, onde
+alimentam os mesmos testes por contagem da análise em blocos
+(sumarios_streaming.py).
+
+Motores:
+- duckdb (opcional, `pip install duckdb`): colunar, vetorizado e multi-thread;
+  lê o CSV (ou Parquet) diretamente, sem importação
+- sqlite: biblioteca padrão; lê o banco normalizado da coleta (coleta.sqlite,
+  view dataset_prs)
+
+Uso:
+    python motor_sql.py --arquivo dataset_prs.csv            # duckdb
+    python motor_sql.py --arquivo coleta.sqlite --motor sqlite
+"""
+
+import argparse
+import sqlite3
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+import instrumentacao
+import sumarios_streaming as ss
+from analise_em_blocos import AnalisadorEmBlocos
+
+try:
+    import duckdb
+except ImportError:  # motor opcional
+    duckdb = None
+
+MOTORES = ('auto', 'duckdb', 'sqlite')
+EXTENSOES_SQLITE = ('.sqlite', '.sqlite3', '.db')
+
+
+class AnalisadorSQL(AnalisadorEmBlocos):
+    MODO = "EM SQL"
+
+    def __init__(self, arquivo_dataset: str = "dataset_prs.csv", motor: str = 'auto',
+                 threads: Optional[int] = None, **opcoes):
+        """
+        Inicializa o analisador em SQL
+
+        Args:
+            arquivo_dataset: CSV/Parquet com os dados dos PRs ou banco SQLite da coleta
+            motor: 'duckdb', 'sqlite' ou 'auto' (sqlite para bancos SQLite, duckdb para os demais)
+            threads: Threads usadas pelo DuckDB (padrão: todos os núcleos)
+            opcoes: Demais opções do AnalisadorPRs (caminho_base, categorias...)
+        """
+        super().__init__(arquivo_dataset, **opcoes)
+        self.motor = self._escolher_motor(motor)
+        self.threads = threads
+        self.conexao = None
+
+    def _escolher_motor(self, motor: str) -> str:
+        if motor not in MOTORES:
+            raise ValueError(f"Motor desconhecido: {motor} (opções: {', '.join(MOTORES)})")
+        banco_sqlite = self.caminho_dataset.suffix.lower() in EXTENSOES_SQLITE
+        if motor == 'auto':
+            motor = 'sqlite' if banco_sqlite or duckdb is None else 'duckdb'
+        if motor == 'duckdb' and duckdb is None:
+            raise ImportError("O motor duckdb requer o pacote duckdb (pip install duckdb)")
+        if motor == 'sqlite' and not banco_sqlite:
+            raise ValueError("O motor sqlite lê apenas o banco da coleta (coleta.sqlite); "
+                             "para CSV use o motor duckdb")
+        return motor
+
+    def _fonte(self) -> str:
+        caminho = str(self.caminho_dataset).replace("'", "''")
+        if self.motor == 'sqlite':
+            return 'dataset_prs'
+        if self.caminho_dataset.suffix.lower() == '.parquet':
+            return f"read_parquet('{caminho}')"
+        if self.caminho_dataset.suffix.lower() in EXTENSOES_SQLITE:
+            raise ValueError("Para ler o banco SQLite da coleta use o motor sqlite")
+        return f"read_csv_auto('{caminho}')"
+
+    def _expressao(self, metrica: str) -> str:
+        if metrica == 'total_changes':
+            return 'total_additions + total_deletions'
+        resolucao = self.RESOLUCAO.get(metrica)
+        if resolucao is not None:
+            # Mesma discretização da análise em blocos (ver RESOLUCAO)
+            return f"ROUND({metrica} / {resolucao!r}) * {resolucao!r}"
+        return metrica
+
+    def _consultar(self, sql: str, parametros: Sequence = ()) -> List[Tuple]:
+        with instrumentacao.span('sql.consulta', 'sql', sql=' '.join(sql.split())[:120]):
+            return self.conexao.execute(sql, parametros).fetchall()
+
+    def carregar_dados(self) -> bool:
+        """
+        Abre o motor SQL e define a view prs sobre o dataset (nada é carregado no Python)
+
+        Returns:
+            True se o dataset existe, False caso contrário
+        """
+        if not super().carregar_dados():
+            return False
+
+        if self.motor == 'duckdb':
+            self.conexao = duckdb.connect(config={'threads': self.threads} if self.threads else {})
+        else:
+            self.conexao = sqlite3.connect(self.caminho_dataset)
+
+        cursor = self.conexao.execute(f"SELECT * FROM {self._fonte()} LIMIT 0")
+        self._detectar_revisoes([d[0] for d in cursor.description])
+
+        colunas = ',\n'.join(f"    {self._expressao(m)} AS {m}" for m in self.METRICAS)
+        self.conexao.execute(f"""
+            CREATE TEMP VIEW prs AS
+            SELECT repository, CAST(merged AS INTEGER) AS merged,
+            {colunas}
+            FROM {self._fonte()}
+        """)
+
+        print(f"🗄  Motor SQL: {self.motor}")
+        print()
+        return True
+
+    def _categoria(self, origem: str, limites: List[float], rotulos: List[str]) -> str:
+        # CASE equivalente ao pd.cut (intervalos fechados à direita, sem incluir o limite inferior)
+        casos = []
+        for inferior, superior, rotulo in zip(limites[:-1], limites[1:], rotulos):
+            condicao = f"{origem} > {inferior!r}"
+            if superior != float('inf'):
+                condicao += f" AND {origem} <= {superior!r}"
+            casos.append(f"WHEN {condicao} THEN '{rotulo}'")
+        return f"CASE {' '.join(casos)} END"
+
+    def _serie(self, linhas: List[Tuple], niveis: int) -> pd.Series:
+        if not linhas:
+            return pd.Series(dtype=np.int64)
+        colunas = list(zip(*linhas))
+        if niveis == 1:
+            indice = pd.Index(colunas[0])
+        else:
+            indice = pd.MultiIndex.from_arrays(colunas[:niveis])
+        return pd.Series(colunas[niveis], index=indice, dtype=np.int64)
+
+    @staticmethod
+    def _ordenar_categorias(serie: pd.Series, rotulos: List[str]) -> pd.Series:
+        # Rótulos como categorias ordenadas, na ordem dos intervalos (como o pd.cut)
+        if not len(serie):
+            return serie
+        niveis = pd.CategoricalIndex(serie.index.levels[0], categories=rotulos, ordered=True)
+        return serie.set_axis(serie.index.set_levels(niveis, level=0)).sort_index()
+
+    def preparar_dados(self):
+        """
+        Calcula no motor SQL todos os sumários usados pelas RQs
+        """
+        print(f"🔧 Agregando dataset no {self.motor}...")
+
+        self.total_prs, n_repositorios = self._consultar(
+            "SELECT COUNT(*), COUNT(DISTINCT repository) FROM prs")[0]
+
+        # Momentos por status: média e soma dos quadrados dos desvios em duas passagens
+        self.momentos = {}
+        for metrica in self.METRICAS:
+            linhas = self._consultar(f"""
+                WITH medias AS (SELECT merged, AVG({metrica}) AS media FROM prs GROUP BY merged)
+                SELECT p.merged, COUNT(p.{metrica}), m.media,
+                       SUM((p.{metrica} - m.media) * (p.{metrica} - m.media)),
+                       MIN(p.{metrica}), MAX(p.{metrica})
+                FROM prs p JOIN medias m ON p.merged = m.merged
+                GROUP BY p.merged, m.media
+            """)
+            por_status = {bool(merged): resto for merged, *resto in linhas if merged is not None}
+            for merged in (True, False):
+                n, media, m2, minimo, maximo = por_status.get(merged, (0, 0.0, 0.0, np.inf, -np.inf))
+                self.momentos[(metrica, merged)] = ss.Momentos.de_agregados(
+                    n, media or 0.0, m2 or 0.0, minimo, maximo)
+
+        # Contagens por valor distinto e status (postos exatos para Mann-Whitney)
+        self.contagens = {}
+        for metrica in self.METRICAS:
+            contagens = self._serie(self._consultar(f"""
+                SELECT merged, {metrica}, COUNT(*) FROM prs
+                WHERE {metrica} IS NOT NULL AND merged IS NOT NULL
+                GROUP BY merged, {metrica}
+            """), 2)
+            for merged, grupo in contagens.groupby(level=0):
+                self.contagens[(metrica, bool(merged))] = grupo.droplevel(0)
+
+        # Pares (variável, revisões) para as correlações da Dimensão B
+        self.conjuntas = {}
+        for _, variavel, comparacao in (t for rq in ('RQ05', 'RQ06', 'RQ07', 'RQ08') for t in self.TESTES_RQ[rq]):
+            self.conjuntas[variavel] = self._serie(self._consultar(f"""
+                SELECT {variavel}, {comparacao}, COUNT(*) FROM prs
+                WHERE {variavel} IS NOT NULL AND {comparacao} IS NOT NULL
+                GROUP BY {variavel}, {comparacao}
+            """), 2)
+
+        # Categorias do pd.cut e tabelas cruzadas por status e por número de revisões
+        self.categorias = {}
+        self.revisoes_por_categoria = {}
+        for coluna, (origem, limites, rotulos) in self.CATEGORIAS.items():
+            categoria = self._categoria(origem, limites, rotulos)
+            cruzada = self._serie(self._consultar(f"""
+                SELECT categoria, merged, COUNT(*) FROM (SELECT {categoria} AS categoria, merged FROM prs) t
+                WHERE categoria IS NOT NULL GROUP BY categoria, merged
+            """), 2)
+            if len(cruzada):
+                cruzada.index = cruzada.index.set_levels(cruzada.index.levels[1].astype(bool), level=1)
+            self.categorias[coluna] = self._ordenar_categorias(cruzada, rotulos)
+            self.revisoes_por_categoria[coluna] = self._ordenar_categorias(self._serie(self._consultar(f"""
+                SELECT categoria, {self.coluna_revisoes}, COUNT(*)
+                FROM (SELECT {categoria} AS categoria, {self.coluna_revisoes} FROM prs) t
+                WHERE categoria IS NOT NULL AND {self.coluna_revisoes} IS NOT NULL
+                GROUP BY categoria, {self.coluna_revisoes}
+            """), 2), rotulos)
+
+        self.limites_outliers = self._limites_outliers()
+        self._montar_resumo(n_repositorios)
+
+    def _limites_outliers(self) -> Dict[str, Tuple[float, float]]:
+        if self.motor == 'duckdb':
+            # quantile_cont interpola como pandas.Series.quantile
+            colunas = ', '.join(f"quantile_cont({m}, [0.01, 0.99])" for m in self.METRICAS_SEM_OUTLIERS)
+            quantis = self._consultar(f"SELECT {colunas} FROM prs")[0]
+            return {m: (float(q[0]), float(q[1])) if q else (np.nan, np.nan)
+                    for m, q in zip(self.METRICAS_SEM_OUTLIERS, quantis)}
+
+        # O SQLite não tem função de quantil: os percentis saem das tabelas de contagem
+        limites = {}
+        for metrica in self.METRICAS_SEM_OUTLIERS:
+            contagens = ss.mesclar_contagens(self.contagens.get((metrica, True)),
+                                             self.contagens.get((metrica, False), pd.Series(dtype=np.int64)))
+            limites[metrica] = tuple(float(q) for q in ss.quantis_de_contagens(contagens, [0.01, 0.99]))
+        return limites
+
+    def executar_analise_completa(self, bootstrap: bool = False, estratificado: bool = False,
+                                  formatos_relatorio: tuple = ('md',)):
+        try:
+            return super().executar_analise_completa(bootstrap, estratificado, formatos_relatorio)
+        finally:
+            if self.conexao is not None:
+                self.conexao.close()
+                self.conexao = None
+
+
+def main():
+    """
+    Função principal para executar a análise em SQL
+    """
+    parser = argparse.ArgumentParser(description="Análise de PRs com agregações em SQL (DuckDB ou SQLite)")
+    parser.add_argument('--arquivo', default="dataset_prs.csv",
+                        help="CSV/Parquet com os dados dos PRs ou banco SQLite da coleta")
+    parser.add_argument('--motor', choices=MOTORES, default='auto')
+    parser.add_argument('--threads', type=int, help="Threads do DuckDB (padrão: todos os núcleos)")
+    args = parser.parse_args()
+
+    try:
+        analisador = AnalisadorSQL(args.arquivo, motor=args.motor, threads=args.threads)
+    except (ValueError, ImportError) as e:
+        parser.error(str(e))
+    analisador.executar_analise_completa()
+    instrumentacao.finalizar(analisador.caminho_base / "trace_sql.json")
+
+
+if __name__ == "__main__":
+    main()
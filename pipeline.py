@@ -0,0 +1,439 @@
+"""
+Pipeline da coleta ao relatório
+Lab 03 - Caracterizando a atividade de code review no GitHub
+
+Encadeia as etapas do projeto como um grafo de dependências:
+
+    repositorios -> prs -> analise -> relatorio
+                       \\-> metricas_banco
+
+Cada etapa declara os arquivos que lê e escreve, as seções de pipeline.json
+de que depende e os módulos com o seu código (a impressão digital inclui
+também os módulos do projeto que eles importam, direta ou indiretamente). A
+impressão digital da etapa
+(SHA-256 desses parâmetros e do conteúdo das entradas e do código) fica em
+.pipeline_estado.json, no diretório base; se ela não mudou e as saídas
+continuam iguais às da última execução, a etapa é pulada. Como as entradas de
+uma etapa são as saídas das anteriores, uma etapa refeita que produz os mesmos
+arquivos não invalida as seguintes: mudar o dpi dos gráficos refaz só a
+análise, e o relatório continua em cache.
+
+Etapas independentes (a análise e a exportação das métricas do banco) rodam
+em paralelo.
+
+Uso:
+    python pipeline.py                          # executa o que estiver desatualizado
+    python pipeline.py --alvo analise           # só a análise e as etapas de que ela depende
+    python pipeline.py --forcar prs             # refaz a coleta de PRs (e o que mudar por causa dela)
+    python pipeline.py --seco                   # mostra o que seria executado
+    python pipeline.py --alvo analise relatorio --sem-dependencias   # usa o dataset já coletado
+"""
+
+import argparse
+import ast
+import contextlib
+import csv
+import hashlib
+import json
+import logging
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+import configuracao
+import registro
+
+logger = logging.getLogger(__name__)
+
+ARQUIVO_ESTADO = ".pipeline_estado.json"
+
+
+class Etapa:
+    """
+    Etapa do pipeline: função a executar, entradas e saídas (relativas ao
+    diretório base), seções da configuração e módulos de que depende
+    """
+
+    def __init__(self, nome: str, funcao: Callable[[Dict, Path], None], entradas: Sequence[str] = (),
+                 saidas: Sequence[str] = (), parametros: Sequence[str] = (),
+                 dependencias: Sequence[str] = (), codigo: Sequence[str] = ()):
+        self.nome = nome
+        self.funcao = funcao
+        self.entradas = list(entradas)
+        self.saidas = list(saidas)
+        self.parametros = list(parametros)
+        self.dependencias = list(dependencias)
+        self.codigo = list(codigo)
+
+
+def _coletar_repositorios(config: Dict, base: Path):
+    import coletor_repositorios
+    from armazenamento import ArmazenamentoColeta
+
+    opcoes = config['coleta_repositorios']
+    with ArmazenamentoColeta(base / "coleta.sqlite") as armazenamento:
+        coletor = coletor_repositorios.ColetorRepositorios(
+            timeout=(opcoes['timeout_conexao'], opcoes['timeout_leitura']), hedge=opcoes['hedge'],
+            armazenamento=armazenamento, caminho_base=base)
+        if opcoes['atualizar'] and (base / "repositorios_selecionados.json").exists():
+            coletor.atualizar_repositorios()
+        elif not coletor_repositorios.coletar(coletor, limite=opcoes['limite'], min_prs=opcoes['min_prs']):
+            raise RuntimeError("nenhum repositório atendeu aos critérios")
+
+
+def _coletar_prs(config: Dict, base: Path):
+    import coletor_prs
+    import metricas_pr
+    from armazenamento import ArmazenamentoColeta
+
+    opcoes = config['coleta_prs']
+    with contextlib.ExitStack() as pilha:
+        armazenamento = pilha.enter_context(ArmazenamentoColeta(base / "coleta.sqlite"))
+        cache = (pilha.enter_context(metricas_pr.CacheRespostas(base / metricas_pr.ARQUIVO_CACHE))
+                 if opcoes['cache_respostas'] else None)
+        coletor = coletor_prs.ColetorPRs(
+            timeout=(opcoes['timeout_conexao'], opcoes['timeout_leitura']), hedge=opcoes['hedge'],
+            armazenamento=armazenamento, caminho_base=base, plugins=opcoes['metricas'], cache_respostas=cache)
+        amostragem = opcoes['amostragem']
+        if amostragem['ativa']:
+            import amostragem_prs
+
+            amostral = amostragem_prs.ColetorAmostral(
+                coletor, confianca=amostragem['confianca'], margem=amostragem['margem'],
+                estratos=amostragem['estratos'], simultaneas=amostragem['simultaneas'], semente=amostragem['semente'])
+            coletado = amostragem_prs.coletar(amostral)
+        else:
+            coletado = coletor_prs.coletar(coletor, max_prs=opcoes['max_prs_por_repositorio'])
+        if not coletado:
+            raise RuntimeError("nenhum PR foi coletado")
+
+
+def _analisar(config: Dict, base: Path):
+    from executar_sprint2 import AnalisadorPRs
+
+    opcoes = config['analise']
+    analisador = AnalisadorPRs(dpi=opcoes['dpi'], formato_graficos=opcoes['formato_graficos'],
+                               limite_pontos=opcoes['limite_pontos'], modo_dispersao=opcoes['modo_dispersao'],
+                               caminho_base=base, categorias=configuracao.categorias(config),
+                               modo_testes=opcoes['modo_testes'], faixas_histograma=opcoes['faixas_histograma'])
+    # O relatório é uma etapa própria: aqui só se salva resultados_sprint2.json
+    if not analisador.executar_analise_completa(bootstrap=opcoes['bootstrap'], estratificado=opcoes['estratificado'],
+                                                formatos_relatorio=()):
+        raise RuntimeError("análise não concluída")
+
+
+def _exportar_metricas_banco(config: Dict, base: Path):
+    import armazenamento
+
+    (base / "metricas").mkdir(exist_ok=True)
+    conexao = armazenamento.conectar(base / "coleta.sqlite")
+    try:
+        for nome in config['metricas_banco']['metricas']:
+            colunas, linhas = armazenamento.consultar(conexao, armazenamento.METRICAS[nome])
+            with open(base / "metricas" / f"{nome}.csv", 'w', newline='', encoding='utf-8') as f:
+                escritor = csv.writer(f)
+                escritor.writerow(colunas)
+                escritor.writerows(linhas)
+    finally:
+        conexao.close()
+
+
+def _gerar_relatorio(config: Dict, base: Path):
+    import relatorio
+
+    cache = relatorio.carregar_cache(base / "resultados_sprint2.json")
+    for formato in config['relatorio']['formatos']:
+        caminho = relatorio.gerar_relatorio(cache['resultados'], cache['resumo'],
+                                            base / f"relatorio_sprint2.{formato}", formato,
+                                            cache.get('formato_graficos'))
+        logger.info("Relatório salvo: %s", caminho.name)
+
+
+def montar_etapas(config: Dict) -> Dict[str, Etapa]:
+    """
+    Grafo de etapas do projeto, com as saídas que dependem da configuração
+    """
+    etapas = [
+        Etapa('repositorios', _coletar_repositorios,
+              saidas=["todos_repositorios_populares.json", "repositorios_selecionados.json",
+                      "resumo_repositorios.csv"],
+              parametros=['coleta_repositorios'],
+              codigo=['coletor_repositorios.py', 'cliente_http.py']),
+        Etapa('prs', _coletar_prs,
+              entradas=["repositorios_selecionados.json"],
+              saidas=["dataset_prs.json", "dataset_prs.csv", "coleta.sqlite"],
+              parametros=['coleta_prs'],
+              dependencias=['repositorios'],
+              codigo=['coletor_prs.py', 'cliente_http.py', 'armazenamento.py', 'metricas_pr.py', 'amostragem_prs.py',
+                      'coleta_pipeline.py']),
+        Etapa('analise', _analisar,
+              entradas=["dataset_prs.csv"],
+              saidas=["resultados_sprint2.json", "graficos"],
+              parametros=['analise', 'categorias'],
+              dependencias=['prs'],
+              codigo=['executar_sprint2.py', 'preparacao.py', 'estratificacao.py', 'reamostragem.py']),
+        Etapa('metricas_banco', _exportar_metricas_banco,
+              entradas=["coleta.sqlite"],
+              saidas=[f"metricas/{nome}.csv" for nome in config['metricas_banco']['metricas']],
+              parametros=['metricas_banco'],
+              dependencias=['prs'],
+              codigo=['armazenamento.py']),
+        Etapa('relatorio', _gerar_relatorio,
+              entradas=["resultados_sprint2.json"],
+              saidas=[f"relatorio_sprint2.{formato}" for formato in config['relatorio']['formatos']],
+              parametros=['relatorio'],
+              dependencias=['analise'],
+              codigo=['relatorio.py']),
+    ]
+    return {etapa.nome: etapa for etapa in etapas}
+
+
+def modulos_locais(scripts: Sequence[str]) -> List[str]:
+    """
+    Scripts do projeto importados pelos scripts dados, direta ou indiretamente
+
+    Inclui os imports dentro de funções (os módulos pesados são importados sob
+    demanda) e ignora os módulos que não estão em DIRETORIO_SCRIPTS.
+
+    Args:
+        scripts: Nomes dos arquivos, ex.: ['executar_sprint2.py']
+
+    Returns:
+        Nomes dos arquivos, incluindo os dados, em ordem alfabética
+    """
+    vistos, pendentes = set(), list(scripts)
+    while pendentes:
+        nome = pendentes.pop()
+        caminho = configuracao.DIRETORIO_SCRIPTS / nome
+        if nome in vistos or not caminho.exists():
+            continue
+        vistos.add(nome)
+        for no in ast.walk(ast.parse(caminho.read_text(encoding='utf-8'))):
+            if isinstance(no, ast.Import):
+                modulos = [alias.name for alias in no.names]
+            elif isinstance(no, ast.ImportFrom) and not no.level and no.module:
+                modulos = [no.module]
+            else:
+                continue
+            pendentes += [f"{modulo.split('.')[0]}.py" for modulo in modulos]
+    return sorted(vistos)
+
+
+def hash_caminho(caminho: Path) -> Optional[str]:
+    """
+    SHA-256 do conteúdo de um arquivo, ou dos nomes e conteúdos de um diretório
+
+    Returns:
+        Hash em hexadecimal, ou None se o caminho não existe
+    """
+    if not caminho.exists():
+        return None
+    h = hashlib.sha256()
+    if caminho.is_dir():
+        arquivos = sorted(p for p in caminho.rglob('*') if p.is_file())
+    else:
+        arquivos = [caminho]
+    for arquivo in arquivos:
+        if arquivo != caminho:
+            h.update(arquivo.relative_to(caminho).as_posix().encode())
+        with open(arquivo, 'rb') as f:
+            for bloco in iter(lambda: f.read(1 << 20), b''):
+                h.update(bloco)
+    return h.hexdigest()
+
+
+class Pipeline:
+    """
+    Executa as etapas na ordem do grafo, pulando as que estão em dia
+    """
+
+    def __init__(self, config: Dict, etapas: Optional[Dict[str, Etapa]] = None, max_paralelo: int = 2):
+        """
+        Args:
+            config: Configuração carregada por configuracao.carregar()
+            etapas: Grafo de etapas (padrão: montar_etapas(config))
+            max_paralelo: Máximo de etapas executadas ao mesmo tempo
+        """
+        self.config = config
+        self.base = Path(config['caminho_base'])
+        self.base.mkdir(parents=True, exist_ok=True)
+        self.etapas = etapas if etapas is not None else montar_etapas(config)
+        self.max_paralelo = max_paralelo
+        self.caminho_estado = self.base / ARQUIVO_ESTADO
+        self.estado = self._carregar_estado()
+        self._trava = threading.Lock()
+
+    def _carregar_estado(self) -> Dict:
+        if self.caminho_estado.exists():
+            with open(self.caminho_estado, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return {}
+
+    def _salvar_estado(self):
+        temporario = self.caminho_estado.with_suffix('.tmp')
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump(self.estado, f, indent=2, sort_keys=True)
+        temporario.replace(self.caminho_estado)
+
+    def impressao_digital(self, etapa: Etapa) -> str:
+        """
+        Hash dos parâmetros, das entradas e do código da etapa
+        """
+        partes = {
+            'parametros': {secao: self.config.get(secao) for secao in etapa.parametros},
+            'entradas': {nome: hash_caminho(self.base / nome) for nome in etapa.entradas},
+            'codigo': {nome: hash_caminho(configuracao.DIRETORIO_SCRIPTS / nome)
+                       for nome in modulos_locais(etapa.codigo)},
+        }
+        return hashlib.sha256(json.dumps(partes, sort_keys=True).encode()).hexdigest()
+
+    def _em_dia(self, etapa: Etapa, impressao: str) -> bool:
+        anterior = self.estado.get(etapa.nome)
+        if not anterior or anterior['impressao'] != impressao:
+            return False
+        # Saídas apagadas ou alteradas fora do pipeline também invalidam a etapa
+        for nome in etapa.saidas:
+            atual = hash_caminho(self.base / nome)
+            if atual is None or atual != anterior['saidas'].get(nome):
+                return False
+        return True
+
+    def selecionar(self, alvos: Optional[Sequence[str]] = None) -> List[str]:
+        """
+        Etapas necessárias para os alvos (eles e todas as suas dependências), em ordem topológica
+        """
+        for nome in alvos or ():
+            if nome not in self.etapas:
+                raise ValueError(f"Etapa desconhecida: {nome} (opções: {', '.join(self.etapas)})")
+
+        ordem, visitadas = [], set()
+
+        def visitar(nome: str, caminho: tuple):
+            if nome in caminho:
+                raise ValueError(f"Ciclo no pipeline: {' -> '.join(caminho + (nome,))}")
+            if nome in visitadas:
+                return
+            for dependencia in self.etapas[nome].dependencias:
+                visitar(dependencia, caminho + (nome,))
+            visitadas.add(nome)
+            ordem.append(nome)
+
+        for nome in alvos or self.etapas:
+            visitar(nome, ())
+        return ordem
+
+    def _executar_etapa(self, etapa: Etapa, impressao: str):
+        ausentes = [nome for nome in etapa.entradas if not (self.base / nome).exists()]
+        if ausentes:
+            raise RuntimeError(f"entradas ausentes: {', '.join(ausentes)}")
+        logger.info("[%s] executando", etapa.nome)
+        etapa.funcao(self.config, self.base)
+        saidas = {nome: hash_caminho(self.base / nome) for nome in etapa.saidas}
+        faltando = [nome for nome, h in saidas.items() if h is None]
+        if faltando:
+            raise RuntimeError(f"saídas não geradas: {', '.join(faltando)}")
+        with self._trava:
+            self.estado[etapa.nome] = {'impressao': impressao, 'saidas': saidas}
+            self._salvar_estado()
+
+    def executar(self, alvos: Optional[Sequence[str]] = None, forcar: Sequence[str] = (),
+                 seco: bool = False, sem_dependencias: bool = False) -> Dict[str, str]:
+        """
+        Executa as etapas desatualizadas necessárias para os alvos
+
+        Args:
+            alvos: Etapas desejadas (padrão: todas)
+            forcar: Etapas executadas mesmo se estiverem em dia
+            seco: Só informa o que seria executado
+            sem_dependencias: Executa só os alvos, usando as entradas que já existem no
+                diretório base (por exemplo, um dataset coletado fora do pipeline)
+
+        Returns:
+            Situação de cada etapa: 'executada', 'em cache', 'falhou', 'ignorada' ou,
+            no modo seco, 'executaria'
+        """
+        ordem = self.selecionar(alvos)
+        if sem_dependencias and alvos:
+            ordem = [nome for nome in ordem if nome in alvos]
+        for nome in forcar:
+            if nome not in self.etapas:
+                raise ValueError(f"Etapa desconhecida: {nome} (opções: {', '.join(self.etapas)})")
+        # Dependências fora da seleção contam como em dia
+        situacao: Dict[str, str] = {nome: 'em cache' for nome in self.etapas if nome not in ordem}
+
+        if seco:
+            for nome in ordem:
+                etapa = self.etapas[nome]
+                # Se uma dependência vai rodar, as entradas desta ainda não são conhecidas
+                depende_de_execucao = any(situacao[d] == 'executaria' for d in etapa.dependencias)
+                em_dia = not depende_de_execucao and nome not in forcar and \
+                    self._em_dia(etapa, self.impressao_digital(etapa))
+                situacao[nome] = 'em cache' if em_dia else 'executaria'
+                logger.info("[%s] %s", nome, situacao[nome])
+            return {nome: situacao[nome] for nome in ordem}
+
+        pendentes = list(ordem)
+        em_execucao = {}
+        with ThreadPoolExecutor(max_workers=self.max_paralelo) as executor:
+            while pendentes or em_execucao:
+                for nome in list(pendentes):
+                    etapa = self.etapas[nome]
+                    estados = [situacao.get(d) for d in etapa.dependencias]
+                    if any(s in ('falhou', 'ignorada') for s in estados):
+                        situacao[nome] = 'ignorada'
+                        pendentes.remove(nome)
+                        logger.warning("[%s] ignorada: uma dependência falhou", nome)
+                    elif all(s in ('executada', 'em cache') for s in estados):
+                        pendentes.remove(nome)
+                        impressao = self.impressao_digital(etapa)
+                        if nome not in forcar and self._em_dia(etapa, impressao):
+                            situacao[nome] = 'em cache'
+                            logger.info("[%s] em cache", nome)
+                        else:
+                            em_execucao[executor.submit(self._executar_etapa, etapa, impressao)] = nome
+                if not em_execucao:
+                    continue
+
+                concluidas, _ = wait(em_execucao, return_when=FIRST_COMPLETED)
+                for futuro in concluidas:
+                    nome = em_execucao.pop(futuro)
+                    try:
+                        futuro.result()
+                        situacao[nome] = 'executada'
+                        logger.info("[%s] concluída", nome)
+                    except Exception as e:
+                        situacao[nome] = 'falhou'
+                        logger.error("[%s] falhou: %s", nome, e, exc_info=True)
+        return {nome: situacao[nome] for nome in ordem}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Executa o pipeline da coleta ao relatório")
+    parser.add_argument('--config', help="Arquivo de configuração (padrão: pipeline.json)")
+    parser.add_argument('--alvo', nargs='+', help="Etapas desejadas (padrão: todas)")
+    parser.add_argument('--forcar', nargs='+', default=[], help="Etapas executadas mesmo se estiverem em dia")
+    parser.add_argument('--seco', action='store_true', help="Só mostra o que seria executado")
+    parser.add_argument('--sem-dependencias', action='store_true',
+                        help="Executa só os alvos, com as entradas já existentes no diretório base")
+    parser.add_argument('--paralelo', type=int, default=2, help="Máximo de etapas simultâneas")
+    args = parser.parse_args()
+
+    registro.configurar_logging()
+    config = configuracao.carregar(args.config)
+    pipeline = Pipeline(config, max_paralelo=args.paralelo)
+    try:
+        situacao = pipeline.executar(args.alvo, forcar=args.forcar, seco=args.seco,
+                                    sem_dependencias=args.sem_dependencias)
+    except ValueError as e:
+        parser.error(str(e))
+
+    logger.info("Diretório base: %s", pipeline.base)
+    for nome, estado in situacao.items():
+        logger.info("  %-15s %s", nome, estado)
+    if any(estado == 'falhou' for estado in situacao.values()):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+"""
+Núcleo vetorizado da preparação dos dados
+Lab 03 - Caracterizando a atividade de code review no GitHub
+
+Calcula, em uma única passada pelos dados, o que AnalisadorPRs.preparar_dados
+antes obtinha com uma passada por operação (um pd.cut por categoria, um
+quantile por percentil e um describe por métrica):
+
+- Códigos das categorias: posição de cada valor nos limites da categoria (como
+  np.searchsorted), em códigos int8 (-1 para valores fora dos limites ou
+  ausentes), com a mesma semântica do pd.cut (intervalos fechados à direita)
+- Contagem, média e desvio padrão (ddof=1) de cada métrica, mesclados bloco a
+  bloco (Chan et al.)
+- Quantis de todas as métricas, iguais aos de np.quantile e do pandas
+  (interpolação linear): por contagem (np.bincount) nas métricas de valores
+  inteiros entre 0 e LIMITE_CONTAGEM, e por seleção (np.partition) sobre a
+  linha da métrica em uma matriz (métricas × PRs) nas demais
+
+Os dados são percorridos em blocos de TAMANHO_BLOCO linhas: cada bloco é
+copiado para a matriz e, ainda no cache, discretizado e resumido. A matriz
+é então reordenada no lugar para os quantis (ver quantis).
+
+O ganho vem de percorrer os dados uma vez só, e não uma vez por operação, e
+de não ordenar mais do que o necessário para os quantis: a contagem evita a
+seleção nas métricas inteiras, e nas demais cada np.partition reparte só o
+trecho que ainda contém as posições pedidas. Com 10 milhões de PRs e o numpy
+de requirements.txt (benchmarks/bench_preparacao.py), a preparação fica
+cerca de 4× mais rápida que a anterior, com os mesmos resultados.
+"""
+
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Linhas por bloco: 64 Ki valores float64 (512 KiB) por métrica cabem no cache L2
+TAMANHO_BLOCO = 1 << 16
+
+# Maior valor (exclusivo) das métricas inteiras cujos quantis saem da contagem
+# dos valores: a tabela tem até 8 MiB (a descrição do PR tem até 65536 caracteres)
+LIMITE_CONTAGEM = 1 << 20
+
+# Até quantos limites a discretização compara com cada limite em vez da busca binária
+LIMITES_BUSCA_LINEAR = 16
+
+
+def codigos_categoria(valores: np.ndarray, limites: np.ndarray, saida: np.ndarray):
+    """
+    Discretiza um bloco nos intervalos (limites[i], limites[i+1]]
+
+    Com poucos limites, conta os limites menores que cada valor (o mesmo que
+    np.searchsorted(limites, valores) - 1, sem desvios condicionais); com
+    muitos, usa a busca binária.
+
+    Args:
+        valores: Valores do bloco (float64)
+        limites: Limites crescentes dos intervalos
+        saida: Array que recebe os códigos (-1 fora dos limites ou NaN)
+    """
+    if len(limites) > LIMITES_BUSCA_LINEAR:
+        posicoes = np.searchsorted(limites, valores, side='left')
+        posicoes -= 1
+        posicoes[posicoes >= len(limites) - 1] = -1
+        saida[:] = posicoes
+        return
+
+    saida[:] = valores > limites[0]
+    for limite in limites[1:]:
+        saida += valores > limite
+    # Até o primeiro limite sai -1 da subtração; depois do último (e NaN), len(limites) - 1
+    saida -= 1
+    saida[saida >= len(limites) - 1] = -1
+
+
+def _posicoes(n: int, probabilidades: Sequence[float]):
+    indices = (n - 1) * np.asarray(probabilidades, dtype='float64')
+    anteriores = np.floor(indices).astype(np.intp)
+    return indices, anteriores, np.minimum(anteriores + 1, n - 1)
+
+
+def _interpolar(indices: np.ndarray, anteriores: np.ndarray, anterior: np.ndarray, proximo: np.ndarray):
+    # Interpolação como a de np.quantile (_lerp), para resultados idênticos
+    fracao = indices - anteriores
+    diferenca = proximo - anterior
+    return np.where(fracao >= 0.5, proximo - diferenca * (1 - fracao), anterior + diferenca * fracao)
+
+
+def _selecionar(valores: np.ndarray, posicoes: Sequence[int]):
+    """
+    Põe em cada posição (crescentes, sem repetição) o valor que ela teria no array ordenado
+
+    Cada np.partition separa as posições da mediana das demais, que são
+    buscadas só do seu lado; posições na ponta do trecho saem do mínimo ou do
+    máximo dele. Para (1%, 50%, 99%), são 2n elementos repartidos, contra
+    2,5n selecionando da maior posição para a menor.
+    """
+    while posicoes:
+        if posicoes[-1] == len(valores) - 1:
+            maior = np.argmax(valores)
+            valores[maior], valores[-1] = valores[-1], valores[maior]
+            valores, posicoes = valores[:-1], posicoes[:-1]
+        elif posicoes[0] == 0:
+            menor = np.argmin(valores)
+            valores[menor], valores[0] = valores[0], valores[menor]
+            valores, posicoes = valores[1:], [k - 1 for k in posicoes[1:]]
+        else:
+            meio = len(posicoes) // 2
+            k = posicoes[meio]
+            valores.partition(k)
+            _selecionar(valores[:k], posicoes[:meio])
+            valores, posicoes = valores[k + 1:], [p - k - 1 for p in posicoes[meio + 1:]]
+
+
+def quantis(valores: np.ndarray, probabilidades: Sequence[float]) -> np.ndarray:
+    """
+    Quantis com interpolação linear, iguais aos de np.quantile (e do pandas)
+
+    Em vez de copiar o array e repartir todas as posições de uma vez, como
+    np.quantile, reordena o próprio array com um np.partition por posição,
+    cada um sobre o trecho que ainda a contém (ver _selecionar).
+
+    Args:
+        valores: Valores sem NaN (reordenados no lugar)
+        probabilidades: Quantis a calcular, entre 0 e 1
+
+    Returns:
+        Array com um valor por probabilidade
+    """
+    n = len(valores)
+    if not n:
+        return np.full(len(probabilidades), np.nan)
+
+    indices, anteriores, proximos = _posicoes(n, probabilidades)
+    _selecionar(valores, sorted(set(anteriores.tolist()) | set(proximos.tolist())))
+    return _interpolar(indices, anteriores, valores[anteriores].astype('float64'),
+                       valores[proximos].astype('float64'))
+
+
+def quantis_contagem(valores: np.ndarray, probabilidades: Sequence[float]) -> np.ndarray:
+    """
+    Quantis de valores inteiros entre 0 e LIMITE_CONTAGEM, pela contagem de cada valor
+
+    Uma passada (np.bincount) e uma busca nas contagens acumuladas dão os
+    mesmos valores de ordem que a seleção, sem reordenar os dados.
+
+    Args:
+        valores: Valores inteiros sem NaN
+        probabilidades: Quantis a calcular, entre 0 e 1
+
+    Returns:
+        Array com um valor por probabilidade
+    """
+    n = len(valores)
+    if not n:
+        return np.full(len(probabilidades), np.nan)
+
+    acumuladas = np.cumsum(np.bincount(valores))
+    indices, anteriores, proximos = _posicoes(n, probabilidades)
+    # O valor na posição k é o primeiro cuja contagem acumulada passa de k
+    anterior = np.searchsorted(acumuladas, anteriores, side='right').astype('float64')
+    proximo = np.searchsorted(acumuladas, proximos, side='right').astype('float64')
+    return _interpolar(indices, anteriores, anterior, proximo)
+
+
+def _inteiros_contaveis(valores: np.ndarray) -> Optional[np.ndarray]:
+    """
+    Os valores como inteiros, se todos forem inteiros entre 0 e LIMITE_CONTAGEM (senão None)
+    """
+    if not len(valores) or valores.min() < 0 or valores.max() >= LIMITE_CONTAGEM:
+        return None
+    if np.issubdtype(valores.dtype, np.integer):
+        return valores.astype(np.intp, copy=False)
+    # Valores fracionários costumam aparecer logo no início
+    if np.any(valores[:TAMANHO_BLOCO] % 1):
+        return None
+    inteiros = valores.astype(np.intp)
+    return inteiros if (inteiros == valores).all() else None
+
+
+def preparar(colunas: Dict[str, np.ndarray], metricas: Sequence[str],
+             categorias: Dict[str, Tuple[str, Iterable[float]]], probabilidades: Sequence[float],
+             tamanho_bloco: int = TAMANHO_BLOCO) -> Tuple[Dict, Dict, Dict]:
+    """
+    Calcula códigos das categorias, momentos e quantis das métricas
+
+    Args:
+        colunas: Valores de cada coluna usada (métricas e origens das categorias)
+        metricas: Colunas resumidas (momentos e quantis)
+        categorias: Categoria -> (coluna de origem, limites)
+        probabilidades: Quantis calculados para todas as métricas
+        tamanho_bloco: Linhas processadas por bloco
+
+    Returns:
+        Tupla (categoria -> códigos int8, métrica -> array de quantis,
+        métrica -> {'count', 'mean', 'std'})
+    """
+    n = len(next(iter(colunas.values()))) if colunas else 0
+
+    # Métricas com NaN (PRs sem num_reviews, por exemplo) usam as versões nan* das reduções
+    ausentes = {m for m in metricas
+                if np.issubdtype(colunas[m].dtype, np.floating) and np.isnan(colunas[m]).any()}
+    linha = {m: i for i, m in enumerate(metricas)}
+    com_ausentes = [linha[m] for m in ausentes]
+    matriz = np.empty((len(linha), n), dtype='float64')
+
+    limites = {c: np.asarray(list(lim), dtype='float64') for c, (_, lim) in categorias.items()}
+    codigos = {c: np.empty(n, dtype='int8') for c in categorias}
+
+    contagens = np.zeros(len(linha))
+    medias = np.zeros(len(linha))
+    m2 = np.zeros(len(linha))
+    auxiliar = np.empty(min(tamanho_bloco, n), dtype='float64')
+
+    for inicio in range(0, n, tamanho_bloco):
+        fim = min(inicio + tamanho_bloco, n)
+        for m, i in linha.items():
+            matriz[i, inicio:fim] = colunas[m][inicio:fim]
+        bloco = matriz[:, inicio:fim]
+
+        for c, (origem, _) in categorias.items():
+            if origem in linha:
+                valores = bloco[linha[origem]]
+            else:
+                valores = auxiliar[:fim - inicio]
+                valores[:] = colunas[origem][inicio:fim]
+            codigos_categoria(valores, limites[c], codigos[c][inicio:fim])
+
+        # Momentos do bloco, mesclados aos acumulados (Chan et al.). Nas linhas
+        # com NaN, a soma ignora os NaN e os desvios deles são zerados
+        n_bloco = np.full(len(linha), float(fim - inicio))
+        soma = bloco.sum(axis=1)
+        nulos = {}
+        for i in com_ausentes:
+            nulos[i] = np.isnan(bloco[i])
+            n_bloco[i] -= np.count_nonzero(nulos[i])
+            soma[i] = bloco[i].sum(where=~nulos[i])
+        media_bloco = np.divide(soma, n_bloco, out=np.zeros_like(soma), where=n_bloco > 0)
+        desvios = bloco - media_bloco[:, None]
+        for i, nulo in nulos.items():
+            desvios[i][nulo] = 0
+        m2_bloco = np.einsum('ij,ij->i', desvios, desvios)
+
+        total = contagens + n_bloco
+        delta = media_bloco - medias
+        peso = np.divide(n_bloco, total, out=np.zeros_like(total), where=total > 0)
+        medias += delta * peso
+        m2 += m2_bloco + delta * delta * contagens * peso
+        contagens = total
+
+    momentos = {}
+    for m, i in linha.items():
+        contagem = contagens[i]
+        momentos[m] = {
+            'count': float(contagem),
+            'mean': float(medias[i]) if contagem else float('nan'),
+            'std': float(np.sqrt(m2[i] / (contagem - 1))) if contagem > 1 else float('nan'),
+        }
+
+    # Quantis de cada métrica: por contagem, quando os valores são inteiros
+    # pequenos, ou sobre a sua linha da matriz, que é descartada depois e pode
+    # ser reordenada no lugar (sem os NaN, quando há)
+    resultado = {}
+    for m, i in linha.items():
+        valores = matriz[i][~np.isnan(matriz[i])] if m in ausentes else matriz[i]
+        inteiros = _inteiros_contaveis(colunas[m] if m not in ausentes else valores)
+        if inteiros is not None:
+            resultado[m] = quantis_contagem(inteiros, probabilidades)
+        else:
+            resultado[m] = quantis(valores, probabilidades)
+
+    return codigos, resultado, momentos
@@ -0,0 +1,395 @@
+"""
+Reamostragem bootstrap e testes de permutação vetorizados
+Lab 03 - Caracterizando a atividade de code review no GitHub
+
+As métricas dos PRs são inteiras (ou discretizadas em segundos) e têm muitos
+empates, então cada amostra é representada pelos seus valores distintos e
+respectivas contagens. Uma reamostragem bootstrap equivale a sortear novas
+contagens de uma multinomial, e uma permutação de rótulos equivale a sortear
+uma hipergeométrica multivariada. Assim, cada lote de reamostragens é uma
+matriz (reamostragens x valores distintos), dimensionada para caber em
+`memoria_mb`, e os lotes são distribuídos entre processos.
+"""
+
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations, permutations
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+# Dados compartilhados com os processos do pool (definidos pelo inicializador)
+_DADOS_WORKER: Dict = {}
+
+
+def _inicializar_worker(dados: Dict):
+    global _DADOS_WORKER
+    _DADOS_WORKER = dados
+
+
+def _medianas_de_contagens(contagens: np.ndarray, n: int, valores: np.ndarray) -> np.ndarray:
+    """
+    Mediana de cada linha de uma matriz de contagens por valor distinto
+    """
+    acumulado = np.cumsum(contagens, axis=1)
+    i_inf = (acumulado < (n + 1) // 2).sum(axis=1)
+    i_sup = (acumulado < n // 2 + 1).sum(axis=1)
+    return (valores[i_inf] + valores[i_sup]) / 2.0
+
+
+def _postos_medios(contagens: np.ndarray) -> np.ndarray:
+    """
+    Posto médio (tratamento de empates do scipy) de cada valor distinto
+    """
+    return np.cumsum(contagens, axis=-1) - (contagens - 1) / 2.0
+
+
+def _u_de_contagens(c1: np.ndarray, c2: np.ndarray, n1: int) -> np.ndarray:
+    postos = _postos_medios(c1 + c2)
+    return (c1 * postos).sum(axis=-1) - n1 * (n1 + 1) / 2.0
+
+
+# ============================================================================
+# Kernels executados por lote (um gerador aleatório por lote)
+# ============================================================================
+
+def _lote_bootstrap_mann_whitney(rng: np.random.Generator, lote: int) -> np.ndarray:
+    d = _DADOS_WORKER
+    c1 = rng.multinomial(d['n1'], d['p1'], size=lote)
+    c2 = rng.multinomial(d['n2'], d['p2'], size=lote)
+    mediana1 = _medianas_de_contagens(c1, d['n1'], d['valores'])
+    mediana2 = _medianas_de_contagens(c2, d['n2'], d['valores'])
+    efeito = _u_de_contagens(c1, c2, d['n1']) / (d['n1'] * d['n2'])
+    return np.column_stack([mediana1, mediana2, efeito])
+
+
+def _lote_bootstrap_spearman(rng: np.random.Generator, lote: int) -> np.ndarray:
+    d = _DADOS_WORKER
+    n = d['n']
+    cp = rng.multinomial(n, d['p_pares'], size=lote).astype(float)
+
+    # Contagens marginais: pares ordenados por x, e reordenados por y
+    cx = np.add.reduceat(cp, d['inicio_x'], axis=1)
+    cy = np.add.reduceat(cp[:, d['ordem_y']], d['inicio_y'], axis=1)
+
+    centro = (n + 1) / 2.0
+    rx = _postos_medios(cx)[:, d['par_x']] - centro
+    ry = _postos_medios(cy)[:, d['par_y']] - centro
+
+    sxy = (cp * rx * ry).sum(axis=1)
+    sxx = (cp * rx * rx).sum(axis=1)
+    syy = (cp * ry * ry).sum(axis=1)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rho = sxy / np.sqrt(sxx * syy)
+    return rho[:, None]
+
+
+def _lote_permutacao_mann_whitney(rng: np.random.Generator, lote: int) -> np.ndarray:
+    d = _DADOS_WORKER
+    c1 = rng.multivariate_hypergeometric(d['contagens'], d['n1'], size=lote)
+    u = c1 @ d['postos'] - d['n1'] * (d['n1'] + 1) / 2.0
+    return u[:, None]
+
+
+def _lote_permutacao_spearman(rng: np.random.Generator, lote: int) -> np.ndarray:
+    d = _DADOS_WORKER
+    permutados = rng.permuted(np.tile(d['b'], (lote, 1)), axis=1)
+    return (permutados @ d['a'])[:, None]
+
+
+_KERNELS = {
+    'bootstrap_mann_whitney': _lote_bootstrap_mann_whitney,
+    'bootstrap_spearman': _lote_bootstrap_spearman,
+    'permutacao_mann_whitney': _lote_permutacao_mann_whitney,
+    'permutacao_spearman': _lote_permutacao_spearman,
+}
+
+
+def _executar_lote(tarefa: Tuple[str, int, np.random.SeedSequence]) -> np.ndarray:
+    kernel, lote, semente = tarefa
+    return _KERNELS[kernel](np.random.default_rng(semente), lote)
+
+
+def _executar_em_lotes(kernel: str, dados: Dict, total: int, bytes_por_reamostragem: int,
+                       memoria_mb: int, n_processos: Optional[int], semente: Optional[int]) -> np.ndarray:
+    """
+    Divide `total` reamostragens em lotes que cabem em `memoria_mb` e executa
+    cada lote no pool de processos (ou no próprio processo, se houver um só lote)
+    """
+    lote = max(1, min(total, (memoria_mb * 1024 * 1024) // max(1, bytes_por_reamostragem)))
+    tamanhos = [lote] * (total // lote)
+    if total % lote:
+        tamanhos.append(total % lote)
+
+    sementes = np.random.SeedSequence(semente).spawn(len(tamanhos))
+    tarefas = [(kernel, tamanho, s) for tamanho, s in zip(tamanhos, sementes)]
+
+    n_processos = min(n_processos or os.cpu_count() or 1, len(tarefas))
+
+    if n_processos <= 1:
+        _inicializar_worker(dados)
+        resultados = [_executar_lote(t) for t in tarefas]
+    else:
+        with ProcessPoolExecutor(max_workers=n_processos, initializer=_inicializar_worker,
+                                 initargs=(dados,)) as pool:
+            resultados = list(pool.map(_executar_lote, tarefas))
+
+    return np.vstack(resultados)
+
+
+def _intervalo(amostras: np.ndarray, nivel_confianca: float) -> Tuple[float, float]:
+    alfa = 1 - nivel_confianca
+    inf, sup = np.nanpercentile(amostras, [100 * alfa / 2, 100 * (1 - alfa / 2)])
+    return float(inf), float(sup)
+
+
+def _limpar(valores) -> np.ndarray:
+    valores = np.asarray(valores, dtype=float)
+    return valores[~np.isnan(valores)]
+
+
+# ============================================================================
+# API pública
+# ============================================================================
+
+def bootstrap_mann_whitney(grupo1, grupo2, n_reamostragens: int = 10000,
+                           nivel_confianca: float = 0.95, memoria_mb: int = 256,
+                           n_processos: Optional[int] = None,
+                           semente: Optional[int] = None) -> Dict:
+    """
+    Intervalos bootstrap (percentil) para as medianas de dois grupos e para o
+    tamanho de efeito do Mann-Whitney U
+
+    O tamanho de efeito é a probabilidade de superioridade U1 / (n1 * n2), isto é,
+    P(grupo1 > grupo2) + 0.5 * P(empate). Os grupos são reamostrados de forma
+    independente (bootstrap estratificado).
+
+    Args:
+        grupo1: Valores do primeiro grupo
+        grupo2: Valores do segundo grupo
+        n_reamostragens: Número de reamostragens bootstrap
+        nivel_confianca: Nível de confiança dos intervalos
+        memoria_mb: Memória máxima por lote de reamostragens
+        n_processos: Número de processos (None usa todos os núcleos)
+        semente: Semente do gerador aleatório
+
+    Returns:
+        Dicionário com os intervalos e o efeito observado
+    """
+    grupo1, grupo2 = _limpar(grupo1), _limpar(grupo2)
+    n1, n2 = len(grupo1), len(grupo2)
+
+    valores, codigos = np.unique(np.concatenate([grupo1, grupo2]), return_inverse=True)
+    contagem1 = np.bincount(codigos[:n1], minlength=len(valores))
+    contagem2 = np.bincount(codigos[n1:], minlength=len(valores))
+
+    dados = {
+        'valores': valores,
+        'n1': n1,
+        'n2': n2,
+        'p1': contagem1 / n1,
+        'p2': contagem2 / n2,
+    }
+
+    amostras = _executar_em_lotes(
+        'bootstrap_mann_whitney', dados, n_reamostragens,
+        bytes_por_reamostragem=len(valores) * 8 * 6,
+        memoria_mb=memoria_mb, n_processos=n_processos, semente=semente
+    )
+
+    return {
+        'mediana_grupo1': float(np.median(grupo1)),
+        'mediana_grupo1_ic': _intervalo(amostras[:, 0], nivel_confianca),
+        'mediana_grupo2': float(np.median(grupo2)),
+        'mediana_grupo2_ic': _intervalo(amostras[:, 1], nivel_confianca),
+        'efeito_u': float(_u_de_contagens(contagem1, contagem2, n1) / (n1 * n2)),
+        'efeito_u_ic': _intervalo(amostras[:, 2], nivel_confianca),
+        'n_reamostragens': n_reamostragens,
+    }
+
+
+def bootstrap_spearman(x, y, n_reamostragens: int = 10000, nivel_confianca: float = 0.95,
+                       memoria_mb: int = 256, n_processos: Optional[int] = None,
+                       semente: Optional[int] = None) -> Dict:
+    """
+    Intervalo bootstrap (percentil) para a correlação de Spearman
+
+    Os pares (x, y) são reamostrados em conjunto, agrupados por par distinto.
+
+    Args:
+        x: Valores da primeira variável
+        y: Valores da segunda variável (mesmo tamanho de x)
+        n_reamostragens: Número de reamostragens bootstrap
+        nivel_confianca: Nível de confiança do intervalo
+        memoria_mb: Memória máxima por lote de reamostragens
+        n_processos: Número de processos (None usa todos os núcleos)
+        semente: Semente do gerador aleatório
+
+    Returns:
+        Dicionário com o intervalo de ρ
+    """
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    validos = ~(np.isnan(x) | np.isnan(y))
+    x, y = x[validos], y[validos]
+    n = len(x)
+
+    _, codigo_x = np.unique(x, return_inverse=True)
+    valores_y, codigo_y = np.unique(y, return_inverse=True)
+    my = len(valores_y)
+
+    # Pares distintos ordenados por (x, y): os valores de x ficam contíguos
+    chaves, frequencias = np.unique(codigo_x.astype(np.int64) * my + codigo_y, return_counts=True)
+    par_x, par_y = chaves // my, chaves % my
+    ordem_y = np.argsort(par_y, kind='stable')
+
+    dados = {
+        'n': n,
+        'p_pares': frequencias / n,
+        'par_x': par_x,
+        'par_y': par_y,
+        'inicio_x': np.flatnonzero(np.r_[True, np.diff(par_x) != 0]),
+        'ordem_y': ordem_y,
+        'inicio_y': np.flatnonzero(np.r_[True, np.diff(par_y[ordem_y]) != 0]),
+    }
+
+    amostras = _executar_em_lotes(
+        'bootstrap_spearman', dados, n_reamostragens,
+        bytes_por_reamostragem=len(chaves) * 8 * 8,
+        memoria_mb=memoria_mb, n_processos=n_processos, semente=semente
+    )
+
+    return {
+        'rho_ic': _intervalo(amostras[:, 0], nivel_confianca),
+        'n_reamostragens': n_reamostragens,
+    }
+
+
+def _p_valor(estatisticas: np.ndarray, observado: float, centro: float, exato: bool) -> float:
+    # Tolerância relativa para não perder empates por erro de arredondamento
+    extremos = np.abs(estatisticas - centro) >= abs(observado - centro) * (1 - 1e-12)
+    if exato:
+        return float(extremos.mean())
+    return float((extremos.sum() + 1) / (len(estatisticas) + 1))
+
+
+def _enumeravel(log_rearranjos: float, n_permutacoes: int, rearranjos) -> bool:
+    """
+    Indica se todos os rearranjos cabem em `n_permutacoes`
+
+    A comparação é feita em escala logarítmica: o número exato (inteiro enorme
+    em amostras grandes) só é calculado quando é pequeno.
+
+    Args:
+        log_rearranjos: Logaritmo natural do número de rearranjos
+        n_permutacoes: Número de permutações aleatórias
+        rearranjos: Função que calcula o número exato de rearranjos
+    """
+    if log_rearranjos > math.log(max(n_permutacoes, 1)) + 1e-9:
+        return False
+    return rearranjos() <= n_permutacoes
+
+
+def permutacao_mann_whitney(grupo1, grupo2, n_permutacoes: int = 10000,
+                            memoria_mb: int = 256, n_processos: Optional[int] = None,
+                            semente: Optional[int] = None) -> Dict:
+    """
+    Teste de permutação bilateral para a estatística U de Mann-Whitney
+
+    Quando o número de rearranjos possíveis não passa de `n_permutacoes`, todos
+    são enumerados (teste exato). Caso contrário, usa permutações aleatórias com
+    p-valor (k + 1) / (B + 1), que mantém o nível nominal do teste.
+
+    Args:
+        grupo1: Valores do primeiro grupo
+        grupo2: Valores do segundo grupo
+        n_permutacoes: Número de permutações aleatórias
+        memoria_mb: Memória máxima por lote de permutações
+        n_processos: Número de processos (None usa todos os núcleos)
+        semente: Semente do gerador aleatório
+
+    Returns:
+        Dicionário com o p-valor e se o teste foi exato
+    """
+    grupo1, grupo2 = _limpar(grupo1), _limpar(grupo2)
+    n1, n2 = len(grupo1), len(grupo2)
+
+    valores, codigos = np.unique(np.concatenate([grupo1, grupo2]), return_inverse=True)
+    contagens = np.bincount(codigos, minlength=len(valores))
+    postos = _postos_medios(contagens)
+    u_observado = float(postos[codigos[:n1]].sum() - n1 * (n1 + 1) / 2.0)
+    centro = n1 * n2 / 2.0
+
+    if _enumeravel(math.lgamma(n1 + n2 + 1) - math.lgamma(n1 + 1) - math.lgamma(n2 + 1), n_permutacoes,
+                   lambda: math.comb(n1 + n2, n1)):
+        postos_obs = postos[codigos]
+        estatisticas = np.array([
+            postos_obs[list(indices)].sum() - n1 * (n1 + 1) / 2.0
+            for indices in combinations(range(n1 + n2), n1)
+        ])
+        exato = True
+    else:
+        dados = {'contagens': contagens, 'n1': n1, 'postos': postos}
+        estatisticas = _executar_em_lotes(
+            'permutacao_mann_whitney', dados, n_permutacoes,
+            bytes_por_reamostragem=len(valores) * 8 * 2,
+            memoria_mb=memoria_mb, n_processos=n_processos, semente=semente
+        )[:, 0]
+        exato = False
+
+    return {
+        'p_valor': _p_valor(estatisticas, u_observado, centro, exato),
+        'exato': exato,
+        'n_permutacoes': len(estatisticas),
+    }
+
+
+def permutacao_spearman(x, y, n_permutacoes: int = 10000, memoria_mb: int = 256,
+                        n_processos: Optional[int] = None,
+                        semente: Optional[int] = None) -> Dict:
+    """
+    Teste de permutação bilateral para a correlação de Spearman
+
+    Permuta os postos de y em relação aos de x. Enumera todas as permutações
+    quando n! não passa de `n_permutacoes` (teste exato).
+
+    Args:
+        x: Valores da primeira variável
+        y: Valores da segunda variável (mesmo tamanho de x)
+        n_permutacoes: Número de permutações aleatórias
+        memoria_mb: Memória máxima por lote de permutações
+        n_processos: Número de processos (None usa todos os núcleos)
+        semente: Semente do gerador aleatório
+
+    Returns:
+        Dicionário com o p-valor e se o teste foi exato
+    """
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    validos = ~(np.isnan(x) | np.isnan(y))
+    x, y = x[validos], y[validos]
+    n = len(x)
+
+    def postos_centrados(valores):
+        _, codigos, contagens = np.unique(valores, return_inverse=True, return_counts=True)
+        return _postos_medios(contagens)[codigos] - (n + 1) / 2.0
+
+    a, b = postos_centrados(x), postos_centrados(y)
+    observado = float(a @ b)
+
+    if _enumeravel(math.lgamma(n + 1), n_permutacoes, lambda: math.factorial(n)):
+        estatisticas = np.array([b[list(p)] @ a for p in permutations(range(n))])
+        exato = True
+    else:
+        estatisticas = _executar_em_lotes(
+            'permutacao_spearman', {'a': a, 'b': b}, n_permutacoes,
+            bytes_por_reamostragem=n * 8 * 3,
+            memoria_mb=memoria_mb, n_processos=n_processos, semente=semente
+        )[:, 0]
+        exato = False
+
+    return {
+        'p_valor': _p_valor(estatisticas, observado, 0.0, exato),
+        'exato': exato,
+        'n_permutacoes': len(estatisticas),
+    }
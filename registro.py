@@ -0,0 +1,182 @@
+"""
+Logging estruturado e progresso da coleta
+Lab 03 - Caracterizando a atividade de code review no GitHub
+
+configurar_logging() instala um QueueHandler na raiz: o código que registra uma
+mensagem só a coloca em uma fila, e a escrita no terminal (e no arquivo JSON,
+se configurado) acontece em uma thread separada (QueueListener). Assim os laços
+da coleta não esperam pela saída do console.
+
+Variáveis de ambiente:
+- LAB3_LOG_NIVEL: nível mínimo (DEBUG, INFO, WARNING...; padrão INFO)
+- LAB3_LOG_JSON: arquivo que recebe cada registro como uma linha JSON
+
+Progresso relata, no máximo a cada `intervalo` segundos, itens concluídos,
+vazão, tempo estimado e a cota restante da API do GitHub.
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import time
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+# Última cota informada pela API (cabeçalhos X-RateLimit-*)
+_cota: Dict[str, Optional[int]] = {'restante': None, 'limite': None, 'reset': None}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class FormatadorJSON(logging.Formatter):
+    """
+    Uma linha JSON por registro; campos passados em extra={'dados': {...}} são incluídos
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        registro = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'nivel': record.levelname,
+            'logger': record.name,
+            'mensagem': record.getMessage(),
+        }
+        dados = getattr(record, 'dados', None)
+        if dados:
+            registro.update(dados)
+        if record.exc_info:
+            registro['excecao'] = self.formatException(record.exc_info)
+        return json.dumps(registro, ensure_ascii=False, default=str)
+
+
+def configurar_logging(nivel: Optional[str] = None, arquivo_json: Optional[str] = None):
+    """
+    Configura o logging da aplicação (pode ser chamada mais de uma vez)
+
+    Args:
+        nivel: Nível mínimo (padrão: LAB3_LOG_NIVEL ou INFO)
+        arquivo_json: Arquivo para os registros em JSON (padrão: LAB3_LOG_JSON)
+    """
+    global _listener
+
+    nivel = (nivel or os.getenv('LAB3_LOG_NIVEL', 'INFO')).upper()
+    arquivo_json = arquivo_json or os.getenv('LAB3_LOG_JSON')
+
+    if _listener is not None:
+        _listener.stop()
+
+    console = logging.StreamHandler()
+    console.setFormatter(logging.Formatter('%(message)s'))
+    destinos = [console]
+
+    if arquivo_json:
+        arquivo = logging.FileHandler(arquivo_json, encoding='utf-8')
+        arquivo.setFormatter(FormatadorJSON())
+        destinos.append(arquivo)
+
+    fila = queue.SimpleQueue()
+    raiz = logging.getLogger()
+    raiz.handlers = [logging.handlers.QueueHandler(fila)]
+    raiz.setLevel(nivel)
+
+    _listener = logging.handlers.QueueListener(fila, *destinos, respect_handler_level=True)
+    _listener.start()
+
+
+@atexit.register
+def encerrar_logging():
+    """
+    Esvazia a fila de registros (chamada automaticamente ao sair)
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def registrar_cota(response):
+    """
+    Guarda a cota restante informada nos cabeçalhos de uma resposta da API
+    """
+    for chave, cabecalho in (('restante', 'X-RateLimit-Remaining'), ('limite', 'X-RateLimit-Limit'),
+                             ('reset', 'X-RateLimit-Reset')):
+        valor = response.headers.get(cabecalho)
+        if valor is not None:
+            _cota[chave] = int(valor)
+
+
+def cota() -> Dict[str, Optional[int]]:
+    return dict(_cota)
+
+
+def _duracao(segundos: float) -> str:
+    segundos = int(segundos)
+    return f"{segundos // 3600:02d}:{segundos % 3600 // 60:02d}:{segundos % 60:02d}"
+
+
+class Progresso:
+    """
+    Progresso com limite de frequência
+
+    Exemplo:
+        progresso = Progresso(len(repositorios), "Repositórios", logger)
+        for repo in repositorios:
+            ...
+            progresso.avancar(prs=len(prs))
+        progresso.concluir()
+    """
+
+    def __init__(self, total: int, descricao: str, logger: logging.Logger, intervalo: float = 5.0):
+        self.total = total
+        self.descricao = descricao
+        self.logger = logger
+        self.intervalo = intervalo
+        self.concluidos = 0
+        self.contadores: Dict[str, int] = {}
+        self.inicio = time.monotonic()
+        self._ultimo = self.inicio
+
+    def avancar(self, n: int = 1, **contadores: int):
+        """
+        Registra n itens concluídos e soma os contadores extras (ex.: prs=120)
+        """
+        self.concluidos += n
+        for nome, valor in contadores.items():
+            self.contadores[nome] = self.contadores.get(nome, 0) + valor
+
+        agora = time.monotonic()
+        if agora - self._ultimo >= self.intervalo:
+            self._ultimo = agora
+            self._relatar(agora, logging.INFO)
+
+    def concluir(self):
+        self._relatar(time.monotonic(), logging.INFO, final=True)
+
+    def _relatar(self, agora: float, nivel: int, final: bool = False):
+        decorrido = max(agora - self.inicio, 1e-9)
+        taxa = self.concluidos / decorrido
+
+        partes = [f"{self.descricao}: {self.concluidos}/{self.total}"
+                  + (f" ({self.concluidos / self.total * 100:.1f}%)" if self.total else ""),
+                  f"{taxa:.2f}/s"]
+        for nome, valor in self.contadores.items():
+            partes.append(f"{valor} {nome} ({valor / decorrido:.1f}/s)")
+        if final:
+            partes.append(f"duração {_duracao(decorrido)}")
+        elif taxa > 0 and self.total:
+            partes.append(f"ETA {_duracao((self.total - self.concluidos) / taxa)}")
+        if _cota['restante'] is not None:
+            partes.append(f"cota {_cota['restante']}/{_cota['limite']}")
+
+        self.logger.log(nivel, " | ".join(partes), extra={'dados': {
+            'evento': 'progresso',
+            'descricao': self.descricao,
+            'concluidos': self.concluidos,
+            'total': self.total,
+            'taxa_por_s': taxa,
+            'decorrido_s': decorrido,
+            'cota_restante': _cota['restante'],
+            **self.contadores,
+        }})
@@ -0,0 +1,614 @@
+"""
+Geração do relatório final a partir dos resultados
+Lab 03 - Caracterizando a atividade de code review no GitHub
+
+O relatório usa apenas `resultados` (preenchido pelas RQs) e `resumo` (totais
+e estatísticas descritivas calculados uma vez em preparar_dados), sem acessar o
+DataFrame. O conteúdo é descrito como uma sequência de blocos (título,
+parágrafo, lista, tabela, imagem, separador) que cada formato renderiza com os
+seus templates e que é escrita em partes no arquivo de saída.
+
+Os resultados são salvos em cache (JSON) ao final da análise, e o relatório pode
+ser regenerado em outro formato sem recarregar o dataset:
+
+    python relatorio.py --formato html
+"""
+
+import argparse
+import html
+import json
+import re
+from datetime import datetime
+from pathlib import Path
+from string import Template
+from typing import Dict, Iterator, List, Optional
+
+import configuracao
+
+FORMATOS = ('md', 'html', 'json')
+
+TITULO = "Sprint 2 - Análise de Pull Requests do GitHub"
+
+# Gráfico de cada RQ (salvo em graficos/ por AnalisadorPRs)
+GRAFICOS = {
+    'RQ01': 'rq01_tamanho_vs_status',
+    'RQ02': 'rq02_tempo_vs_status',
+    'RQ03': 'rq03_descricao_vs_status',
+    'RQ04': 'rq04_interacoes_vs_status',
+    'RQ05': 'rq05_tamanho_vs_revisoes',
+    'RQ06': 'rq06_tempo_vs_revisoes',
+    'RQ07': 'rq07_descricao_vs_revisoes',
+    'RQ08': 'rq08_interacoes_vs_revisoes',
+}
+
+METRICAS_GERAIS = [
+    ('total_changes', 'Mudanças (linhas)'),
+    ('time_analysis_hours', 'Tempo (horas)'),
+    ('description_chars', 'Descrição (chars)'),
+    ('num_comments', 'Comentários'),
+    ('num_participants', 'Participantes'),
+    # Coleta com o plugin revisoes (metricas_pr.py); ausentes em datasets antigos
+    ('num_reviews', 'Revisões'),
+    ('first_review_hours', 'Tempo até a 1ª revisão (horas)'),
+]
+
+# Dimensão A: frase com a média de cada status e interpretações
+# (merged com média menor, merged com média maior, sem significância)
+RQS_STATUS = {
+    'RQ01': {
+        'titulo': 'RQ 01: Tamanho dos PRs vs Feedback Final',
+        'questao': 'Qual a relação entre o tamanho dos PRs e o feedback final das revisões?',
+        'media': Template('PRs **$status** têm em média **$media linhas** de mudanças'),
+        'interpretacao': ('PRs menores têm maior probabilidade de serem merged.',
+                          'PRs maiores têm maior probabilidade de serem merged.',
+                          'Não há evidência estatística de que o tamanho influencie o status final do PR.'),
+    },
+    'RQ02': {
+        'titulo': 'RQ 02: Tempo de Análise vs Feedback Final',
+        'questao': 'Qual a relação entre o tempo de análise dos PRs e o feedback final das revisões?',
+        'media': Template('PRs **$status** levam em média **$media horas** ($dias dias)'),
+        'interpretacao': ('PRs que são merged tendem a ser analisados mais rapidamente.',
+                          'PRs que são merged tendem a levar mais tempo para serem analisados.',
+                          'Não há evidência estatística de que o tempo de análise influencie o status final do PR.'),
+    },
+    'RQ03': {
+        'titulo': 'RQ 03: Descrição dos PRs vs Feedback Final',
+        'questao': 'Qual a relação entre a descrição dos PRs e o feedback final das revisões?',
+        'media': Template('PRs **$status** têm em média **$media caracteres** na descrição'),
+        'interpretacao': ('Descrições mais curtas estão associadas a maior probabilidade de merge.',
+                          'Descrições mais detalhadas estão associadas a maior probabilidade de merge.',
+                          'Não há evidência estatística de que o tamanho da descrição influencie o status final do PR.'),
+    },
+}
+
+# Dimensão B: interpretações (correlação positiva, negativa, sem significância), com
+# a medida usada (MEDIDAS_REVISOES, conforme resumo['coluna_revisoes']) nos campos
+RQS_REVISOES = {
+    'RQ05': {
+        'titulo': 'RQ 05: Tamanho dos PRs vs Número de {Medida}',
+        'questao': 'Qual a relação entre o tamanho dos PRs e o {numero}?',
+        'interpretacao': ('PRs maiores tendem a {verbo} mais {medida}.',
+                          'PRs menores tendem a {verbo} mais {medida}.',
+                          'Não há evidência estatística de correlação entre o tamanho do PR e o número de {medida}.'),
+    },
+    'RQ06': {
+        'titulo': 'RQ 06: Tempo de Análise vs Número de {Medida}',
+        'questao': 'Qual a relação entre o tempo de análise dos PRs e o {numero}?',
+        'interpretacao': ('PRs que levam mais tempo tendem a {verbo} mais {medida}.',
+                          'PRs mais rápidos tendem a {verbo} mais {medida}.',
+                          'Não há evidência estatística de correlação entre o tempo de análise e o número de {medida}.'),
+    },
+    'RQ07': {
+        'titulo': 'RQ 07: Descrição dos PRs vs Número de {Medida}',
+        'questao': 'Qual a relação entre a descrição dos PRs e o {numero}?',
+        'interpretacao': ('PRs com descrições mais detalhadas tendem a {verbo} mais {medida}.',
+                          'PRs com descrições mais curtas tendem a {verbo} mais {medida}.',
+                          'Não há evidência estatística de correlação entre o tamanho da descrição e o número de {medida}.'),
+    },
+    'RQ08': {
+        'titulo': 'RQ 08: Interações vs Número de {Medida}',
+        'questao': 'Qual a relação entre as interações nos PRs e o {numero}?',
+        'interpretacao': ('PRs com mais comentários tendem a {verbo} mais {medida} (esperado).',
+                          'PRs com menos comentários tendem a {verbo} mais {medida} (contra-intuitivo).',
+                          'Não há evidência estatística de correlação entre comentários e número de {medida}.'),
+    },
+}
+
+# Coluna da Dimensão B -> termos dos textos de RQS_REVISOES
+MEDIDAS_REVISOES = {
+    'num_reviews': {'medida': 'revisões', 'Medida': 'Revisões', 'numero': 'número de revisões realizadas',
+                    'verbo': 'receber'},
+    'num_participants': {'medida': 'participantes', 'Medida': 'Participantes',
+                         'numero': 'número de participantes', 'verbo': 'ter'},
+}
+
+TEMPLATES = {
+    'md': {
+        'inicio': Template(''),
+        'fim': Template(''),
+        'titulo': Template('$marcador $texto\n\n'),
+        'paragrafo': Template('$texto\n\n'),
+        'lista_inicio': Template(''),
+        'lista_fim': Template('\n'),
+        'item': Template('$recuo- $texto\n$subitens'),
+        'item_numerado': Template('$recuo$numero. $texto\n$subitens'),
+        'recuo': '   ',
+        'tabela_cabecalho': Template('| $celulas |\n| $separadores |\n'),
+        'tabela_linha': Template('| $celulas |\n'),
+        'tabela_fim': Template('\n'),
+        'celula_cabecalho': Template('$texto'),
+        'celula': Template('$texto'),
+        'separador_celulas': ' | ',
+        'imagem': Template('![$alt]($caminho)\n\n'),
+        'separador': Template('---\n\n'),
+    },
+    'html': {
+        'inicio': Template('<!DOCTYPE html>\n<html lang="pt-BR">\n<head>\n<meta charset="utf-8">\n'
+                           '<title>$titulo</title>\n<style>\n'
+                           'body { font-family: sans-serif; max-width: 960px; margin: auto; padding: 1em; }\n'
+                           'table { border-collapse: collapse; }\n'
+                           'th, td { border: 1px solid #ccc; padding: 4px 8px; }\n'
+                           'img { max-width: 100%; }\n'
+                           '</style>\n</head>\n<body>\n'),
+        'fim': Template('</body>\n</html>\n'),
+        'titulo': Template('<h$nivel>$texto</h$nivel>\n'),
+        'paragrafo': Template('<p>$texto</p>\n'),
+        'lista_inicio': Template('<$tag>\n'),
+        'lista_fim': Template('</$tag>\n'),
+        'item': Template('<li>$texto$subitens</li>\n'),
+        'item_numerado': Template('<li>$texto$subitens</li>\n'),
+        'recuo': '',
+        'tabela_cabecalho': Template('<table>\n<thead><tr>$celulas</tr></thead>\n<tbody>\n'),
+        'tabela_linha': Template('<tr>$celulas</tr>\n'),
+        'tabela_fim': Template('</tbody>\n</table>\n'),
+        'celula_cabecalho': Template('<th>$texto</th>'),
+        'celula': Template('<td>$texto</td>'),
+        'separador_celulas': '',
+        'imagem': Template('<p><img src="$caminho" alt="$alt"></p>\n'),
+        'separador': Template('<hr>\n'),
+    },
+}
+
+
+# ============================================================================
+# Formatação
+# ============================================================================
+
+def _num(valor, casas: int = 2) -> str:
+    if valor is None or valor != valor:
+        return '-'
+    return f"{valor:.{casas}f}"
+
+
+def _ic(intervalo, casas: int = 2) -> str:
+    if not intervalo:
+        return '[-]'
+    return f"[{_num(intervalo[0], casas)}; {_num(intervalo[1], casas)}]"
+
+
+def _significancia(significativo) -> str:
+    return '✓ Significativo' if significativo else '✗ Não significativo'
+
+
+def _significativo(resultado: Dict) -> bool:
+    # A RQ04 tem dois testes: é significativa se algum deles for
+    if 'significativo' in resultado:
+        return bool(resultado['significativo'])
+    return bool(resultado.get('significativo_comments') or resultado.get('significativo_participants'))
+
+
+def _data(iso: Optional[str], formato: str) -> str:
+    return datetime.fromisoformat(iso).strftime(formato) if iso else '-'
+
+
+def _markdown_para_html(texto: str) -> str:
+    texto = html.escape(texto, quote=False)
+    texto = re.sub(r'\*\*(.+?)\*\*', r'<strong>\1</strong>', texto)
+    return re.sub(r'\*(.+?)\*', r'<em>\1</em>', texto)
+
+
+def _serializavel(valor):
+    """
+    Converte tipos do numpy em tipos nativos e NaN em None para o JSON
+    """
+    if isinstance(valor, dict):
+        return {str(k): _serializavel(v) for k, v in valor.items()}
+    if isinstance(valor, (list, tuple)):
+        return [_serializavel(v) for v in valor]
+    if hasattr(valor, 'tolist'):
+        return _serializavel(valor.tolist())
+    if isinstance(valor, float) and valor != valor:
+        return None
+    return valor
+
+
+# ============================================================================
+# Conteúdo do relatório
+# ============================================================================
+
+def _interpretacao(significativo: bool, primeiro: bool, textos) -> tuple:
+    if not significativo:
+        texto = textos[2]
+    else:
+        texto = textos[0] if primeiro else textos[1]
+    return ('paragrafo', f"**Interpretação:** {texto}")
+
+
+def _blocos_status(rq: str, r: Dict) -> Iterator[tuple]:
+    config = RQS_STATUS[rq]
+    yield ('titulo', 3, config['titulo'])
+    yield ('paragrafo', f"**Questão:** {config['questao']}")
+    yield ('paragrafo', "**Resultados:**")
+
+    itens = []
+    for status, media in (('merged', r['merged_mean']), ('closed', r['closed_mean'])):
+        dias = media / 24 if media is not None else None
+        itens.append(config['media'].substitute(status=status, media=_num(media), dias=_num(dias)))
+    itens.append(f"Teste Mann-Whitney U: U={_num(r['u_stat'])}, p={_num(r['p_value'], 4)}")
+    itens.append(f"**Significância:** {_significancia(r['significativo'])}")
+    yield ('lista', itens, False)
+
+    menor = r['merged_mean'] is not None and r['closed_mean'] is not None and r['merged_mean'] < r['closed_mean']
+    yield _interpretacao(r['significativo'], menor, config['interpretacao'])
+
+
+def _blocos_interacoes(r: Dict) -> Iterator[tuple]:
+    yield ('titulo', 3, "RQ 04: Interações nos PRs vs Feedback Final")
+    yield ('paragrafo', "**Questão:** Qual a relação entre as interações nos PRs e o feedback final das revisões?")
+
+    for sufixo, nome, unidade in (('comments', 'Comentários', 'comentários'),
+                                  ('participants', 'Participantes', 'participantes')):
+        yield ('paragrafo', f"**Resultados - {nome}:**")
+        yield ('lista', [
+            f"PRs **merged** têm em média **{_num(r[f'merged_mean_{sufixo}'])} {unidade}**",
+            f"PRs **closed** têm em média **{_num(r[f'closed_mean_{sufixo}'])} {unidade}**",
+            f"Teste Mann-Whitney U: U={_num(r[f'u_stat_{sufixo}'])}, p={_num(r[f'p_value_{sufixo}'], 4)}",
+            f"**Significância:** {_significancia(r[f'significativo_{sufixo}'])}",
+        ], False)
+
+    if _significativo(r):
+        texto = "O nível de interação (comentários e/ou participantes) influencia o status final do PR."
+    else:
+        texto = "Não há evidência estatística de que o nível de interação influencie o status final do PR."
+    yield ('paragrafo', f"**Interpretação:** {texto}")
+
+
+def _blocos_revisoes(rq: str, r: Dict, coluna: str) -> Iterator[tuple]:
+    medida = MEDIDAS_REVISOES[coluna]
+    config = RQS_REVISOES[rq]
+    yield ('titulo', 3, config['titulo'].format(**medida))
+    yield ('paragrafo', f"**Questão:** {config['questao'].format(**medida)}")
+    yield ('paragrafo', "**Resultados:**")
+    yield ('lista', [
+        f"Correlação de Spearman: ρ={_num(r['correlacao'], 4)}",
+        f"P-valor: p={_num(r['p_value'], 4)}",
+        f"Interpretação: Correlação {r['interpretacao'] or '-'}",
+        f"**Significância:** {_significancia(r['significativo'])}",
+    ], False)
+
+    positiva = r['correlacao'] is not None and r['correlacao'] > 0
+    yield _interpretacao(r['significativo'], positiva, [texto.format(**medida) for texto in config['interpretacao']])
+
+
+def _blocos_bootstrap(resultados: Dict) -> Iterator[tuple]:
+    rqs = [rq for rq in GRAFICOS if resultados.get(rq, {}).get('bootstrap')]
+    if not rqs:
+        return
+
+    yield ('titulo', 2, "Intervalos de Confiança (Bootstrap) e Testes de Permutação")
+
+    yield ('titulo', 3, "Dimensão A: Medianas e Tamanho de Efeito")
+    linhas = [
+        [rq, variavel,
+         f"{_num(b['mediana_merged'])} {_ic(b['mediana_merged_ic'])}",
+         f"{_num(b['mediana_closed'])} {_ic(b['mediana_closed_ic'])}",
+         f"{_num(b['efeito_u'], 4)} {_ic(b['efeito_u_ic'], 4)}",
+         _num(b['p_value_permutacao'], 4)]
+        for rq in rqs for variavel, b in resultados[rq]['bootstrap'].items() if b['teste'] == 'mann_whitney'
+    ]
+    yield ('tabela', ["RQ", "Variável", "Mediana Merged (IC)", "Mediana Closed (IC)", "Efeito U (IC)",
+                      "p (permutação)"], linhas)
+
+    yield ('titulo', 3, "Dimensão B: Correlação de Spearman")
+    linhas = [
+        [rq, f"{variavel} vs {b['comparacao']}", _num(resultados[rq]['correlacao'], 4),
+         _ic(b['rho_ic'], 4), _num(b['p_value_permutacao'], 4)]
+        for rq in rqs for variavel, b in resultados[rq]['bootstrap'].items() if b['teste'] == 'spearman'
+    ]
+    yield ('tabela', ["RQ", "Variáveis", "ρ", "IC de ρ", "p (permutação)"], linhas)
+
+    exemplo = next(iter(resultados[rqs[0]]['bootstrap'].values()))
+    yield ('paragrafo', f"*Intervalos percentis de {exemplo['nivel_confianca'] * 100:.0f}% com "
+                        f"{exemplo['n_reamostragens']} reamostragens bootstrap. "
+                        "Efeito U = U1 / (n1 · n2), a probabilidade de um PR merged superar um PR closed. "
+                        "P-valores de permutação exatos quando todos os rearranjos cabem no número de permutações.*")
+    yield ('separador',)
+
+
+def _blocos_estratificados(resultados: Dict) -> Iterator[tuple]:
+    rqs = [rq for rq in GRAFICOS if resultados.get(rq, {}).get('estratificado')]
+    if not rqs:
+        return
+
+    yield ('titulo', 2, "Análise Estratificada por Repositório")
+    yield ('paragrafo', "Cada teste foi calculado separadamente em cada repositório (mínimo de 3 PRs por grupo) "
+                        "e os resultados foram combinados, para que repositórios grandes não dominem a análise.")
+
+    linhas = []
+    for rq in rqs:
+        for variavel, e in resultados[rq]['estratificado'].items():
+            if not e['n_grupos_validos']:
+                linhas.append([rq, variavel, f"0/{e['n_grupos']}", '-', '-', '-'])
+                continue
+            if e['teste'] == 'mann_whitney':
+                combinado = f"Efeito U médio = {_num(e['efeito_u_medio'], 4)} (van Elteren z={_num(e['z'])})"
+            else:
+                combinado = f"ρ = {_num(e['correlacao'], 4)} {_ic(e['correlacao_ic'], 4)}"
+            linhas.append([rq, variavel, f"{e['n_grupos_validos']}/{e['n_grupos']}", combinado,
+                           _num(e['p_value'], 4), str(e['n_grupos_significativos'])])
+
+    yield ('tabela', ["RQ", "Variável", "Repositórios válidos", "Resultado combinado", "p-valor",
+                      "Repos. com p < 0.05"], linhas)
+    yield ('paragrafo', "*Mann-Whitney combinado pelo teste de van Elteren; Spearman combinado pela "
+                        "transformação z de Fisher ponderada por (n - 3).*")
+    yield ('separador',)
+
+
+def _blocos_aproximados(resultados: Dict) -> Iterator[tuple]:
+    rqs = [rq for rq in GRAFICOS if resultados.get(rq, {}).get('aproximado')]
+    if not rqs:
+        return
+
+    yield ('titulo', 2, "Testes Aproximados")
+    yield ('paragrafo', "Nestas RQs os testes foram calculados a partir de histogramas de postos. Os intervalos "
+                        "contêm com certeza a estatística e o p-valor que o cálculo exato daria.")
+
+    linhas = []
+    for rq in rqs:
+        for variavel, a in resultados[rq]['aproximado'].items():
+            if a['teste'] == 'mann_whitney':
+                estatistica = f"U = {_num(a['u_stat'])} {_ic(a['u_intervalo'])}"
+            else:
+                estatistica = f"ρ = {_num(a['correlacao'], 4)} {_ic(a['correlacao_intervalo'], 4)}"
+            p_min, p_max = a['p_intervalo']
+            conclusao = "não" if p_min < 0.05 <= p_max else "sim"
+            linhas.append([rq, variavel, estatistica, f"{_num(a['p_value'], 4)} {_ic(a['p_intervalo'], 4)}",
+                           conclusao])
+
+    yield ('tabela', ["RQ", "Variável", "Estatística (limites)", "p-valor (limites)", "Conclusão a 5% garantida"],
+           linhas)
+    yield ('separador',)
+
+
+def _blocos(resultados: Dict, resumo: Dict, formato_graficos: Optional[str]) -> Iterator[tuple]:
+    """
+    Sequência de blocos do relatório, independente do formato de saída
+    """
+    def grafico(rq: str) -> Iterator[tuple]:
+        if formato_graficos:
+            yield ('imagem', rq, f"graficos/{GRAFICOS[rq]}.{formato_graficos}")
+        yield ('separador',)
+
+    total = resumo['total_prs']
+
+    # Cabeçalho
+    yield ('titulo', 1, TITULO)
+    yield ('paragrafo', f"**Data da análise:** {_data(resumo.get('data_analise'), '%d/%m/%Y %H:%M')}")
+    yield ('paragrafo', f"**Dataset:** {total} Pull Requests")
+    yield ('paragrafo', f"**Repositórios analisados:** {resumo['n_repositorios']}")
+    yield ('separador',)
+
+    # Sumário executivo
+    yield ('titulo', 2, "Sumário Executivo")
+    yield ('paragrafo', "Este relatório apresenta os resultados da análise de code review em repositórios "
+                        "populares do GitHub, investigando as relações entre características dos PRs e dois "
+                        "outcomes principais:")
+    # Relatórios de datasets sem num_reviews (ou de caches antigos) usam o número de participantes
+    coluna_revisoes = resumo.get('coluna_revisoes', 'num_participants')
+    proxy = coluna_revisoes != 'num_reviews'
+    yield ('lista', ["**Dimensão A:** Feedback final das revisões (PR merged ou closed)",
+                     "**Dimensão B:** Número de revisões realizadas"
+                     + (" (proxy: número de participantes)" if proxy else "")], True)
+    yield ('separador',)
+
+    # Estatísticas descritivas gerais
+    yield ('titulo', 2, "Estatísticas Descritivas Gerais")
+    yield ('titulo', 3, "Status dos PRs")
+    yield ('lista', [
+        f"**PRs Merged:** {resumo['merged']} ({_num(resumo['merged'] / total * 100 if total else None, 1)}%)",
+        f"**PRs Closed (não merged):** {resumo['closed']} "
+        f"({_num(resumo['closed'] / total * 100 if total else None, 1)}%)",
+    ], False)
+
+    yield ('titulo', 3, "Métricas Gerais")
+    yield ('tabela', ["Métrica", "Média", "Mediana", "Desvio Padrão"], [
+        [nome, _num(d['mean']), _num(d['50%']), _num(d['std'])]
+        for metrica, nome in METRICAS_GERAIS if metrica in resumo['metricas']
+        for d in [resumo['metricas'][metrica]]
+    ])
+    yield ('separador',)
+
+    # Dimensão A: Feedback Final
+    yield ('titulo', 2, "Dimensão A: Feedback Final das Revisões")
+    for rq in RQS_STATUS:
+        yield from _blocos_status(rq, resultados[rq])
+        yield from grafico(rq)
+    yield from _blocos_interacoes(resultados['RQ04'])
+    yield from grafico('RQ04')
+
+    # Dimensão B: Número de Revisões
+    yield ('titulo', 2, "Dimensão B: Número de Revisões Realizadas")
+    if proxy:
+        yield ('paragrafo', "*Nota: O número de participantes é usado como proxy para o número de revisões.*")
+    for rq in RQS_REVISOES:
+        yield from _blocos_revisoes(rq, resultados[rq], coluna_revisoes)
+        yield from grafico(rq)
+
+    yield from _blocos_aproximados(resultados)
+    yield from _blocos_bootstrap(resultados)
+    yield from _blocos_estratificados(resultados)
+
+    # Conclusões
+    significativas = sum(_significativo(resultados[rq]) for rq in GRAFICOS)
+    yield ('titulo', 2, "Conclusões Gerais")
+    yield ('paragrafo', f"Das 8 questões de pesquisa analisadas, **{significativas} apresentaram resultados "
+                        f"estatisticamente significativos** (p < 0.05).")
+    yield ('titulo', 3, "Principais Achados:")
+
+    for dimensao, rqs in (("**Dimensão A - Feedback Final:**", ['RQ01', 'RQ02', 'RQ03', 'RQ04']),
+                          ("**Dimensão B - Número de Revisões:**", ['RQ05', 'RQ06', 'RQ07', 'RQ08'])):
+        yield ('paragrafo', dimensao)
+        yield ('lista', [
+            f"✓ **{rq}:** {resultados[rq]['titulo']} - Relação significativa encontrada"
+            if _significativo(resultados[rq]) else
+            f"✗ **{rq}:** {resultados[rq]['titulo']} - Sem relação significativa"
+            for rq in rqs
+        ], False)
+    yield ('separador',)
+
+    # Metodologia
+    yield ('titulo', 2, "Metodologia")
+    yield ('titulo', 3, "Testes Estatísticos Utilizados:")
+    yield ('lista', [
+        ("**Teste de Mann-Whitney U:** Para comparar duas grupos independentes (PRs merged vs closed)",
+         ["Não paramétrico, não assume distribuição normal", "Apropriado para dados com outliers"]),
+        ("**Correlação de Spearman:** Para medir a associação entre duas variáveis contínuas",
+         ["Não paramétrica, baseada em ranks", "Detecta relações monotônicas (não apenas lineares)"]),
+    ], True)
+    yield ('titulo', 3, "Nível de Significância:")
+    yield ('lista', ["α = 0.05 (5%)", "Resultados com p < 0.05 são considerados estatisticamente significativos"],
+           False)
+    yield ('titulo', 3, "Tratamento de Outliers:")
+    yield ('lista', ["Outliers extremos foram tratados usando clipping nos percentis 1% e 99%",
+                     "Dados originais preservados para análises robustas"], False)
+    yield ('separador',)
+
+    yield ('paragrafo', f"*Relatório gerado automaticamente pela Sprint 2 em "
+                        f"{datetime.now().strftime('%d/%m/%Y às %H:%M')}*")
+
+
+# ============================================================================
+# Renderização
+# ============================================================================
+
+def _renderizar_lista(t: Dict, inline, itens: List, ordenada: bool, recuo: str = '') -> str:
+    tag = 'ol' if ordenada else 'ul'
+    partes = [t['lista_inicio'].substitute(tag=tag)]
+    for numero, item in enumerate(itens, 1):
+        texto, subitens = item if isinstance(item, tuple) else (item, [])
+        sub = _renderizar_lista(t, inline, subitens, False, recuo + t['recuo']) if subitens else ''
+        modelo = t['item_numerado'] if ordenada else t['item']
+        partes.append(modelo.substitute(recuo=recuo, numero=numero, texto=inline(texto), subitens=sub))
+    partes.append(t['lista_fim'].substitute(tag=tag))
+    return ''.join(partes)
+
+
+def _renderizar_bloco(t: Dict, inline, bloco: tuple) -> str:
+    tipo = bloco[0]
+
+    if tipo == 'titulo':
+        _, nivel, texto = bloco
+        return t['titulo'].substitute(nivel=nivel, marcador='#' * nivel, texto=inline(texto))
+    if tipo == 'paragrafo':
+        return t['paragrafo'].substitute(texto=inline(bloco[1]))
+    if tipo == 'lista':
+        return _renderizar_lista(t, inline, bloco[1], bloco[2])
+    if tipo == 'tabela':
+        _, cabecalho, linhas = bloco
+        juntar = t['separador_celulas'].join
+        partes = [t['tabela_cabecalho'].substitute(
+            celulas=juntar(t['celula_cabecalho'].substitute(texto=inline(c)) for c in cabecalho),
+            separadores=juntar('---' for _ in cabecalho))]
+        for linha in linhas:
+            partes.append(t['tabela_linha'].substitute(
+                celulas=juntar(t['celula'].substitute(texto=inline(c)) for c in linha)))
+        partes.append(t['tabela_fim'].substitute())
+        return ''.join(partes)
+    if tipo == 'imagem':
+        return t['imagem'].substitute(alt=inline(bloco[1]), caminho=bloco[2])
+    return t['separador'].substitute()
+
+
+def renderizar(resultados: Dict, resumo: Dict, formato: str = 'md',
+               formato_graficos: Optional[str] = None) -> Iterator[str]:
+    """
+    Renderiza o relatório em partes
+
+    Args:
+        resultados: Resultados das RQs (AnalisadorPRs.resultados)
+        resumo: Totais e estatísticas descritivas (AnalisadorPRs.resumo)
+        formato: 'md', 'html' ou 'json'
+        formato_graficos: Extensão dos gráficos referenciados (None omite as imagens)
+
+    Returns:
+        Iterador de trechos de texto do relatório
+    """
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato de relatório inválido: {formato} (use um de {', '.join(FORMATOS)})")
+
+    if formato == 'json':
+        dados = {'titulo': TITULO, 'resumo': resumo, 'resultados': resultados}
+        yield from json.JSONEncoder(ensure_ascii=False, indent=2).iterencode(_serializavel(dados))
+        return
+
+    t = TEMPLATES[formato]
+    inline = _markdown_para_html if formato == 'html' else str
+
+    yield t['inicio'].substitute(titulo=inline(TITULO))
+    for bloco in _blocos(resultados, resumo, formato_graficos):
+        yield _renderizar_bloco(t, inline, bloco)
+    yield t['fim'].substitute()
+
+
+def gerar_relatorio(resultados: Dict, resumo: Dict, caminho: Path, formato: str = 'md',
+                    formato_graficos: Optional[str] = None) -> Path:
+    """
+    Escreve o relatório no arquivo, à medida que é renderizado
+
+    Returns:
+        Caminho do arquivo gerado
+    """
+    with open(caminho, 'w', encoding='utf-8') as f:
+        f.writelines(renderizar(resultados, resumo, formato, formato_graficos))
+    return Path(caminho)
+
+
+# ============================================================================
+# Cache de resultados
+# ============================================================================
+
+def salvar_cache(caminho: Path, resultados: Dict, resumo: Dict, formato_graficos: Optional[str] = None):
+    """
+    Salva resultados e resumo em JSON para regenerar o relatório sem o dataset
+    """
+    dados = {'resumo': resumo, 'resultados': resultados, 'formato_graficos': formato_graficos}
+    with open(caminho, 'w', encoding='utf-8') as f:
+        json.dump(_serializavel(dados), f, ensure_ascii=False, indent=2)
+
+
+def carregar_cache(caminho: Path) -> Dict:
+    with open(caminho, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def main():
+    """
+    Regenera o relatório a partir do cache de resultados
+    """
+    base = configuracao.caminho_base()
+
+    parser = argparse.ArgumentParser(description="Regenera o relatório a partir dos resultados em cache")
+    parser.add_argument('--cache', default=str(base / "resultados_sprint2.json"), help="Cache de resultados (JSON)")
+    parser.add_argument('--formato', choices=FORMATOS, default='md', help="Formato do relatório")
+    parser.add_argument('--saida', help="Arquivo de saída (padrão: relatorio_sprint2.<formato> ao lado do cache)")
+    args = parser.parse_args()
+
+    cache = carregar_cache(args.cache)
+    saida = Path(args.saida) if args.saida else Path(args.cache).with_name(f"relatorio_sprint2.{args.formato}")
+
+    gerar_relatorio(cache['resultados'], cache['resumo'], saida, args.formato, cache.get('formato_graficos'))
+    print(f"✓ Relatório salvo: {saida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,769 @@
+"""
+Sumários mescláveis para análise em fluxo (streaming)
+Lab 03 - Caracterizando a atividade de code review no GitHub
+
+Estruturas que podem ser atualizadas bloco a bloco e mescladas entre si:
+- EsbocoKLL: esboço de quantis KLL (erro de posto ~ 1.7 / k)
+- Momentos: contagem, média e variância (Welford / Chan), com retirada
+- SomaPostos: U do Mann-Whitney mantido a cada inserção ou retirada, sobre
+  tabelas ordenadas por valor (TabelaOrdenada)
+- Tabelas de contagem por valor distinto, a partir das quais os testes de
+  Mann-Whitney e Spearman são calculados com os mesmos postos médios do scipy
+- Histogramas de postos: versões aproximadas dos dois testes, com limites de
+  erro garantidos, para colunas com muitos valores distintos
+
+Testes aproximados
+------------------
+Os valores são agrupados em faixas (uma por valor quando a métrica é inteira
+e tem até `faixas` valores possíveis; senão, faixas delimitadas por quantis de
+uma amostra ou de um EsbocoKLL) e os testes tratam os valores de uma mesma
+faixa como empatados. O custo é O(n) para discretizar (uma busca binária nas
+bordas) mais O(faixas), em vez da ordenação completa do scipy, e os
+histogramas podem ser reaproveitados entre subgrupos e reamostragens.
+
+Cada quantil q vira uma faixa unitária (anterior(q), q]: valores muito
+repetidos (o 0 de description_chars, por exemplo) ficam sozinhos em uma faixa
+"pura", que não gera erro. Só as faixas impuras, que podem conter valores
+distintos, contribuem para os limites abaixo (t_k é o total da faixa k e
+c1_k, c2_k as contagens de cada grupo nela):
+
+- Mann-Whitney: cada par (grupo 1, grupo 2) dentro de uma faixa impura conta
+  1/2 em U, quando o valor exato é 0, 1/2 ou 1. Logo
+      |U - U_exato| <= 1/2 · Σ_k c1_k · c2_k,
+  que é no máximo Σ t_k² / 8 ≈ n² / (8 · faixas) com faixas de massa n / faixas,
+  ou seja, erro de no máximo ~1 / (2 · faixas) no tamanho de efeito U / (n1 · n2).
+- Spearman: o posto exato de cada observação fica a no máximo h_k = (t_k - 1) / 2
+  do posto médio da sua faixa, e a soma dos quadrados dos postos de x fica entre
+  a do histograma e ela mais Σ (t_k³ - t_k) / 12. Com isso, o numerador e o
+  denominador de ρ ficam em intervalos calculáveis a partir do histograma
+  conjunto, e ρ exato fica em [ρ_min, ρ_max] (erro da ordem de 1.5 / faixas
+  por variável discretizada).
+- P-valores: o p-valor é monótono na estatística, e a variância sob H0 do
+  histograma é no máximo a exata (juntar empates só a reduz). Os intervalos
+  de p valem para os p-valores assintóticos que o scipy calcula.
+
+Os limites são garantidos (não probabilísticos): a qualidade dos quantis só
+afeta a largura do intervalo, nunca a validade. A validação contra o scipy
+está em benchmarks/validar_testes_aproximados.py.
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+
+class EsbocoKLL:
+    """
+    Esboço de quantis KLL (Karnin, Lang e Liberty, 2016)
+
+    Cada nível h guarda itens com peso 2^h. Quando um nível excede sua capacidade,
+    ele é ordenado e metade dos itens (pares ou ímpares, ao acaso) sobe de nível.
+    """
+
+    def __init__(self, k: int = 2000, semente: Optional[int] = None):
+        self.k = k
+        self.n = 0
+        self.niveis: List[np.ndarray] = [np.empty(0)]
+        self._rng = np.random.default_rng(semente)
+
+    def _capacidade(self, nivel: int) -> int:
+        profundidade = len(self.niveis) - nivel - 1
+        return max(2, int(np.ceil(self.k * (2 / 3) ** profundidade)))
+
+    def _compactar(self):
+        nivel = 0
+        while nivel < len(self.niveis):
+            itens = self.niveis[nivel]
+            if len(itens) > self._capacidade(nivel):
+                if nivel + 1 == len(self.niveis):
+                    self.niveis.append(np.empty(0))
+
+                itens = np.sort(itens)
+                # Com número ímpar de itens, o último fica no nível atual
+                sobra = itens[-1:] if len(itens) % 2 else itens[:0]
+                pares = itens[:len(itens) - len(sobra)]
+                deslocamento = self._rng.integers(2)
+
+                self.niveis[nivel + 1] = np.concatenate([self.niveis[nivel + 1], pares[deslocamento::2]])
+                self.niveis[nivel] = sobra
+            nivel += 1
+
+    def atualizar(self, valores):
+        valores = np.asarray(valores, dtype=float)
+        valores = valores[~np.isnan(valores)]
+        if not len(valores):
+            return
+        self.n += len(valores)
+        self.niveis[0] = np.concatenate([self.niveis[0], valores])
+        self._compactar()
+
+    def mesclar(self, outro: 'EsbocoKLL'):
+        while len(self.niveis) < len(outro.niveis):
+            self.niveis.append(np.empty(0))
+        for nivel, itens in enumerate(outro.niveis):
+            self.niveis[nivel] = np.concatenate([self.niveis[nivel], itens])
+        self.n += outro.n
+        self._compactar()
+
+    def quantis(self, qs: Iterable[float]) -> np.ndarray:
+        """
+        Quantis aproximados (inverso da distribuição acumulada ponderada)
+        """
+        itens = np.concatenate(self.niveis)
+        pesos = np.concatenate([np.full(len(v), 2.0 ** h) for h, v in enumerate(self.niveis)])
+
+        if not len(itens):
+            return np.full(len(list(qs)), np.nan)
+
+        ordem = np.argsort(itens, kind='stable')
+        itens, acumulado = itens[ordem], np.cumsum(pesos[ordem])
+        alvo = np.asarray(list(qs), dtype=float) * acumulado[-1]
+        indices = np.minimum(np.searchsorted(acumulado, alvo, side='left'), len(itens) - 1)
+        return itens[indices]
+
+
+class Momentos:
+    """
+    Contagem, média, variância, mínimo e máximo mescláveis (algoritmo de Chan)
+    """
+
+    def __init__(self):
+        self.n = 0
+        self.media = 0.0
+        self.m2 = 0.0
+        self.minimo = np.inf
+        self.maximo = -np.inf
+
+    def _combinar(self, n: int, media: float, m2: float, minimo: float, maximo: float):
+        if not n:
+            return
+        total = self.n + n
+        delta = media - self.media
+        self.media += delta * n / total
+        self.m2 += m2 + delta ** 2 * self.n * n / total
+        self.n = total
+        self.minimo = min(self.minimo, minimo)
+        self.maximo = max(self.maximo, maximo)
+
+    @classmethod
+    def de_agregados(cls, n: int, media: float, m2: float, minimo: float, maximo: float) -> 'Momentos':
+        """
+        Momentos já agregados em outro lugar (ex.: COUNT, AVG e soma dos quadrados em SQL)
+        """
+        momentos = cls()
+        momentos._combinar(n, media, m2, minimo, maximo)
+        return momentos
+
+    def atualizar(self, valores):
+        valores = np.asarray(valores, dtype=float)
+        valores = valores[~np.isnan(valores)]
+        if len(valores):
+            media = valores.mean()
+            self._combinar(len(valores), media, ((valores - media) ** 2).sum(),
+                           valores.min(), valores.max())
+
+    def mesclar(self, outro: 'Momentos'):
+        self._combinar(outro.n, outro.media, outro.m2, outro.minimo, outro.maximo)
+
+    def retirar(self, valores):
+        """
+        Desfaz um atualizar(valores) (algoritmo de Chan invertido)
+
+        Mínimo e máximo não são recalculados: continuam limites dos valores restantes.
+        """
+        valores = np.asarray(valores, dtype=float)
+        valores = valores[~np.isnan(valores)]
+        if not len(valores):
+            return
+        restantes = self.n - len(valores)
+        if restantes <= 0:
+            self.n, self.media, self.m2 = 0, 0.0, 0.0
+            return
+        media = valores.mean()
+        media_restante = (self.n * self.media - len(valores) * media) / restantes
+        delta = media - media_restante
+        self.m2 = max(0.0, self.m2 - ((valores - media) ** 2).sum() - delta ** 2 * restantes * len(valores) / self.n)
+        self.media = media_restante
+        self.n = restantes
+
+    @property
+    def desvio_padrao(self) -> float:
+        # Desvio padrão amostral (ddof=1), como em pandas.Series.std
+        return float(np.sqrt(self.m2 / (self.n - 1))) if self.n > 1 else float('nan')
+
+
+class TabelaOrdenada:
+    """
+    Contagens por valor distinto em arrays ordenados, com consultas de posto por busca binária
+
+    Atualizar com d valores custa O(d log d + D) (D valores distintos, cópia vetorizada),
+    e cada consulta O(log D): nada depende do número total de observações.
+    """
+
+    def __init__(self, valores=None, contagens=None):
+        self.valores = np.asarray(valores if valores is not None else [], dtype=float)
+        self.contagens = np.asarray(contagens if contagens is not None else [], dtype=np.int64)
+        self._acumulado = None
+
+    @property
+    def n(self) -> int:
+        return int(self.contagens.sum())
+
+    def contagem(self, consultas) -> np.ndarray:
+        """
+        Número de observações iguais a cada consulta
+        """
+        consultas = np.asarray(consultas, dtype=float)
+        posicoes = np.searchsorted(self.valores, consultas)
+        encontrados = posicoes < len(self.valores)
+        encontrados[encontrados] = self.valores[posicoes[encontrados]] == consultas[encontrados]
+        return np.where(encontrados, self.contagens[np.minimum(posicoes, len(self.valores) - 1)]
+                        if len(self.valores) else 0, 0)
+
+    def menores(self, consultas) -> np.ndarray:
+        """
+        Número de observações menores que cada consulta
+        """
+        if self._acumulado is None:
+            self._acumulado = np.concatenate([[0], np.cumsum(self.contagens)])
+        return self._acumulado[np.searchsorted(self.valores, np.asarray(consultas, dtype=float), side='left')]
+
+    def atualizar(self, valores, sinal: int = 1):
+        """
+        Insere (sinal=1) ou retira (sinal=-1) observações
+        """
+        valores = np.asarray(valores, dtype=float)
+        valores, contagens = np.unique(valores[~np.isnan(valores)], return_counts=True)
+        if not len(valores):
+            return
+
+        posicoes = np.searchsorted(self.valores, valores)
+        existentes = posicoes < len(self.valores)
+        existentes[existentes] = self.valores[posicoes[existentes]] == valores[existentes]
+
+        if sinal < 0 and not existentes.all():
+            raise ValueError("retirada de valores que não estão na tabela")
+
+        self.contagens = self.contagens.copy()
+        self.contagens[posicoes[existentes]] += sinal * contagens[existentes]
+
+        self.valores = np.insert(self.valores, posicoes[~existentes], valores[~existentes])
+        self.contagens = np.insert(self.contagens, posicoes[~existentes], contagens[~existentes])
+        if (self.contagens < 0).any():
+            raise ValueError("retirada de mais observações do que a tabela contém")
+
+        vazios = self.contagens == 0
+        if vazios.any():
+            self.valores, self.contagens = self.valores[~vazios], self.contagens[~vazios]
+        self._acumulado = None
+
+    def serie(self) -> pd.Series:
+        """
+        Tabela no formato de contar_valores (índice: valor, valor: contagem)
+        """
+        return pd.Series(self.contagens, index=self.valores)
+
+
+class SomaPostos:
+    """
+    Estatística U1 do Mann-Whitney mantida incrementalmente
+
+    Com S(X, Y) = #{x > y} + #{x = y} / 2 sobre os pares de X × Y, inserir X1 no
+    grupo 1 e X2 no grupo 2 soma S(X1, G2) + S(G1, X2) + S(X1, X2) a U1 (G1 e G2
+    antes da inserção); retirar subtrai S(X1, G2) + S(G1, X2) - S(X1, X2). A soma
+    dos empates Σ (t³ - t) da correção da variância é atualizada só nos valores
+    afetados. U1 é guardado dobrado, como inteiro, para não acumular erro.
+    """
+
+    def __init__(self):
+        self.grupos = (TabelaOrdenada(), TabelaOrdenada())
+        self.conjunta = TabelaOrdenada()
+        self.dobro_u = 0
+        self.empates = 0
+
+    @staticmethod
+    def _dobro_s(x: np.ndarray, tabela_y: TabelaOrdenada) -> int:
+        # 2 · S(X, Y) = Σ_x (2 · #{y < x} + #{y = x})
+        return int((2 * tabela_y.menores(x) + tabela_y.contagem(x)).sum())
+
+    @staticmethod
+    def _dobro_s_inverso(tabela_x: TabelaOrdenada, y: np.ndarray) -> int:
+        # 2 · S(X, Y) = Σ_y (2 · #{x > y} + #{x = y})
+        return int((2 * (tabela_x.n - tabela_x.menores(y)) - tabela_x.contagem(y)).sum())
+
+    def atualizar(self, grupo1, grupo2, sinal: int = 1):
+        """
+        Insere (sinal=1) ou retira (sinal=-1) observações de cada grupo
+        """
+        x1, x2 = (np.asarray(x, dtype=float) for x in (grupo1, grupo2))
+        x1, x2 = x1[~np.isnan(x1)], x2[~np.isnan(x2)]
+        if not len(x1) and not len(x2):
+            return
+
+        g1, g2 = self.grupos
+        cruzados = self._dobro_s(x1, TabelaOrdenada(*np.unique(x2, return_counts=True)))
+        self.dobro_u += sinal * (self._dobro_s(x1, g2) + self._dobro_s_inverso(g1, x2)) + cruzados
+
+        afetados = np.unique(np.concatenate([x1, x2]))
+        antes = self.conjunta.contagem(afetados)
+        g1.atualizar(x1, sinal)
+        g2.atualizar(x2, sinal)
+        self.conjunta.atualizar(np.concatenate([x1, x2]), sinal)
+        depois = self.conjunta.contagem(afetados)
+        self.empates += sum(int(t) ** 3 - int(t) for t in depois) - sum(int(t) ** 3 - int(t) for t in antes)
+
+    def resultado(self) -> Tuple[Optional[float], Optional[float]]:
+        """
+        (U1, p-valor bilateral), como mann_whitney_de_contagens
+        """
+        n1, n2 = self.grupos[0].n, self.grupos[1].n
+
+        if n1 < 3 or n2 < 3:
+            return None, None
+
+        n = n1 + n2
+        u1 = self.dobro_u / 2
+        variancia = n1 * n2 / 12 * ((n + 1) - self.empates / (n * (n - 1)))
+
+        if variancia <= 0:
+            return float(u1), 1.0
+
+        z = max(0.0, abs(u1 - n1 * n2 / 2) - 0.5) / np.sqrt(variancia)
+        return float(u1), float(min(1.0, 2 * stats.norm.sf(z)))
+
+
+# ============================================================================
+# Tabelas de contagem por valor distinto
+# ============================================================================
+
+def contar_valores(valores: pd.Series) -> pd.Series:
+    return valores.dropna().value_counts(sort=False)
+
+
+def contar_pares(x: pd.Series, y: pd.Series) -> pd.Series:
+    pares = pd.DataFrame({'x': x, 'y': y}).dropna()
+    return pares.groupby(['x', 'y'], sort=False).size()
+
+
+def mesclar_contagens(acumulado: Optional[pd.Series], novas: pd.Series) -> pd.Series:
+    if acumulado is None:
+        return novas.astype(np.int64)
+    return acumulado.add(novas, fill_value=0).astype(np.int64)
+
+
+class AcumuladorContagens:
+    """
+    Soma de tabelas de contagem, mescladas em lotes
+
+    Cada mescla (Series.add) realinha a tabela acumulada inteira. As tabelas
+    novas ficam pendentes até somarem tantas linhas quanto a acumulada e são
+    mescladas de uma vez: o custo amortizado por bloco fica proporcional ao
+    tamanho do bloco, e não ao número de valores distintos já vistos.
+    """
+
+    def __init__(self):
+        self._tabela: Optional[pd.Series] = None
+        self._pendentes: List[pd.Series] = []
+        self._linhas_pendentes = 0
+
+    def adicionar(self, contagens: pd.Series):
+        self._pendentes.append(contagens)
+        self._linhas_pendentes += len(contagens)
+        if self._linhas_pendentes >= len(self._tabela if self._tabela is not None else ()):
+            self._mesclar()
+
+    def _mesclar(self):
+        if not self._pendentes:
+            return
+        novas = pd.concat(self._pendentes)
+        niveis = list(range(novas.index.nlevels)) if novas.index.nlevels > 1 else 0
+        novas = novas.groupby(level=niveis, sort=False).sum()
+        self._tabela = mesclar_contagens(self._tabela, novas)
+        self._pendentes, self._linhas_pendentes = [], 0
+
+    def __len__(self) -> int:
+        """Limite superior do número de linhas (exato depois de `tabela`)"""
+        return len(self._tabela if self._tabela is not None else ()) + self._linhas_pendentes
+
+    @property
+    def tabela(self) -> pd.Series:
+        self._mesclar()
+        return self._tabela if self._tabela is not None else pd.Series(dtype=np.int64)
+
+    def reagrupar(self, nivel: int, funcao):
+        """
+        Aplica `funcao` aos valores de um nível do índice e soma as linhas que coincidem
+
+        Args:
+            nivel: Nível do índice (0 nas tabelas por valor)
+            funcao: Função vetorizada sobre os valores do nível
+        """
+        tabela = self.tabela
+        if tabela.empty:
+            return
+        indice = tabela.index
+        niveis = [indice.get_level_values(i) for i in range(indice.nlevels)]
+        niveis[nivel] = funcao(niveis[nivel].to_numpy(dtype=float))
+        self._tabela = tabela.groupby(niveis if len(niveis) > 1 else niveis[0], sort=False).sum().astype(np.int64)
+        self._tabela.index.names = indice.names
+
+
+def agrupar_relativo(valores: np.ndarray, precisao: float) -> np.ndarray:
+    """
+    Agrupa valores em faixas geométricas de largura relativa `precisao`
+
+    Cada valor não nulo vira o representante ±(1 + precisao)^k mais próximo (erro
+    relativo de no máximo ~precisao / 2); zero e NaN são mantidos. Valores entre
+    m e M > 0 ocupam no máximo ln(M / m) / ln(1 + precisao) + 1 faixas, qualquer
+    que seja o número de valores. A função é idempotente: reagrupar uma tabela já
+    agrupada não muda nada.
+
+    Args:
+        valores: Valores (float)
+        precisao: Largura relativa das faixas, ex.: 1e-3
+
+    Returns:
+        Array com o representante de cada valor
+    """
+    valores = np.asarray(valores, dtype=float)
+    passo = np.log1p(precisao)
+    modulo = np.abs(valores)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        representantes = np.sign(valores) * np.exp(np.round(np.log(modulo) / passo) * passo)
+    return np.where(modulo > 0, representantes, valores)
+
+
+def _postos_medios(contagens: np.ndarray) -> np.ndarray:
+    return np.cumsum(contagens) - (contagens - 1) / 2.0
+
+
+def descrever_contagens(contagens: pd.Series) -> Dict[str, float]:
+    """
+    Média, mediana e desvio padrão exatos a partir de uma tabela de contagens
+    """
+    contagens = contagens.sort_index()
+    valores, c = contagens.index.to_numpy(dtype=float), contagens.to_numpy(dtype=float)
+    n = c.sum()
+
+    if not n:
+        return {'count': 0, 'mean': float('nan'), '50%': float('nan'), 'std': float('nan')}
+
+    media = (valores * c).sum() / n
+    variancia = (c * (valores - media) ** 2).sum() / (n - 1) if n > 1 else float('nan')
+    acumulado = np.cumsum(c)
+    mediana = (valores[np.searchsorted(acumulado, (n + 1) // 2)] +
+               valores[np.searchsorted(acumulado, n // 2 + 1)]) / 2
+
+    return {'count': int(n), 'mean': float(media), '50%': float(mediana), 'std': float(np.sqrt(variancia))}
+
+
+def quantis_de_contagens(contagens: pd.Series, qs: Iterable[float]) -> np.ndarray:
+    """
+    Quantis exatos a partir de uma tabela de contagens (interpolação linear, como pandas.Series.quantile)
+    """
+    contagens = contagens.sort_index()
+    valores, acumulado = contagens.index.to_numpy(dtype=float), np.cumsum(contagens.to_numpy())
+    qs = np.asarray(list(qs), dtype=float)
+
+    if not len(valores):
+        return np.full(len(qs), np.nan)
+
+    posicao = qs * (acumulado[-1] - 1)
+    abaixo = valores[np.searchsorted(acumulado, np.floor(posicao), side='right')]
+    acima = valores[np.searchsorted(acumulado, np.ceil(posicao), side='right')]
+    return abaixo + (acima - abaixo) * (posicao - np.floor(posicao))
+
+
+def mann_whitney_de_contagens(contagens1: pd.Series, contagens2: pd.Series) -> Tuple[Optional[float], Optional[float]]:
+    """
+    Mann-Whitney U bilateral a partir das contagens por valor de cada grupo
+
+    Equivale ao stats.mannwhitneyu(method='asymptotic') com correção de empates
+    e de continuidade. Retorna (U1, p-valor), ou (None, None) se algum grupo
+    tiver menos de 3 observações.
+    """
+    tabela = pd.concat([contagens1, contagens2], axis=1).fillna(0).sort_index()
+    c1, c2 = tabela.iloc[:, 0].to_numpy(dtype=float), tabela.iloc[:, 1].to_numpy(dtype=float)
+    n1, n2 = c1.sum(), c2.sum()
+
+    if n1 < 3 or n2 < 3:
+        return None, None
+
+    t = c1 + c2
+    n = n1 + n2
+    u1 = (c1 * _postos_medios(t)).sum() - n1 * (n1 + 1) / 2
+    variancia = n1 * n2 / 12 * ((n + 1) - (t ** 3 - t).sum() / (n * (n - 1)))
+
+    if variancia <= 0:
+        return float(u1), 1.0
+
+    z = max(0.0, abs(u1 - n1 * n2 / 2) - 0.5) / np.sqrt(variancia)
+    return float(u1), float(min(1.0, 2 * stats.norm.sf(z)))
+
+
+def spearman_de_contagens(conjunta: pd.Series) -> Tuple[Optional[float], Optional[float]]:
+    """
+    Correlação de Spearman a partir das contagens de cada par (x, y)
+
+    Usa os postos médios de x e de y ponderados pelas contagens dos pares e o
+    p-valor da distribuição t com n - 2 graus de liberdade, como o scipy.
+    """
+    n = float(conjunta.sum())
+
+    if n < 3:
+        return None, None
+
+    centro = (n + 1) / 2
+
+    def postos_do_nivel(nivel: int) -> np.ndarray:
+        marginal = conjunta.groupby(level=nivel).sum().sort_index()
+        postos = pd.Series(_postos_medios(marginal.to_numpy(dtype=float)), index=marginal.index)
+        return postos.reindex(conjunta.index.get_level_values(nivel)).to_numpy() - centro
+
+    rx, ry = postos_do_nivel(0), postos_do_nivel(1)
+    c = conjunta.to_numpy(dtype=float)
+    sxx, syy = (c * rx * rx).sum(), (c * ry * ry).sum()
+
+    if sxx <= 0 or syy <= 0:
+        return float('nan'), float('nan')
+
+    rho = float(np.clip((c * rx * ry).sum() / np.sqrt(sxx * syy), -1, 1))
+
+    if abs(rho) == 1:
+        return rho, 0.0
+
+    t = rho * np.sqrt((n - 2) / (1 - rho ** 2))
+    return rho, float(2 * stats.t.sf(abs(t), n - 2))
+
+
+# ============================================================================
+# Testes aproximados a partir de histogramas de postos
+# ============================================================================
+
+# Acima deste número de células, o histograma conjunto é montado com np.unique
+# em vez de uma matriz densa (faixas de x · faixas de y)
+LIMITE_CELULAS_DENSAS = 1 << 22
+
+
+def bordas_de_quantis(quantis: Iterable[float]) -> np.ndarray:
+    """
+    Bordas de faixas (busca com side='left') em que cada quantil vira uma faixa unitária
+
+    Args:
+        quantis: Quantis dos valores (ex.: EsbocoKLL.quantis ou np.quantile de uma amostra)
+
+    Returns:
+        Bordas ordenadas: a faixa k é (bordas[k - 1], bordas[k]]
+    """
+    q = np.asarray(list(quantis), dtype=float)
+    q = np.unique(q[~np.isnan(q)])
+    return np.unique(np.concatenate([np.nextafter(q, -np.inf), q]))
+
+
+def discretizar(valores, faixas: int = 4096, quantis: Optional[Iterable[float]] = None,
+                amostra: int = 200_000) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Faixa de cada valor e máscara das faixas puras (que só admitem um valor)
+
+    Valores inteiros com até `faixas` valores possíveis usam uma faixa por valor,
+    sem nenhuma aproximação. Os demais usam as bordas de `quantis` ou, sem eles,
+    de faixas / 2 quantis de uma amostra sistemática de até `amostra` valores.
+
+    Args:
+        valores: Valores sem NaN
+        faixas: Número aproximado de faixas
+        quantis: Quantis já calculados (ex.: de um EsbocoKLL)
+        amostra: Tamanho da amostra usada para os quantis
+
+    Returns:
+        Tupla (códigos das faixas, máscara das faixas puras)
+    """
+    valores = np.asarray(valores)
+    if not len(valores):
+        return np.zeros(0, dtype=np.intp), np.ones(1, dtype=bool)
+
+    minimo, maximo = valores.min(), valores.max()
+    inteiros = np.issubdtype(valores.dtype, np.integer) or bool(np.all(valores == np.floor(valores)))
+
+    if inteiros and maximo - minimo < faixas:
+        return (valores - minimo).astype(np.intp), np.ones(int(maximo - minimo) + 1, dtype=bool)
+
+    if quantis is None:
+        passo = max(1, len(valores) // amostra)
+        quantis = np.quantile(valores[::passo], np.linspace(0, 1, faixas // 2 + 1))
+
+    bordas = bordas_de_quantis(quantis)
+    puras = np.zeros(len(bordas) + 1, dtype=bool)
+    puras[1:-1] = bordas[:-1] == np.nextafter(bordas[1:], -np.inf)
+    return np.searchsorted(bordas, valores, side='left'), puras
+
+
+def _p_normal(desvio: float, variancia: float) -> float:
+    # P-valor bilateral com correção de continuidade, como em mann_whitney_de_contagens
+    if variancia <= 0:
+        return 1.0
+    z = max(0.0, desvio - 0.5) / np.sqrt(variancia)
+    return float(min(1.0, 2 * stats.norm.sf(z)))
+
+
+def _p_spearman(rho: float, n: float) -> float:
+    if abs(rho) >= 1:
+        return 0.0
+    t = rho * np.sqrt((n - 2) / (1 - rho ** 2))
+    return float(2 * stats.t.sf(abs(t), n - 2))
+
+
+def mann_whitney_de_histogramas(h1, h2, puras) -> Optional[Dict]:
+    """
+    Mann-Whitney U bilateral aproximado a partir dos histogramas dos grupos nas mesmas faixas
+
+    Args:
+        h1: Contagem do grupo 1 em cada faixa
+        h2: Contagem do grupo 2 em cada faixa
+        puras: Máscara das faixas puras (ver discretizar)
+
+    Returns:
+        Dicionário com u_stat e p_value (da tabela de faixas), erro_u, u_intervalo e
+        p_intervalo (que contêm os valores exatos), ou None se algum grupo tiver
+        menos de 3 observações
+    """
+    c1, c2 = np.asarray(h1, dtype=float), np.asarray(h2, dtype=float)
+    puras = np.asarray(puras, dtype=bool)
+    n1, n2 = c1.sum(), c2.sum()
+
+    if n1 < 3 or n2 < 3:
+        return None
+
+    t = c1 + c2
+    n = n1 + n2
+    u1 = float((c1 * _postos_medios(t)).sum() - n1 * (n1 + 1) / 2)
+    erro = float(0.5 * (c1 * c2)[~puras].sum())
+
+    # Empates das faixas impuras podem não existir: sem eles a variância é a máxima
+    empates = t ** 3 - t
+    variancia_min = n1 * n2 / 12 * ((n + 1) - empates.sum() / (n * (n - 1)))
+    variancia_max = n1 * n2 / 12 * ((n + 1) - empates[puras].sum() / (n * (n - 1)))
+
+    desvio = abs(u1 - n1 * n2 / 2)
+    p_min = _p_normal(desvio + erro, variancia_min) if variancia_min > 0 else 0.0
+    p_max = _p_normal(max(0.0, desvio - erro), variancia_max)
+
+    return {
+        'u_stat': u1,
+        'p_value': _p_normal(desvio, variancia_min),
+        'erro_u': erro,
+        'u_intervalo': [max(0.0, u1 - erro), min(n1 * n2, u1 + erro)],
+        'p_intervalo': [p_min, p_max],
+        'faixas': int(np.count_nonzero(t)),
+    }
+
+
+def spearman_de_histograma(ix, iy, contagens, puras_x, puras_y) -> Optional[Dict]:
+    """
+    Correlação de Spearman aproximada a partir do histograma conjunto
+
+    Args:
+        ix: Faixa de x de cada célula não vazia
+        iy: Faixa de y de cada célula não vazia
+        contagens: Número de observações de cada célula
+        puras_x: Máscara das faixas puras de x
+        puras_y: Máscara das faixas puras de y
+
+    Returns:
+        Dicionário com correlacao e p_value (da tabela de faixas), erro, correlacao_intervalo
+        e p_intervalo (que contêm os valores exatos), ou None com menos de 3 observações
+    """
+    c = np.asarray(contagens, dtype=float)
+    n = c.sum()
+
+    if n < 3:
+        return None
+
+    centro = (n + 1) / 2
+
+    def marginal(indices, puras):
+        puras = np.asarray(puras, dtype=bool)
+        t = np.bincount(indices, weights=c, minlength=len(puras))
+        postos = _postos_medios(t) - centro
+        meia_largura = np.where(puras, 0.0, np.maximum(t - 1, 0) / 2)
+        soma = (t * postos * postos).sum()
+        return postos[indices], meia_largura[indices], soma, soma + ((t ** 3 - t) / 12)[~puras].sum()
+
+    ax, hx, sxx, sxx_max = marginal(ix, puras_x)
+    ay, hy, syy, syy_max = marginal(iy, puras_y)
+
+    cov = (c * ax * ay).sum()
+    erro = (c * (hx * (np.abs(ay) + hy) + np.abs(ax) * hy)).sum()
+
+    if sxx <= 0 or syy <= 0:
+        return {'correlacao': float('nan'), 'p_value': float('nan'), 'erro': float('nan'),
+                'correlacao_intervalo': [-1.0, 1.0], 'p_intervalo': [0.0, 1.0], 'faixas': [0, 0]}
+
+    d_min, d_max = np.sqrt(sxx * syy), np.sqrt(sxx_max * syy_max)
+    alto, baixo = cov + erro, cov - erro
+    rho_max = float(np.clip(alto / (d_min if alto > 0 else d_max), -1, 1))
+    rho_min = float(np.clip(baixo / (d_max if baixo > 0 else d_min), -1, 1))
+    rho = float(np.clip(cov / d_min, -1, 1))
+
+    maior = max(abs(rho_min), abs(rho_max))
+    menor = 0.0 if rho_min <= 0 <= rho_max else min(abs(rho_min), abs(rho_max))
+
+    return {
+        'correlacao': rho,
+        'p_value': _p_spearman(rho, n),
+        'erro': max(rho_max - rho, rho - rho_min),
+        'correlacao_intervalo': [rho_min, rho_max],
+        'p_intervalo': [_p_spearman(maior, n), _p_spearman(menor, n)],
+        'faixas': [len(np.unique(ix)), len(np.unique(iy))],
+    }
+
+
+def mann_whitney_aproximado(grupo1, grupo2, faixas: int = 4096, quantis: Optional[Iterable[float]] = None,
+                            pesos1=None, pesos2=None) -> Optional[Dict]:
+    """
+    Mann-Whitney U aproximado (ver mann_whitney_de_histogramas)
+
+    Os dois grupos são discretizados nas mesmas faixas. Com pesos, grupo1 e grupo2
+    são os valores distintos de tabelas de contagem e os pesos, suas contagens.
+    """
+    grupo1, grupo2 = np.asarray(grupo1, dtype=float), np.asarray(grupo2, dtype=float)
+    codigos, puras = discretizar(np.concatenate([grupo1, grupo2]), faixas, quantis)
+    h1 = np.bincount(codigos[:len(grupo1)], weights=pesos1, minlength=len(puras))
+    h2 = np.bincount(codigos[len(grupo1):], weights=pesos2, minlength=len(puras))
+    return mann_whitney_de_histogramas(h1, h2, puras)
+
+
+def histograma_conjunto(cx, cy, faixas_y: int, pesos=None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Células não vazias do histograma conjunto de dois vetores de códigos de faixa
+
+    Returns:
+        Tupla (faixa de x, faixa de y, contagem) de cada célula não vazia
+    """
+    celulas = np.asarray(cx, dtype=np.intp) * faixas_y + cy
+    total = (int(celulas.max()) + 1) if len(celulas) else 0
+
+    if total <= LIMITE_CELULAS_DENSAS:
+        contagens = np.bincount(celulas, weights=pesos, minlength=total)
+        celulas = np.flatnonzero(contagens)
+        contagens = contagens[celulas]
+    else:
+        celulas, inverso = np.unique(celulas, return_inverse=True)
+        contagens = np.bincount(inverso, weights=pesos)
+
+    ix, iy = np.divmod(celulas, faixas_y)
+    return ix, iy, contagens
+
+
+def spearman_aproximado(x, y, faixas: int = 4096, quantis_x: Optional[Iterable[float]] = None,
+                        quantis_y: Optional[Iterable[float]] = None, pesos=None) -> Optional[Dict]:
+    """
+    Correlação de Spearman aproximada (ver spearman_de_histograma)
+
+    Com pesos, cada par (x, y) é uma célula de uma tabela de contagem e os pesos, suas contagens.
+    """
+    cx, puras_x = discretizar(x, faixas, quantis_x)
+    cy, puras_y = discretizar(y, faixas, quantis_y)
+    return spearman_de_histograma(*histograma_conjunto(cx, cy, len(puras_y), pesos), puras_x, puras_y)